@@ -1,49 +1,115 @@
-import { injectable } from 'inversify';
+import { injectable, inject, optional } from 'inversify';
 import * as vscode from 'vscode';
 import * as path from 'path';
-import { PythonParser, ModelInfo, FieldInfo, ManagerInfo } from '../parsers/pythonParser';
+import * as fs from 'fs';
+import { FieldInfo, ManagerInfo } from '../parsers/pythonParser';
+import { ModelExtractor, ModelRelation, EnhancedModelInfo } from '../parsers/modelExtractor';
 import { getFieldLookups } from '../data/djangoFieldTypes';
-import { DJANGO_MODEL_METHODS, DJANGO_MODEL_PROPERTIES } from '../data/djangoMethods';
-
-interface ModelRelation {
-    fromModel: string;
-    toModel: string;
-    fieldName: string;
-    relationType: 'ForeignKey' | 'OneToOneField' | 'ManyToManyField';
-    relatedName?: string;
+import { TYPES } from '../container/types';
+import { ModelStore } from './modelStore';
+import { PrebuiltProjectIndex } from './prebuiltProjectIndex';
+import { GitCheckoutMonitor, CommitSnapshotCache } from './gitCheckoutMonitor';
+import { MemoryConsumer } from '../cache/memoryBudgetManager';
+import { AnalysisQuarantine } from './analysisQuarantine';
+import { AnalysisSnapshot } from './analysisSnapshot';
+import { PersistentAnalysisCache } from '../cache/persistentAnalysisCache';
+import { ClassHierarchyIndex, ClassHierarchyChange } from './classHierarchyIndex';
+import { ServerUnavailableError } from '../server/connection';
+
+export type { ModelRelation, ModelMethod, EnhancedModelInfo } from '../parsers/modelExtractor';
+
+function mergeByName<T extends { name: string }>(primary: T[], secondary: T[]): T[] {
+    const names = new Set(primary.map(item => item.name));
+    return [...primary, ...secondary.filter(item => !names.has(item.name))];
 }
 
-interface ModelMethod {
-    name: string;
-    isProperty: boolean;
-    isClassMethod: boolean;
-    isStaticMethod: boolean;
-    parameters: string[];
-    returnType?: string;
+/**
+ * Combine a parsed model with its description from the live registry. The
+ * registry is authoritative for fields, managers and relations; members only
+ * the parser knows about (e.g. added since the last refresh) are kept.
+ */
+export function mergeLiveModel(parsed: EnhancedModelInfo, live: EnhancedModelInfo): EnhancedModelInfo {
+    const liveRelationFields = new Set(live.relations.map(relation => relation.fieldName));
+    return {
+        ...parsed,
+        app: live.app,
+        fields: mergeByName(live.fields, parsed.fields),
+        methods: mergeByName(parsed.methods, live.methods),
+        properties: Array.from(new Set([...parsed.properties, ...live.properties])),
+        managers: mergeByName(live.managers, parsed.managers),
+        isAbstract: live.isAbstract,
+        meta: live.meta,
+        relations: [
+            ...live.relations,
+            ...parsed.relations.filter(relation => !liveRelationFields.has(relation.fieldName))
+        ]
+    };
 }
 
-interface EnhancedModelInfo {
-    name: string;
-    app: string;
-    fields: FieldInfo[];
-    methods: ModelMethod[];
-    properties: string[];
-    managers: ManagerInfo[];
-    baseClasses: string[];
-    isAbstract: boolean;
-    relations: ModelRelation[];
+/**
+ * Runs model extraction somewhere else, e.g. in the analysis server process.
+ * `modelBases` names models of other modules the file derives from.
+ */
+export interface ModelExtractionBackend {
+    extractModels(code: string, filePath: string, modelBases?: string[]): Promise<EnhancedModelInfo[]>;
 }
 
 @injectable()
 export class AdvancedModelAnalyzer {
-    private models: Map<string, EnhancedModelInfo> = new Map();
+    private store: ModelStore;
+    // Writer's view of the store's models, including unpublished changes
+    private models: ReadonlyMap<string, EnhancedModelInfo>;
+    private externalModelNames: Set<string> = new Set();
+    // Models reported by the live registry, and those of them no file defines
+    private liveModels: Map<string, EnhancedModelInfo> = new Map();
+    private liveOnlyModelNames: Set<string> = new Set();
     private relations: ModelRelation[] = [];
+    private fileModels: Map<string, string[]> = new Map();
+    // Models as their files define them, by qualified class name; the
+    // registered models add what they inherit from other modules
+    private declaredModels: Map<string, EnhancedModelInfo> = new Map();
+    private classHierarchy: ClassHierarchyIndex;
+    // Set while this analyzer indexes a file, whose descendants it refreshes itself
+    private indexingFile = false;
     private fileCache: Map<string, { content: string; timestamp: number }> = new Map();
-    private parser: PythonParser;
+    private extractor: ModelExtractor;
+    private quarantine: AnalysisQuarantine;
+    private extractionBackend: ModelExtractionBackend | undefined;
+    private commitSnapshots: CommitSnapshotCache<EnhancedModelInfo[]> | undefined;
+    private persistentCache: PersistentAnalysisCache<EnhancedModelInfo[]> | undefined;
+    // Analyzes the file of a model that is not indexed yet, see resolveModel()
+    private modelResolver: ((name: string) => Promise<void>) | undefined;
     private readonly cacheDuration = 5000; // 5 seconds
+    private _onDidChangeModels = new vscode.EventEmitter<string[]>();
+    // Models changed since the last publish, and whether a batch defers it
+    private pendingChanges: Set<string> = new Set();
+    private batchDepth = 0;
+    // getAllModels() result for the snapshot generation it was built from
+    private allModels: { generation: number; models: { [key: string]: EnhancedModelInfo } } | undefined;
+
+    /**
+     * Fired with the names of models that were added, removed or changed,
+     * once the snapshot containing the change is published
+     */
+    readonly onDidChangeModels = this._onDidChangeModels.event;
 
-    constructor() {
-        this.parser = new PythonParser();
+    constructor(
+        @inject(TYPES.ModelStore) @optional() store?: ModelStore,
+        @inject(TYPES.PrebuiltProjectIndex) @optional() private prebuiltIndex?: PrebuiltProjectIndex,
+        @inject(TYPES.AnalysisQuarantine) @optional() quarantine?: AnalysisQuarantine,
+        @inject(TYPES.ClassHierarchyIndex) @optional() classHierarchy?: ClassHierarchyIndex
+    ) {
+        this.store = store || new ModelStore();
+        this.models = this.store.getModels();
+        this.extractor = new ModelExtractor();
+        this.quarantine = quarantine || new AnalysisQuarantine();
+        this.classHierarchy = classHierarchy || new ClassHierarchyIndex();
+        // Bases such as mixins may live in files no model analysis covers
+        this.classHierarchy.onDidChangeClasses(change => {
+            if (!this.indexingFile) {
+                this.refreshInheritedModels(change);
+            }
+        });
     }
 
     async analyzeModelCode(code: string, filePath: string): Promise<void> {
@@ -59,370 +125,543 @@ export class AdvancedModelAnalyzer {
         this.fileCache.set(filePath, { content: code, timestamp: Date.now() });
 
         try {
-            const parseResult = await this.parser.parseModelFile(code, filePath);
-            
-            for (const model of parseResult.models) {
-                const enhancedModel = await this.enhanceModelInfo(model, code);
-                this.models.set(model.name, enhancedModel);
-                
-                // Extract relations with source code for related_name extraction
-                this.extractRelations(enhancedModel, code);
+            this.indexingFile = true;
+            try {
+                this.classHierarchy.updateFile(filePath, code);
+            } finally {
+                this.indexingFile = false;
             }
-            
-            // After all models are analyzed, add reverse relations
-            this.addReverseRelations();
+
+            const models = await this.extractProjectModels(code, filePath);
+            if (!models) {
+                return; // Quarantined; keep what the file had
+            }
+            this.applyModels(filePath, models, this.fileModels.get(filePath) || []);
         } catch (error) {
             console.error(`Error analyzing model file ${filePath}:`, error);
         }
     }
 
-    private async enhanceModelInfo(model: ModelInfo, code: string): Promise<EnhancedModelInfo> {
-        const enhanced: EnhancedModelInfo = {
-            name: model.name,
-            app: model.app,
-            fields: model.fields,
-            methods: [],
-            properties: [],
-            managers: model.managers.map(m => ({ name: m, type: 'Manager' })),
-            baseClasses: [],
-            isAbstract: false,
-            relations: []
-        };
-
-        // Parse additional details using AST or regex
-        // This is a simplified implementation
-        enhanced.methods = this.extractMethods(code, model.name);
-        enhanced.properties = this.extractProperties(code, model.name);
-        enhanced.managers = this.extractManagers(code, model.name);
-        enhanced.baseClasses = this.extractBaseClasses(code, model.name);
-        enhanced.isAbstract = this.checkIfAbstract(code, model.name);
-
-        // Add default Django model methods
-        this.addDefaultDjangoMethods(enhanced);
-        
-        // Add inherited members from base classes
-        await this.addInheritedMembers(enhanced, code);
+    /**
+     * Re-parse some classes of an unsaved buffer. `code` holds the classes
+     * (and what they need to parse); only the models named in `classNames`
+     * are replaced, or all models of the file when it is omitted. Classes
+     * that are no longer models are removed. `buffer` is the whole unsaved
+     * file, which the class index is updated from; without classNames it
+     * is `code` itself.
+     */
+    async patchModelClasses(filePath: string, code: string, classNames?: string[], buffer?: string): Promise<void> {
+        // The store no longer reflects the file on disk
+        this.fileCache.delete(filePath);
 
-        return enhanced;
-    }
+        try {
+            const source = buffer ?? (classNames ? undefined : code);
+            if (source !== undefined) {
+                this.indexingFile = true;
+                try {
+                    this.classHierarchy.updateFile(filePath, source);
+                } finally {
+                    this.indexingFile = false;
+                }
+            }
 
-    private extractMethods(code: string, modelName: string): ModelMethod[] {
-        const methods: ModelMethod[] = [];
-        
-        // Regex to find methods in the model class
-        const classRegex = new RegExp(`class\\s+${modelName}\\s*\\([^)]*\\)\\s*:([\\s\\S]*?)(?=\\nclass\\s+\\w+|\\n\\n|$)`, 's');
-        const classMatch = code.match(classRegex);
-        
-        if (!classMatch) {
-            return methods;
-        }
-        
-        const classBody = classMatch[1];
-        
-        // Find methods - need to handle indented methods in Python
-        const methodRegex = /\s*(?:@(\w+)\s+)?def\s+(\w+)\s*\(([^)]*)\)/g;
-        let match;
-        
-        while ((match = methodRegex.exec(classBody)) !== null) {
-            const [_, decorator, methodName, params] = match;
-            
-            if (methodName === '__init__' || methodName === '__str__') {
-                continue;
+            // Bases in other modules tell the parser which classes are models
+            let models = await this.parseModels(code, filePath, this.getModelBases(filePath));
+            if (!models) {
+                return;
             }
-            
-            const parameters = params
-                .split(',')
-                .map(p => p.trim())
-                .filter(p => p && p !== 'self' && p !== 'cls');
-            
-            methods.push({
-                name: methodName,
-                isProperty: decorator === 'property',
-                isClassMethod: decorator === 'classmethod',
-                isStaticMethod: decorator === 'staticmethod',
-                parameters
-            });
+            let replaced = this.fileModels.get(filePath) || [];
+            if (classNames) {
+                const names = new Set(classNames);
+                models = models.filter(model => names.has(model.name));
+                replaced = replaced.filter(name => names.has(name));
+            }
+            this.applyModels(filePath, models, replaced);
+        } catch (error) {
+            console.error(`Error analyzing unsaved model changes in ${filePath}:`, error);
         }
-        
-        return methods;
     }
 
-    private extractProperties(code: string, modelName: string): string[] {
-        const properties: string[] = [];
-        
-        const classRegex = new RegExp(`class\\s+${modelName}\\s*\\([^)]*\\)\\s*:([\\s\\S]*?)(?=\\nclass\\s+\\w+|\\n\\n|$)`, 's');
-        const classMatch = code.match(classRegex);
-        
-        if (!classMatch) {
-            return properties;
+    /**
+     * Register models of a file. `replacedNames` are the models of the file
+     * the new ones supersede; the file's other models are kept.
+     */
+    private applyModels(filePath: string, models: EnhancedModelInfo[], replacedNames: string[]): void {
+        const replaced = new Set(replacedNames);
+        const newNames = new Set(models.map(model => model.name));
+        const keptNames = (this.fileModels.get(filePath) || []).filter(name => !replaced.has(name) && !newNames.has(name));
+        const changed = new Set<string>();
+
+        const previousSignatures = new Map<string, string>();
+        for (const name of [...replaced, ...newNames]) {
+            const existing = this.models.get(name);
+            if (existing) {
+                previousSignatures.set(name, this.getModelSignature(existing));
+            }
         }
-        
-        const classBody = classMatch[1];
-        
-        // Find @property decorated methods - handle indentation
-        const propertyRegex = /^\s*@property\s+def\s+(\w+)\s*\(/gm;
-        let match;
-        
-        while ((match = propertyRegex.exec(classBody)) !== null) {
-            properties.push(match[1]);
+
+        // Drop models that no longer exist in this file along with the
+        // relations previously contributed by them
+        const classNames: string[] = [];
+        for (const name of replaced) {
+            classNames.push(this.classHierarchy.qualify(filePath, name));
+            if (!newNames.has(name)) {
+                this.store.delete(name);
+                this.declaredModels.delete(this.classHierarchy.qualify(filePath, name));
+                changed.add(name);
+            }
         }
+        this.relations = this.relations.filter(relation => !replaced.has(relation.fromModel) && !newNames.has(relation.fromModel));
         
-        return properties;
-    }
+        for (const model of models) {
+            const className = this.classHierarchy.qualify(filePath, model.name);
+            classNames.push(className);
+            this.declaredModels.set(className, model);
+            this.registerModel(this.withInheritedMembers(className, model));
+        }
+        this.fileModels.set(filePath, [...keptNames, ...newNames]);
 
-    private extractManagers(code: string, modelName: string): ManagerInfo[] {
-        const managers: ManagerInfo[] = [
-            { name: 'objects', type: 'Manager', methods: [] } // Default manager
-        ];
-        
-        const classRegex = new RegExp(`class\\s+${modelName}\\s*\\([^)]*\\)\\s*:([\\s\\S]*?)(?=\\nclass\\s+\\w+|\\n\\n|$)`, 's');
-        const classMatch = code.match(classRegex);
-        
-        if (!classMatch) {
-            return managers;
+        // Models of other files that derive from the changed ones
+        const descendants = new Set(classNames.flatMap(name => this.classHierarchy.getDescendants(name)));
+        classNames.forEach(name => descendants.delete(name));
+        const previousDescendants = this.reregisterModels(descendants);
+        
+        // After all models are analyzed, add reverse relations
+        this.addReverseRelations();
+        this.collectChangedModels(previousDescendants).forEach(name => changed.add(name));
+
+        for (const parsed of models) {
+            // Compare what was registered, which may be merged with the live registry
+            const model = this.models.get(parsed.name) || parsed;
+            if (previousSignatures.get(model.name) !== this.getModelSignature(model)) {
+                changed.add(model.name);
+                // Reverse relations live on the target models
+                model.relations.forEach(relation => changed.add(relation.toModel));
+            }
         }
-        
-        const classBody = classMatch[1];
-        
-        // Find manager assignments
-        const managerRegex = /(\w+)\s*=\s*(\w+)\s*\(\)/g;
-        let match;
-        
-        while ((match = managerRegex.exec(classBody)) !== null) {
-            const [_, managerName, managerType] = match;
-            if (managerType.includes('Manager') && managerName !== 'objects') {
-                // Extract methods from the manager class
-                const managerMethods = this.extractManagerMethods(code, managerType);
-                managers.push({ name: managerName, type: managerType, methods: managerMethods });
+
+        this.publish(changed);
+    }
+
+    /**
+     * Extract the models of a project file, including classes that derive
+     * from models of other modules (e.g. an abstract base of a core app)
+     */
+    private extractProjectModels(code: string, filePath: string): Promise<EnhancedModelInfo[] | undefined> {
+        return this.extractModels(code, filePath, this.getModelBases(filePath));
+    }
+
+    /**
+     * Bases of a file's classes that are models of other modules, which the
+     * parser cannot tell from other classes by itself. Read from the class
+     * index, so the file's classes must be indexed first. Bases the parser
+     * recognizes (names containing "Model", classes of the same file) are
+     * left out.
+     */
+    private getModelBases(filePath: string): string[] {
+        const classes = this.classHierarchy.getClassesForFile(filePath);
+        const localNames = new Set(classes.map(cls => cls.name));
+        const modelBases = new Set<string>();
+        for (const cls of classes) {
+            for (const base of cls.bases) {
+                if (base.includes('Model') || localNames.has(base) || modelBases.has(base)) {
+                    continue;
+                }
+                const mro = this.classHierarchy.getMro(this.classHierarchy.resolveName(filePath, base));
+                if (mro.some(name => this.declaredModels.has(name) || /(^|\.)Model$/.test(name))) {
+                    modelBases.add(base);
+                }
             }
         }
-        
-        return managers;
+        return Array.from(modelBases).sort();
     }
-    
-    private extractManagerMethods(code: string, managerClassName: string): string[] {
-        const methods: string[] = [];
-        
-        // Find the manager class definition
-        const classRegex = new RegExp(`class\\s+${managerClassName}\\s*\\([^)]*\\)\\s*:([\\s\\S]*?)(?=class\\s+\\w+|$)`);
-        const classMatch = code.match(classRegex);
-        
-        if (!classMatch) {
-            return methods;
+
+    /**
+     * A declared model with the fields, methods, properties and managers it
+     * inherits, in method resolution order. Model bases contribute their
+     * parsed members, other classes (mixins) their methods and properties.
+     */
+    private withInheritedMembers(className: string, model: EnhancedModelInfo): EnhancedModelInfo {
+        let { fields, methods, properties, managers } = model;
+        for (const ancestor of this.classHierarchy.getMro(className).slice(1)) {
+            const base = this.declaredModels.get(ancestor);
+            if (base) {
+                fields = mergeByName(fields, base.fields);
+                methods = mergeByName(methods, base.methods);
+                properties = Array.from(new Set([...properties, ...base.properties]));
+                managers = mergeByName(managers, base.managers);
+                continue;
+            }
+
+            for (const member of this.classHierarchy.getClass(ancestor)?.members || []) {
+                if (member.kind === 'property' && !properties.includes(member.name)) {
+                    properties = [...properties, member.name];
+                } else if (member.kind === 'method' && !methods.some(method => method.name === member.name)) {
+                    methods = [...methods, {
+                        name: member.name,
+                        isProperty: false,
+                        isClassMethod: !!member.decorators?.includes('classmethod'),
+                        isStaticMethod: !!member.decorators?.includes('staticmethod'),
+                        parameters: member.parameters || []
+                    }];
+                }
+            }
         }
-        
-        const classBody = classMatch[1];
-        
-        // Find method definitions
-        const methodRegex = /def\s+(\w+)\s*\([^)]*\)/g;
-        let match;
-        
-        while ((match = methodRegex.exec(classBody)) !== null) {
-            const methodName = match[1];
-            // Skip special methods and get_queryset
-            if (!methodName.startsWith('__') && methodName !== 'get_queryset') {
-                methods.push(methodName);
+        // Registering canonicalizes the model in place; keep the declared one intact
+        return { ...model, fields, methods, properties, managers };
+    }
+
+    /**
+     * Register declared models again with what they inherit now. Returns
+     * the signatures of the models before, for collectChangedModels().
+     */
+    private reregisterModels(classNames: Iterable<string>): Map<string, string | undefined> {
+        const previous = new Map<string, string | undefined>();
+        for (const className of classNames) {
+            const declared = this.declaredModels.get(className);
+            if (!declared) {
+                continue;
             }
+            const existing = this.models.get(declared.name);
+            previous.set(declared.name, existing && this.getModelSignature(existing));
+            this.relations = this.relations.filter(relation => relation.fromModel !== declared.name);
+            this.registerModel(this.withInheritedMembers(className, declared));
         }
-        
-        return methods;
+        return previous;
     }
 
-    private extractBaseClasses(code: string, modelName: string): string[] {
-        const classRegex = new RegExp(`class\\s+${modelName}\\s*\\(([^)]*)\\)`);
-        const match = code.match(classRegex);
-        
-        if (!match) {
-            return [];
+    private collectChangedModels(previous: Map<string, string | undefined>): string[] {
+        return Array.from(previous.keys()).filter(name => {
+            const model = this.models.get(name);
+            return !model || previous.get(name) !== this.getModelSignature(model);
+        });
+    }
+
+    /**
+     * Refresh the models whose bases changed in a file this analyzer did not index
+     */
+    private refreshInheritedModels(change: ClassHierarchyChange): void {
+        const previous = this.reregisterModels(change.classes);
+        if (previous.size === 0) {
+            return;
         }
-        
-        return match[1]
-            .split(',')
-            .map(base => base.trim())
-            .filter(base => base && base !== 'models.Model');
+        this.addReverseRelations();
+        this.publish(this.collectChangedModels(previous));
     }
 
-    private checkIfAbstract(code: string, modelName: string): boolean {
-        const classRegex = new RegExp(`class\\s+${modelName}\\s*\\([^)]*\\)\\s*:([\\s\\S]*?)(?=\\nclass\\s+\\w+|\\n\\n|$)`, 's');
-        const classMatch = code.match(classRegex);
-        
-        if (!classMatch) {
-            return false;
+    /**
+     * The project-wide class index the inherited members come from
+     */
+    getClassHierarchy(): ClassHierarchyIndex {
+        return this.classHierarchy;
+    }
+
+    /**
+     * Parse and enhance the models of a file without registering them.
+     * Resolves to undefined while the file is quarantined.
+     */
+    async extractModels(code: string, filePath: string, modelBases: string[] = []): Promise<EnhancedModelInfo[] | undefined> {
+        // The prebuilt index was parsed without knowing other modules' models
+        const prebuilt = modelBases.length === 0 ? this.prebuiltIndex?.takeModels(filePath, code) : undefined;
+        if (prebuilt) {
+            return prebuilt;
         }
-        
-        const classBody = classMatch[1];
-        return /class\s+Meta\s*:[\s\S]*?abstract\s*=\s*True/.test(classBody);
+
+        // Cached results are only valid for the same model bases
+        const cacheKey = modelBases.length === 0 ? code : `${code}\0${modelBases.join('\0')}`;
+
+        // Registering a model reassigns its members, so hand out and keep copies
+        const snapshot = this.commitSnapshots?.get(filePath, cacheKey) || this.persistentCache?.getIfValid(filePath, cacheKey);
+        if (snapshot) {
+            return snapshot.map(model => ({ ...model }));
+        }
+
+        const models = await this.parseModels(code, filePath, modelBases);
+        if (models) {
+            this.commitSnapshots?.set(filePath, cacheKey, models.map(model => ({ ...model })));
+            this.persistentCache?.setWithHash(filePath, cacheKey, models.map(model => ({ ...model })));
+        }
+        return models;
     }
 
-    private extractRelations(model: EnhancedModelInfo, code: string): void {
-        for (const field of model.fields) {
-            if (['ForeignKey', 'OneToOneField', 'ManyToManyField'].includes(field.type)) {
-                // If the field already has relatedModel from parsing, use it
-                if (!field.relatedModel) {
-                    const relatedModel = this.extractRelatedModel(field);
-                    field.relatedModel = relatedModel;
+    /**
+     * Parse under the analysis time budget; quarantined files are skipped or
+     * parsed in the quarantine worker
+     */
+    private parseModels(code: string, filePath: string, modelBases: string[] = []): Promise<EnhancedModelInfo[] | undefined> {
+        return this.quarantine.run(
+            'model',
+            filePath,
+            code,
+            async measure => {
+                if (this.extractionBackend) {
+                    try {
+                        return await this.extractionBackend.extractModels(code, filePath, modelBases);
+                    } catch (error) {
+                        // Parse locally only when the server is not there to ask
+                        if (!(error instanceof ServerUnavailableError)) {
+                            this.quarantine.recordBackendFailure('model', filePath, code, error);
+                            return undefined;
+                        }
+                    }
                 }
-                
-                const relation: ModelRelation = {
-                    fromModel: model.name,
-                    toModel: field.relatedModel || 'UnknownModel',
-                    fieldName: field.name,
-                    relationType: field.type as any,
-                    relatedName: this.extractRelatedNameFromCode(code, model.name, field.name)
-                };
-                
-                this.relations.push(relation);
-                model.relations.push(relation);
-            }
-        }
+                return measure(() => this.extractor.extractModelsSync(code, filePath, modelBases));
+            },
+            worker => worker.extractModels(code, filePath, modelBases)
+        );
     }
 
-    private extractRelatedModel(field: FieldInfo): string {
-        // Extract model name from field definition
-        // Common patterns:
-        // ForeignKey('User', ...)
-        // ForeignKey(User, ...)
-        // ForeignKey('auth.User', ...)
-        
-        if (!field.helpText) {
-            return 'UnknownModel';
+    /**
+     * Keep the models of recently checked out commits so that switching back
+     * to a branch restores them without parsing
+     */
+    setCheckoutMonitor(monitor: GitCheckoutMonitor | undefined): void {
+        this.commitSnapshots = monitor?.createSnapshotCache<EnhancedModelInfo[]>();
+    }
+
+    /**
+     * Keep extracted models on disk so later sessions restore them without
+     * parsing; undefined stops persisting
+     */
+    setPersistentCache(cache: PersistentAnalysisCache<EnhancedModelInfo[]> | undefined): void {
+        this.persistentCache = cache;
+    }
+
+    /**
+     * Set how models missing from the snapshot are found, e.g. by the
+     * demand-driven project analyzer; undefined turns lookups off
+     */
+    setModelResolver(resolver: ((name: string) => Promise<void>) | undefined): void {
+        this.modelResolver = resolver;
+    }
+
+    /**
+     * Get a model, analyzing the file that defines it first when it is not
+     * indexed yet and a resolver is set
+     */
+    async resolveModel(name: string): Promise<EnhancedModelInfo | undefined> {
+        const model = this.getModel(name);
+        if (model || !this.modelResolver) {
+            return model;
         }
-        
-        // Try to extract from field definition in helpText
-        const patterns = [
-            /ForeignKey\s*\(\s*['"]([^'"]+)['"]/,  // ForeignKey('ModelName')
-            /ForeignKey\s*\(\s*([A-Z]\w+)/,        // ForeignKey(ModelName)
-            /OneToOneField\s*\(\s*['"]([^'"]+)['"]/,
-            /OneToOneField\s*\(\s*([A-Z]\w+)/,
-            /ManyToManyField\s*\(\s*['"]([^'"]+)['"]/,
-            /ManyToManyField\s*\(\s*([A-Z]\w+)/,
-        ];
-        
-        for (const pattern of patterns) {
-            const match = field.helpText.match(pattern);
-            if (match) {
-                // Handle app.Model format
-                const modelName = match[1];
-                return modelName.includes('.') ? modelName.split('.').pop()! : modelName;
-            }
+
+        try {
+            await this.modelResolver(name);
+        } catch (error) {
+            console.error(`Error resolving model ${name}:`, error);
         }
-        
-        return 'RelatedModel';
+        return this.getModel(name);
     }
 
-    private extractRelatedNameFromCode(code: string, modelName: string, fieldName: string): string | undefined {
-        // Extract the model class body
-        const classRegex = new RegExp(`class\\s+${modelName}\\s*\\([^)]*\\)\\s*:([\\s\\S]*?)(?=\\nclass\\s+\\w+|\\n\\n|$)`, 's');
-        const classMatch = code.match(classRegex);
-        
-        if (!classMatch) {
-            return undefined;
-        }
-        
-        const classBody = classMatch[1];
-        
-        // Find the field definition line
-        const fieldRegex = new RegExp(`${fieldName}\\s*=\\s*models\\.\\w+\\s*\\([^)]*\\)`, 'g');
-        const fieldMatch = fieldRegex.exec(classBody);
-        
-        if (!fieldMatch) {
-            return undefined;
+    /**
+     * Route model extraction through a backend, or back to in-process parsing
+     * when called without one
+     */
+    setExtractionBackend(backend: ModelExtractionBackend | undefined): void {
+        this.extractionBackend = backend;
+    }
+
+    /**
+     * Register models that live outside the workspace (e.g. django.contrib or
+     * third-party apps). Workspace models with the same name take precedence.
+     */
+    addExternalModels(models: EnhancedModelInfo[]): void {
+        const previousExternal = new Set(this.externalModelNames);
+        for (const name of previousExternal) {
+            this.store.delete(name);
         }
+        this.relations = this.relations.filter(relation => !previousExternal.has(relation.fromModel));
+        this.externalModelNames.clear();
         
-        const fieldDef = fieldMatch[0];
-        
-        // Look for related_name parameter
-        const relatedNameMatch = fieldDef.match(/related_name\s*=\s*['"]([^'"]+)['"]/);
-        if (relatedNameMatch) {
-            return relatedNameMatch[1];
+        for (const model of models) {
+            if (this.models.has(model.name)) {
+                continue;
+            }
+            this.registerModel(model);
+            this.externalModelNames.add(model.name);
         }
+        this.liveOnlyModelNames.clear();
+        this.addLiveOnlyModels();
         
-        return undefined;
-    }
-
-    private addDefaultDjangoMethods(model: EnhancedModelInfo): void {
-        const defaultMethods: ModelMethod[] = DJANGO_MODEL_METHODS.map(method => ({
-            name: method.name,
-            isProperty: false,
-            isClassMethod: false,
-            isStaticMethod: false,
-            parameters: this.parseMethodParameters(method.signature),
-            returnType: undefined
-        }));
-        
-        model.methods.push(...defaultMethods);
-        
-        // Add default properties
-        model.properties.push(...DJANGO_MODEL_PROPERTIES);
+        this.addReverseRelations();
+        this.publish([...previousExternal, ...this.externalModelNames]);
     }
 
-    private parseMethodParameters(signature: string): string[] {
-        const paramsMatch = signature.match(/\((.*?)\)/);
-        if (!paramsMatch || !paramsMatch[1]) {
-            return [];
-        }
-        return paramsMatch[1].split(',').map(p => p.trim()).filter(p => p);
+    isExternalModel(name: string): boolean {
+        return this.externalModelNames.has(name);
     }
 
-    private async addInheritedMembers(model: EnhancedModelInfo, code: string): Promise<void> {
-        // Look for base classes in the same file
-        for (const baseClass of model.baseClasses) {
-            // Skip Django's built-in model classes
-            if (baseClass === 'models.Model' || baseClass === 'Model') {
-                continue;
+    /**
+     * Replace the models reported by the live registry. Workspace files whose
+     * models are described differently now are merged again; registry models
+     * no file defines are registered like installed-package models.
+     */
+    async setLiveModels(models: EnhancedModelInfo[]): Promise<void> {
+        // Readers keep the previous models until all files are merged again
+        await this.batch(async () => {
+            const previous = this.liveModels;
+            this.liveModels = new Map(models.map(model => [model.name, model]));
+            const changed = new Set<string>();
+
+            for (const name of this.liveOnlyModelNames) {
+                this.store.delete(name);
+                this.externalModelNames.delete(name);
+                changed.add(name);
             }
-            
-            // Try to find the base class in the same file
-            const baseClassRegex = new RegExp(`class\\s+${baseClass}\\s*\\([^)]*\\)\\s*:([\\s\\S]*?)(?=\\nclass\\s+\\w+|\\n\\n|$)`, 's');
-            const baseClassMatch = code.match(baseClassRegex);
-            
-            if (baseClassMatch) {
-                // Parse fields from base class
-                const parseResult = await this.parser.parseModelFile(code, 'temp.py');
-                const baseModel = parseResult.models.find((m: ModelInfo) => m.name === baseClass);
-                
-                if (baseModel) {
-                    // Add fields from base class if not already present
-                    for (const baseField of baseModel.fields) {
-                        if (!model.fields.some(f => f.name === baseField.name)) {
-                            model.fields.push(baseField);
-                        }
-                    }
-                }
-                
-                // Extract and add methods from base class
-                const baseMethods = this.extractMethods(code, baseClass);
-                for (const baseMethod of baseMethods) {
-                    if (!model.methods.some(m => m.name === baseMethod.name)) {
-                        model.methods.push(baseMethod);
-                    }
+            this.relations = this.relations.filter(relation => !this.liveOnlyModelNames.has(relation.fromModel));
+            this.liveOnlyModelNames.clear();
+
+            for (const [filePath, names] of Array.from(this.fileModels)) {
+                const outdated = names.some(name =>
+                    JSON.stringify(previous.get(name)) !== JSON.stringify(this.liveModels.get(name))
+                );
+                if (!outdated) {
+                    continue;
                 }
-                
-                // Extract and add properties from base class
-                const baseProperties = this.extractProperties(code, baseClass);
-                for (const baseProp of baseProperties) {
-                    if (!model.properties.includes(baseProp)) {
-                        model.properties.push(baseProp);
+
+                let content = this.fileCache.get(filePath)?.content;
+                if (content === undefined) {
+                    try {
+                        content = await fs.promises.readFile(filePath, 'utf8');
+                    } catch {
+                        continue;
                     }
                 }
+                this.fileCache.delete(filePath);
+                await this.analyzeModelCode(content, filePath);
+            }
+
+            this.addLiveOnlyModels().forEach(name => changed.add(name));
+            this.addReverseRelations();
+            this.publish(changed);
+        });
+    }
+
+    /**
+     * Register the live registry models that no workspace file defines,
+     * replacing the parsed installed-package model of the same name
+     */
+    private addLiveOnlyModels(): string[] {
+        const workspaceNames = new Set(Array.from(this.fileModels.values()).flat());
+        const added: string[] = [];
+        for (const model of this.liveModels.values()) {
+            if (workspaceNames.has(model.name)) {
+                continue;
             }
+            this.relations = this.relations.filter(relation => relation.fromModel !== model.name);
+            // The store canonicalizes in place, so register a copy
+            this.store.add({ ...model });
+            this.relations.push(...this.models.get(model.name)!.relations);
+            this.externalModelNames.add(model.name);
+            this.liveOnlyModelNames.add(model.name);
+            added.push(model.name);
         }
+        return added;
+    }
+
+    private registerModel(model: EnhancedModelInfo): void {
+        const live = this.liveModels.get(model.name);
+        const registered = this.store.add(live ? mergeLiveModel(model, live) : model);
+        this.externalModelNames.delete(model.name);
+        this.liveOnlyModelNames.delete(model.name);
+        this.relations.push(...registered.relations);
+    }
+
+    /**
+     * Compact description of a model used to detect whether a re-analysis changed it
+     */
+    private getModelSignature(model: EnhancedModelInfo): string {
+        return JSON.stringify([
+            model.fields.map(f => [f.name, f.type, f.relatedModel || '']),
+            model.methods.map(m => m.name),
+            model.properties,
+            model.managers.map(m => m.name),
+            model.baseClasses,
+            model.isAbstract
+        ]);
+    }
+
+    /**
+     * Publish the models registered so far as a new snapshot and notify
+     * listeners of the changed ones, unless a batch defers it
+     */
+    private publish(changed: Iterable<string>): void {
+        for (const name of changed) {
+            this.pendingChanges.add(name);
+        }
+        if (this.batchDepth > 0) {
+            return;
+        }
+
+        this.store.publish();
+        if (this.pendingChanges.size > 0) {
+            const names = Array.from(this.pendingChanges);
+            this.pendingChanges.clear();
+            this._onDidChangeModels.fire(names);
+        }
+    }
+
+    /**
+     * Analyze several files and publish their models as one snapshot, so
+     * readers never see some of them updated and others not
+     */
+    async batch<T>(update: () => Promise<T>): Promise<T> {
+        this.batchDepth++;
+        try {
+            return await update();
+        } finally {
+            this.batchDepth--;
+            this.publish([]);
+        }
+    }
+
+    /**
+     * The published models. Providers read one snapshot per request;
+     * results derived from it can be memoized by its generation.
+     */
+    getSnapshot(): AnalysisSnapshot<EnhancedModelInfo> {
+        return this.store.getSnapshot();
     }
 
     getAllModels(): { [key: string]: EnhancedModelInfo } {
-        const result: { [key: string]: EnhancedModelInfo } = {};
-        for (const [name, info] of this.models) {
-            result[name] = info;
+        const snapshot = this.getSnapshot();
+        let cached = this.allModels;
+        if (!cached || cached.generation !== snapshot.generation) {
+            const models: { [key: string]: EnhancedModelInfo } = {};
+            for (const [name, info] of snapshot) {
+                models[name] = info;
+            }
+            cached = { generation: snapshot.generation, models: Object.freeze(models) };
+            this.allModels = cached;
         }
-        return result;
+        return cached.models;
     }
 
-    getModels(): Map<string, EnhancedModelInfo> {
-        return this.models;
+    getModels(): ReadonlyMap<string, EnhancedModelInfo> {
+        return this.getSnapshot();
     }
 
     getModel(name: string): EnhancedModelInfo | undefined {
-        return this.models.get(name);
+        return this.getSnapshot().get(name);
+    }
+
+    /**
+     * Get the models currently defined by a file, including those of a
+     * batch that is not published yet
+     */
+    getModelsForFile(filePath: string): EnhancedModelInfo[] {
+        const models: EnhancedModelInfo[] = [];
+        for (const name of this.fileModels.get(filePath) || []) {
+            const model = this.models.get(name);
+            if (model) {
+                models.push(model);
+            }
+        }
+        return models;
+    }
+
+    getStore(): ModelStore {
+        return this.store;
     }
 
     getRelationsForModel(modelName: string): ModelRelation[] {
@@ -435,15 +674,33 @@ export class AdvancedModelAnalyzer {
         this.fileCache.clear();
     }
 
+    getMemoryConsumers(): MemoryConsumer[] {
+        return [{
+            name: 'Model file contents',
+            tier: 'content',
+            cost: () => {
+                let bytes = 0;
+                this.fileCache.forEach(entry => bytes += entry.content.length * 2);
+                return bytes;
+            },
+            shed: () => this.fileCache.clear()
+        }];
+    }
+
     getFieldLookups(fieldType: string): string[] {
         return getFieldLookups(fieldType);
     }
     
     private addReverseRelations(): void {
+        // Published models may be held by readers, so the reverse members are
+        // added to a copy of each target model
+        const copied = new Set<string>();
+
         // For each relation, add a reverse relation field to the target model
         for (const relation of this.relations) {
-            const targetModel = this.models.get(relation.toModel);
-            if (!targetModel) {
+            let targetModel = this.models.get(relation.toModel);
+            // The live registry already lists the exact reverse accessors
+            if (!targetModel || this.liveModels.has(targetModel.name)) {
                 continue;
             }
             
@@ -461,12 +718,22 @@ export class AdvancedModelAnalyzer {
                 continue;
             }
             
+            if (!copied.has(targetModel.name)) {
+                targetModel = this.store.put({
+                    ...targetModel,
+                    fields: [...targetModel.fields],
+                    managers: [...targetModel.managers]
+                });
+                copied.add(targetModel.name);
+            }
+
             // Add a virtual field representing the reverse relation
+            reverseFieldName = this.store.intern(reverseFieldName);
             const reverseField: FieldInfo = {
                 name: reverseFieldName,
                 type: 'RelatedManager',
                 required: false,
-                helpText: `Reverse relation from ${relation.fromModel}.${relation.fieldName}`,
+                helpText: this.store.intern(`Reverse relation from ${relation.fromModel}.${relation.fieldName}`),
                 relatedModel: relation.fromModel
             };
             
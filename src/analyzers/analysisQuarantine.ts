@@ -0,0 +1,204 @@
+import { injectable } from 'inversify';
+import * as crypto from 'crypto';
+import { RequestTimeoutError } from '../server/connection';
+import type { ModelExtractionBackend } from './advancedModelAnalyzer';
+import type { FormParseBackend } from './djangoFormAnalyzer';
+
+export type QuarantineKind = 'model' | 'form' | 'admin' | 'view';
+
+export type QuarantineRetryState = 'running' | 'succeeded' | 'timedOut' | 'failed';
+
+export interface QuarantinedFile {
+    filePath: string;
+    kind: QuarantineKind;
+    // Time the parse blocked the extension host when the file was quarantined
+    durationMs: number;
+    quarantinedAt: number;
+    retry?: QuarantineRetryState;
+}
+
+/**
+ * Separate process that quarantined files are parsed in, restarted when a
+ * parse does not finish within the hard timeout
+ */
+export interface QuarantineWorker extends ModelExtractionBackend, FormParseBackend {
+    start(): Promise<void>;
+    restart(): Promise<void>;
+}
+
+/**
+ * Runs a synchronous parse and counts its time toward the file's budget
+ */
+export type ParseTimer = <R>(parse: () => R) => R;
+
+export interface AnalysisQuarantineOptions {
+    budgetMs?: number;
+    hardTimeoutMs?: number;
+}
+
+const DEFAULT_BUDGET_MS = 2000;
+const DEFAULT_HARD_TIMEOUT_MS = 10000;
+
+class WorkerTimeoutError extends Error {}
+
+function hashContent(content: string): string {
+    return crypto.createHash('sha1').update(content).digest('hex');
+}
+
+/**
+ * Keeps pathological files, e.g. huge generated modules that make the
+ * class-body regexes backtrack, from stalling analysis. Every file is
+ * analyzed under a time budget; one that exceeds it is skipped by later
+ * scans until its content changes, or parsed in the worker when one is set.
+ */
+@injectable()
+export class AnalysisQuarantine {
+    private files: Map<string, QuarantinedFile & { hash: string }> = new Map();
+    private budgetMs = DEFAULT_BUDGET_MS;
+    private hardTimeoutMs = DEFAULT_HARD_TIMEOUT_MS;
+    private worker: QuarantineWorker | undefined;
+
+    configure(options: AnalysisQuarantineOptions): void {
+        this.budgetMs = options.budgetMs ?? this.budgetMs;
+        this.hardTimeoutMs = options.hardTimeoutMs ?? this.hardTimeoutMs;
+    }
+
+    /**
+     * Parse quarantined files in a separate process instead of skipping them
+     */
+    setWorker(worker: QuarantineWorker | undefined): void {
+        this.worker = worker;
+    }
+
+    /**
+     * Analyze one file under the time budget. Resolves to undefined without
+     * analyzing in-process while the file is quarantined with this content;
+     * `retry` then parses it in the worker, if one is set.
+     *
+     * Only time the extension host spends in `analyze` counts: all of it
+     * for a synchronous analysis, and for an asynchronous one what runs
+     * before its first await plus the parses it runs through `measure`.
+     * Waiting, e.g. for the analysis server or behind other files, does not.
+     */
+    async run<T>(
+        kind: QuarantineKind,
+        filePath: string,
+        content: string,
+        analyze: (measure: ParseTimer) => T | Promise<T>,
+        retry?: (worker: QuarantineWorker) => Promise<T>
+    ): Promise<T | undefined> {
+        const quarantined = this.get(filePath, content);
+        if (quarantined) {
+            if (!retry || !this.worker || quarantined.retry === 'timedOut') {
+                return undefined;
+            }
+            return this.retryInWorker(quarantined, this.worker, retry);
+        }
+
+        let durationMs = 0;
+        let depth = 0;
+        const measure: ParseTimer = parse => {
+            const start = Date.now();
+            depth++;
+            try {
+                return parse();
+            } finally {
+                depth--;
+                if (depth === 0) {
+                    durationMs += Date.now() - start;
+                }
+            }
+        };
+
+        try {
+            return await measure(() => analyze(measure));
+        } finally {
+            if (durationMs > this.budgetMs) {
+                this.files.set(filePath, { filePath, kind, durationMs, quarantinedAt: Date.now(), hash: hashContent(content) });
+                console.warn(`Analysis of ${filePath} took ${durationMs}ms; it is skipped until the file changes`);
+            }
+        }
+    }
+
+    /**
+     * Quarantine a file whose parse made the analysis server time out or
+     * fail. It is not parsed in-process, where it could stall the extension
+     * host; a timed out parse is not retried in the worker either.
+     */
+    recordBackendFailure(kind: QuarantineKind, filePath: string, content: string, error: unknown): void {
+        const timedOut = error instanceof RequestTimeoutError;
+        this.files.set(filePath, {
+            filePath,
+            kind,
+            durationMs: timedOut ? error.timeoutMs : 0,
+            quarantinedAt: Date.now(),
+            retry: timedOut ? 'timedOut' : 'failed',
+            hash: hashContent(content)
+        });
+        console.warn(`Analysis server failed on ${filePath}; it is skipped until the file changes:`, error);
+    }
+
+    isQuarantined(filePath: string, content: string): boolean {
+        return this.get(filePath, content) !== undefined;
+    }
+
+    getQuarantinedFiles(): QuarantinedFile[] {
+        return Array.from(this.files.values()).map(({ hash: _hash, ...file }) => file);
+    }
+
+    /**
+     * Analyze a file in-process again on its next scan
+     */
+    release(filePath: string): void {
+        this.files.delete(filePath);
+    }
+
+    clear(): void {
+        this.files.clear();
+    }
+
+    private get(filePath: string, content: string): (QuarantinedFile & { hash: string }) | undefined {
+        const entry = this.files.get(filePath);
+        if (entry && entry.hash !== hashContent(content)) {
+            this.files.delete(filePath);
+            return undefined;
+        }
+        return entry;
+    }
+
+    /**
+     * Parse in the worker; a parse that does not finish in time kills the
+     * worker and is not retried for this content
+     */
+    private async retryInWorker<T>(
+        entry: QuarantinedFile,
+        worker: QuarantineWorker,
+        retry: (worker: QuarantineWorker) => Promise<T>
+    ): Promise<T | undefined> {
+        entry.retry = 'running';
+        let timer: NodeJS.Timeout | undefined;
+        const timeout = new Promise<never>((_, reject) => {
+            timer = setTimeout(() => reject(new WorkerTimeoutError()), this.hardTimeoutMs);
+        });
+
+        try {
+            const result = await Promise.race([worker.start().then(() => retry(worker)), timeout]);
+            entry.retry = 'succeeded';
+            return result;
+        } catch (error) {
+            if (error instanceof WorkerTimeoutError) {
+                entry.retry = 'timedOut';
+                console.warn(`Parsing ${entry.filePath} in the analysis server timed out, restarting it`);
+                worker.restart().catch(restartError => {
+                    console.error('Failed to restart Django analysis server:', restartError);
+                });
+            } else {
+                entry.retry = 'failed';
+                console.error(`Error parsing quarantined file ${entry.filePath}:`, error);
+            }
+            return undefined;
+        } finally {
+            clearTimeout(timer);
+        }
+    }
+}
@@ -0,0 +1,148 @@
+/**
+ * Immutable view of analysis results as they were published at one
+ * generation. Readers keep a snapshot for the whole of a request and may
+ * memoize what they derive from it by generation.
+ */
+export class AnalysisSnapshot<V> implements ReadonlyMap<string, V> {
+    constructor(readonly generation: number, private readonly entryMap: ReadonlyMap<string, V>) {}
+
+    get size(): number {
+        return this.entryMap.size;
+    }
+
+    get(key: string): V | undefined {
+        return this.entryMap.get(key);
+    }
+
+    has(key: string): boolean {
+        return this.entryMap.has(key);
+    }
+
+    forEach(callback: (value: V, key: string, map: ReadonlyMap<string, V>) => void, thisArg?: any): void {
+        this.entryMap.forEach((value, key) => callback.call(thisArg, value, key, this));
+    }
+
+    keys(): IterableIterator<string> {
+        return this.entryMap.keys();
+    }
+
+    values(): IterableIterator<V> {
+        return this.entryMap.values();
+    }
+
+    entries(): IterableIterator<[string, V]> {
+        return this.entryMap.entries();
+    }
+
+    [Symbol.iterator](): IterableIterator<[string, V]> {
+        return this.entryMap.entries();
+    }
+}
+
+/**
+ * Map whose writer builds changes off to the side and publishes them as a
+ * new snapshot in one step. The first write after a publish copies the
+ * entries, so unchanged values are shared with earlier snapshots; values
+ * must be replaced, never mutated, once published.
+ *
+ * Reading the map itself gives the writer's view, including unpublished
+ * changes; readers outside the analyzer use getSnapshot().
+ */
+export class SnapshotMap<V> implements ReadonlyMap<string, V> {
+    private published: Map<string, V>;
+    private draft: Map<string, V> | undefined;
+    private snapshot: AnalysisSnapshot<V>;
+
+    constructor(entries?: Iterable<[string, V]>) {
+        this.published = new Map(entries || []);
+        this.snapshot = new AnalysisSnapshot(0, this.published);
+    }
+
+    getSnapshot(): AnalysisSnapshot<V> {
+        return this.snapshot;
+    }
+
+    get generation(): number {
+        return this.snapshot.generation;
+    }
+
+    /**
+     * Whether there are writes that readers do not see yet
+     */
+    get hasPendingChanges(): boolean {
+        return this.draft !== undefined;
+    }
+
+    /**
+     * Make the writes so far visible to readers. Returns the current
+     * snapshot, a new one if anything changed.
+     */
+    publish(): AnalysisSnapshot<V> {
+        if (this.draft) {
+            this.published = this.draft;
+            this.draft = undefined;
+            this.snapshot = new AnalysisSnapshot(this.snapshot.generation + 1, this.published);
+        }
+        return this.snapshot;
+    }
+
+    set(key: string, value: V): this {
+        if (this.current.get(key) !== value || !this.current.has(key)) {
+            this.writable().set(key, value);
+        }
+        return this;
+    }
+
+    delete(key: string): boolean {
+        return this.current.has(key) && this.writable().delete(key);
+    }
+
+    clear(): void {
+        if (this.current.size > 0) {
+            this.draft = new Map();
+        }
+    }
+
+    get size(): number {
+        return this.current.size;
+    }
+
+    get(key: string): V | undefined {
+        return this.current.get(key);
+    }
+
+    has(key: string): boolean {
+        return this.current.has(key);
+    }
+
+    forEach(callback: (value: V, key: string, map: ReadonlyMap<string, V>) => void, thisArg?: any): void {
+        this.current.forEach((value, key) => callback.call(thisArg, value, key, this));
+    }
+
+    keys(): IterableIterator<string> {
+        return this.current.keys();
+    }
+
+    values(): IterableIterator<V> {
+        return this.current.values();
+    }
+
+    entries(): IterableIterator<[string, V]> {
+        return this.current.entries();
+    }
+
+    [Symbol.iterator](): IterableIterator<[string, V]> {
+        return this.current.entries();
+    }
+
+    private get current(): Map<string, V> {
+        return this.draft || this.published;
+    }
+
+    private writable(): Map<string, V> {
+        if (!this.draft) {
+            this.draft = new Map(this.published);
+        }
+        return this.draft;
+    }
+}
@@ -0,0 +1,690 @@
+import { injectable } from 'inversify';
+import * as vscode from 'vscode';
+import * as path from 'path';
+import * as crypto from 'crypto';
+import { findTopLevelClasses } from '../parsers/classRanges';
+import { parseImports, PythonImport } from '../parsers/pythonImports';
+import { nodeFileSystem } from '../utils/fileSystem';
+
+export interface ClassMember {
+    name: string;
+    kind: 'method' | 'property' | 'attribute';
+    // Right-hand side of an attribute, first line only
+    value?: string;
+    // Method parameters without self/cls
+    parameters?: string[];
+    decorators?: string[];
+}
+
+export interface InheritedMember extends ClassMember {
+    // Qualified name of the class that defines the member
+    owner: string;
+}
+
+export interface IndexedClass {
+    // Dotted module path and class name, e.g. "core.models.TimeStamped"
+    qualifiedName: string;
+    name: string;
+    filePath: string;
+    line: number;
+    // Names in the class signature as written, e.g. ["models.Model"]
+    bases: string[];
+    members: ClassMember[];
+}
+
+export interface ClassHierarchyChange {
+    // Files indexed again or removed
+    filePaths: string[];
+    // Classes that were added, removed or changed, and their descendants
+    classes: string[];
+}
+
+interface IndexedModule {
+    filePath: string;
+    hash: string;
+    name: string;
+    isPackage: boolean;
+    imports: PythonImport[];
+    classes: Map<string, IndexedClass>;
+}
+
+// Imports followed to find where a re-exported class is defined
+const MAX_REEXPORT_DEPTH = 4;
+const PROPERTY_DECORATORS = new Set(['property', 'cached_property', 'functools.cached_property']);
+
+/**
+ * Project-wide index of Python classes by qualified name. Base classes are
+ * resolved through the imports of their module, including relative imports
+ * and re-exports from packages, and modules that define bases are read
+ * when first needed. Method resolution orders are C3-linearized and
+ * memoized; a change to a class only invalidates the orders of the class
+ * and its descendants.
+ */
+@injectable()
+export class ClassHierarchyIndex {
+    private sourceRoots: string[] = [];
+    private modules: Map<string, IndexedModule> = new Map();
+    private classes: Map<string, IndexedClass> = new Map();
+    // Module name -> files it may live in, and the one that exists
+    private moduleFiles: Map<string, { candidates: string[]; filePath?: string }> = new Map();
+    private resolvedBases: Map<string, string[]> = new Map();
+    private mroCache: Map<string, string[]> = new Map();
+    // Base -> classes that name it directly
+    private subclasses: Map<string, Set<string>> = new Map();
+    // File -> classes whose bases were resolved by looking at it, and back
+    private fileDependents: Map<string, Set<string>> = new Map();
+    private consultedFiles: Map<string, string[]> = new Map();
+    private _onDidChangeClasses = new vscode.EventEmitter<ClassHierarchyChange>();
+
+    /**
+     * Fired after a file was indexed again with the classes whose members
+     * or method resolution order may have changed
+     */
+    readonly onDidChangeClasses = this._onDidChangeClasses.event;
+
+    /**
+     * Resolve absolute imports against this directory, e.g. the project root
+     */
+    addSourceRoot(root: string): void {
+        if (this.sourceRoots.includes(root)) {
+            return;
+        }
+        this.sourceRoots.push(root);
+        // Deepest root first so nested roots win
+        this.sourceRoots.sort((a, b) => b.length - a.length);
+
+        // Module names change with the roots
+        this.classes.clear();
+        for (const module of this.modules.values()) {
+            this.registerModule(this.createModule(module.filePath, module.hash, module.imports, Array.from(module.classes.values())));
+        }
+        this.resetResolution();
+    }
+
+    /**
+     * Index the classes of a file. Returns the classes affected by the
+     * change, or undefined when the content did not change.
+     */
+    updateFile(filePath: string, content: string): ClassHierarchyChange | undefined {
+        const hash = crypto.createHash('sha1').update(content).digest('hex');
+        const previous = this.modules.get(filePath);
+        if (previous?.hash === hash) {
+            return undefined;
+        }
+
+        const module = this.parseModule(filePath, content, hash);
+        const changed = this.diffModules(previous, module);
+        this.indexModule(module);
+        return this.invalidate(filePath, changed, module);
+    }
+
+    /**
+     * Index a file again if the index depends on it, e.g. after it changed
+     * on disk
+     */
+    refreshFile(filePath: string): ClassHierarchyChange | undefined {
+        if (!this.modules.has(filePath) && !this.fileDependents.has(filePath)) {
+            return undefined;
+        }
+        try {
+            return this.updateFile(filePath, nodeFileSystem.readFileSync(filePath, 'utf8') as string);
+        } catch {
+            return this.removeFile(filePath);
+        }
+    }
+
+    removeFile(filePath: string): ClassHierarchyChange | undefined {
+        const previous = this.modules.get(filePath);
+        if (!previous && !this.fileDependents.has(filePath)) {
+            return undefined;
+        }
+
+        const changed = this.diffModules(previous, undefined);
+        if (previous) {
+            this.unregisterModule(previous);
+            this.modules.delete(filePath);
+        }
+        this.moduleFiles.clear();
+        return this.invalidate(filePath, changed, undefined);
+    }
+
+    isTracked(filePath: string): boolean {
+        return this.modules.has(filePath);
+    }
+
+    /**
+     * Qualified name of a class defined in a file
+     */
+    qualify(filePath: string, className: string): string {
+        const moduleName = this.modules.get(filePath)?.name ?? this.getModuleName(filePath);
+        return moduleName ? `${moduleName}.${className}` : className;
+    }
+
+    getClass(qualifiedName: string): IndexedClass | undefined {
+        return this.classes.get(qualifiedName);
+    }
+
+    getClassesForFile(filePath: string): IndexedClass[] {
+        return Array.from(this.modules.get(filePath)?.classes.values() || []);
+    }
+
+    /**
+     * Qualified name a (dotted) name refers to in a file; names that cannot
+     * be resolved are returned as they are
+     */
+    resolveName(filePath: string, name: string): string {
+        const module = this.modules.get(filePath);
+        return module ? this.resolveInModule(module, name, new Set(), 0) : name;
+    }
+
+    /**
+     * Method resolution order of a class, starting with the class itself.
+     * Classes outside the index are listed but have no bases.
+     */
+    getMro(qualifiedName: string): string[] {
+        return this.linearize(qualifiedName, new Set());
+    }
+
+    /**
+     * Members a class inherits, in method resolution order; members the
+     * class defines itself and overridden ones are left out
+     */
+    getInheritedMembers(qualifiedName: string): InheritedMember[] {
+        const seen = new Set((this.classes.get(qualifiedName)?.members || []).map(member => member.name));
+        const inherited: InheritedMember[] = [];
+        for (const ancestor of this.getMro(qualifiedName).slice(1)) {
+            for (const member of this.classes.get(ancestor)?.members || []) {
+                if (!seen.has(member.name)) {
+                    seen.add(member.name);
+                    inherited.push({ ...member, owner: ancestor });
+                }
+            }
+        }
+        return inherited;
+    }
+
+    /**
+     * All classes that derive from a class, directly or not
+     */
+    getDescendants(qualifiedName: string): string[] {
+        const descendants = this.collectDescendants([qualifiedName]);
+        descendants.delete(qualifiedName);
+        return Array.from(descendants);
+    }
+
+    get size(): number {
+        return this.classes.size;
+    }
+
+    clear(): void {
+        this.modules.clear();
+        this.classes.clear();
+        this.resetResolution();
+    }
+
+    dispose(): void {
+        this.clear();
+        this._onDidChangeClasses.dispose();
+    }
+
+    private resetResolution(): void {
+        this.moduleFiles.clear();
+        this.resolvedBases.clear();
+        this.mroCache.clear();
+        this.subclasses.clear();
+        this.fileDependents.clear();
+        this.consultedFiles.clear();
+    }
+
+    /**
+     * Forget what depends on the changed classes and notify listeners
+     */
+    private invalidate(filePath: string, changed: Set<string>, module: IndexedModule | undefined): ClassHierarchyChange {
+        // Classes resolved through this file may now resolve differently
+        this.fileDependents.get(filePath)?.forEach(name => changed.add(name));
+        const affected = this.collectDescendants(changed);
+
+        for (const name of changed) {
+            this.forgetBases(name);
+        }
+        for (const name of affected) {
+            this.mroCache.delete(name);
+        }
+
+        // Resolve the classes again so that their descendants stay known,
+        // including those whose bases were resolved through this file
+        for (const name of affected) {
+            if (this.classes.has(name)) {
+                this.getMro(name);
+            }
+        }
+        module?.classes.forEach(cls => this.getMro(cls.qualifiedName));
+
+        const change: ClassHierarchyChange = { filePaths: [filePath], classes: Array.from(affected) };
+        this._onDidChangeClasses.fire(change);
+        return change;
+    }
+
+    private forgetBases(name: string): void {
+        for (const base of this.resolvedBases.get(name) || []) {
+            this.subclasses.get(base)?.delete(name);
+        }
+        this.resolvedBases.delete(name);
+        for (const filePath of this.consultedFiles.get(name) || []) {
+            this.fileDependents.get(filePath)?.delete(name);
+        }
+        this.consultedFiles.delete(name);
+    }
+
+    private collectDescendants(names: Iterable<string>): Set<string> {
+        const result = new Set<string>();
+        const pending = Array.from(names);
+        while (pending.length > 0) {
+            const name = pending.pop()!;
+            if (result.has(name)) {
+                continue;
+            }
+            result.add(name);
+            this.subclasses.get(name)?.forEach(subclass => pending.push(subclass));
+        }
+        return result;
+    }
+
+    /**
+     * Qualified names of the classes that differ between two versions of a module
+     */
+    private diffModules(previous: IndexedModule | undefined, next: IndexedModule | undefined): Set<string> {
+        const changed = new Set<string>();
+        const importsChanged = !previous || !next
+            || JSON.stringify(previous.imports.map(imp => ({ ...imp, line: 0 })))
+                !== JSON.stringify(next.imports.map(imp => ({ ...imp, line: 0 })));
+
+        for (const cls of previous?.classes.values() || []) {
+            const other = next?.classes.get(cls.name);
+            if (importsChanged || !other || getClassSignature(cls) !== getClassSignature(other)) {
+                changed.add(cls.qualifiedName);
+            }
+        }
+        for (const cls of next?.classes.values() || []) {
+            if (importsChanged || !previous?.classes.has(cls.name)) {
+                changed.add(cls.qualifiedName);
+            }
+        }
+        return changed;
+    }
+
+    private indexModule(module: IndexedModule): void {
+        const previous = this.modules.get(module.filePath);
+        if (previous) {
+            this.unregisterModule(previous);
+        } else {
+            // Lookups may have missed the new file
+            this.moduleFiles.clear();
+        }
+        this.registerModule(module);
+    }
+
+    private registerModule(module: IndexedModule): void {
+        this.modules.set(module.filePath, module);
+        module.classes.forEach(cls => this.classes.set(cls.qualifiedName, cls));
+    }
+
+    private unregisterModule(module: IndexedModule): void {
+        module.classes.forEach(cls => {
+            if (this.classes.get(cls.qualifiedName) === cls) {
+                this.classes.delete(cls.qualifiedName);
+            }
+        });
+    }
+
+    private parseModule(filePath: string, content: string, hash: string): IndexedModule {
+        const lines = content.split('\n');
+        const classes: IndexedClass[] = [];
+
+        for (const range of findTopLevelClasses(content)) {
+            let classLine = range.startLine;
+            while (classLine < range.endLine && !lines[classLine].startsWith('class')) {
+                classLine++;
+            }
+            const { bases, bodyStart } = parseClassSignature(lines, classLine);
+            classes.push({
+                qualifiedName: '',
+                name: range.name,
+                filePath,
+                line: classLine,
+                bases,
+                members: parseClassMembers(lines, bodyStart, range.endLine)
+            });
+        }
+
+        return this.createModule(filePath, hash, parseImports(content), classes);
+    }
+
+    private createModule(filePath: string, hash: string, imports: PythonImport[], classes: IndexedClass[]): IndexedModule {
+        const name = this.getModuleName(filePath);
+        return {
+            filePath,
+            hash,
+            name,
+            isPackage: path.basename(filePath) === '__init__.py',
+            imports,
+            classes: new Map(classes.map(cls => [cls.name, {
+                ...cls,
+                qualifiedName: name ? `${name}.${cls.name}` : cls.name
+            }]))
+        };
+    }
+
+    private getModuleName(filePath: string): string {
+        const root = this.sourceRoots.find(candidate => {
+            const relative = path.relative(candidate, filePath);
+            return !relative.startsWith('..') && !path.isAbsolute(relative);
+        });
+        const relative = root ? path.relative(root, filePath) : filePath;
+        const parts = relative.replace(/\.py$/, '').split(/[\\/]/).filter(part => part);
+        if (parts[parts.length - 1] === '__init__') {
+            parts.pop();
+        }
+        return parts.join('.');
+    }
+
+    private linearize(name: string, visiting: Set<string>): string[] {
+        const cached = this.mroCache.get(name);
+        if (cached) {
+            return cached;
+        }
+        // Cyclic bases; Python rejects them, ignore the cycle here
+        if (visiting.has(name)) {
+            return [name];
+        }
+
+        visiting.add(name);
+        const bases = this.getBases(name);
+        const sequences = bases.map(base => this.linearize(base, visiting));
+        visiting.delete(name);
+
+        // Bases whose orders conflict fall back to left-to-right order
+        const merged = c3Merge([...sequences, bases])
+            ?? Array.from(new Set(sequences.flat()));
+        const mro = [name, ...merged.filter(base => base !== name)];
+        this.mroCache.set(name, mro);
+        return mro;
+    }
+
+    private getBases(name: string): string[] {
+        const cached = this.resolvedBases.get(name);
+        if (cached) {
+            return cached;
+        }
+        const cls = this.classes.get(name);
+        const module = cls && this.modules.get(cls.filePath);
+        if (!cls || !module) {
+            return [];
+        }
+
+        const consulted = new Set<string>();
+        const bases = Array.from(new Set(
+            cls.bases.map(base => this.resolveInModule(module, base, consulted, 0))
+        )).filter(base => base !== name);
+
+        this.resolvedBases.set(name, bases);
+        for (const base of bases) {
+            let subclasses = this.subclasses.get(base);
+            if (!subclasses) {
+                subclasses = new Set();
+                this.subclasses.set(base, subclasses);
+            }
+            subclasses.add(name);
+        }
+        for (const filePath of consulted) {
+            let dependents = this.fileDependents.get(filePath);
+            if (!dependents) {
+                dependents = new Set();
+                this.fileDependents.set(filePath, dependents);
+            }
+            dependents.add(name);
+        }
+        this.consultedFiles.set(name, Array.from(consulted));
+        return bases;
+    }
+
+    /**
+     * Qualified name of a name used in a module, or the name itself
+     */
+    private resolveInModule(module: IndexedModule, dotted: string, consulted: Set<string>, depth: number): string {
+        const [head, ...rest] = dotted.split('.');
+        const attribute = rest.join('.');
+        if (!attribute && module.classes.has(head)) {
+            return module.classes.get(head)!.qualifiedName;
+        }
+
+        // The last import of a name wins
+        for (let i = module.imports.length - 1; i >= 0; i--) {
+            const imp = module.imports[i];
+            const importedModule = this.getAbsoluteModule(module, imp);
+
+            if (imp.names.length > 0) {
+                const imported = imp.names.find(candidate => candidate.alias === head);
+                if (imported) {
+                    // "from a import b" binds a class of a, or its submodule b
+                    return attribute
+                        ? this.resolveExport(joinModule(importedModule, imported.name), attribute, consulted, depth)
+                        : this.resolveExport(importedModule, imported.name, consulted, depth);
+                }
+                if (!attribute && imp.names.some(candidate => candidate.name === '*')) {
+                    const target = this.findModule(importedModule, consulted);
+                    if (target?.classes.has(head)) {
+                        return target.classes.get(head)!.qualifiedName;
+                    }
+                }
+            } else if (attribute) {
+                // "import a.b as c" binds a.b, "import a.b" binds a
+                if (imp.alias === head) {
+                    return this.resolveExport(importedModule, attribute, consulted, depth);
+                }
+                if (!imp.alias && dotted.startsWith(`${importedModule}.`)) {
+                    return this.resolveExport(importedModule, dotted.slice(importedModule.length + 1), consulted, depth);
+                }
+            }
+        }
+        return dotted;
+    }
+
+    /**
+     * Qualified name of a name defined in, or re-exported by, a module
+     */
+    private resolveExport(moduleName: string, name: string, consulted: Set<string>, depth: number): string {
+        const target = this.findModule(moduleName, consulted);
+        if (target && !target.classes.has(name) && depth < MAX_REEXPORT_DEPTH) {
+            const resolved = this.resolveInModule(target, name, consulted, depth + 1);
+            if (resolved !== name) {
+                return resolved;
+            }
+        }
+        return target?.classes.get(name)?.qualifiedName ?? joinModule(moduleName, name);
+    }
+
+    /**
+     * The indexed module of a dotted module name, indexing its file first
+     * when it exists but was not needed before
+     */
+    private findModule(moduleName: string, consulted: Set<string>): IndexedModule | undefined {
+        let lookup = this.moduleFiles.get(moduleName);
+        if (!lookup) {
+            const parts = moduleName.split('.').filter(part => part);
+            const candidates = this.sourceRoots.flatMap(root => [
+                `${path.join(root, ...parts)}.py`,
+                path.join(root, ...parts, '__init__.py')
+            ]);
+            lookup = {
+                candidates,
+                filePath: candidates.find(candidate => this.modules.has(candidate) || nodeFileSystem.existsSync(candidate))
+            };
+            this.moduleFiles.set(moduleName, lookup);
+        }
+        lookup.candidates.forEach(candidate => consulted.add(candidate));
+
+        if (!lookup.filePath) {
+            return undefined;
+        }
+        let module = this.modules.get(lookup.filePath);
+        if (!module) {
+            try {
+                const content = nodeFileSystem.readFileSync(lookup.filePath, 'utf8') as string;
+                module = this.parseModule(lookup.filePath, content, crypto.createHash('sha1').update(content).digest('hex'));
+                this.registerModule(module);
+            } catch {
+                return undefined;
+            }
+        }
+        return module;
+    }
+
+    private getAbsoluteModule(module: IndexedModule, imp: PythonImport): string {
+        if (imp.level === 0) {
+            return imp.module;
+        }
+        const parts = module.name.split('.').filter(part => part);
+        if (!module.isPackage) {
+            parts.pop();
+        }
+        parts.splice(Math.max(0, parts.length - (imp.level - 1)));
+        return joinModule(parts.join('.'), imp.module);
+    }
+}
+
+/**
+ * C3 merge of the linearizations of the bases and the list of bases.
+ * Returns undefined when no consistent order exists.
+ */
+export function c3Merge(sequences: string[][]): string[] | undefined {
+    const pending = sequences.map(sequence => [...sequence]).filter(sequence => sequence.length > 0);
+    const result: string[] = [];
+
+    while (pending.length > 0) {
+        // First head that is not in the tail of any sequence
+        const head = pending
+            .map(sequence => sequence[0])
+            .find(candidate => !pending.some(sequence => sequence.indexOf(candidate) > 0));
+        if (head === undefined) {
+            return undefined;
+        }
+
+        result.push(head);
+        for (let i = pending.length - 1; i >= 0; i--) {
+            if (pending[i][0] === head) {
+                pending[i].shift();
+            }
+            if (pending[i].length === 0) {
+                pending.splice(i, 1);
+            }
+        }
+    }
+    return result;
+}
+
+function joinModule(moduleName: string, name: string): string {
+    return moduleName ? `${moduleName}.${name}` : name;
+}
+
+function getClassSignature(cls: IndexedClass): string {
+    return JSON.stringify([cls.bases, cls.members]);
+}
+
+/**
+ * Bases of a class statement, which may continue over lines in parentheses
+ */
+function parseClassSignature(lines: string[], classLine: number): { bases: string[]; bodyStart: number } {
+    let signature = '';
+    let depth = 0;
+    let line = classLine;
+    for (; line < lines.length; line++) {
+        const text = lines[line].replace(/#.*$/, '');
+        signature += text + ' ';
+        for (const char of text) {
+            depth += char === '(' || char === '[' ? 1 : char === ')' || char === ']' ? -1 : 0;
+        }
+        if (depth <= 0) {
+            break;
+        }
+    }
+
+    const open = signature.indexOf('(');
+    const colon = signature.indexOf(':');
+    if (open < 0 || (colon >= 0 && colon < open)) {
+        return { bases: [], bodyStart: line + 1 };
+    }
+
+    const bases: string[] = [];
+    let current = '';
+    depth = 0;
+    for (const char of signature.slice(open + 1)) {
+        if (char === ')' && depth === 0) {
+            break;
+        }
+        depth += char === '(' || char === '[' ? 1 : char === ')' || char === ']' ? -1 : 0;
+        if (char === ',' && depth === 0) {
+            bases.push(current);
+            current = '';
+        } else {
+            current += char;
+        }
+    }
+    bases.push(current);
+
+    return {
+        // Keyword arguments such as metaclass= are not bases; drop generic arguments
+        bases: bases
+            .map(base => base.replace(/\[.*$/, '').trim())
+            .filter(base => /^[\w.]+$/.test(base)),
+        bodyStart: line + 1
+    };
+}
+
+/**
+ * Methods, properties and attributes defined directly in a class body
+ */
+function parseClassMembers(lines: string[], bodyStart: number, endLine: number): ClassMember[] {
+    const members: ClassMember[] = [];
+    let bodyIndent: number | undefined;
+    let decorators: string[] = [];
+
+    for (let i = bodyStart; i <= endLine && i < lines.length; i++) {
+        const line = lines[i];
+        const trimmed = line.trim();
+        if (!trimmed || trimmed.startsWith('#')) {
+            continue;
+        }
+        const indent = line.length - line.trimStart().length;
+        bodyIndent = bodyIndent ?? indent;
+        if (indent !== bodyIndent) {
+            continue;
+        }
+
+        const decorator = trimmed.match(/^@([\w.]+)/);
+        if (decorator) {
+            decorators.push(decorator[1]);
+            continue;
+        }
+
+        const method = trimmed.match(/^(?:async\s+)?def\s+(\w+)\s*\(([^)]*)/);
+        const attribute = !method && trimmed.match(/^(\w+)\s*(?::[^=]+)?=(?!=)\s*(.*)$/);
+        if (method) {
+            if (decorators.some(name => PROPERTY_DECORATORS.has(name))) {
+                members.push({ name: method[1], kind: 'property' });
+            } else if (!decorators.some(name => /\.(setter|deleter)$/.test(name))) {
+                members.push({
+                    name: method[1],
+                    kind: 'method',
+                    parameters: method[2].split(',').map(p => p.trim()).filter(p => p && p !== 'self' && p !== 'cls'),
+                    decorators
+                });
+            }
+        } else if (attribute) {
+            members.push({ name: attribute[1], kind: 'attribute', value: attribute[2].trim() });
+        }
+        decorators = [];
+    }
+
+    return members;
+}
@@ -1,232 +1,219 @@
-import { injectable, inject } from 'inversify';
+import { injectable, inject, optional } from 'inversify';
 import * as vscode from 'vscode';
 import * as path from 'path';
 import { TYPES } from '../container/types';
 import { PythonParser } from '../parsers/pythonParser';
 import { DjangoProjectAnalyzer } from './djangoProjectAnalyzer';
-
-export interface DjangoModel {
-    name: string;
-    appName: string;
-    fields: Map<string, { name: string; type: string; }>;
-    methods: string[];
-    filePath: string;
-    line: number;
-}
-
-export interface AdminClass {
-    name: string;
-    modelName: string;
-    model?: DjangoModel;
-    filePath: string;
-    line: number;
-    attributes: Map<string, any>;
-    methods: string[];
-    inlines: string[];
-    isRegistered: boolean;
-}
-
-export interface AdminInline {
-    name: string;
-    modelName: string;
-    type: 'TabularInline' | 'StackedInline';
-    filePath: string;
-    line: number;
-}
+import { ModelDependencyGraph } from './modelDependencyGraph';
+import { EnhancedModelInfo } from './advancedModelAnalyzer';
+import { PrebuiltProjectIndex } from './prebuiltProjectIndex';
+import { AnalysisQuarantine } from './analysisQuarantine';
+import { ClassHierarchyIndex, ClassHierarchyChange } from './classHierarchyIndex';
+import {
+    parseAdminModule,
+    parseAttributeValue,
+    DjangoModel,
+    AdminClass,
+    AdminInline,
+    AdminRegistration,
+    ADMIN_ATTRIBUTES,
+    ADMIN_METHODS,
+    INLINE_ATTRIBUTES
+} from '../parsers/adminParser';
+
+export type { DjangoModel, AdminClass, AdminInline } from '../parsers/adminParser';
 
 @injectable()
 export class DjangoAdminAnalyzer {
     private adminClasses: Map<string, AdminClass> = new Map();
     private adminInlines: Map<string, AdminInline> = new Map();
     private fileAdminMap: Map<string, string[]> = new Map();
-    
-    // Common ModelAdmin attributes
-    private readonly ADMIN_ATTRIBUTES = [
-        'list_display', 'list_display_links', 'list_filter', 'list_select_related',
-        'list_per_page', 'list_max_show_all', 'list_editable', 'search_fields',
-        'search_help_text', 'date_hierarchy', 'save_as', 'save_as_continue',
-        'save_on_top', 'paginator', 'preserve_filters', 'inlines', 'actions',
-        'actions_on_top', 'actions_on_bottom', 'actions_selection_counter',
-        'fields', 'exclude', 'fieldsets', 'form', 'filter_horizontal',
-        'filter_vertical', 'ordering', 'view_on_site', 'show_full_result_count',
-        'sortable_by', 'readonly_fields', 'raw_id_fields', 'formfield_overrides',
-        'prepopulated_fields', 'radio_fields', 'autocomplete_fields'
-    ];
-    
-    // Common ModelAdmin methods
-    private readonly ADMIN_METHODS = [
-        'get_queryset', 'get_list_display', 'get_list_display_links',
-        'get_fields', 'get_fieldsets', 'get_list_filter', 'get_list_select_related',
-        'get_search_fields', 'get_search_results', 'get_sortable_by',
-        'get_ordering', 'get_readonly_fields', 'get_prepopulated_fields',
-        'get_form', 'get_formsets_with_inlines', 'get_inline_instances',
-        'formfield_for_foreignkey', 'formfield_for_manytomany', 'formfield_for_choice_field',
-        'get_changelist', 'get_changelist_form', 'get_changelist_formset',
-        'has_add_permission', 'has_change_permission', 'has_delete_permission',
-        'has_view_permission', 'has_module_permission',
-        'save_model', 'delete_model', 'save_formset', 'save_related',
-        'get_autocomplete_fields', 'get_actions', 'get_urls',
-        'add_view', 'change_view', 'delete_view', 'history_view', 'changelist_view'
-    ];
-    
-    // Inline attributes
-    private readonly INLINE_ATTRIBUTES = [
-        'model', 'fk_name', 'formset', 'form', 'classes', 'extra', 'min_num',
-        'max_num', 'validate_min', 'validate_max', 'fields', 'exclude',
-        'raw_id_fields', 'verbose_name', 'verbose_name_plural', 'can_delete',
-        'show_change_link', 'autocomplete_fields', 'readonly_fields'
-    ];
+    private fileRegistrations: Map<string, AdminRegistration[]> = new Map();
+    private djangoModels: WeakMap<EnhancedModelInfo, DjangoModel> = new WeakMap();
+    private quarantine: AnalysisQuarantine;
 
     constructor(
         @inject(TYPES.ExtensionContext) private context: vscode.ExtensionContext,
         @inject(TYPES.PythonParser) private pythonParser: PythonParser,
-        @inject(TYPES.DjangoProjectAnalyzer) private projectAnalyzer: DjangoProjectAnalyzer
-    ) {}
+        @inject(TYPES.DjangoProjectAnalyzer) private projectAnalyzer: DjangoProjectAnalyzer,
+        @inject(TYPES.ModelDependencyGraph) @optional() private dependencyGraph?: ModelDependencyGraph,
+        @inject(TYPES.PrebuiltProjectIndex) @optional() private prebuiltIndex?: PrebuiltProjectIndex,
+        @inject(TYPES.AnalysisQuarantine) @optional() quarantine?: AnalysisQuarantine,
+        @inject(TYPES.ClassHierarchyIndex) @optional() private classHierarchy?: ClassHierarchyIndex
+    ) {
+        this.quarantine = quarantine || new AnalysisQuarantine();
+        this.classHierarchy?.onDidChangeClasses(change => this.onBaseClassesChanged(change));
+        if (this.dependencyGraph) {
+            this.dependencyGraph.onDidInvalidate(dependents => {
+                const adminNames = dependents
+                    .filter(dependent => dependent.kind === 'admin')
+                    .map(dependent => dependent.name);
+                if (adminNames.length > 0) {
+                    this.linkModelsToAdminClasses(adminNames);
+                }
+            });
+        }
+    }
 
     async analyzeAdminFile(content: string, filePath: string): Promise<void> {
+        this.classHierarchy?.updateFile(filePath, content);
+        const isAdminBase = this.getAdminBaseFilter(filePath);
+        const parsed = this.prebuiltIndex?.takeAdmin(filePath, content)
+            || await this.quarantine.run('admin', filePath, content, () => parseAdminModule(content, filePath, isAdminBase));
+        if (!parsed) {
+            return; // Quarantined; keep the admin classes found before
+        }
+        parsed.adminClasses.forEach(adminClass => this.addInheritedMembers(adminClass));
+
         // Clear previous admin classes from this file
         const previousClasses = this.fileAdminMap.get(filePath) || [];
         previousClasses.forEach(className => {
             this.adminClasses.delete(className);
+            this.dependencyGraph?.removeDependent('admin', className);
         });
         this.fileAdminMap.set(filePath, []);
 
-        // Parse file content
-        const lines = content.split('\n');
         const adminClassNames: string[] = [];
 
-        // Find admin class definitions
-        const adminClassRegex = /class\s+(\w+)\s*\(\s*(admin\.)?ModelAdmin\s*\)/;
-        const inlineRegex = /class\s+(\w+)\s*\(\s*(admin\.)?(TabularInline|StackedInline)\s*\)/;
-        const registerRegex = /@admin\.register\s*\(\s*(\w+)\s*\)/;
-        const modelRegex = /^\s*model\s*=\s*(\w+)\s*$/;
-
-        let currentClass: AdminClass | null = null;
-        let currentInline: AdminInline | null = null;
-        let indentLevel = 0;
-        let nextClassModel: string | null = null;
-
-        for (let i = 0; i < lines.length; i++) {
-            const line = lines[i];
-            const trimmedLine = line.trim();
-
-            // Check for @admin.register decorator
-            const registerMatch = line.match(registerRegex);
-            if (registerMatch) {
-                nextClassModel = registerMatch[1];
-                continue;
-            }
+        for (const adminClass of parsed.adminClasses) {
+            this.adminClasses.set(adminClass.name, adminClass);
+            adminClassNames.push(adminClass.name);
+        }
+        for (const inline of parsed.inlines) {
+            this.adminInlines.set(inline.name, inline);
+        }
 
-            // Check for ModelAdmin class
-            const adminMatch = line.match(adminClassRegex);
-            if (adminMatch) {
-                const className = adminMatch[1];
-                currentClass = {
-                    name: className,
-                    modelName: nextClassModel || '',
-                    filePath,
-                    line: i,
-                    attributes: new Map(),
-                    methods: [],
-                    inlines: [],
-                    isRegistered: nextClassModel !== null
-                };
-                
-                this.adminClasses.set(className, currentClass);
-                adminClassNames.push(className);
-                nextClassModel = null;
-                indentLevel = this.getIndentLevel(line);
-                continue;
-            }
+        // admin.site.register() may name an admin class from another module
+        this.applyRegistrations(parsed.registrations);
+        this.fileRegistrations.set(filePath, parsed.registrations);
 
-            // Check for Inline class
-            const inlineMatch = line.match(inlineRegex);
-            if (inlineMatch) {
-                const inlineName = inlineMatch[1];
-                const inlineType = inlineMatch[3] as 'TabularInline' | 'StackedInline';
-                currentInline = {
-                    name: inlineName,
-                    modelName: '',
-                    type: inlineType,
-                    filePath,
-                    line: i
-                };
-                
-                this.adminInlines.set(inlineName, currentInline);
-                currentClass = null;
-                indentLevel = this.getIndentLevel(line);
-                continue;
+        // Link models to the admin classes of this file only
+        await this.linkModelsToAdminClasses(adminClassNames);
+
+        this.fileAdminMap.set(filePath, adminClassNames);
+    }
+
+    /**
+     * Re-parse some classes of an unsaved admin.py buffer. `content` holds
+     * the classes and the imports they need; admin and inline classes named
+     * in `classNames` are replaced, the file's other classes and its
+     * admin.site.register() calls are kept.
+     */
+    async patchAdminClasses(content: string, filePath: string, classNames: string[]): Promise<void> {
+        const names = new Set(classNames);
+        const parsed = parseAdminModule(content, filePath, this.getAdminBaseFilter(filePath));
+        parsed.adminClasses.forEach(adminClass => this.addInheritedMembers(adminClass));
+        const kept = (this.fileAdminMap.get(filePath) || []).filter(name => !names.has(name));
+
+        for (const name of names) {
+            if (this.fileAdminMap.get(filePath)?.includes(name)) {
+                this.adminClasses.delete(name);
+                this.dependencyGraph?.removeDependent('admin', name);
             }
+            this.adminInlines.delete(name);
+        }
 
-            // Parse class content
-            if (currentClass && this.getIndentLevel(line) > indentLevel && trimmedLine) {
-                // Check for model assignment in Meta class
-                if (trimmedLine.startsWith('model =')) {
-                    const modelMatch = trimmedLine.match(/model\s*=\s*(\w+)/);
-                    if (modelMatch) {
-                        currentClass.modelName = modelMatch[1];
-                    }
-                }
+        const patchedNames: string[] = [];
+        for (const adminClass of parsed.adminClasses.filter(cls => names.has(cls.name))) {
+            this.adminClasses.set(adminClass.name, adminClass);
+            patchedNames.push(adminClass.name);
+        }
+        for (const inline of parsed.inlines.filter(cls => names.has(cls.name))) {
+            this.adminInlines.set(inline.name, inline);
+        }
 
-                // Check for attributes
-                for (const attr of this.ADMIN_ATTRIBUTES) {
-                    if (trimmedLine.startsWith(`${attr} =`) || trimmedLine.startsWith(`${attr}=`)) {
-                        const value = this.parseAttributeValue(trimmedLine, attr);
-                        currentClass.attributes.set(attr, value);
-                        break;
-                    }
-                }
+        // @admin.register decorators come with the classes, register() calls
+        // from the last full parse of the file
+        this.applyRegistrations(parsed.registrations);
+        this.applyRegistrations(this.fileRegistrations.get(filePath) || []);
 
-                // Check for methods
-                const methodMatch = trimmedLine.match(/def\s+(\w+)\s*\(/);
-                if (methodMatch) {
-                    currentClass.methods.push(methodMatch[1]);
-                }
+        await this.linkModelsToAdminClasses(patchedNames);
+        this.fileAdminMap.set(filePath, [...kept, ...patchedNames]);
+    }
 
-                // Check for inlines
-                if (trimmedLine.startsWith('inlines =')) {
-                    const inlineList = this.parseListAttribute(trimmedLine);
-                    currentClass.inlines = inlineList;
-                }
-            }
+    /**
+     * Accepts bases of a file's classes that derive from ModelAdmin, e.g. a
+     * project-wide BaseAdmin
+     */
+    private getAdminBaseFilter(filePath: string): ((base: string) => boolean) | undefined {
+        const hierarchy = this.classHierarchy;
+        if (!hierarchy) {
+            return undefined;
+        }
+        return base => hierarchy.getMro(hierarchy.resolveName(filePath, base))
+            .some(name => /(^|\.)ModelAdmin$/.test(name));
+    }
+
+    /**
+     * Add the admin attributes and methods an admin class inherits from
+     * project classes, in method resolution order
+     */
+    private addInheritedMembers(adminClass: AdminClass): void {
+        if (!this.classHierarchy) {
+            return;
+        }
 
-            // Parse inline content
-            if (currentInline && this.getIndentLevel(line) > indentLevel && trimmedLine) {
-                if (trimmedLine.startsWith('model =')) {
-                    const modelMatch = trimmedLine.match(/model\s*=\s*(\w+)/);
-                    if (modelMatch) {
-                        currentInline.modelName = modelMatch[1];
+        const className = this.classHierarchy.qualify(adminClass.filePath, adminClass.name);
+        for (const member of this.classHierarchy.getInheritedMembers(className)) {
+            if (member.kind === 'attribute') {
+                if (ADMIN_ATTRIBUTES.includes(member.name) && !adminClass.attributes.has(member.name)) {
+                    const value = parseAttributeValue(`${member.name} = ${member.value || ''}`);
+                    adminClass.attributes.set(member.name, value);
+                    if (member.name === 'inlines' && adminClass.inlines.length === 0 && Array.isArray(value)) {
+                        adminClass.inlines = value;
                     }
                 }
+            } else if (!adminClass.methods.includes(member.name)) {
+                adminClass.methods.push(member.name);
             }
+        }
+    }
 
-            // Reset current class/inline if dedented
-            if (trimmedLine && this.getIndentLevel(line) <= indentLevel) {
-                currentClass = null;
-                currentInline = null;
+    /**
+     * Parse admin files again whose classes derive from classes that changed
+     * in another file
+     */
+    private async onBaseClassesChanged(change: ClassHierarchyChange): Promise<void> {
+        const filePaths = new Set<string>();
+        for (const className of change.classes) {
+            const filePath = this.classHierarchy?.getClass(className)?.filePath;
+            if (filePath && !change.filePaths.includes(filePath) && this.fileAdminMap.has(filePath)) {
+                filePaths.add(filePath);
             }
         }
 
-        // Find admin.site.register() calls
-        const siteRegisterRegex = /admin\.site\.register\s*\(\s*(\w+)\s*,\s*(\w+)\s*\)/g;
-        let match;
-        while ((match = siteRegisterRegex.exec(content)) !== null) {
-            const modelName = match[1];
-            const adminClassName = match[2];
-            const adminClass = this.adminClasses.get(adminClassName);
+        for (const filePath of filePaths) {
+            try {
+                // Open documents are analyzed with their unsaved changes
+                const document = await vscode.workspace.openTextDocument(vscode.Uri.file(filePath));
+                await this.analyzeAdminFile(document.getText(), filePath);
+            } catch (error) {
+                console.error(`Error analyzing admin file ${filePath}:`, error);
+            }
+        }
+    }
+
+    private applyRegistrations(registrations: AdminRegistration[]): void {
+        for (const registration of registrations) {
+            const adminClass = this.adminClasses.get(registration.adminClassName);
             if (adminClass) {
-                adminClass.modelName = modelName;
+                adminClass.modelName = registration.modelName;
                 adminClass.isRegistered = true;
             }
         }
+    }
 
-        // Link models to admin classes
-        await this.linkModelsToAdminClasses();
-
-        this.fileAdminMap.set(filePath, adminClassNames);
+    /**
+     * Names of the admin classes defined in a file
+     */
+    getAdminClassNamesForFile(filePath: string): string[] {
+        return this.fileAdminMap.get(filePath) || [];
     }
 
-    private async linkModelsToAdminClasses(): Promise<void> {
+    /**
+     * Resolve the models of the given admin classes and record the dependencies
+     */
+    private async linkModelsToAdminClasses(classNames: string[]): Promise<void> {
         // Get models from advanced analyzer
         const advancedAnalyzer = this.projectAnalyzer.getAdvancedAnalyzer();
         if (!advancedAnalyzer) {
@@ -235,97 +222,45 @@ export class DjangoAdminAnalyzer {
         
         const models = advancedAnalyzer.getModels();
         
-        for (const [className, adminClass] of this.adminClasses) {
+        for (const className of classNames) {
+            const adminClass = this.adminClasses.get(className);
+            if (!adminClass) {
+                continue;
+            }
+
+            adminClass.model = undefined;
             if (adminClass.modelName) {
                 // Find the corresponding model
                 const model = models.get(adminClass.modelName);
                 if (model) {
-                    // Convert to DjangoModel format
-                    adminClass.model = {
-                        name: model.name,
-                        appName: model.app,
-                        fields: new Map(model.fields.map(f => [f.name, { name: f.name, type: f.type }])),
-                        methods: model.methods.map(m => m.name),
-                        filePath: '',
-                        line: 0
-                    };
+                    adminClass.model = this.getDjangoModel(model);
                 }
             }
-        }
-    }
 
-    private getIndentLevel(line: string): number {
-        const match = line.match(/^(\s*)/);
-        return match ? match[1].length : 0;
-    }
-
-    private parseAttributeValue(line: string, attribute: string): any {
-        const valueStart = line.indexOf('=') + 1;
-        const value = line.substring(valueStart).trim();
-        
-        // Parse list values
-        if (value.startsWith('[')) {
-            return this.parseListValue(value);
-        }
-        
-        // Parse tuple values
-        if (value.startsWith('(')) {
-            return this.parseTupleValue(value);
-        }
-        
-        // Parse string values
-        if (value.startsWith("'") || value.startsWith('"')) {
-            return value.slice(1, -1);
-        }
-        
-        // Parse boolean/numeric values
-        if (value === 'True' || value === 'False') {
-            return value === 'True';
+            this.dependencyGraph?.setDependencies('admin', className, [adminClass.modelName]);
         }
-        
-        if (!isNaN(Number(value))) {
-            return Number(value);
-        }
-        
-        return value;
-    }
-
-    private parseListAttribute(line: string): string[] {
-        const match = line.match(/\[(.*?)\]/);
-        if (match) {
-            return match[1]
-                .split(',')
-                .map(item => item.trim())
-                .filter(item => item.length > 0)
-                .map(item => item.replace(/['"]/g, ''));
-        }
-        return [];
     }
 
-    private parseListValue(value: string): string[] {
-        // Simple list parsing - can be enhanced for nested structures
-        const match = value.match(/\[(.*?)\]/);
-        if (match) {
-            return match[1]
-                .split(',')
-                .map(item => item.trim())
-                .filter(item => item.length > 0)
-                .map(item => item.replace(/['"]/g, ''));
+    /**
+     * DjangoModel view of a stored model, shared by all admin classes of the
+     * model and referencing its field objects rather than copies
+     */
+    private getDjangoModel(model: EnhancedModelInfo): DjangoModel {
+        const cached = this.djangoModels.get(model);
+        if (cached && cached.fields.size === model.fields.length) {
+            return cached;
         }
-        return [];
-    }
 
-    private parseTupleValue(value: string): any[] {
-        // Simple tuple parsing
-        const match = value.match(/\((.*?)\)/);
-        if (match) {
-            return match[1]
-                .split(',')
-                .map(item => item.trim())
-                .filter(item => item.length > 0)
-                .map(item => item.replace(/['"]/g, ''));
-        }
-        return [];
+        const djangoModel: DjangoModel = {
+            name: model.name,
+            appName: model.app,
+            fields: new Map(model.fields.map(f => [f.name, f])),
+            methods: model.methods.map(m => m.name),
+            filePath: '',
+            line: 0
+        };
+        this.djangoModels.set(model, djangoModel);
+        return djangoModel;
     }
 
     async scanWorkspace(): Promise<void> {
@@ -363,14 +298,14 @@ export class DjangoAdminAnalyzer {
     }
 
     getAdminAttributes(): string[] {
-        return this.ADMIN_ATTRIBUTES;
+        return ADMIN_ATTRIBUTES;
     }
 
     getAdminMethods(): string[] {
-        return this.ADMIN_METHODS;
+        return ADMIN_METHODS;
     }
 
     getInlineAttributes(): string[] {
-        return this.INLINE_ATTRIBUTES;
+        return INLINE_ATTRIBUTES;
     }
 }
\ No newline at end of file
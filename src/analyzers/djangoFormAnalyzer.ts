@@ -1,37 +1,85 @@
-import { injectable, inject } from 'inversify';
+import { injectable, inject, optional } from 'inversify';
 import * as vscode from 'vscode';
 import * as path from 'path';
+import * as fs from 'fs';
 import { TYPES } from '../container/types';
 import { DjangoProjectAnalyzer } from './djangoProjectAnalyzer';
+import { ModelDependencyGraph } from './modelDependencyGraph';
+import { PrebuiltProjectIndex } from './prebuiltProjectIndex';
+import { GitCheckoutMonitor, CommitSnapshotCache } from './gitCheckoutMonitor';
+import { FormParser, FormInfo, FormFieldInfo } from '../parsers/formParser';
+import { runWithConcurrency } from '../utils/concurrency';
+import { AnalysisQuarantine, ParseTimer } from './analysisQuarantine';
+import { AnalysisSnapshot, SnapshotMap } from './analysisSnapshot';
+import { ClassHierarchyIndex } from './classHierarchyIndex';
+import { ServerUnavailableError } from '../server/connection';
 
-export interface FormInfo {
-    name: string;
-    type: 'Form' | 'ModelForm';
-    fields: FormFieldInfo[];
-    modelName?: string; // For ModelForm
-    filePath: string;
+export type { FormInfo, FormFieldInfo } from '../parsers/formParser';
+
+/**
+ * Parses forms somewhere else, e.g. in the analysis server process
+ */
+export interface FormParseBackend {
+    parseForms(content: string, filePath: string): Promise<{ forms: FormInfo[]; hasUnparsedFormPatterns: boolean }>;
+    forgetFile(filePath: string): void;
 }
 
-export interface FormFieldInfo {
-    name: string;
-    fieldType: string;
-    required: boolean;
-    widget?: string;
-    helpText?: string;
+type FormParseOutcome = { forms: FormInfo[]; hasUnparsedFormPatterns: boolean };
+
+interface FormScanProblem {
+    filePath: string;
+    message: string;
 }
 
+// forms.py files read and parsed concurrently during a workspace scan
+const SCAN_CONCURRENCY = 8;
+// Delay before reporting problems found by watcher-triggered re-analysis
+const REPORT_DELAY = 2000;
+
 /**
  * Analyzer for Django forms
  */
 @injectable()
 export class DjangoFormAnalyzer {
-    private formCache: Map<string, FormInfo> = new Map();
+    // Published after each file, or once per scan; readers use the snapshot
+    private formCache = new SnapshotMap<FormInfo>();
+    private formsByFile: Map<string, FormInfo[]> = new Map();
+    private modelFormFieldCache: Map<string, FormFieldInfo[]> = new Map();
+    private parser = new FormParser();
+    private parseBackend: FormParseBackend | undefined;
+    private quarantine: AnalysisQuarantine;
+    private problems: Map<string, FormScanProblem> = new Map();
+    private reportedProblems: Set<string> = new Set();
+    private reportTimer: NodeJS.Timeout | undefined;
+    // Scans in progress; they may overlap, e.g. a batch of changed files during the workspace scan
+    private scanDepth = 0;
     private fileWatcher: vscode.FileSystemWatcher | undefined;
+    private checkoutMonitor: GitCheckoutMonitor | undefined;
+    private checkoutSubscription: vscode.Disposable | undefined;
+    private commitSnapshots: CommitSnapshotCache<FormParseOutcome> | undefined;
 
     constructor(
-        @inject(TYPES.DjangoProjectAnalyzer) private projectAnalyzer: DjangoProjectAnalyzer
+        @inject(TYPES.DjangoProjectAnalyzer) private projectAnalyzer: DjangoProjectAnalyzer,
+        @inject(TYPES.ModelDependencyGraph) @optional() private dependencyGraph?: ModelDependencyGraph,
+        @inject(TYPES.PrebuiltProjectIndex) @optional() private prebuiltIndex?: PrebuiltProjectIndex,
+        @inject(TYPES.AnalysisQuarantine) @optional() quarantine?: AnalysisQuarantine,
+        @inject(TYPES.ClassHierarchyIndex) @optional() private classHierarchy?: ClassHierarchyIndex
     ) {
+        this.quarantine = quarantine || new AnalysisQuarantine();
         this.initializeWatcher();
+
+        if (this.dependencyGraph) {
+            this.dependencyGraph.onDidInvalidate(dependents => {
+                dependents
+                    .filter(dependent => dependent.kind === 'form')
+                    .forEach(dependent => this.modelFormFieldCache.delete(dependent.name));
+            });
+        }
+
+        // Forms inherit fields and Meta.model from their bases
+        this.classHierarchy?.onDidChangeClasses(change => {
+            change.classes.forEach(className => this.forgetModelFormFields(className.slice(className.lastIndexOf('.') + 1)));
+        });
     }
 
     /**
@@ -40,30 +88,84 @@ export class DjangoFormAnalyzer {
     private initializeWatcher(): void {
         this.fileWatcher = vscode.workspace.createFileSystemWatcher('**/forms.py');
         
+        // During a branch switch files are handled in one batch afterwards
         this.fileWatcher.onDidChange(uri => {
-            this.analyzeFormFile(uri.fsPath);
+            if (!this.checkoutMonitor?.defer(uri.fsPath)) {
+                this.analyzeFormFile(uri.fsPath);
+            }
         });
         
         this.fileWatcher.onDidCreate(uri => {
-            this.analyzeFormFile(uri.fsPath);
+            if (!this.checkoutMonitor?.defer(uri.fsPath)) {
+                this.analyzeFormFile(uri.fsPath);
+            }
         });
         
         this.fileWatcher.onDidDelete(uri => {
-            this.removeFormsFromFile(uri.fsPath);
+            if (!this.checkoutMonitor?.defer(uri.fsPath)) {
+                this.onFormFileDeleted(uri.fsPath);
+            }
+        });
+    }
+
+    private onFormFileDeleted(filePath: string): void {
+        this.removeFormsFromFile(filePath);
+        this.classHierarchy?.removeFile(filePath);
+        this.parser.forget(filePath);
+        this.parseBackend?.forgetFile(filePath);
+        this.problems.delete(filePath);
+        this.reportedProblems.delete(filePath);
+    }
+
+    /**
+     * Defer watcher events while git rewrites the working tree, and keep the
+     * forms of recently checked out commits so switching back needs no parsing
+     */
+    setCheckoutMonitor(monitor: GitCheckoutMonitor | undefined): void {
+        this.checkoutSubscription?.dispose();
+        this.checkoutMonitor = monitor;
+        this.commitSnapshots = monitor?.createSnapshotCache<FormParseOutcome>();
+        this.checkoutSubscription = monitor?.onDidFinishSwitch(event => {
+            this.analyzeChangedFiles(event.changedFiles.filter(filePath => path.basename(filePath) === 'forms.py'));
         });
     }
 
+    private async analyzeChangedFiles(filePaths: string[]): Promise<void> {
+        const existing = filePaths.filter(filePath => fs.existsSync(filePath));
+        filePaths
+            .filter(filePath => !existing.includes(filePath))
+            .forEach(filePath => this.onFormFileDeleted(filePath));
+
+        await this.scan(() => runWithConcurrency(existing, SCAN_CONCURRENCY, filePath => this.analyzeFormFile(filePath)));
+    }
+
     /**
      * Scan workspace for all forms
      */
     async scanWorkspace(): Promise<void> {
         const formFiles = await vscode.workspace.findFiles('**/forms.py', '**/node_modules/**');
-        
-        for (const file of formFiles) {
-            await this.analyzeFormFile(file.fsPath);
+
+        await this.scan(() => runWithConcurrency(formFiles, SCAN_CONCURRENCY, file => this.analyzeFormFile(file.fsPath)));
+        console.log(`Found ${this.formCache.size} Django forms in ${formFiles.length} files`);
+    }
+
+    /**
+     * Run a scan. Forms are published and problems reported together once
+     * the last of overlapping scans ends.
+     */
+    private async scan(task: () => Promise<unknown>): Promise<void> {
+        this.scanDepth++;
+        try {
+            await task();
+        } finally {
+            this.scanDepth--;
+            if (this.scanDepth === 0) {
+                this.formCache.publish();
+            }
+        }
+        if (this.scanDepth === 0) {
+            this.reportProblems();
         }
-        
-        console.log(`Found ${this.formCache.size} Django forms`);
     }
 
     /**
@@ -71,429 +173,203 @@ export class DjangoFormAnalyzer {
      */
     async analyzeFormFile(filePath: string): Promise<void> {
         try {
-            const document = await vscode.workspace.openTextDocument(filePath);
-            const text = document.getText();
-            
-            // Remove existing forms from this file
-            this.removeFormsFromFile(filePath);
-            
-            // Extract form classes
-            const forms = this.extractForms(text, filePath);
-            
-            // Add to cache
-            forms.forEach(form => {
-                this.formCache.set(form.name, form);
-            });
-            
-            // Log the analysis result
-            const fileName = path.basename(filePath);
-            if (forms.length > 0) {
-                console.log(`✅ Successfully analyzed ${forms.length} forms in ${fileName}`);
-                forms.forEach(form => {
-                    console.log(`  - ${form.name} (${form.type}) with ${form.fields.length} fields`);
+            const text = await fs.promises.readFile(filePath, 'utf8');
+            const result = await this.parseForms(text, filePath);
+            if (!result) {
+                return; // Quarantined; keep the forms found before
+            }
+
+            this.classHierarchy?.updateFile(filePath, text);
+            this.replaceFormsForFile(filePath, result.forms);
+
+            if (result.hasUnparsedFormPatterns) {
+                this.problems.set(filePath, {
+                    filePath,
+                    message: 'found form patterns but could not parse them'
                 });
             } else {
-                // Check if the file contains form-like patterns but parsing failed
-                if (this.containsFormPatterns(text)) {
-                    console.warn(`⚠️ Found form patterns in ${fileName} but couldn't parse them. The forms might use unsupported syntax.`);
-                    vscode.window.showWarningMessage(
-                        `Django Power Tools: Found form patterns in ${fileName} but couldn't parse them. Please check if the forms use supported Django syntax.`
-                    );
-                }
+                this.problems.delete(filePath);
+                this.reportedProblems.delete(filePath);
             }
         } catch (error) {
-            console.error(`❌ Error analyzing form file ${filePath}:`, error);
-            vscode.window.showErrorMessage(
-                `Django Power Tools: Failed to analyze ${path.basename(filePath)}. Error: ${error instanceof Error ? error.message : String(error)}`
-            );
+            this.problems.set(filePath, {
+                filePath,
+                message: error instanceof Error ? error.message : String(error)
+            });
+        }
+
+        if (this.scanDepth === 0 && this.problems.has(filePath) && !this.reportedProblems.has(filePath)) {
+            this.scheduleProblemReport();
         }
     }
 
     /**
-     * Extract form information from file content
+     * Analyze the unsaved buffer of a forms.py file. The parser keeps forms
+     * per class, so only the classes that changed are parsed again.
      */
-    private extractForms(content: string, filePath: string): FormInfo[] {
-        const forms: FormInfo[] = [];
-        
-        // Extract all possible form base classes from imports
-        const formBaseClasses = this.extractFormBaseClasses(content);
-        
-        // Build regex pattern for form class definitions with various inheritance patterns
-        const baseClassPattern = formBaseClasses.length > 0 ? formBaseClasses.map(cls => cls.replace(/[.*+?^${}()|[\]\\]/g, '\\$&')).join('|') : '';
-        
-        // Create a comprehensive regex pattern that handles various inheritance patterns
-        const patterns = [
-            `forms\\.(?:Model)?Form`,              // forms.Form or forms.ModelForm
-            `(?:Model)?Form`,                      // Form or ModelForm (direct import)
-            `\\w+\\.(?:Model)?Form`,               // alias.Form or alias.ModelForm
-            `\\w+Form`,                            // Any class ending with Form
-        ];
-        
-        if (baseClassPattern) {
-            patterns.push(baseClassPattern);      // Custom imported forms
+    analyzeFormBuffer(filePath: string, text: string): void {
+        try {
+            this.classHierarchy?.updateFile(filePath, text);
+            this.replaceFormsForFile(filePath, this.parser.parse(text, filePath).forms);
+        } catch (error) {
+            console.error(`Error analyzing unsaved form changes in ${filePath}:`, error);
         }
-        
-        const formClassRegex = new RegExp(
-            `class\\s+(\\w+)\\s*\\(\\s*(?:` +
-            patterns.join('|') +
-            `)(?:\\s*,\\s*[\\w\\.]+)*\\s*\\)\\s*:`,  // Support multiple inheritance
-            'g'
+    }
+
+    private async parseForms(text: string, filePath: string): Promise<FormParseOutcome | undefined> {
+        const prebuilt = this.prebuiltIndex?.takeForms(filePath, text) || this.commitSnapshots?.get(filePath, text);
+        if (prebuilt) {
+            return prebuilt;
+        }
+
+        const result = await this.quarantine.run(
+            'form',
+            filePath,
+            text,
+            measure => this.parseFormsWithBackend(text, filePath, measure),
+            worker => worker.parseForms(text, filePath)
         );
-        let match;
-        
-        while ((match = formClassRegex.exec(content)) !== null) {
-            const formName = match[1];
-            const fullMatch = match[0];
-            
-            // Determine form type from the full match
-            const formType = this.determineFormType(fullMatch, content);
-            
-            // Extract form body with improved regex that handles indentation
-            const formBodyMatch = this.extractFormBody(content, formName, match.index!);
-            
-            if (formBodyMatch) {
-                const fields = this.extractFormFields(formBodyMatch);
-                const modelName = formType === 'ModelForm' ? this.extractModelName(formBodyMatch) : undefined;
-                
-                forms.push({
-                    name: formName,
-                    type: formType,
-                    fields: fields,
-                    modelName: modelName,
-                    filePath: filePath
-                });
-            }
+        if (!result) {
+            return undefined;
         }
-        
-        return forms;
+        this.commitSnapshots?.set(filePath, text, { forms: result.forms, hasUnparsedFormPatterns: result.hasUnparsedFormPatterns });
+        return result;
     }
 
-    /**
-     * Extract form base classes from imports
-     */
-    private extractFormBaseClasses(content: string): string[] {
-        const baseClasses: string[] = [];
-        const importAliases: Map<string, string> = new Map();
-        
-        // Match various import patterns
-        const importPatterns = [
-            // from django.forms import Form, ModelForm
-            /from\s+django\.forms\s+import\s+([^;\n]+)/g,
-            // from django import forms
-            /from\s+django\s+import\s+forms/g,
-            // from myapp.forms import CustomForm
-            /from\s+[\w\.]+\s+import\s+(\w*Form\w*)/g,
-            // import django.forms as forms
-            /import\s+django\.forms\s+as\s+(\w+)/g,
-            // from django.forms import Form as BaseForm
-            /from\s+django\.forms\s+import\s+(\w+)\s+as\s+(\w+)/g,
-            // import django.forms
-            /import\s+django\.forms/g
-        ];
-        
-        // First pass: collect imports and aliases
-        importPatterns.forEach((pattern, index) => {
-            let match;
-            const patternCopy = new RegExp(pattern.source, pattern.flags);
-            
-            while ((match = patternCopy.exec(content)) !== null) {
-                if (index === 0 && match[1]) {
-                    // from django.forms import X, Y, Z
-                    const imports = match[1].split(',').map(s => s.trim());
-                    imports.forEach(imp => {
-                        // Handle 'as' aliases within the import
-                        const asMatch = imp.match(/(\w+)\s+as\s+(\w+)/);
-                        if (asMatch) {
-                            if (asMatch[1].includes('Form')) {
-                                baseClasses.push(asMatch[2]);
-                                importAliases.set(asMatch[2], asMatch[1]);
-                            }
-                        } else if (imp.includes('Form')) {
-                            baseClasses.push(imp);
-                        }
-                    });
-                } else if (index === 2 && match[1]) {
-                    // from custom.module import CustomForm
-                    baseClasses.push(match[1]);
-                } else if (index === 3 && match[1]) {
-                    // import django.forms as X
-                    importAliases.set(match[1], 'forms');
-                } else if (index === 4 && match[1] && match[2]) {
-                    // from django.forms import X as Y
-                    if (match[1].includes('Form')) {
-                        baseClasses.push(match[2]);
-                        importAliases.set(match[2], match[1]);
-                    }
-                }
-            }
-        });
-        
-        // Second pass: look for aliased form usage
-        importAliases.forEach((value, alias) => {
-            if (value === 'forms') {
-                // Look for alias.Form or alias.ModelForm usage
-                const aliasPattern = new RegExp(`${alias}\\.(\\w*Form)`, 'g');
-                let match;
-                while ((match = aliasPattern.exec(content)) !== null) {
-                    baseClasses.push(`${alias}.${match[1]}`);
+    private async parseFormsWithBackend(text: string, filePath: string, measure: ParseTimer): Promise<FormParseOutcome | undefined> {
+        if (this.parseBackend) {
+            try {
+                return await this.parseBackend.parseForms(text, filePath);
+            } catch (error) {
+                // Parse locally only when the server is not there to ask
+                if (!(error instanceof ServerUnavailableError)) {
+                    this.quarantine.recordBackendFailure('form', filePath, text, error);
+                    return undefined;
                 }
             }
-        });
-        
-        return [...new Set(baseClasses)]; // Remove duplicates
+        }
+        return measure(() => this.parser.parse(text, filePath));
     }
 
     /**
-     * Determine form type based on class definition and imports
+     * Route form parsing through a backend, or back to in-process parsing
+     * when called without one
      */
-    private determineFormType(classDefinition: string, content: string): 'Form' | 'ModelForm' {
-        // Check if ModelForm is explicitly mentioned
-        if (classDefinition.includes('ModelForm')) {
-            return 'ModelForm';
-        }
-        
-        // Check if the class has a Meta class with a model attribute
-        const className = classDefinition.match(/class\s+(\w+)/)?.[1];
-        if (className) {
-            const metaRegex = new RegExp(
-                `class\\s+${className}[^:]*:[\\s\\S]*?class\\s+Meta\\s*:[\\s\\S]*?model\\s*=`,
-                'm'
-            );
-            if (metaRegex.test(content)) {
-                return 'ModelForm';
-            }
-        }
-        
-        return 'Form';
+    setParseBackend(backend: FormParseBackend | undefined): void {
+        this.parseBackend = backend;
     }
 
     /**
-     * Extract form body with better handling of indentation
+     * Swap the forms defined in a file in one step so readers never see a
+     * partially updated file. During a scan the forms of all files are
+     * published together when it ends.
      */
-    private extractFormBody(content: string, className: string, startIndex: number): string | null {
-        const lines = content.split('\n');
-        let currentIndex = 0;
-        let lineIndex = 0;
-        
-        // Find the line containing the class definition
-        for (let i = 0; i < lines.length; i++) {
-            if (currentIndex + lines[i].length >= startIndex) {
-                lineIndex = i;
-                break;
-            }
-            currentIndex += lines[i].length + 1; // +1 for newline
-        }
-        
-        // Get the indentation level of the class definition
-        const classLine = lines[lineIndex];
-        const classIndent = classLine.match(/^(\s*)/)?.[1]?.length || 0;
-        
-        // Collect lines that belong to the class body
-        const bodyLines: string[] = [classLine];
-        for (let i = lineIndex + 1; i < lines.length; i++) {
-            const line = lines[i];
-            const lineIndent = line.match(/^(\s*)/)?.[1]?.length || 0;
-            
-            // Skip empty lines
-            if (line.trim() === '') {
-                bodyLines.push(line);
-                continue;
+    private replaceFormsForFile(filePath: string, forms: FormInfo[]): void {
+        const previous = this.formsByFile.get(filePath) || [];
+        const names = new Set(forms.map(form => form.name));
+
+        previous.forEach(form => {
+            if (!names.has(form.name) && this.formCache.get(form.name)?.filePath === filePath) {
+                this.formCache.delete(form.name);
+                this.forgetModelFormFields(form.name);
             }
-            
-            // If we find a line with same or less indentation (and it's not empty), we're done
-            if (lineIndent <= classIndent) {
-                break;
+        });
+        forms.forEach(form => {
+            if (this.formCache.get(form.name) !== form) {
+                this.forgetModelFormFields(form.name);
             }
-            
-            bodyLines.push(line);
-        }
-        
-        return bodyLines.join('\n');
-    }
+            this.formCache.set(form.name, form);
+        });
 
-    /**
-     * Extract form fields from form body
-     */
-    private extractFormFields(formBody: string): FormFieldInfo[] {
-        const fields: FormFieldInfo[] = [];
-        
-        // Split the form body into lines for better processing
-        const lines = formBody.split('\n');
-        
-        for (let i = 0; i < lines.length; i++) {
-            const line = lines[i];
-            
-            // Check if this line starts a field definition
-            // Support both 'forms.CharField' and aliased patterns like 'f.CharField'
-            const fieldStartMatch = line.match(/^\s*(\w+)\s*=\s*(\w+)\.(\w+)\s*\(/);
-            
-            if (fieldStartMatch) {
-                const fieldName = fieldStartMatch[1];
-                const moduleOrAlias = fieldStartMatch[2];
-                const fieldType = fieldStartMatch[3];
-                
-                // Check if this is actually a forms field
-                if (!this.isFormsField(moduleOrAlias, fieldType, formBody)) {
-                    continue;
-                }
-                
-                // Skip if it's a method (starts with underscore or is 'Meta')
-                if (fieldName.startsWith('_') || fieldName === 'Meta') {
-                    continue;
-                }
-                
-                // Extract the full field definition (might span multiple lines)
-                const fieldDefinition = this.extractMultilineFieldDefinition(lines, i);
-                
-                // Extract parameters from the full definition
-                const paramsMatch = fieldDefinition.match(/\w+\.\w+\s*\(([\s\S]*?)\)$/);
-                const fieldParams = paramsMatch ? paramsMatch[1] : '';
-                
-                const fieldInfo: FormFieldInfo = {
-                    name: fieldName,
-                    fieldType: fieldType,
-                    required: !fieldParams.includes('required=False'),
-                    widget: this.extractWidget(fieldParams),
-                    helpText: this.extractHelpText(fieldParams)
-                };
-                
-                fields.push(fieldInfo);
-                
-                // Skip lines that were part of this field definition
-                const definitionLines = fieldDefinition.split('\n').length - 1;
-                i += definitionLines;
-            }
+        if (forms.length > 0) {
+            this.formsByFile.set(filePath, forms);
+        } else {
+            this.formsByFile.delete(filePath);
+        }
+        if (this.scanDepth === 0) {
+            this.formCache.publish();
         }
-        
-        return fields;
     }
 
     /**
-     * Extract multi-line field definition starting from the given line
+     * Debounce problem reporting so a burst of file events produces one summary
      */
-    private extractMultilineFieldDefinition(lines: string[], startIndex: number): string {
-        let definition = lines[startIndex];
-        let openParens = (definition.match(/\(/g) || []).length;
-        let closeParens = (definition.match(/\)/g) || []).length;
-        let i = startIndex;
-        
-        // Continue reading lines until parentheses are balanced
-        while (openParens > closeParens && i < lines.length - 1) {
-            i++;
-            const nextLine = lines[i];
-            definition += '\n' + nextLine;
-            openParens += (nextLine.match(/\(/g) || []).length;
-            closeParens += (nextLine.match(/\)/g) || []).length;
+    private scheduleProblemReport(): void {
+        if (this.reportTimer) {
+            clearTimeout(this.reportTimer);
         }
-        
-        return definition;
+        this.reportTimer = setTimeout(() => {
+            this.reportTimer = undefined;
+            this.reportProblems();
+        }, REPORT_DELAY);
     }
 
     /**
-     * Check if the given module/alias and field type represent a Django forms field
+     * Log every problem and show a single summary for files not reported before
      */
-    private isFormsField(moduleOrAlias: string, fieldType: string, content: string): boolean {
-        // Common Django form field types
-        const formFieldTypes = [
-            'CharField', 'EmailField', 'IntegerField', 'DecimalField', 'FloatField',
-            'BooleanField', 'DateField', 'DateTimeField', 'TimeField', 'URLField',
-            'SlugField', 'ChoiceField', 'MultipleChoiceField', 'FileField', 'ImageField',
-            'JSONField', 'GenericIPAddressField', 'RegexField', 'TypedChoiceField',
-            'TypedMultipleChoiceField', 'ModelChoiceField', 'ModelMultipleChoiceField',
-            'DurationField', 'SplitDateTimeField', 'FilePathField', 'UUIDField'
-        ];
-        
-        // Check if it's a known form field type
-        if (!formFieldTypes.includes(fieldType)) {
-            return false;
+    private reportProblems(): void {
+        if (this.reportTimer) {
+            clearTimeout(this.reportTimer);
+            this.reportTimer = undefined;
         }
-        
-        // Check common patterns
-        if (moduleOrAlias === 'forms') {
-            return true;
+
+        const newProblems = Array.from(this.problems.values())
+            .filter(problem => !this.reportedProblems.has(problem.filePath));
+        newProblems.forEach(problem => this.reportedProblems.add(problem.filePath));
+
+        if (newProblems.length === 0) {
+            return;
         }
-        
-        // Check if there's an import alias for forms
-        const aliasPatterns = [
-            new RegExp(`import\\s+django\\.forms\\s+as\\s+${moduleOrAlias}\\b`),
-            new RegExp(`from\\s+django\\s+import\\s+forms\\s+as\\s+${moduleOrAlias}\\b`),
-            new RegExp(`import\\s+forms\\s+as\\s+${moduleOrAlias}\\b`)
-        ];
-        
-        return aliasPatterns.some(pattern => pattern.test(content));
+
+        newProblems.forEach(problem => {
+            console.warn(`⚠️ Could not analyze forms in ${problem.filePath}: ${problem.message}`);
+        });
+
+        const fileNames = newProblems.slice(0, 3).map(problem => this.getDisplayPath(problem.filePath));
+        const more = newProblems.length > fileNames.length ? ` and ${newProblems.length - fileNames.length} more` : '';
+        vscode.window.showWarningMessage(
+            `Django Power Tools: Could not analyze forms in ${newProblems.length} file(s): ${fileNames.join(', ')}${more}. Please check if the forms use supported Django syntax.`
+        );
     }
 
-    /**
-     * Extract model name from ModelForm
-     */
-    private extractModelName(formBody: string): string | undefined {
-        const metaMatch = formBody.match(/class\s+Meta\s*:[\s\S]*?model\s*=\s*(\w+)/);
-        return metaMatch ? metaMatch[1] : undefined;
+    private getDisplayPath(filePath: string): string {
+        const projectRoot = this.projectAnalyzer.getProjectRoot?.();
+        return projectRoot ? path.relative(projectRoot, filePath) : path.basename(filePath);
     }
 
     /**
-     * Extract widget from field parameters
+     * Get files whose forms could not be analyzed in the last scan
      */
-    private extractWidget(params: string): string | undefined {
-        // Match various widget patterns
-        const widgetPatterns = [
-            /widget\s*=\s*forms\.(\w+)/,          // widget=forms.TextInput
-            /widget\s*=\s*widgets\.(\w+)/,        // widget=widgets.TextInput
-            /widget\s*=\s*(\w+)\.(\w+)/,          // widget=f.TextInput (aliased)
-            /widget\s*=\s*(\w+)\(/                // widget=TextInput( (direct import)
-        ];
-        
-        for (const pattern of widgetPatterns) {
-            const match = params.match(pattern);
-            if (match) {
-                if (match.length === 3) {
-                    // For patterns with module.Widget format
-                    return match[2];
-                } else {
-                    // For other patterns
-                    return match[1];
-                }
-            }
-        }
-        
-        return undefined;
+    getProblemFiles(): string[] {
+        return Array.from(this.problems.keys());
     }
 
     /**
-     * Extract help text from field parameters
+     * Remove forms from a specific file
      */
-    private extractHelpText(params: string): string | undefined {
-        const helpTextMatch = params.match(/help_text\s*=\s*['"](.*?)['"]/);
-        return helpTextMatch ? helpTextMatch[1] : undefined;
+    private removeFormsFromFile(filePath: string): void {
+        this.replaceFormsForFile(filePath, []);
     }
 
     /**
-     * Remove forms from a specific file
+     * The published forms keyed by name, for reading several forms consistently
      */
-    private removeFormsFromFile(filePath: string): void {
-        const formsToRemove: string[] = [];
-        
-        this.formCache.forEach((form, name) => {
-            if (form.filePath === filePath) {
-                formsToRemove.push(name);
-            }
-        });
-        
-        formsToRemove.forEach(name => this.formCache.delete(name));
+    getSnapshot(): AnalysisSnapshot<FormInfo> {
+        return this.formCache.getSnapshot();
     }
 
     /**
      * Get all forms
      */
     getAllForms(): FormInfo[] {
-        return Array.from(this.formCache.values());
+        return Array.from(this.formCache.getSnapshot().values());
     }
 
     /**
      * Get form by name
      */
     getForm(name: string): FormInfo | undefined {
-        return this.formCache.get(name);
+        return this.formCache.getSnapshot().get(name);
     }
 
     /**
@@ -506,7 +382,7 @@ export class DjangoFormAnalyzer {
             return [];
         }
         
-        return Array.from(this.formCache.values()).filter(form => {
+        return Array.from(this.formCache.getSnapshot().values()).filter(form => {
             try {
                 const relativePath = path.relative(projectRoot, form.filePath);
                 const parts = relativePath.split(path.sep);
@@ -532,17 +408,32 @@ export class DjangoFormAnalyzer {
     }
 
     /**
-     * Get ModelForm fields including inherited model fields
+     * Get ModelForm fields including inherited model fields.
+     * The result is cached until the form or its model changes.
      */
     async getModelFormFields(formName: string): Promise<FormFieldInfo[]> {
-        const form = this.formCache.get(formName);
-        if (!form || form.type !== 'ModelForm' || !form.modelName) {
-            return form ? form.fields : [];
+        const declared = this.formCache.getSnapshot().get(formName);
+        if (!declared) {
+            return [];
+        }
+
+        const cached = this.modelFormFieldCache.get(formName);
+        if (cached) {
+            return cached;
+        }
+
+        const form = this.withInheritedFields(declared);
+        if (form.type !== 'ModelForm' || !form.modelName) {
+            return form.fields;
         }
 
         // Get model fields
         const modelInfo = await this.projectAnalyzer.getModelInfo();
         const model = modelInfo[form.modelName];
+
+        // Record the dependency even if the model is not known yet so the
+        // form is refreshed once it appears
+        this.dependencyGraph?.setDependencies('form', formName, [form.modelName]);
         
         if (!model) {
             return form.fields;
@@ -564,9 +455,70 @@ export class DjangoFormAnalyzer {
             }
         });
 
+        // Only cache when the graph can tell us about model changes
+        if (this.dependencyGraph) {
+            this.modelFormFieldCache.set(formName, combinedFields);
+        }
+
         return combinedFields;
     }
 
+    /**
+     * A form with the fields and Meta.model of its base forms, in method
+     * resolution order; bases that are not parsed as forms (mixins)
+     * contribute the fields they declare
+     */
+    private withInheritedFields(form: FormInfo): FormInfo {
+        const hierarchy = this.classHierarchy;
+        if (!hierarchy) {
+            return form;
+        }
+
+        const fields = [...form.fields];
+        const fieldNames = new Set(fields.map(field => field.name));
+        let modelName = form.modelName;
+        const snapshot = this.formCache.getSnapshot();
+
+        for (const ancestor of hierarchy.getMro(hierarchy.qualify(form.filePath, form.name)).slice(1)) {
+            const cls = hierarchy.getClass(ancestor);
+            if (!cls) {
+                continue;
+            }
+
+            const baseForm = snapshot.get(cls.name);
+            if (baseForm && baseForm.filePath === cls.filePath) {
+                baseForm.fields.filter(field => !fieldNames.has(field.name)).forEach(field => {
+                    fieldNames.add(field.name);
+                    fields.push(field);
+                });
+                modelName = modelName || baseForm.modelName;
+                continue;
+            }
+
+            for (const member of cls.members) {
+                const fieldMatch = member.kind === 'attribute' && member.value?.match(/^(?:\w+\.)?(\w+Field)\s*\(/);
+                if (fieldMatch && !fieldNames.has(member.name)) {
+                    fieldNames.add(member.name);
+                    fields.push({
+                        name: member.name,
+                        fieldType: fieldMatch[1],
+                        required: !/required\s*=\s*False/.test(member.value || '')
+                    });
+                }
+            }
+        }
+
+        if (fields.length === form.fields.length && modelName === form.modelName) {
+            return form;
+        }
+        return { ...form, fields, modelName, type: modelName ? 'ModelForm' : form.type };
+    }
+
+    private forgetModelFormFields(formName: string): void {
+        this.modelFormFieldCache.delete(formName);
+        this.dependencyGraph?.removeDependent('form', formName);
+    }
+
     /**
      * Map Django model field types to form field types
      */
@@ -593,22 +545,6 @@ export class DjangoFormAnalyzer {
         return mapping[modelFieldType] || 'CharField';
     }
 
-    /**
-     * Check if the content contains form-like patterns
-     */
-    private containsFormPatterns(content: string): boolean {
-        const formPatterns = [
-            /class\s+\w+\s*\(\s*.*Form.*\s*\)/,           // class MyForm(Form)
-            /from\s+django\.forms\s+import/,               // from django.forms import
-            /from\s+django\s+import\s+forms/,              // from django import forms
-            /import\s+django\.forms/,                      // import django.forms
-            /=\s*forms\.\w+\s*\(/,                         // = forms.CharField(
-            /class\s+Meta\s*:[\s\S]*?model\s*=/            // class Meta: model =
-        ];
-        
-        return formPatterns.some(pattern => pattern.test(content));
-    }
-
     /**
      * Dispose resources
      */
@@ -616,6 +552,16 @@ export class DjangoFormAnalyzer {
         if (this.fileWatcher) {
             this.fileWatcher.dispose();
         }
+        this.checkoutSubscription?.dispose();
+        if (this.reportTimer) {
+            clearTimeout(this.reportTimer);
+            this.reportTimer = undefined;
+        }
         this.formCache.clear();
+        this.formCache.publish();
+        this.formsByFile.clear();
+        this.modelFormFieldCache.clear();
+        this.problems.clear();
+        this.parser.clear();
     }
-}
\ No newline at end of file
+}
@@ -1,18 +1,16 @@
 import { injectable, inject } from 'inversify';
 import * as vscode from 'vscode';
 import * as path from 'path';
-import * as fs from 'fs';
 import { AdvancedModelAnalyzer } from './advancedModelAnalyzer';
-import { PythonParser } from '../parsers/pythonParser';
 import { TYPES } from '../container/types';
+import { FileSystem, nodeFileSystem } from '../utils/fileSystem';
+import { GitCheckoutMonitor } from './gitCheckoutMonitor';
+import { UrlConfEngine } from './urlConfEngine';
+import { UrlConfEntry } from '../parsers/urlConfParser';
+import { MemoryConsumer } from '../cache/memoryBudgetManager';
+import { SnapshotMap } from './analysisSnapshot';
 
-// FileSystem interface for dependency injection
-export interface FileSystem {
-    existsSync(path: string): boolean;
-    readFileSync(path: string, encoding?: string): string | Buffer;
-    readdirSync(path: string): string[];
-    statSync(path: string): fs.Stats;
-}
+export type { FileSystem } from '../utils/fileSystem';
 
 interface ModelField {
     name: string;
@@ -38,25 +36,30 @@ interface UrlPattern {
 @injectable()
 export class DjangoProjectAnalyzer {
     protected projectRoot: string | undefined;
-    protected modelCache: Map<string, ModelInfo> = new Map();
-    protected urlPatternCache: Map<string, UrlPattern> = new Map();
+    // Set when the analyzer only owns one project of a multi-project workspace
+    protected scopedToRoot = false;
+    // Published by publish(); the public getters read the last snapshot
+    protected modelCache = new SnapshotMap<ModelInfo>();
+    protected urlPatternCache = new SnapshotMap<UrlPattern>();
+    private batchDepth = 0;
+    // Entries each urls.py added to urlPatternCache
+    private fileUrlPatterns: Map<string, Map<string, UrlPattern>> = new Map();
+    private urlConfEngine: UrlConfEngine = new UrlConfEngine();
     protected settingsCache: any = {};
     protected advancedAnalyzer: AdvancedModelAnalyzer;
-    protected pythonParser: PythonParser;
     protected fileSystem: FileSystem;
+    private pythonWatcher: vscode.FileSystemWatcher | undefined;
+    protected checkoutMonitor: GitCheckoutMonitor | undefined;
+    private checkoutSubscription: vscode.Disposable | undefined;
+    // Where analysis results are kept between sessions, if anywhere
+    protected storageDirectory: string | undefined;
 
     constructor(
         @inject(TYPES.AdvancedModelAnalyzer) advancedAnalyzer: AdvancedModelAnalyzer,
         fileSystem?: FileSystem
     ) {
-        this.fileSystem = fileSystem || {
-            existsSync: fs.existsSync,
-            readFileSync: (path: string, encoding?: string) => fs.readFileSync(path, (encoding || 'utf8') as BufferEncoding),
-            readdirSync: fs.readdirSync,
-            statSync: fs.statSync
-        };
+        this.fileSystem = fileSystem || nodeFileSystem;
         this.advancedAnalyzer = advancedAnalyzer;
-        this.pythonParser = new PythonParser();
         this.initializeWatchers();
     }
 
@@ -72,6 +75,7 @@ export class DjangoProjectAnalyzer {
             if (managePyPath) {
                 this.projectRoot = path.dirname(managePyPath);
                 console.log(`Django project found at: ${this.projectRoot}`);
+                this.advancedAnalyzer.getClassHierarchy().addSourceRoot(this.projectRoot);
                 
                 // 초기 분석 수행
                 await this.analyzeProject();
@@ -82,6 +86,49 @@ export class DjangoProjectAnalyzer {
         return false;
     }
 
+    /**
+     * Initialize for a known project root and only analyze files below it
+     */
+    async initializeAt(projectRoot: string): Promise<boolean> {
+        this.projectRoot = projectRoot;
+        this.scopedToRoot = true;
+        this.advancedAnalyzer.getClassHierarchy().addSourceRoot(projectRoot);
+        console.log(`Django project shard started at: ${projectRoot}`);
+
+        await this.analyzeProject();
+        return true;
+    }
+
+    /**
+     * Only analyze files below the project root, used when the workspace
+     * contains several Django projects
+     */
+    restrictToProjectRoot(): void {
+        this.scopedToRoot = true;
+    }
+
+    /**
+     * Check whether a file belongs to this analyzer's project
+     */
+    isInProject(filePath: string): boolean {
+        if (!this.scopedToRoot || !this.projectRoot) {
+            return true;
+        }
+
+        const relative = path.relative(this.projectRoot, filePath);
+        return !relative.startsWith('..') && !path.isAbsolute(relative);
+    }
+
+    /**
+     * Glob for workspace searches, limited to the project root when scoped
+     */
+    protected getSearchPattern(glob: string): vscode.GlobPattern {
+        if (this.scopedToRoot && this.projectRoot) {
+            return new vscode.RelativePattern(this.projectRoot, glob);
+        }
+        return glob;
+    }
+
     private async findManagePy(rootPath: string): Promise<string | undefined> {
         const possiblePaths = [
             path.join(rootPath, 'manage.py'),
@@ -101,35 +148,156 @@ export class DjangoProjectAnalyzer {
     private initializeWatchers(): void {
         // Python 파일 변경 감지
         const pythonWatcher = vscode.workspace.createFileSystemWatcher('**/*.py');
+        this.pythonWatcher = pythonWatcher;
         
+        // During a branch switch files are handled in one batch afterwards
         pythonWatcher.onDidChange(uri => {
-            this.onPythonFileChanged(uri);
+            if (!this.checkoutMonitor?.defer(uri.fsPath)) {
+                this.onPythonFileChanged(uri);
+            }
         });
         
         pythonWatcher.onDidCreate(uri => {
-            this.onPythonFileChanged(uri);
+            if (!this.checkoutMonitor?.defer(uri.fsPath)) {
+                this.onPythonFileChanged(uri);
+            }
         });
         
         pythonWatcher.onDidDelete(uri => {
-            this.onPythonFileDeleted(uri);
+            if (!this.checkoutMonitor?.defer(uri.fsPath)) {
+                this.onPythonFileDeleted(uri);
+            }
         });
     }
 
+    /**
+     * Defer watcher events to the monitor while git rewrites the working tree
+     */
+    setCheckoutMonitor(monitor: GitCheckoutMonitor | undefined): void {
+        this.checkoutSubscription?.dispose();
+        this.checkoutMonitor = monitor;
+        this.checkoutSubscription = monitor?.onDidFinishSwitch(event => {
+            this.onPythonFilesChanged(event.changedFiles.filter(filePath => filePath.endsWith('.py')));
+        });
+    }
+
+    /**
+     * Directory for results kept between sessions; only analyzers that
+     * persist results use it. Set before initializing.
+     */
+    setStorageDirectory(directory: string | undefined): void {
+        this.storageDirectory = directory;
+    }
+
+    /**
+     * Parse URLconf modules with the engine shared by all URL consumers
+     */
+    setUrlConfEngine(engine: UrlConfEngine): void {
+        this.urlConfEngine = engine;
+    }
+
+    getUrlConfEngine(): UrlConfEngine {
+        return this.urlConfEngine;
+    }
+
+    /**
+     * Handle the files changed by a branch switch; files that no longer
+     * exist are treated as deleted
+     */
+    protected async onPythonFilesChanged(filePaths: string[]): Promise<void> {
+        await this.batch(async () => {
+            for (const filePath of filePaths) {
+                const uri = vscode.Uri.file(filePath);
+                if (this.fileSystem.existsSync(filePath)) {
+                    await this.onPythonFileChanged(uri);
+                } else {
+                    this.onPythonFileDeleted(uri);
+                }
+            }
+        });
+    }
+
+    /**
+     * Analyze several files and publish the models and URL patterns they
+     * define together once all of them are done
+     */
+    protected async batch(update: () => Promise<void>): Promise<void> {
+        this.batchDepth++;
+        try {
+            await this.advancedAnalyzer.batch(update);
+        } finally {
+            this.batchDepth--;
+            this.publish();
+        }
+    }
+
+    /**
+     * Make cache changes visible to readers, unless a batch defers it
+     */
+    protected publish(): void {
+        if (this.batchDepth === 0) {
+            this.modelCache.publish();
+            this.urlPatternCache.publish();
+        }
+    }
+
     protected async onPythonFileChanged(uri: vscode.Uri): Promise<void> {
         const filePath = uri.fsPath;
+        if (!this.isInProject(filePath)) {
+            return;
+        }
         
         if (filePath.endsWith('models.py')) {
             await this.analyzeModels(filePath);
-        } else if (filePath.endsWith('urls.py')) {
+        } else if (this.isUrlConf(filePath)) {
             await this.analyzeUrls(filePath);
         } else if (filePath.endsWith('settings.py')) {
             await this.analyzeSettings(filePath);
         }
+        this.refreshClassHierarchy(filePath);
+    }
+
+    /**
+     * Index a changed file again when it defines base classes, e.g. an
+     * abstract model or a mixin; models.py files are indexed by the model
+     * analyzer
+     */
+    protected refreshClassHierarchy(filePath: string): void {
+        if (!filePath.endsWith('models.py')) {
+            this.advancedAnalyzer.getClassHierarchy().refreshFile(filePath);
+        }
+    }
+
+    /**
+     * Analyze a file before it is opened. Results are kept by content, so a
+     * file that did not change costs only the read.
+     */
+    async prefetchFile(filePath: string): Promise<void> {
+        if (!this.isInProject(filePath)) {
+            return;
+        }
+
+        if (filePath.endsWith('models.py')) {
+            await this.analyzeModels(filePath);
+        } else if (this.isUrlConf(filePath)) {
+            await this.analyzeUrls(filePath);
+        }
     }
 
-    private onPythonFileDeleted(uri: vscode.Uri): void {
+    /**
+     * urls.py files plus the modules include() calls name, e.g. api/routes.py
+     */
+    protected isUrlConf(filePath: string): boolean {
+        return filePath.endsWith('urls.py') || this.urlConfEngine.isTracked(filePath);
+    }
+
+    protected onPythonFileDeleted(uri: vscode.Uri): void {
         // 캐시에서 관련 정보 제거
         const filePath = uri.fsPath;
+        if (!this.isInProject(filePath)) {
+            return;
+        }
+        this.advancedAnalyzer.getClassHierarchy().removeFile(filePath);
         
         if (filePath.endsWith('models.py')) {
             // 해당 앱의 모델 정보 제거
@@ -140,7 +308,11 @@ export class DjangoProjectAnalyzer {
                         this.modelCache.delete(key);
                     }
                 }
+                this.publish();
             }
+        } else if (this.isUrlConf(filePath)) {
+            this.urlConfEngine.removeFile(filePath);
+            this.applyUrlConf(filePath);
         }
     }
 
@@ -201,7 +373,7 @@ export class DjangoProjectAnalyzer {
         }
 
         // 재귀적으로 찾기
-        const files = await vscode.workspace.findFiles('**/settings.py', '**/node_modules/**', 5);
+        const files = await vscode.workspace.findFiles(this.getSearchPattern('**/settings.py'), '**/node_modules/**', 5);
         return files.length > 0 ? files[0].fsPath : undefined;
     }
 
@@ -229,11 +401,22 @@ export class DjangoProjectAnalyzer {
                 this.settingsCache.installedApps = apps;
             }
             
+            // ROOT_URLCONF 추출
+            const rootUrlconfMatch = content.match(/^ROOT_URLCONF\s*=\s*['"]([\w.]+)['"]/m);
+            this.settingsCache.rootUrlconf = rootUrlconfMatch ? rootUrlconfMatch[1] : undefined;
+            if (this.projectRoot) {
+                this.urlConfEngine.setRootUrlconf(this.projectRoot, this.settingsCache.rootUrlconf);
+            }
+
             // TEMPLATES 설정 추출
-            const templatesMatch = content.match(/TEMPLATES\s*=\s*\[([\s\S]*?)\]/);
+            const templatesMatch = content.match(/TEMPLATES\s*=\s*\[[\s\S]*?['"]DIRS['"]\s*:\s*\[([\s\S]*?)\]/);
             if (templatesMatch) {
-                // 템플릿 디렉토리 추출 로직
-                this.settingsCache.templateDirs = [];
+                // 템플릿 디렉토리 추출: BASE_DIR / 'templates', os.path.join(BASE_DIR, 'templates'), '/abs/path'
+                const items = templatesMatch[1].match(/(?:[^,(]|\([^)]*\))+/g) || [];
+                this.settingsCache.templateDirs = items
+                    .map(item => Array.from(item.matchAll(/['"]([^'"]+)['"]/g), match => match[1]))
+                    .filter(parts => parts.length > 0)
+                    .map(parts => parts.join('/'));
             }
             
             console.log('Settings analyzed:', this.settingsCache);
@@ -247,11 +430,13 @@ export class DjangoProjectAnalyzer {
             return;
         }
 
-        const modelFiles = await vscode.workspace.findFiles('**/models.py', '**/node_modules/**');
+        const modelFiles = await vscode.workspace.findFiles(this.getSearchPattern('**/models.py'), '**/node_modules/**');
         
-        for (const file of modelFiles) {
-            await this.analyzeModels(file.fsPath);
-        }
+        await this.batch(async () => {
+            for (const file of modelFiles) {
+                await this.analyzeModels(file.fsPath);
+            }
+        });
     }
 
     protected async analyzeModels(filePath: string): Promise<void> {
@@ -267,26 +452,24 @@ export class DjangoProjectAnalyzer {
                 return;
             }
 
-            // Parse using Python parser
-            const parseResult = await this.pythonParser.parseModelFile(content, filePath);
-            
-            for (const model of parseResult.models) {
+            // Reference the canonical models instead of parsing the file again;
+            // reverse relations are left to the advanced analyzer
+            const store = this.advancedAnalyzer.getStore();
+            for (const model of this.advancedAnalyzer.getModelsForFile(filePath)) {
                 const modelInfo: ModelInfo = {
                     name: model.name,
-                    app: app,
-                    fields: model.fields.map(f => ({
-                        name: f.name,
-                        type: f.type,
-                        helpText: f.helpText,
-                        required: f.required
-                    })),
+                    app: store.intern(app),
+                    fields: model.fields.filter(f => f.type !== 'RelatedManager'),
                     methods: [],
                     managers: model.managers
+                        .filter(m => m.type !== 'RelatedManager')
+                        .map(m => m.name)
                 };
                 
                 this.modelCache.set(model.name, modelInfo);
                 console.log(`Model analyzed: ${app}.${model.name}`);
             }
+            this.publish();
         } catch (error) {
             console.error(`Error analyzing models in ${filePath}:`, error);
         }
@@ -327,47 +510,67 @@ export class DjangoProjectAnalyzer {
             return;
         }
 
-        const urlFiles = await vscode.workspace.findFiles('**/urls.py', '**/node_modules/**');
+        const urlFiles = await vscode.workspace.findFiles(this.getSearchPattern('**/urls.py'), '**/node_modules/**');
         
-        for (const file of urlFiles) {
-            await this.analyzeUrls(file.fsPath);
-        }
+        await this.urlConfEngine.batch(async () => {
+            for (const file of urlFiles) {
+                await this.analyzeUrls(file.fsPath);
+            }
+        });
     }
 
     protected async analyzeUrls(filePath: string): Promise<void> {
         try {
             const content = this.fileSystem.readFileSync(filePath, 'utf8') as string;
-            
-            // URL 패턴 추출 - 개선된 정규식
-            // path() 및 re_path() 패턴 모두 처리
-            const pathRegex = /(?:path|re_path)\s*\(\s*r?['"]([^'"]*)['\"]\s*,\s*([^,\s]+(?:\.[^,\s]+)*)[^,)]*(?:,\s*name\s*=\s*['"]([^'"]+)['"])?\s*\)/g;
-            let match;
-            
-            while ((match = pathRegex.exec(content)) !== null) {
-                const [_, pattern, view, name] = match;
-                
-                const urlPattern: UrlPattern = {
-                    pattern: pattern,
-                    view: view.trim(),
-                    name: name
-                };
-                
-                // Store all patterns, using pattern as key if no name
-                const key = name || `${pattern}_${view}`;
-                this.urlPatternCache.set(key, urlPattern);
-                
-                console.log(`URL pattern analyzed: ${pattern} -> ${view}`);
-            }
+            // Parsed only when the content changed since the engine last saw it
+            this.urlConfEngine.updateFile(filePath, content);
+            this.applyUrlConf(filePath);
         } catch (error) {
             console.error(`Error analyzing URLs in ${filePath}:`, error);
         }
     }
 
+    /**
+     * Replace the patterns a urls.py contributed with its current entries
+     */
+    protected applyUrlConf(filePath: string): void {
+        for (const [key, pattern] of this.fileUrlPatterns.get(filePath) || []) {
+            if (this.urlPatternCache.get(key) === pattern) {
+                this.urlPatternCache.delete(key);
+            }
+        }
+
+        const parsed = this.urlConfEngine.getParsed(filePath);
+        if (!parsed) {
+            this.fileUrlPatterns.delete(filePath);
+            this.publish();
+            return;
+        }
+
+        const patterns = new Map<string, UrlPattern>();
+        const collect = (entries: UrlConfEntry[]) => {
+            for (const entry of entries) {
+                if (entry.kind === 'pattern') {
+                    // Store all patterns, using pattern as key if no name
+                    const key = entry.name || `${entry.route}_${entry.view}`;
+                    const pattern: UrlPattern = { pattern: entry.route, view: entry.view, name: entry.name };
+                    patterns.set(key, pattern);
+                    this.urlPatternCache.set(key, pattern);
+                } else if (entry.entries) {
+                    collect(entry.entries);
+                }
+            }
+        };
+        collect(parsed.entries);
+        this.fileUrlPatterns.set(filePath, patterns);
+        this.publish();
+    }
+
     // Public API
     async getModelInfo(): Promise<{ [key: string]: ModelInfo }> {
         const result: { [key: string]: ModelInfo } = {};
         
-        for (const [name, info] of this.modelCache.entries()) {
+        for (const [name, info] of this.modelCache.getSnapshot()) {
             result[name] = info;
         }
         
@@ -375,11 +578,11 @@ export class DjangoProjectAnalyzer {
     }
 
     async getUrlPatterns(): Promise<UrlPattern[]> {
-        return Array.from(this.urlPatternCache.values());
+        return Array.from(this.urlPatternCache.getSnapshot().values());
     }
 
     async getUrlByName(name: string): Promise<UrlPattern | undefined> {
-        return this.urlPatternCache.get(name);
+        return this.urlPatternCache.getSnapshot().get(name);
     }
 
     getProjectRoot(): string | undefined {
@@ -390,7 +593,33 @@ export class DjangoProjectAnalyzer {
         return this.settingsCache.installedApps || [];
     }
 
+    /**
+     * TEMPLATES DIRS from settings, resolved against the project root
+     */
+    getTemplateDirs(): string[] {
+        const dirs: string[] = this.settingsCache.templateDirs || [];
+        const root = this.projectRoot;
+        return dirs.map(dir => path.isAbsolute(dir) || !root ? dir : path.join(root, dir));
+    }
+
+    getRootUrlconf(): string | undefined {
+        return this.settingsCache.rootUrlconf;
+    }
+
     getAdvancedAnalyzer(): AdvancedModelAnalyzer {
         return this.advancedAnalyzer;
     }
+
+    /**
+     * Caches that can be dropped under memory pressure; the project state
+     * itself is not one of them
+     */
+    getMemoryConsumers(): MemoryConsumer[] {
+        return [];
+    }
+
+    dispose(): void {
+        this.pythonWatcher?.dispose();
+        this.checkoutSubscription?.dispose();
+    }
 }
\ No newline at end of file
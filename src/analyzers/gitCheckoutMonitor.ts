@@ -0,0 +1,368 @@
+import { injectable } from 'inversify';
+import * as vscode from 'vscode';
+import * as fs from 'fs';
+import * as path from 'path';
+import { hashContent } from './projectIndexFormat';
+
+/**
+ * Files touched while a checkout (or another index-rewriting git command)
+ * was running, delivered once the working tree has settled
+ */
+export interface CheckoutEvent {
+    workTree: string;
+    previousHead: string | undefined;
+    head: string | undefined;
+    changedFiles: string[];
+}
+
+export interface CheckoutMonitorStatus {
+    switching: boolean;
+    repositories: { workTree: string; head?: string }[];
+    snapshots: number;
+    snapshotHits: number;
+    snapshotMisses: number;
+}
+
+interface Repository {
+    workTree: string;
+    // Holds HEAD and index.lock; differs from commonDir in linked worktrees
+    gitDir: string;
+    commonDir: string;
+    head: string | undefined;
+}
+
+// Snapshots kept per analyzer, one per recently checked out commit
+const MAX_COMMIT_SNAPSHOTS = 4;
+// A switch ends once no file or git events arrived for this long
+const SWITCH_QUIET_PERIOD = 1500;
+// Deferred files are handed out after this long even if events keep coming
+const MAX_SWITCH_DURATION = 60 * 1000;
+
+/**
+ * Detects branch switches and other git operations that rewrite many files
+ * at once by watching HEAD, refs and index.lock. While one is running,
+ * analyzers defer their per-file watcher handling to the monitor and get the
+ * whole set of touched files in one batch afterwards.
+ */
+@injectable()
+export class GitCheckoutMonitor {
+    private repositories: Repository[] = [];
+    private watchers: vscode.Disposable[] = [];
+    private switchingRepository: Repository | undefined;
+    private switchStartHead: string | undefined;
+    private switchStartedAt = 0;
+    private deferredFiles: Set<string> = new Set();
+    private quietTimer: NodeJS.Timeout | undefined;
+    private snapshotCaches: CommitSnapshotCache<unknown>[] = [];
+    private snapshotHits = 0;
+    private snapshotMisses = 0;
+
+    private readonly startEmitter = new vscode.EventEmitter<string>();
+    private readonly finishEmitter = new vscode.EventEmitter<CheckoutEvent>();
+    // Fires with the work tree of the repository a switch started in
+    readonly onDidStartSwitch = this.startEmitter.event;
+    readonly onDidFinishSwitch = this.finishEmitter.event;
+
+    /**
+     * Find the repositories of the given folders (the workspace folders by
+     * default) and start watching them
+     */
+    initialize(folders?: string[]): void {
+        this.disposeWatchers();
+        const roots = folders || (vscode.workspace.workspaceFolders || []).map(folder => folder.uri.fsPath);
+        this.repositories = roots
+            .map(root => this.findRepository(root))
+            .filter((repository): repository is Repository => repository !== undefined);
+
+        for (const repository of this.repositories) {
+            repository.head = this.readHead(repository);
+            this.watchRepository(repository);
+        }
+    }
+
+    private findRepository(workTree: string): Repository | undefined {
+        const dotGit = path.join(workTree, '.git');
+        try {
+            let gitDir = dotGit;
+            if (fs.statSync(dotGit).isFile()) {
+                // Linked worktree or submodule: ".git" points at the real directory
+                const match = fs.readFileSync(dotGit, 'utf8').match(/^gitdir:\s*(.+)$/m);
+                if (!match) {
+                    return undefined;
+                }
+                gitDir = path.resolve(workTree, match[1].trim());
+            }
+
+            let commonDir = gitDir;
+            const commonDirFile = path.join(gitDir, 'commondir');
+            if (fs.existsSync(commonDirFile)) {
+                commonDir = path.resolve(gitDir, fs.readFileSync(commonDirFile, 'utf8').trim());
+            }
+            return { workTree, gitDir, commonDir, head: undefined };
+        } catch {
+            return undefined;
+        }
+    }
+
+    private watchRepository(repository: Repository): void {
+        const patterns = [new vscode.RelativePattern(repository.gitDir, '{HEAD,index.lock}')];
+        patterns.push(new vscode.RelativePattern(repository.commonDir, '{packed-refs,refs/heads/**}'));
+
+        for (const pattern of patterns) {
+            const watcher = vscode.workspace.createFileSystemWatcher(pattern);
+            const onEvent = () => this.onGitActivity(repository);
+            this.watchers.push(
+                watcher,
+                watcher.onDidCreate(onEvent),
+                watcher.onDidChange(onEvent),
+                watcher.onDidDelete(onEvent)
+            );
+        }
+    }
+
+    /**
+     * Commit checked out in a repository, following symbolic refs and
+     * packed-refs; undefined for unborn branches or unreadable repositories
+     */
+    readHead(repository: Pick<Repository, 'gitDir' | 'commonDir'>): string | undefined {
+        try {
+            const head = fs.readFileSync(path.join(repository.gitDir, 'HEAD'), 'utf8').trim();
+            const ref = head.match(/^ref:\s*(.+)$/);
+            if (!ref) {
+                return head;
+            }
+
+            const refPath = path.join(repository.commonDir, ...ref[1].split('/'));
+            if (fs.existsSync(refPath)) {
+                return fs.readFileSync(refPath, 'utf8').trim();
+            }
+
+            const packedRefs = path.join(repository.commonDir, 'packed-refs');
+            if (fs.existsSync(packedRefs)) {
+                for (const line of fs.readFileSync(packedRefs, 'utf8').split('\n')) {
+                    const [commit, name] = line.trim().split(' ');
+                    if (name === ref[1]) {
+                        return commit;
+                    }
+                }
+            }
+        } catch {
+            // Fall through
+        }
+        return undefined;
+    }
+
+    private onGitActivity(repository: Repository): void {
+        if (!this.switchingRepository) {
+            // index.lock appears before the working tree is touched, so the
+            // switch starts before the first file event arrives
+            const lockHeld = fs.existsSync(path.join(repository.gitDir, 'index.lock'));
+            if (!lockHeld && this.readHead(repository) === repository.head) {
+                return;
+            }
+            this.startSwitch(repository);
+        }
+        this.scheduleFinish();
+    }
+
+    /**
+     * Re-read HEAD of every repository, starting a switch for one whose
+     * commit changed
+     */
+    refresh(): void {
+        for (const repository of this.repositories) {
+            if (!this.switchingRepository && this.readHead(repository) !== repository.head) {
+                this.startSwitch(repository);
+                this.scheduleFinish();
+            }
+        }
+    }
+
+    private startSwitch(repository: Repository): void {
+        this.switchingRepository = repository;
+        this.switchStartHead = repository.head;
+        this.switchStartedAt = Date.now();
+        this.startEmitter.fire(repository.workTree);
+    }
+
+    isSwitching(): boolean {
+        return this.switchingRepository !== undefined;
+    }
+
+    /**
+     * Called by watcher handlers before handling a file. Returns true when a
+     * switch is running; the file is then delivered with onDidFinishSwitch.
+     */
+    defer(filePath: string): boolean {
+        if (!this.switchingRepository) {
+            return false;
+        }
+        this.deferredFiles.add(filePath);
+        this.scheduleFinish();
+        return true;
+    }
+
+    private scheduleFinish(): void {
+        if (this.quietTimer) {
+            clearTimeout(this.quietTimer);
+        }
+        const remaining = this.switchStartedAt + MAX_SWITCH_DURATION - Date.now();
+        this.quietTimer = setTimeout(() => this.tryFinishSwitch(), Math.max(0, Math.min(SWITCH_QUIET_PERIOD, remaining)));
+    }
+
+    private tryFinishSwitch(): void {
+        const repository = this.switchingRepository;
+        const timedOut = Date.now() - this.switchStartedAt >= MAX_SWITCH_DURATION;
+        if (repository && !timedOut && fs.existsSync(path.join(repository.gitDir, 'index.lock'))) {
+            // Git is still writing the working tree
+            this.scheduleFinish();
+            return;
+        }
+        this.finishSwitch();
+    }
+
+    /**
+     * End the running switch and deliver the deferred files
+     */
+    finishSwitch(): void {
+        const repository = this.switchingRepository;
+        if (this.quietTimer) {
+            clearTimeout(this.quietTimer);
+            this.quietTimer = undefined;
+        }
+        if (!repository) {
+            return;
+        }
+
+        repository.head = this.readHead(repository);
+        const event: CheckoutEvent = {
+            workTree: repository.workTree,
+            previousHead: this.switchStartHead,
+            head: repository.head,
+            changedFiles: Array.from(this.deferredFiles)
+        };
+        this.switchingRepository = undefined;
+        this.switchStartHead = undefined;
+        this.deferredFiles = new Set();
+
+        if (event.previousHead !== event.head && event.changedFiles.length > 0) {
+            console.log(
+                `Checkout ${event.previousHead?.substring(0, 8)} -> ${event.head?.substring(0, 8)}: ` +
+                `${event.changedFiles.length} files changed, re-analyzing in one batch`
+            );
+        }
+        this.finishEmitter.fire(event);
+    }
+
+    /**
+     * Commit checked out in the repository that contains a file
+     */
+    getHead(filePath: string): string | undefined {
+        const repository = this.repositories.find(candidate => {
+            const relative = path.relative(candidate.workTree, filePath);
+            return !relative.startsWith('..') && !path.isAbsolute(relative);
+        });
+        return repository?.head;
+    }
+
+    /**
+     * Per-commit cache of analysis results, validated by content hash, that
+     * lets an analyzer restore the files of a recently checked out commit
+     * without parsing them again
+     */
+    createSnapshotCache<T>(): CommitSnapshotCache<T> {
+        const cache = new CommitSnapshotCache<T>(this, MAX_COMMIT_SNAPSHOTS);
+        this.snapshotCaches.push(cache);
+        return cache;
+    }
+
+    recordSnapshotLookup(hit: boolean): void {
+        if (hit) {
+            this.snapshotHits++;
+        } else {
+            this.snapshotMisses++;
+        }
+    }
+
+    getStatus(): CheckoutMonitorStatus {
+        return {
+            switching: this.isSwitching(),
+            repositories: this.repositories.map(repository => ({ workTree: repository.workTree, head: repository.head })),
+            snapshots: this.snapshotCaches.reduce((count, cache) => count + cache.size, 0),
+            snapshotHits: this.snapshotHits,
+            snapshotMisses: this.snapshotMisses
+        };
+    }
+
+    private disposeWatchers(): void {
+        this.watchers.forEach(watcher => watcher.dispose());
+        this.watchers = [];
+    }
+
+    dispose(): void {
+        this.disposeWatchers();
+        if (this.quietTimer) {
+            clearTimeout(this.quietTimer);
+        }
+        this.snapshotCaches.forEach(cache => cache.clear());
+        this.startEmitter.dispose();
+        this.finishEmitter.dispose();
+    }
+}
+
+/**
+ * Analysis results of the files seen at each of the most recently checked
+ * out commits. Results are keyed by file and validated by content hash, so
+ * uncommitted changes never return a stale result.
+ */
+export class CommitSnapshotCache<T> {
+    // Least recently used commit first
+    private snapshots: Map<string, Map<string, { hash: string; value: T }>> = new Map();
+
+    constructor(private monitor: GitCheckoutMonitor, private maxSnapshots: number) {}
+
+    get size(): number {
+        return this.snapshots.size;
+    }
+
+    get(filePath: string, content: string): T | undefined {
+        const snapshot = this.getSnapshot(filePath, false);
+        if (!snapshot) {
+            return undefined;
+        }
+
+        const entry = snapshot.get(filePath);
+        const hit = entry !== undefined && entry.hash === hashContent(content);
+        this.monitor.recordSnapshotLookup(hit);
+        return hit ? entry!.value : undefined;
+    }
+
+    set(filePath: string, content: string, value: T): void {
+        this.getSnapshot(filePath, true)?.set(filePath, { hash: hashContent(content), value });
+    }
+
+    private getSnapshot(filePath: string, create: boolean): Map<string, { hash: string; value: T }> | undefined {
+        const commit = this.monitor.getHead(filePath);
+        if (!commit) {
+            return undefined;
+        }
+
+        let snapshot = this.snapshots.get(commit);
+        if (snapshot) {
+            // Move to the most recently used end
+            this.snapshots.delete(commit);
+            this.snapshots.set(commit, snapshot);
+        } else if (create) {
+            snapshot = new Map();
+            this.snapshots.set(commit, snapshot);
+            if (this.snapshots.size > this.maxSnapshots) {
+                this.snapshots.delete(this.snapshots.keys().next().value as string);
+            }
+        }
+        return snapshot;
+    }
+
+    clear(): void {
+        this.snapshots.clear();
+    }
+}
@@ -6,4 +6,21 @@ export type { UrlPattern } from './urlPatternAnalyzer';
 export * from './enhancedUrlPatternAnalyzer';
 export * from './djangoFormAnalyzer';
 export * from './viewContextAnalyzer';
-export * from './staticFileAnalyzer';
\ No newline at end of file
+export * from './staticFileAnalyzer';
+export * from './sitePackagesModelIndex';
+export * from './modelDependencyGraph';
+export * from './projectShardManager';
+export * from './modelStore';
+export * from './urlResolver';
+export * from './templateIndex';
+export * from './prebuiltProjectIndex';
+export * from './gitCheckoutMonitor';
+export * from './liveModelRegistry';
+export * from './referenceIndex';
+export * from './variableBindingIndex';
+export * from './urlConfEngine';
+export * from './prefetchPolicy';
+export * from './analysisQuarantine';
+export * from './analysisSnapshot';
+export * from './modelLocator';
+export * from './classHierarchyIndex';
\ No newline at end of file
@@ -0,0 +1,423 @@
+import { injectable, inject, optional } from 'inversify';
+import * as vscode from 'vscode';
+import * as path from 'path';
+import { TYPES } from '../container/types';
+import { PythonExecutor } from '../pythonIntegration';
+import { FieldInfo, ManagerInfo } from '../parsers/pythonParser';
+import { getDefaultModelMethods } from '../parsers/modelExtractor';
+import { AdvancedModelAnalyzer, EnhancedModelInfo, ModelMethod, ModelRelation } from './advancedModelAnalyzer';
+import { DjangoProjectAnalyzer } from './djangoProjectAnalyzer';
+import { GitCheckoutMonitor } from './gitCheckoutMonitor';
+import { DebouncedTaskExecutor } from '../workers/analysisWorkerPool';
+
+/**
+ * One model of the registry dump, as printed by the dump script
+ */
+export interface RegistryModel {
+    name: string;
+    app: string;
+    module: string;
+    filePath?: string;
+    abstract: boolean;
+    proxy: boolean;
+    swappable?: string;
+    dbTable: string;
+    ordering: string[];
+    bases: string[];
+    fields: FieldInfo[];
+    // Reverse accessors, e.g. post_set or a related_name
+    reverse: { name: string; relatedModel: string; multiple: boolean; fieldName: string }[];
+    relations: { fieldName: string; toModel: string; relationType: ModelRelation['relationType']; relatedName?: string }[];
+    managers: ManagerInfo[];
+    methods: ModelMethod[];
+}
+
+export interface RegistryDump {
+    djangoVersion: string;
+    models: RegistryModel[];
+}
+
+export interface LiveRegistryStatus {
+    enabled: boolean;
+    djangoVersion?: string;
+    modelCount: number;
+    refreshes: number;
+    lastRefreshTime: number;
+    lastError?: string;
+}
+
+// Files whose changes can alter the registry
+const REGISTRY_FILE_PATTERN = '**/{models.py,models/*.py,settings.py,settings/*.py}';
+// Changes arriving within this window share one refresh
+const REFRESH_DELAY = 2000;
+// django.setup() may hang, e.g. on database access in AppConfig.ready() or a prompt
+const DUMP_TIMEOUT = 60000;
+const DUMP_MARKER = 'DJANGO_POWER_TOOLS_REGISTRY:';
+
+// Runs django.setup() in the project and prints the complete model registry
+const DUMP_SCRIPT = `
+import sys, os, json, inspect
+
+root = sys.argv[1]
+sys.path.insert(0, root)
+if not os.environ.get('DJANGO_SETTINGS_MODULE'):
+    manage = os.path.join(root, 'manage.py')
+    if os.path.exists(manage):
+        with open(manage) as handle:
+            for line in handle:
+                if 'DJANGO_SETTINGS_MODULE' in line and 'setdefault' in line:
+                    value = line.split('DJANGO_SETTINGS_MODULE')[1].split(',')[1]
+                    os.environ['DJANGO_SETTINGS_MODULE'] = value.strip().strip(')').strip().strip('"').strip("'")
+                    break
+
+import django
+django.setup()
+from django.apps import apps
+
+RELATION_TYPES = ('ForeignKey', 'OneToOneField', 'ManyToManyField')
+
+def is_django_class(klass):
+    return klass is object or klass.__module__.startswith('django.db.models')
+
+def own_members(cls):
+    members = {}
+    for klass in reversed(inspect.getmro(cls)):
+        if is_django_class(klass):
+            continue
+        for name, value in vars(klass).items():
+            if not name.startswith('_'):
+                members[name] = value
+    return members
+
+def parameters(function):
+    try:
+        params = list(inspect.signature(function).parameters.values())
+    except (TypeError, ValueError):
+        return []
+    return [str(param) for param in params if param.name not in ('self', 'cls')]
+
+def describe_field(field):
+    internal = field.get_internal_type() if hasattr(field, 'get_internal_type') else type(field).__name__
+    info = {'name': field.name, 'type': internal, 'required': not getattr(field, 'blank', True)}
+    help_text = getattr(field, 'help_text', '')
+    if help_text:
+        info['helpText'] = str(help_text)
+    if getattr(field, 'max_length', None):
+        info['maxLength'] = field.max_length
+    if getattr(field, 'choices', None):
+        info['choices'] = [str(choice[0]) for choice in field.flatchoices][:100]
+    if field.is_relation and field.related_model is not None and not isinstance(field.related_model, str):
+        info['relatedModel'] = field.related_model.__name__
+    return info
+
+def describe_model(model):
+    meta = model._meta
+    fields, reverse, relations = [], [], []
+    for field in meta.get_fields(include_hidden=False):
+        if field.auto_created and not field.concrete:
+            accessor = field.get_accessor_name()
+            if accessor:
+                reverse.append({
+                    'name': accessor,
+                    'relatedModel': field.related_model.__name__,
+                    'multiple': field.multiple,
+                    'fieldName': field.field.name
+                })
+            continue
+        info = describe_field(field)
+        fields.append(info)
+        if info['type'] in RELATION_TYPES and 'relatedModel' in info:
+            relation = {'fieldName': field.name, 'toModel': info['relatedModel'], 'relationType': info['type']}
+            if field.remote_field.related_name:
+                relation['relatedName'] = field.remote_field.related_name
+            relations.append(relation)
+
+    managers = []
+    for manager in meta.managers:
+        methods = set(own_members(type(manager)))
+        queryset_class = getattr(manager, '_queryset_class', None)
+        if queryset_class is not None:
+            methods.update(own_members(queryset_class))
+        managers.append({
+            'name': manager.name,
+            'type': type(manager).__name__,
+            'methods': sorted(name for name in methods if not name.startswith('_'))
+        })
+
+    skipped = set(field['name'] for field in fields) | set(manager['name'] for manager in managers)
+    methods = []
+    for name, value in own_members(model).items():
+        if name in skipped or inspect.isclass(value):
+            continue
+        is_property = isinstance(value, property) or type(value).__name__ == 'cached_property'
+        function = getattr(value, '__func__', value)
+        if not is_property and not callable(function):
+            continue
+        methods.append({
+            'name': name,
+            'isProperty': is_property,
+            'isClassMethod': isinstance(value, classmethod),
+            'isStaticMethod': isinstance(value, staticmethod),
+            'parameters': [] if is_property else parameters(function)
+        })
+
+    try:
+        file_path = inspect.getsourcefile(model)
+    except TypeError:
+        file_path = None
+    return {
+        'name': model.__name__,
+        'app': meta.app_label,
+        'module': model.__module__,
+        'filePath': file_path,
+        'abstract': meta.abstract,
+        'proxy': meta.proxy,
+        'swappable': meta.swappable,
+        'dbTable': meta.db_table,
+        'ordering': [str(item) for item in (meta.ordering or [])],
+        'bases': [base.__name__ for base in model.__bases__],
+        'fields': fields,
+        'reverse': reverse,
+        'relations': relations,
+        'managers': managers,
+        'methods': methods
+    }
+
+dump = {'djangoVersion': django.get_version(), 'models': [describe_model(model) for model in apps.get_models()]}
+print('${DUMP_MARKER}' + json.dumps(dump))
+`;
+
+function mergeDefaultMethods(methods: ModelMethod[]): ModelMethod[] {
+    const names = new Set(methods.map(method => method.name));
+    return [...methods, ...getDefaultModelMethods().filter(method => !names.has(method.name))];
+}
+
+/**
+ * Convert a registry dump into model information. When several apps define
+ * a model of the same name, the one defined inside the project wins.
+ */
+export function fromRegistryDump(dump: RegistryDump, projectRoot?: string): EnhancedModelInfo[] {
+    const isInProject = (model: RegistryModel) => {
+        if (!projectRoot || !model.filePath) {
+            return false;
+        }
+        const relative = path.relative(projectRoot, model.filePath);
+        return !relative.startsWith('..') && !path.isAbsolute(relative) && !relative.includes('site-packages');
+    };
+
+    const ordered = [...dump.models.filter(isInProject), ...dump.models.filter(model => !isInProject(model))];
+    const models = new Map<string, EnhancedModelInfo>();
+    for (const model of ordered) {
+        if (models.has(model.name)) {
+            continue;
+        }
+
+        const fields: FieldInfo[] = [...model.fields];
+        const managers: ManagerInfo[] = [...model.managers];
+        for (const accessor of model.reverse) {
+            fields.push({
+                name: accessor.name,
+                type: accessor.multiple ? 'RelatedManager' : 'OneToOneField',
+                required: false,
+                helpText: `Reverse relation from ${accessor.relatedModel}.${accessor.fieldName}`,
+                relatedModel: accessor.relatedModel
+            });
+            if (accessor.multiple) {
+                managers.push({ name: accessor.name, type: 'RelatedManager', methods: [] });
+            }
+        }
+
+        models.set(model.name, {
+            name: model.name,
+            app: model.app,
+            fields,
+            methods: mergeDefaultMethods(model.methods.filter(method => !method.isProperty)),
+            properties: ['pk', ...model.methods.filter(method => method.isProperty).map(method => method.name)],
+            managers,
+            baseClasses: model.bases,
+            isAbstract: model.abstract,
+            meta: {
+                dbTable: model.dbTable,
+                ordering: model.ordering,
+                proxy: model.proxy,
+                swappable: model.swappable || undefined
+            },
+            relations: model.relations.map(relation => ({ fromModel: model.name, ...relation }))
+        });
+    }
+    return Array.from(models.values());
+}
+
+/**
+ * Opt-in model registry read from Django itself. A process of the selected
+ * interpreter runs django.setup() and dumps apps.get_models(), which covers
+ * what parsing cannot: dynamic fields, mixins from other modules, swappable
+ * and contrib models. The dump is merged over the parsed models and
+ * refreshed once per burst of models or settings changes.
+ */
+@injectable()
+export class LiveModelRegistry {
+    private status: LiveRegistryStatus = { enabled: false, modelCount: 0, refreshes: 0, lastRefreshTime: 0 };
+    private disposables: vscode.Disposable[] = [];
+    private watcher: vscode.FileSystemWatcher | undefined;
+    private debouncer = new DebouncedTaskExecutor(REFRESH_DELAY);
+    private running: Promise<void> | null = null;
+    private refreshPending = false;
+    private refreshAfterSwitch = false;
+
+    constructor(
+        @inject(TYPES.PythonExecutor) private pythonExecutor: PythonExecutor,
+        @inject(TYPES.AdvancedModelAnalyzer) private modelAnalyzer: AdvancedModelAnalyzer,
+        @inject(TYPES.DjangoProjectAnalyzer) private projectAnalyzer: DjangoProjectAnalyzer,
+        @inject(TYPES.GitCheckoutMonitor) @optional() private checkoutMonitor?: GitCheckoutMonitor
+    ) {}
+
+    /**
+     * Start the registry when enabled in the settings, and follow changes of
+     * the setting afterwards
+     */
+    initialize(): void {
+        this.disposables.push(
+            vscode.workspace.onDidChangeConfiguration(event => {
+                if (event.affectsConfiguration('djangoPowerTools.enableLiveModelRegistry')) {
+                    this.applySetting();
+                }
+            })
+        );
+        if (this.checkoutMonitor) {
+            this.disposables.push(this.checkoutMonitor.onDidFinishSwitch(() => {
+                if (this.refreshAfterSwitch) {
+                    this.refreshAfterSwitch = false;
+                    this.scheduleRefresh();
+                }
+            }));
+        }
+        this.applySetting();
+    }
+
+    private applySetting(): void {
+        const enabled = vscode.workspace.getConfiguration('djangoPowerTools').get<boolean>('enableLiveModelRegistry', false);
+        if (enabled === this.status.enabled) {
+            return;
+        }
+
+        this.status.enabled = enabled;
+        if (enabled) {
+            this.startWatching();
+            this.refresh().catch(error => console.error('Failed to load live model registry:', error));
+        } else {
+            this.stopWatching();
+            this.status.modelCount = 0;
+            this.modelAnalyzer.setLiveModels([]).catch(error => {
+                console.error('Failed to drop live model registry:', error);
+            });
+        }
+    }
+
+    private startWatching(): void {
+        this.watcher = vscode.workspace.createFileSystemWatcher(REGISTRY_FILE_PATTERN);
+        const onChange = (uri: vscode.Uri) => {
+            if (!/[\\/](site-packages|node_modules|\.venv|venv)[\\/]/.test(uri.fsPath)) {
+                this.scheduleRefresh();
+            }
+        };
+        this.watcher.onDidCreate(onChange);
+        this.watcher.onDidChange(onChange);
+        this.watcher.onDidDelete(onChange);
+    }
+
+    private stopWatching(): void {
+        this.debouncer.cancelAll();
+        this.watcher?.dispose();
+        this.watcher = undefined;
+    }
+
+    /**
+     * Refresh after the current burst of changes; during a branch switch the
+     * refresh waits until the working tree has settled
+     */
+    scheduleRefresh(): void {
+        if (!this.status.enabled) {
+            return;
+        }
+        if (this.checkoutMonitor?.isSwitching()) {
+            this.refreshAfterSwitch = true;
+            return;
+        }
+        this.debouncer.execute('refresh', () => this.refresh());
+    }
+
+    /**
+     * Dump the registry now. A call while a dump is running is folded into
+     * a single follow-up dump.
+     */
+    refresh(): Promise<void> {
+        if (this.running) {
+            this.refreshPending = true;
+            return this.running;
+        }
+
+        this.running = (async () => {
+            do {
+                this.refreshPending = false;
+                await this.doRefresh();
+            } while (this.refreshPending && this.status.enabled);
+        })().finally(() => {
+            this.running = null;
+        });
+        return this.running;
+    }
+
+    private async doRefresh(): Promise<void> {
+        const projectRoot = this.projectAnalyzer.getProjectRoot();
+        if (!projectRoot || !this.pythonExecutor.getCurrentPythonPath()) {
+            return;
+        }
+
+        const startTime = Date.now();
+        let dump: RegistryDump;
+        try {
+            const result = await this.pythonExecutor.execute(['-c', DUMP_SCRIPT, projectRoot], projectRoot, DUMP_TIMEOUT);
+            dump = LiveModelRegistry.parseOutput(result.stdout);
+        } catch (error) {
+            // Keep the last good registry, e.g. while settings have a syntax error
+            this.status.lastError = error instanceof Error ? error.message : String(error);
+            console.warn('Live model registry refresh failed:', error);
+            return;
+        }
+
+        const models = fromRegistryDump(dump, projectRoot);
+        await this.modelAnalyzer.setLiveModels(models);
+        this.status = {
+            ...this.status,
+            djangoVersion: dump.djangoVersion,
+            modelCount: models.length,
+            refreshes: this.status.refreshes + 1,
+            lastRefreshTime: Date.now() - startTime,
+            lastError: undefined
+        };
+        console.log(`Live model registry: ${models.length} models from Django ${dump.djangoVersion} in ${this.status.lastRefreshTime}ms`);
+    }
+
+    /**
+     * Extract the dump from the script output; settings modules may print
+     * their own lines before it
+     */
+    static parseOutput(stdout: string): RegistryDump {
+        const line = stdout.split('\n').reverse().find(candidate => candidate.startsWith(DUMP_MARKER));
+        if (!line) {
+            throw new Error('Registry dump missing from output');
+        }
+        return JSON.parse(line.substring(DUMP_MARKER.length)) as RegistryDump;
+    }
+
+    getStatus(): LiveRegistryStatus {
+        return { ...this.status };
+    }
+
+    dispose(): void {
+        this.stopWatching();
+        this.disposables.forEach(disposable => disposable.dispose());
+        this.disposables = [];
+    }
+}
@@ -0,0 +1,132 @@
+import { injectable, inject } from 'inversify';
+import * as vscode from 'vscode';
+import { TYPES } from '../container/types';
+import { AdvancedModelAnalyzer } from './advancedModelAnalyzer';
+
+export type ModelDependentKind = 'admin' | 'form' | 'view';
+
+export interface ModelDependent {
+    kind: ModelDependentKind;
+    name: string;
+}
+
+/**
+ * Records which admin classes, ModelForms and view contexts depend on which
+ * models, and notifies exactly those dependents when a model changes.
+ */
+@injectable()
+export class ModelDependencyGraph {
+    // dependent key -> models it depends on
+    private dependencies: Map<string, Set<string>> = new Map();
+    // model name -> dependent keys
+    private dependents: Map<string, Set<string>> = new Map();
+    private _onDidInvalidate = new vscode.EventEmitter<ModelDependent[]>();
+    private disposables: vscode.Disposable[] = [];
+
+    /**
+     * Fired with the dependents whose models changed; they should drop any
+     * resolved field sets and recompute them on demand
+     */
+    readonly onDidInvalidate = this._onDidInvalidate.event;
+
+    constructor(
+        @inject(TYPES.AdvancedModelAnalyzer) modelAnalyzer: AdvancedModelAnalyzer
+    ) {
+        this.disposables.push(
+            modelAnalyzer.onDidChangeModels(modelNames => this.invalidateModels(modelNames))
+        );
+    }
+
+    /**
+     * Replace the set of models a dependent relies on
+     */
+    setDependencies(kind: ModelDependentKind, name: string, modelNames: string[]): void {
+        const key = this.toKey(kind, name);
+        this.removeDependent(kind, name);
+
+        const models = new Set(modelNames.filter(modelName => modelName));
+        if (models.size === 0) {
+            return;
+        }
+
+        this.dependencies.set(key, models);
+        for (const modelName of models) {
+            let keys = this.dependents.get(modelName);
+            if (!keys) {
+                keys = new Set();
+                this.dependents.set(modelName, keys);
+            }
+            keys.add(key);
+        }
+    }
+
+    removeDependent(kind: ModelDependentKind, name: string): void {
+        const key = this.toKey(kind, name);
+        const models = this.dependencies.get(key);
+        if (!models) {
+            return;
+        }
+
+        for (const modelName of models) {
+            const keys = this.dependents.get(modelName);
+            if (keys) {
+                keys.delete(key);
+                if (keys.size === 0) {
+                    this.dependents.delete(modelName);
+                }
+            }
+        }
+        this.dependencies.delete(key);
+    }
+
+    /**
+     * Get the dependents of a model, optionally restricted to one kind
+     */
+    getDependents(modelName: string, kind?: ModelDependentKind): ModelDependent[] {
+        const keys = this.dependents.get(modelName);
+        if (!keys) {
+            return [];
+        }
+
+        return Array.from(keys)
+            .map(key => this.fromKey(key))
+            .filter(dependent => !kind || dependent.kind === kind);
+    }
+
+    getDependencies(kind: ModelDependentKind, name: string): string[] {
+        return Array.from(this.dependencies.get(this.toKey(kind, name)) || []);
+    }
+
+    /**
+     * Notify the dependents of the given models
+     */
+    invalidateModels(modelNames: string[]): void {
+        const keys = new Set<string>();
+        for (const modelName of modelNames) {
+            this.dependents.get(modelName)?.forEach(key => keys.add(key));
+        }
+
+        if (keys.size > 0) {
+            this._onDidInvalidate.fire(Array.from(keys).map(key => this.fromKey(key)));
+        }
+    }
+
+    private toKey(kind: ModelDependentKind, name: string): string {
+        return `${kind}:${name}`;
+    }
+
+    private fromKey(key: string): ModelDependent {
+        const separator = key.indexOf(':');
+        return {
+            kind: key.substring(0, separator) as ModelDependentKind,
+            name: key.substring(separator + 1)
+        };
+    }
+
+    dispose(): void {
+        this.disposables.forEach(disposable => disposable.dispose());
+        this._onDidInvalidate.dispose();
+        this.dependencies.clear();
+        this.dependents.clear();
+    }
+}
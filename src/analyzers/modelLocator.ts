@@ -0,0 +1,110 @@
+// Top-level class statements; candidates only, the file is parsed to confirm
+const CLASS_REGEX = /^class[ \t]+(\w+)[ \t]*[(:]/gm;
+
+// Files read concurrently per lookup step
+const SCAN_BATCH_SIZE = 20;
+
+export function findClassNames(content: string): string[] {
+    const names: string[] = [];
+    let match: RegExpExecArray | null;
+    CLASS_REGEX.lastIndex = 0;
+    while ((match = CLASS_REGEX.exec(content)) !== null) {
+        names.push(match[1]);
+    }
+    return names;
+}
+
+/**
+ * Finds the files that may define a model without parsing them. Files are
+ * scanned for top-level class statements the first time a lookup needs
+ * them and again after they change, so a lookup costs one regex pass over
+ * the files not scanned yet.
+ */
+export class ModelLocator {
+    private filesByName: Map<string, Set<string>> = new Map();
+    private namesByFile: Map<string, string[]> = new Map();
+    private unscanned: Set<string> = new Set();
+
+    constructor(private readFile: (filePath: string) => Promise<string>) {}
+
+    /**
+     * Scan these files on the next lookup
+     */
+    addFiles(filePaths: string[]): void {
+        filePaths.forEach(filePath => this.unscanned.add(filePath));
+    }
+
+    /**
+     * Index a file whose content is already at hand
+     */
+    updateFile(filePath: string, content: string): void {
+        this.unscanned.delete(filePath);
+        this.index(filePath, findClassNames(content));
+    }
+
+    removeFile(filePath: string): void {
+        this.unscanned.delete(filePath);
+        this.index(filePath, []);
+    }
+
+    /**
+     * Files with a top-level class of this name
+     */
+    async locate(name: string): Promise<string[]> {
+        while (this.unscanned.size > 0) {
+            const batch = Array.from(this.unscanned).slice(0, SCAN_BATCH_SIZE);
+            const contents = await Promise.all(batch.map(filePath =>
+                this.readFile(filePath).catch(() => undefined)
+            ));
+            batch.forEach((filePath, i) => {
+                // Files updated or removed during the read are current already
+                if (!this.unscanned.has(filePath)) {
+                    return;
+                }
+                const content = contents[i];
+                if (content === undefined) {
+                    this.removeFile(filePath);
+                } else {
+                    this.updateFile(filePath, content);
+                }
+            });
+            // Let editor events in between batches
+            await new Promise(resolve => setImmediate(resolve));
+        }
+        return Array.from(this.filesByName.get(name) || []);
+    }
+
+    get fileCount(): number {
+        return this.namesByFile.size + this.unscanned.size;
+    }
+
+    clear(): void {
+        this.filesByName.clear();
+        this.namesByFile.clear();
+        this.unscanned.clear();
+    }
+
+    private index(filePath: string, names: string[]): void {
+        for (const name of this.namesByFile.get(filePath) || []) {
+            const files = this.filesByName.get(name);
+            files?.delete(filePath);
+            if (files?.size === 0) {
+                this.filesByName.delete(name);
+            }
+        }
+
+        if (names.length === 0) {
+            this.namesByFile.delete(filePath);
+            return;
+        }
+        this.namesByFile.set(filePath, names);
+        for (const name of names) {
+            let files = this.filesByName.get(name);
+            if (!files) {
+                files = new Set();
+                this.filesByName.set(name, files);
+            }
+            files.add(filePath);
+        }
+    }
+}
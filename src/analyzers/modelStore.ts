@@ -0,0 +1,282 @@
+import { injectable } from 'inversify';
+import { FieldInfo, ManagerInfo } from '../parsers/pythonParser';
+import { EnhancedModelInfo, ModelMethod, ModelRelation } from '../parsers/modelExtractor';
+import { AnalysisSnapshot, SnapshotMap } from './analysisSnapshot';
+
+export interface ModelStoreStats {
+    models: number;
+    internedStrings: number;
+    sharedMethods: number;
+}
+
+// Intern tables are rebuilt from the stored models once this many models
+// were deleted or replaced since the last rebuild
+const PRUNE_MIN_DROPPED = 64;
+
+// V8 keeps substrings of 13+ characters as slices that pin the whole source
+// string, so interned strings of that length are copied once
+const SLICED_STRING_MIN_LENGTH = 13;
+
+/**
+ * Canonical registry of model data. Every string of a stored model is
+ * interned and identical methods (including the default Django members) are
+ * shared as frozen objects, so thousands of models cost little more than
+ * their distinct names. Other analyzers keep references or names into this
+ * store instead of their own copies.
+ *
+ * Models are published as immutable snapshots: changes become visible to
+ * readers of getSnapshot() together, when publish() is called. Entries only
+ * deleted or replaced models used are pruned from the intern tables on
+ * publish, once enough models were dropped to pay for the rebuild.
+ */
+@injectable()
+export class ModelStore {
+    private models = new SnapshotMap<EnhancedModelInfo>();
+    private strings: Map<string, string> = new Map();
+    private methods: Map<string, ModelMethod> = new Map();
+    private stringLists: Map<string, string[]> = new Map();
+    private droppedModels = 0;
+
+    /**
+     * Get the canonical instance of a string
+     */
+    intern(value: string): string {
+        let canonical = this.strings.get(value);
+        if (canonical === undefined) {
+            canonical = value.length >= SLICED_STRING_MIN_LENGTH
+                ? Buffer.from(value, 'utf8').toString('utf8')
+                : value;
+            this.strings.set(canonical, canonical);
+        }
+        return canonical;
+    }
+
+    /**
+     * Canonicalize a model in place and store it under its name
+     */
+    add(model: EnhancedModelInfo): EnhancedModelInfo {
+        model.name = this.intern(model.name);
+        model.app = this.intern(model.app);
+        model.fields = model.fields.map(field => this.internField(field));
+        model.methods = model.methods.map(method => this.shareMethod(method));
+        model.properties = model.properties.map(property => this.intern(property));
+        model.managers = model.managers.map(manager => this.internManager(manager));
+        model.baseClasses = model.baseClasses.map(baseClass => this.intern(baseClass));
+        model.relations = model.relations.map(relation => this.internRelation(relation));
+
+        return this.put(model);
+    }
+
+    /**
+     * Store a model built from canonical parts, e.g. a published model
+     * copied to add members, replacing the previous one of its name
+     */
+    put(model: EnhancedModelInfo): EnhancedModelInfo {
+        const previous = this.models.get(model.name);
+        if (previous && previous !== model) {
+            this.droppedModels++;
+        }
+        this.models.set(model.name, model);
+        return model;
+    }
+
+    get(name: string): EnhancedModelInfo | undefined {
+        return this.models.get(name);
+    }
+
+    has(name: string): boolean {
+        return this.models.has(name);
+    }
+
+    delete(name: string): boolean {
+        if (!this.models.delete(name)) {
+            return false;
+        }
+        this.droppedModels++;
+        return true;
+    }
+
+    get size(): number {
+        return this.models.size;
+    }
+
+    /**
+     * The stored models keyed by name, including changes not published yet
+     */
+    getModels(): ReadonlyMap<string, EnhancedModelInfo> {
+        return this.models;
+    }
+
+    /**
+     * The models as last published
+     */
+    getSnapshot(): AnalysisSnapshot<EnhancedModelInfo> {
+        return this.models.getSnapshot();
+    }
+
+    /**
+     * Make the models added and deleted since the last call visible to
+     * readers of getSnapshot() at once
+     */
+    publish(): AnalysisSnapshot<EnhancedModelInfo> {
+        if (this.droppedModels >= Math.max(PRUNE_MIN_DROPPED, this.models.size)) {
+            this.rebuildInternTables();
+        }
+        return this.models.publish();
+    }
+
+    /**
+     * Keep only the table entries the stored models still use. Shared
+     * methods and lists are frozen; unshared ones from put() are not kept.
+     */
+    private rebuildInternTables(): void {
+        const strings = new Map<string, string>();
+        const methods = new Map<string, ModelMethod>();
+        const stringLists = new Map<string, string[]>();
+        const keepString = (value: string | undefined) => {
+            if (value !== undefined) {
+                strings.set(value, value);
+            }
+        };
+        const keepList = (values: string[] | undefined) => {
+            if (values && Object.isFrozen(values)) {
+                stringLists.set(values.join('\u0000'), values);
+            }
+            values?.forEach(keepString);
+        };
+
+        for (const model of this.models.values()) {
+            keepString(model.name);
+            keepString(model.app);
+            model.properties.forEach(keepString);
+            model.baseClasses.forEach(keepString);
+            for (const field of model.fields) {
+                keepString(field.name);
+                keepString(field.type);
+                keepString(field.helpText);
+                keepString(field.relatedModel);
+                keepList(field.choices);
+            }
+            for (const method of model.methods) {
+                if (Object.isFrozen(method)) {
+                    methods.set(this.getMethodKey(method), method);
+                }
+                keepString(method.name);
+                keepString(method.returnType);
+                keepList(method.parameters);
+            }
+            for (const manager of model.managers) {
+                keepString(manager.name);
+                keepString(manager.type);
+                keepList(manager.methods);
+            }
+            for (const relation of model.relations) {
+                keepString(relation.fromModel);
+                keepString(relation.toModel);
+                keepString(relation.fieldName);
+                keepString(relation.relatedName);
+            }
+        }
+
+        this.strings = strings;
+        this.methods = methods;
+        this.stringLists = stringLists;
+        this.droppedModels = 0;
+    }
+
+    private internField(field: FieldInfo): FieldInfo {
+        field.name = this.intern(field.name);
+        field.type = this.intern(field.type);
+        if (field.helpText !== undefined) {
+            field.helpText = this.intern(field.helpText);
+        }
+        if (field.relatedModel !== undefined) {
+            field.relatedModel = this.intern(field.relatedModel);
+        }
+        if (field.choices) {
+            field.choices = this.shareStringList(field.choices);
+        }
+        return field;
+    }
+
+    private internManager(manager: ManagerInfo): ManagerInfo {
+        manager.name = this.intern(manager.name);
+        manager.type = this.intern(manager.type);
+        if (manager.methods) {
+            manager.methods = this.shareStringList(manager.methods);
+        }
+        return manager;
+    }
+
+    private internRelation(relation: ModelRelation): ModelRelation {
+        relation.fromModel = this.intern(relation.fromModel);
+        relation.toModel = this.intern(relation.toModel);
+        relation.fieldName = this.intern(relation.fieldName);
+        if (relation.relatedName !== undefined) {
+            relation.relatedName = this.intern(relation.relatedName);
+        }
+        return relation;
+    }
+
+    /**
+     * Methods are never modified once extracted, so identical ones share a
+     * single frozen object
+     */
+    private shareMethod(method: ModelMethod): ModelMethod {
+        const key = this.getMethodKey(method);
+        let shared = this.methods.get(key);
+        if (!shared) {
+            shared = Object.freeze({
+                name: this.intern(method.name),
+                isProperty: method.isProperty,
+                isClassMethod: method.isClassMethod,
+                isStaticMethod: method.isStaticMethod,
+                parameters: this.shareStringList(method.parameters),
+                returnType: method.returnType === undefined ? undefined : this.intern(method.returnType)
+            });
+            this.methods.set(key, shared);
+        }
+        return shared;
+    }
+
+    private getMethodKey(method: ModelMethod): string {
+        return [
+            method.name,
+            +method.isProperty,
+            +method.isClassMethod,
+            +method.isStaticMethod,
+            method.returnType || '',
+            method.parameters.join('\u0000')
+        ].join('\u0001');
+    }
+
+    private shareStringList(values: string[]): string[] {
+        const key = values.join('\u0000');
+        let shared = this.stringLists.get(key);
+        if (!shared) {
+            shared = Object.freeze(values.map(value => this.intern(value))) as string[];
+            this.stringLists.set(key, shared);
+        }
+        return shared;
+    }
+
+    getStats(): ModelStoreStats {
+        return {
+            models: this.models.size,
+            internedStrings: this.strings.size,
+            sharedMethods: this.methods.size
+        };
+    }
+
+    /**
+     * Drop all models and the intern tables
+     */
+    clear(): void {
+        this.models.clear();
+        this.models.publish();
+        this.strings.clear();
+        this.methods.clear();
+        this.stringLists.clear();
+        this.droppedModels = 0;
+    }
+}
@@ -3,11 +3,25 @@ import * as vscode from 'vscode';
 import * as path from 'path';
 import { TYPES } from '../container/types';
 import { DjangoProjectAnalyzer, FileSystem } from './djangoProjectAnalyzer';
-import { AdvancedModelAnalyzer } from './advancedModelAnalyzer';
+import { readTextFile } from '../utils/fileSystem';
+import { AdvancedModelAnalyzer, EnhancedModelInfo } from './advancedModelAnalyzer';
 import { ProgressiveAnalyzer, AnalysisTask } from './progressiveAnalyzer';
 import { FileCache } from '../cache/lruCache';
 import { AnalysisWorkerPool, DebouncedTaskExecutor } from '../workers/analysisWorkerPool';
+import { AdaptiveConcurrencyController } from '../workers/adaptiveConcurrency';
 import { PerformanceProfiler } from '../utils/performanceProfiler';
+import { MemoryConsumer } from '../cache/memoryBudgetManager';
+import { PersistentAnalysisCache } from '../cache/persistentAnalysisCache';
+import { ModelLocator } from './modelLocator';
+import { parseImports, getImportCandidates, PythonImport } from '../parsers/pythonImports';
+import { UrlConfEntry } from '../parsers/urlConfParser';
+
+/**
+ * "workspace" analyzes every models/urls/views file in the background;
+ * "demand" only the open files and what they import or include, and other
+ * models when they are first looked up
+ */
+export type AnalysisScope = 'workspace' | 'demand';
 
 /**
  * Optimized Django Project Analyzer with progressive analysis,
@@ -21,6 +35,16 @@ export class OptimizedDjangoProjectAnalyzer extends DjangoProjectAnalyzer {
     private debouncedExecutor: DebouncedTaskExecutor;
     private profiler: PerformanceProfiler;
     private statusBarItem: vscode.StatusBarItem;
+    private concurrency: AdaptiveConcurrencyController;
+    private analysisScope: AnalysisScope;
+    // Demand scope: files taken on so far, where models are defined, and
+    // lookups in flight by model name
+    private demandFiles: Set<string> = new Set();
+    private modelLocator: ModelLocator | undefined;
+    private locatorReady: Promise<void> | undefined;
+    private modelLookups: Map<string, Promise<void>> = new Map();
+    private persistentCache: PersistentAnalysisCache<EnhancedModelInfo[]> | undefined;
+    private disposables: vscode.Disposable[] = [];
 
     constructor(
         @inject(TYPES.AdvancedModelAnalyzer) advancedAnalyzer: AdvancedModelAnalyzer,
@@ -33,12 +57,14 @@ export class OptimizedDjangoProjectAnalyzer extends DjangoProjectAnalyzer {
         const analysisWorkers = config.get<number>('analysisWorkers', 3);
         const cacheMaxSizeMB = config.get<number>('cacheMaxSizeMB', 100);
         const debounceDelay = config.get<number>('debounceDelay', 500);
+        this.analysisScope = config.get<AnalysisScope>('analysisScope', 'workspace');
         
         this.progressiveAnalyzer = new ProgressiveAnalyzer();
         this.fileCache = new FileCache<any>(1000, cacheMaxSizeMB);
         this.workerPool = new AnalysisWorkerPool(analysisWorkers);
         this.debouncedExecutor = new DebouncedTaskExecutor(debounceDelay);
         this.profiler = new PerformanceProfiler();
+        this.concurrency = new AdaptiveConcurrencyController({ maxConcurrency: analysisWorkers, idleDelayMs: debounceDelay * 2 });
         
         // Create status bar item for progress
         this.statusBarItem = vscode.window.createStatusBarItem(vscode.StatusBarAlignment.Left);
@@ -46,6 +72,17 @@ export class OptimizedDjangoProjectAnalyzer extends DjangoProjectAnalyzer {
         
         this.setupWorkers();
         this.setupProgressHandlers();
+
+        // Background analysis backs off while the user types
+        this.disposables.push(vscode.workspace.onDidChangeTextDocument(event => {
+            if (event.contentChanges.length > 0) {
+                this.concurrency.notifyUserActivity();
+            }
+        }));
+
+        if (this.analysisScope === 'demand') {
+            this.setupDemandScope();
+        }
     }
 
     /**
@@ -64,6 +101,15 @@ export class OptimizedDjangoProjectAnalyzer extends DjangoProjectAnalyzer {
         });
     }
 
+    /**
+     * Initialize for a single project root with progressive analysis
+     */
+    async initializeAt(projectRoot: string): Promise<boolean> {
+        const result = await super.initializeAt(projectRoot);
+        this.startProgressiveAnalysis();
+        return result;
+    }
+
     /**
      * Analyze project with optimizations
      */
@@ -74,6 +120,10 @@ export class OptimizedDjangoProjectAnalyzer extends DjangoProjectAnalyzer {
 
         await this.profiler.measureAsync('analyzeProject', async () => {
             console.log('Starting optimized Django project analysis...');
+
+            if (this.analysisScope === 'demand') {
+                await this.loadPersistentCache();
+            }
             
             // Quick initial scan for high-priority files
             await this.quickInitialScan();
@@ -102,7 +152,7 @@ export class OptimizedDjangoProjectAnalyzer extends DjangoProjectAnalyzer {
         // Priority 2: Open files
         const openFiles = vscode.window.visibleTextEditors
             .map(editor => editor.document.uri.fsPath)
-            .filter(path => path.endsWith('.py'));
+            .filter(path => path.endsWith('.py') && this.isInProject(path));
 
         for (const filePath of openFiles) {
             if (filePath.endsWith('models.py')) {
@@ -117,10 +167,15 @@ export class OptimizedDjangoProjectAnalyzer extends DjangoProjectAnalyzer {
      * Queue remaining files for progressive analysis
      */
     private async queueRemainingFiles(): Promise<void> {
+        if (this.analysisScope === 'demand') {
+            await this.extendDemandScope(vscode.window.visibleTextEditors.map(editor => editor.document.uri.fsPath));
+            return;
+        }
+
         // Find all Python files
-        const modelFiles = await vscode.workspace.findFiles('**/models.py', '**/node_modules/**');
-        const urlFiles = await vscode.workspace.findFiles('**/urls.py', '**/node_modules/**');
-        const viewFiles = await vscode.workspace.findFiles('**/views.py', '**/node_modules/**');
+        const modelFiles = await vscode.workspace.findFiles(this.getSearchPattern('**/models.py'), '**/node_modules/**');
+        const urlFiles = await vscode.workspace.findFiles(this.getSearchPattern('**/urls.py'), '**/node_modules/**');
+        const viewFiles = await vscode.workspace.findFiles(this.getSearchPattern('**/views.py'), '**/node_modules/**');
 
         // Add to progressive analyzer queue
         this.progressiveAnalyzer.addToQueue(
@@ -142,6 +197,168 @@ export class OptimizedDjangoProjectAnalyzer extends DjangoProjectAnalyzer {
         );
     }
 
+    /**
+     * Resolve models on lookup and take on the files of editors as they
+     * are shown
+     */
+    private setupDemandScope(): void {
+        this.modelLocator = new ModelLocator(filePath => readTextFile(this.fileSystem, filePath));
+        this.advancedAnalyzer.setModelResolver(name => this.resolveModel(name));
+        this.disposables.push(vscode.window.onDidChangeVisibleTextEditors(editors => {
+            this.extendDemandScope(editors.map(editor => editor.document.uri.fsPath))
+                .then(() => this.startProgressiveAnalysis())
+                .catch(error => console.error('Error extending demand analysis scope:', error));
+        }));
+    }
+
+    /**
+     * Restore the models resolved in earlier sessions of this project
+     * instead of parsing their files again
+     */
+    private async loadPersistentCache(): Promise<void> {
+        if (!this.storageDirectory || !this.projectRoot || this.persistentCache) {
+            return;
+        }
+
+        const cache = new PersistentAnalysisCache<EnhancedModelInfo[]>(
+            path.join(this.storageDirectory, 'demand-analysis'),
+            this.projectRoot
+        );
+        const entries = await cache.load();
+        this.persistentCache = cache;
+        this.advancedAnalyzer.setPersistentCache(cache);
+        console.log(`Loaded ${entries} persisted model analysis results`);
+    }
+
+    /**
+     * Queue the files reachable from `seeds` through imports and URL
+     * includes that are not analyzed yet
+     */
+    private async extendDemandScope(seeds: string[]): Promise<void> {
+        if (!this.projectRoot) {
+            return;
+        }
+
+        const reachable = await this.collectReachableFiles(
+            seeds.filter(filePath => filePath.endsWith('.py') && this.isInProject(filePath))
+        );
+        const added = reachable.filter(filePath => !this.demandFiles.has(filePath));
+        added.forEach(filePath => this.demandFiles.add(filePath));
+
+        this.progressiveAnalyzer.addToQueue(added.filter(filePath => filePath.endsWith('models.py')), 'model', 50);
+        this.progressiveAnalyzer.addToQueue(added.filter(filePath => this.isUrlConf(filePath)), 'url', 40);
+        this.progressiveAnalyzer.addToQueue(added.filter(filePath => filePath.endsWith('views.py')), 'view', 30);
+    }
+
+    /**
+     * Walk imports and include() modules from the seeds. Files already in
+     * the demand scope were walked when they were added, so the walk stops
+     * there unless they are seeds themselves.
+     */
+    private async collectReachableFiles(seeds: string[]): Promise<string[]> {
+        const sourceRoots = new Set<string>([this.projectRoot!]);
+        for (const folder of vscode.workspace.workspaceFolders || []) {
+            sourceRoots.add(folder.uri.fsPath);
+        }
+
+        const seedSet = new Set(seeds);
+        const visited = new Set<string>();
+        const pending = [...seeds];
+        while (pending.length > 0) {
+            const filePath = pending.pop()!;
+            if (visited.has(filePath) || (this.demandFiles.has(filePath) && !seedSet.has(filePath)) || !this.isInProject(filePath)) {
+                continue;
+            }
+
+            let content: string;
+            try {
+                content = await readTextFile(this.fileSystem, filePath);
+            } catch {
+                continue;
+            }
+            visited.add(filePath);
+            pending.push(...this.resolveReferences(filePath, content, Array.from(sourceRoots)));
+
+            if (visited.size % 50 === 0) {
+                // Let editor events in between batches of files
+                await new Promise(resolve => setImmediate(resolve));
+            }
+        }
+        return Array.from(visited);
+    }
+
+    /**
+     * Files a module imports, plus the modules it include()s when it is a
+     * URLconf. Submodule candidates are preferred over package __init__ files.
+     */
+    private resolveReferences(filePath: string, content: string, sourceRoots: string[]): string[] {
+        const imports: PythonImport[] = parseImports(content);
+        if (this.isUrlConf(filePath)) {
+            const engine = this.getUrlConfEngine();
+            engine.updateFile(filePath, content);
+            const collect = (entries: UrlConfEntry[]) => {
+                for (const entry of entries) {
+                    if (entry.kind !== 'include') {
+                        continue;
+                    }
+                    if (entry.entries) {
+                        collect(entry.entries);
+                    } else if (entry.module) {
+                        imports.push({ module: entry.module, level: 0, names: [], line: entry.line });
+                    }
+                }
+            };
+            collect(engine.getParsed(filePath)?.entries || []);
+        }
+
+        const files: string[] = [];
+        for (const imp of imports) {
+            const existing = getImportCandidates(imp, filePath, sourceRoots)
+                .filter(candidate => this.fileSystem.existsSync(candidate));
+            const modules = existing.filter(candidate => path.basename(candidate) !== '__init__.py');
+            files.push(...(modules.length > 0 ? modules : existing));
+        }
+        return files;
+    }
+
+    /**
+     * Analyze the files that may define a model that is not indexed yet.
+     * Concurrent lookups of one name share the analysis.
+     */
+    private resolveModel(name: string): Promise<void> {
+        let lookup = this.modelLookups.get(name);
+        if (!lookup) {
+            lookup = this.locateAndAnalyze(name).finally(() => this.modelLookups.delete(name));
+            this.modelLookups.set(name, lookup);
+        }
+        return lookup;
+    }
+
+    private async locateAndAnalyze(name: string): Promise<void> {
+        const locator = this.modelLocator;
+        if (!locator || !this.projectRoot) {
+            return;
+        }
+        if (!this.locatorReady) {
+            this.locatorReady = Promise.resolve(
+                vscode.workspace.findFiles(this.getSearchPattern('**/models.py'), '**/node_modules/**')
+            ).then(files => locator.addFiles(files.map(file => file.fsPath)));
+        }
+        await this.locatorReady;
+
+        // Files already taken on were analyzed and did not define the model
+        const candidates = (await locator.locate(name)).filter(filePath => !this.demandFiles.has(filePath));
+        await this.batch(async () => {
+            for (const filePath of candidates) {
+                this.demandFiles.add(filePath);
+                await this.analyzeModelsWithCache(filePath);
+                if (this.advancedAnalyzer.getModelsForFile(filePath).some(model => model.name === name)) {
+                    break;
+                }
+            }
+        });
+    }
+
     /**
      * Start progressive analysis
      */
@@ -160,7 +377,7 @@ export class OptimizedDjangoProjectAnalyzer extends DjangoProjectAnalyzer {
                         break;
                 }
             },
-            { batchSize: 10, concurrency: 3 }
+            { controller: this.concurrency }
         );
     }
 
@@ -169,8 +386,10 @@ export class OptimizedDjangoProjectAnalyzer extends DjangoProjectAnalyzer {
      */
     private async analyzeModelsWithCache(filePath: string): Promise<void> {
         try {
-            const content = this.fileSystem.readFileSync(filePath, 'utf8') as string;
+            const content = await readTextFile(this.fileSystem, filePath);
             
+            this.modelLocator?.updateFile(filePath, content);
+
             // Check cache first
             const cached = this.fileCache.getIfValid(filePath, content);
             if (cached) {
@@ -195,60 +414,112 @@ export class OptimizedDjangoProjectAnalyzer extends DjangoProjectAnalyzer {
     }
 
     /**
-     * Analyze URLs with caching
+     * Analyze URLs; the URLconf engine skips files whose content it has
+     * already parsed, so no separate result cache is kept
      */
     private async analyzeUrlsWithCache(filePath: string): Promise<void> {
-        try {
-            const content = this.fileSystem.readFileSync(filePath, 'utf8') as string;
-            
-            // Check cache first
-            const cached = this.fileCache.getIfValid(filePath, content);
-            if (cached) {
-                // Use cached result
-                this.applyCachedUrlAnalysis(cached, filePath);
-                return;
-            }
+        await this.profiler.measureAsync(
+            'analyzeUrl',
+            () => super.analyzeUrls(filePath),
+            { filePath }
+        );
+    }
 
-            // Analyze file
-            await this.profiler.measureAsync(
-                'analyzeUrl',
-                () => super.analyzeUrls(filePath),
-                { filePath }
-            );
+    /**
+     * Analyze a predicted file ahead of its place in the progressive queue;
+     * the queued task then finds the result cached
+     */
+    async prefetchFile(filePath: string): Promise<void> {
+        if (!this.isInProject(filePath)) {
+            return;
+        }
+        this.demandFiles.add(filePath);
 
-            // Cache the result
-            const analysisResult = this.extractUrlAnalysisResult(filePath);
-            this.fileCache.setWithHash(filePath, content, analysisResult);
-        } catch (error) {
-            console.error(`Error analyzing URLs ${filePath}:`, error);
+        if (filePath.endsWith('models.py')) {
+            await this.analyzeModelsWithCache(filePath);
+        } else if (this.isUrlConf(filePath)) {
+            await this.analyzeUrlsWithCache(filePath);
         }
     }
 
     /**
-     * Handle file changes with debouncing
+     * Handle file changes with debouncing; all files changed within the
+     * delay share one timer and are analyzed as a batch
      */
     protected async onPythonFileChanged(uri: vscode.Uri): Promise<void> {
         const filePath = uri.fsPath;
+        if (!this.isInProject(filePath)) {
+            return;
+        }
         
-        // Debounce file changes
-        this.debouncedExecutor.execute(filePath, async () => {
-            // Reprioritize file in progressive analyzer
-            this.progressiveAnalyzer.reprioritizeFile(filePath, 100);
-            
-            // Invalidate cache
-            this.fileCache.delete(filePath);
-            
-            // Analyze with high priority
-            if (filePath.endsWith('models.py')) {
-                await this.analyzeModelsWithCache(filePath);
-            } else if (filePath.endsWith('urls.py')) {
-                await this.analyzeUrlsWithCache(filePath);
-            } else if (filePath.endsWith('settings.py')) {
-                await this.analyzeSettings(filePath);
+        this.debouncedExecutor.executeBatched('pythonFiles', filePath, filePaths => this.analyzeChangedFiles(filePaths, true));
+    }
+
+    /**
+     * Analyze the files of a branch switch right away. Cached results are
+     * validated by content hash, so files that did not change are not
+     * analyzed again.
+     */
+    protected async onPythonFilesChanged(filePaths: string[]): Promise<void> {
+        await this.batch(async () => {
+            const changed: string[] = [];
+            for (const filePath of filePaths.filter(filePath => this.isInProject(filePath))) {
+                if (this.fileSystem.existsSync(filePath)) {
+                    changed.push(filePath);
+                } else {
+                    this.fileCache.delete(filePath);
+                    this.onPythonFileDeleted(vscode.Uri.file(filePath));
+                }
             }
+            await this.analyzeChangedFiles(changed, false);
         });
     }
 
+    private async analyzeChangedFiles(filePaths: string[], invalidate: boolean): Promise<void> {
+        // A branch switch may have started while the files were waiting
+        let pending = filePaths.filter(filePath => !this.checkoutMonitor?.defer(filePath));
+        pending.forEach(filePath => this.refreshClassHierarchy(filePath));
+
+        if (this.analysisScope === 'demand') {
+            // Files outside the scope are analyzed once something looks up
+            // one of their models
+            const outside = new Set(pending.filter(filePath => !this.demandFiles.has(filePath) && !filePath.endsWith('settings.py')));
+            this.modelLocator?.addFiles(Array.from(outside).filter(filePath => filePath.endsWith('models.py')));
+            pending = pending.filter(filePath => !outside.has(filePath));
+
+            // Edits may import files that are not in the scope yet
+            await this.extendDemandScope(pending);
+            this.startProgressiveAnalysis();
+        }
+
+        await this.batch(async () => {
+            for (const filePath of pending) {
+                // Reprioritize file in progressive analyzer
+                this.progressiveAnalyzer.reprioritizeFile(filePath, 100);
+                
+                if (invalidate) {
+                    this.fileCache.delete(filePath);
+                }
+                
+                // Analyze with high priority
+                if (filePath.endsWith('models.py')) {
+                    await this.analyzeModelsWithCache(filePath);
+                } else if (this.isUrlConf(filePath)) {
+                    await this.analyzeUrlsWithCache(filePath);
+                } else if (filePath.endsWith('settings.py')) {
+                    await this.analyzeSettings(filePath);
+                }
+            }
+        });
+    }
+
+    protected onPythonFileDeleted(uri: vscode.Uri): void {
+        super.onPythonFileDeleted(uri);
+        this.demandFiles.delete(uri.fsPath);
+        this.modelLocator?.removeFile(uri.fsPath);
+        this.persistentCache?.delete(uri.fsPath);
+    }
+
     /**
      * Setup worker pool handlers
      */
@@ -298,36 +569,18 @@ export class OptimizedDjangoProjectAnalyzer extends DjangoProjectAnalyzer {
             return null;
         }
 
+        // Cache references to the model entries; they are replaced, never
+        // mutated, when the file is analyzed again
         const models: any[] = [];
-        for (const [name, info] of this.modelCache) {
+        for (const info of this.modelCache.values()) {
             if (info.app === app) {
-                models.push({ ...info });
+                models.push(info);
             }
         }
 
         return { app, models };
     }
 
-    /**
-     * Extract URL analysis result for caching
-     */
-    private extractUrlAnalysisResult(filePath: string): any {
-        // Extract only patterns from this specific file
-        const patterns: any[] = [];
-        const filePathNormalized = filePath.replace(/\\/g, '/');
-        
-        // Filter patterns that belong to this file
-        for (const [key, pattern] of this.urlPatternCache) {
-            // URL patterns typically include file information in their key or metadata
-            // We need to check if this pattern belongs to the current file
-            if (key.includes(filePathNormalized) || key.startsWith(path.basename(filePath, '.py'))) {
-                patterns.push({ key, ...pattern });
-            }
-        }
-        
-        return { filePath, patterns };
-    }
-
     /**
      * Apply cached model analysis
      */
@@ -337,31 +590,9 @@ export class OptimizedDjangoProjectAnalyzer extends DjangoProjectAnalyzer {
         }
 
         for (const model of cached.models) {
-            this.modelCache.set(model.name, {
-                name: model.name,
-                app: model.app,
-                fields: model.fields,
-                methods: model.methods,
-                managers: model.managers
-            });
-        }
-    }
-
-    /**
-     * Apply cached URL analysis
-     */
-    private applyCachedUrlAnalysis(cached: any, filePath: string): void {
-        if (!cached || !cached.patterns) {
-            return;
-        }
-
-        for (const pattern of cached.patterns) {
-            this.urlPatternCache.set(pattern.key, {
-                name: pattern.name,
-                pattern: pattern.pattern,
-                view: pattern.view
-            });
+            this.modelCache.set(model.name, model);
         }
+        this.publish();
     }
 
     /**
@@ -372,10 +603,33 @@ export class OptimizedDjangoProjectAnalyzer extends DjangoProjectAnalyzer {
             profilerSummary: this.profiler.getSummary(),
             progressiveSummary: this.progressiveAnalyzer.getPerformanceSummary(),
             cacheStats: this.fileCache.getStats(),
-            workerStatus: this.workerPool.getStatus()
+            workerStatus: this.workerPool.getStatus(),
+            concurrency: this.concurrency.getStatus(),
+            demandScope: this.analysisScope === 'demand' ? {
+                analyzedFiles: this.demandFiles.size,
+                locatorFiles: this.modelLocator?.fileCount || 0,
+                persistedResults: this.persistentCache?.size || 0
+            } : undefined
         };
     }
 
+    /**
+     * Limit the memory used by this analyzer's file cache
+     */
+    setMemoryBudget(maxMemoryMB: number): void {
+        this.fileCache.clear();
+        this.fileCache = new FileCache<any>(1000, maxMemoryMB);
+    }
+
+    getMemoryConsumers(): MemoryConsumer[] {
+        return [{
+            name: 'Project analysis cache',
+            tier: 'analysis',
+            cost: () => this.fileCache.getMemoryUsageMB() * 1024 * 1024,
+            shed: () => this.fileCache.clear()
+        }];
+    }
+
     /**
      * Clear analysis cache
      */
@@ -387,10 +641,15 @@ export class OptimizedDjangoProjectAnalyzer extends DjangoProjectAnalyzer {
      * Dispose resources
      */
     dispose(): void {
+        super.dispose();
         this.progressiveAnalyzer.dispose();
         this.workerPool.stop();
         this.debouncedExecutor.cancelAll();
         this.statusBarItem.dispose();
         this.fileCache.clear();
+        this.concurrency.dispose();
+        this.disposables.forEach(disposable => disposable.dispose());
+        this.disposables = [];
+        this.persistentCache?.flushSync();
     }
 }
\ No newline at end of file
@@ -0,0 +1,141 @@
+import { injectable } from 'inversify';
+import * as path from 'path';
+import * as fs from 'fs';
+import { EnhancedModelInfo } from '../parsers/modelExtractor';
+import { FormInfo } from '../parsers/formParser';
+import { AdminParseResult } from '../parsers/adminParser';
+import { ViewContext } from '../parsers/viewContextParser';
+import {
+    ProjectIndex,
+    ProjectIndexEntry,
+    ProjectIndexSection,
+    readProjectIndex,
+    hashContent,
+    toIndexPath,
+    fromIndexedForms,
+    fromIndexedAdmin,
+    fromIndexedViews
+} from './projectIndexFormat';
+
+export interface PrebuiltIndexStatus {
+    indexPath?: string;
+    createdAt?: number;
+    remainingFiles: number;
+    hits: number;
+    misses: number;
+}
+
+/**
+ * Parser output imported from an index built ahead of time by the
+ * build-index command line tool, e.g. as a CI artifact. Analyzers take a
+ * file's result instead of parsing it when the file's content hash still
+ * matches; each section is handed out once and then dropped, since later
+ * edits are parsed as usual.
+ */
+@injectable()
+export class PrebuiltProjectIndex {
+    private root: string | undefined;
+    private indexPath: string | undefined;
+    private index: ProjectIndex | undefined;
+    private hits = 0;
+    private misses = 0;
+
+    /**
+     * Load an index whose paths are relative to `root`. Returns false when
+     * the file is missing, malformed or from another index version.
+     */
+    async load(root: string, indexPath: string): Promise<boolean> {
+        let content: string;
+        try {
+            content = await fs.promises.readFile(indexPath, 'utf8');
+        } catch {
+            return false;
+        }
+
+        const index = readProjectIndex(content);
+        if (!index) {
+            console.warn(`Ignoring prebuilt project index ${indexPath}: unsupported format`);
+            return false;
+        }
+
+        this.root = root;
+        this.indexPath = indexPath;
+        this.index = index;
+        this.hits = 0;
+        this.misses = 0;
+        console.log(`Loaded prebuilt project index with ${Object.keys(index.files).length} files from ${indexPath}`);
+        return true;
+    }
+
+    isLoaded(): boolean {
+        return this.index !== undefined;
+    }
+
+    takeModels(filePath: string, content: string): EnhancedModelInfo[] | undefined {
+        return this.take(filePath, content, 'models');
+    }
+
+    takeForms(filePath: string, content: string): { forms: FormInfo[]; hasUnparsedFormPatterns: boolean } | undefined {
+        const forms = this.take(filePath, content, 'forms');
+        return forms && fromIndexedForms(forms, filePath);
+    }
+
+    takeAdmin(filePath: string, content: string): AdminParseResult | undefined {
+        const admin = this.take(filePath, content, 'admin');
+        return admin && fromIndexedAdmin(admin, filePath);
+    }
+
+    takeViews(filePath: string, content: string): ViewContext[] | undefined {
+        const views = this.take(filePath, content, 'views');
+        return views && fromIndexedViews(views, filePath);
+    }
+
+    private take<K extends ProjectIndexSection>(filePath: string, content: string, section: K): ProjectIndexEntry[K] | undefined {
+        if (!this.index || !this.root) {
+            return undefined;
+        }
+
+        const key = toIndexPath(this.root, filePath);
+        const entry = this.index.files[key];
+        const value = entry?.[section];
+        if (!entry || value === undefined) {
+            return undefined;
+        }
+
+        delete entry[section];
+        if (!entry.models && !entry.forms && !entry.admin && !entry.views) {
+            delete this.index.files[key];
+        }
+
+        if (entry.hash !== hashContent(content)) {
+            this.misses++;
+            return undefined;
+        }
+
+        this.hits++;
+        return value;
+    }
+
+    getStatus(): PrebuiltIndexStatus {
+        return {
+            indexPath: this.indexPath,
+            createdAt: this.index?.createdAt,
+            remainingFiles: this.index ? Object.keys(this.index.files).length : 0,
+            hits: this.hits,
+            misses: this.misses
+        };
+    }
+
+    /**
+     * Resolve the configured index location against a workspace folder
+     */
+    static resolveIndexPath(workspaceRoot: string, configuredPath: string): string {
+        return path.isAbsolute(configuredPath) ? configuredPath : path.join(workspaceRoot, configuredPath);
+    }
+
+    clear(): void {
+        this.index = undefined;
+        this.root = undefined;
+        this.indexPath = undefined;
+    }
+}
@@ -0,0 +1,93 @@
+import * as path from 'path';
+
+export type PrefetchReason = 'history' | 'sibling' | 'import';
+
+export interface PrefetchCandidate {
+    filePath: string;
+    score: number;
+    reasons: PrefetchReason[];
+}
+
+// Modules of a Django app that are usually opened together, most likely first
+const SIBLING_MODULES = ['models.py', 'admin.py', 'forms.py', 'views.py', 'urls.py', 'serializers.py', 'tests.py'];
+
+const HISTORY_WEIGHT = 3;
+const SIBLING_WEIGHT = 2;
+const IMPORT_WEIGHT = 1.5;
+
+/**
+ * Predicts the files likely to be opened next from the file that is open
+ * now: files opened after it before, the other modules of its Django app and
+ * the project modules it imports
+ */
+export class PrefetchPolicy {
+    // Number of times each file was opened right after another one, least
+    // recently used source file first
+    private transitions: Map<string, Map<string, number>> = new Map();
+    private lastOpened: string | undefined;
+
+    constructor(private maxHistory: number = 200) {}
+
+    /**
+     * Record that a file was opened
+     */
+    recordOpen(filePath: string): void {
+        const previous = this.lastOpened;
+        this.lastOpened = filePath;
+        if (!previous || previous === filePath) {
+            return;
+        }
+
+        const targets = this.transitions.get(previous) || new Map<string, number>();
+        targets.set(filePath, (targets.get(filePath) || 0) + 1);
+        this.transitions.delete(previous);
+        this.transitions.set(previous, targets);
+
+        if (this.transitions.size > this.maxHistory) {
+            this.transitions.delete(this.transitions.keys().next().value as string);
+        }
+    }
+
+    /**
+     * Files to prefetch for the active file, best first. `importedFiles` are
+     * the project files the active file imports; sibling paths are returned
+     * whether or not they exist.
+     */
+    rank(activeFile: string, importedFiles: string[], limit: number): PrefetchCandidate[] {
+        const candidates = new Map<string, PrefetchCandidate>();
+        const add = (filePath: string, score: number, reason: PrefetchReason) => {
+            if (filePath === activeFile) {
+                return;
+            }
+            const candidate = candidates.get(filePath);
+            if (candidate) {
+                candidate.score += score;
+                candidate.reasons.push(reason);
+            } else {
+                candidates.set(filePath, { filePath, score, reasons: [reason] });
+            }
+        };
+
+        const targets = this.transitions.get(activeFile);
+        if (targets) {
+            const total = Array.from(targets.values()).reduce((sum, count) => sum + count, 0);
+            targets.forEach((count, filePath) => add(filePath, HISTORY_WEIGHT * (1 + count / total), 'history'));
+        }
+
+        const directory = path.dirname(activeFile);
+        SIBLING_MODULES.forEach((module, index) => {
+            add(path.join(directory, module), SIBLING_WEIGHT - index * 0.1, 'sibling');
+        });
+
+        importedFiles.forEach(filePath => add(filePath, IMPORT_WEIGHT, 'import'));
+
+        return Array.from(candidates.values())
+            .sort((a, b) => b.score - a.score)
+            .slice(0, limit);
+    }
+
+    clear(): void {
+        this.transitions.clear();
+        this.lastOpened = undefined;
+    }
+}
@@ -2,6 +2,7 @@ import { injectable } from 'inversify';
 import * as vscode from 'vscode';
 import * as path from 'path';
 import { PerformanceProfiler } from '../utils/performanceProfiler';
+import { AdaptiveConcurrencyController } from '../workers/adaptiveConcurrency';
 
 export interface AnalysisTask {
     id: string;
@@ -31,7 +32,6 @@ export class ProgressiveAnalyzer {
     private completedTasks: Set<string> = new Set();
     private failedTasks: Map<string, Error> = new Map();
     private isProcessing: boolean = false;
-    private batchSize: number = 10;
     private profiler: PerformanceProfiler = new PerformanceProfiler();
     
     // Event emitters
@@ -116,51 +116,45 @@ export class ProgressiveAnalyzer {
     }
 
     /**
-     * Start processing the analysis queue
+     * Start processing the analysis queue. Tasks run as a pipeline: whenever
+     * one finishes, the highest priority task queued by then starts, up to
+     * the concurrency limit, which the controller may change between tasks.
+     * Tasks queued while processing are picked up by the same run.
      */
     async startProcessing(
         analyzeCallback: (task: AnalysisTask) => Promise<void>,
-        options: { batchSize?: number; concurrency?: number } = {}
+        options: { concurrency?: number; controller?: AdaptiveConcurrencyController } = {}
     ): Promise<void> {
         if (this.isProcessing) {
             return; // Already processing
         }
 
         this.isProcessing = true;
-        this.batchSize = options.batchSize || 10;
-        const concurrency = options.concurrency || 3;
+        const { controller } = options;
+        const getLimit = () => Math.max(1, controller ? controller.concurrency : options.concurrency || 3);
+        const running: Set<Promise<void>> = new Set();
 
-        while (this.analysisQueue.length > 0 && this.isProcessing) {
-            // Process tasks in batches
-            const batch = this.analysisQueue.splice(0, this.batchSize);
-            
-            // Process batch with limited concurrency
-            await this.processBatch(batch, analyzeCallback, concurrency);
-            
-            // Small delay between batches to prevent UI blocking
-            await new Promise(resolve => setTimeout(resolve, 100));
+        while (this.isProcessing && (this.analysisQueue.length > 0 || running.size > 0)) {
+            while (this.isProcessing && this.analysisQueue.length > 0 && running.size < getLimit()) {
+                const task = this.analysisQueue.shift()!;
+                const startTime = Date.now();
+                const run: Promise<void> = this.processTask(task, analyzeCallback).then(() => {
+                    running.delete(run);
+                    controller?.recordTask(Date.now() - startTime);
+                });
+                running.add(run);
+            }
+
+            if (running.size > 0) {
+                await Promise.race(running);
+            }
+            // Let editor events in between tasks
+            await new Promise(resolve => setImmediate(resolve));
         }
 
         this.isProcessing = false;
     }
 
-    /**
-     * Process a batch of tasks with limited concurrency
-     */
-    private async processBatch(
-        batch: AnalysisTask[],
-        analyzeCallback: (task: AnalysisTask) => Promise<void>,
-        concurrency: number
-    ): Promise<void> {
-        const promises: Promise<void>[] = [];
-        
-        for (let i = 0; i < batch.length; i += concurrency) {
-            const chunk = batch.slice(i, i + concurrency);
-            const chunkPromises = chunk.map(task => this.processTask(task, analyzeCallback));
-            await Promise.all(chunkPromises);
-        }
-    }
-
     /**
      * Process a single analysis task
      */
@@ -0,0 +1,107 @@
+import * as path from 'path';
+import * as crypto from 'crypto';
+import { EnhancedModelInfo } from '../parsers/modelExtractor';
+import { FormInfo } from '../parsers/formParser';
+import { AdminParseResult, AdminClass, AdminInline } from '../parsers/adminParser';
+import { ViewContext, ContextVariable } from '../parsers/viewContextParser';
+
+// Format of the index written by `npm run build-index` and read by
+// PrebuiltProjectIndex. No editor APIs here, so the CLI can share it.
+
+/**
+ * Bump whenever the output of one of the parsers changes shape, so indexes
+ * written by an older build are ignored
+ */
+export const PROJECT_INDEX_VERSION = 1;
+
+export const DEFAULT_INDEX_PATH = '.vscode/django-power-tools-index.json';
+
+export type IndexedAdminClass = Omit<AdminClass, 'attributes' | 'model' | 'filePath'> & {
+    attributes: [string, any][];
+};
+
+export type IndexedViewContext = Omit<ViewContext, 'contextVariables' | 'viewFile'> & {
+    contextVariables: ContextVariable[];
+};
+
+/**
+ * Parser output for one file. Paths are left out so the index can be built
+ * on another machine and checked into CI artifacts.
+ */
+export interface ProjectIndexEntry {
+    hash: string;
+    models?: EnhancedModelInfo[];
+    forms?: {
+        forms: Omit<FormInfo, 'filePath'>[];
+        hasUnparsedFormPatterns: boolean;
+    };
+    admin?: {
+        adminClasses: IndexedAdminClass[];
+        inlines: Omit<AdminInline, 'filePath'>[];
+        registrations: AdminParseResult['registrations'];
+    };
+    views?: IndexedViewContext[];
+}
+
+export interface ProjectIndex {
+    version: number;
+    createdAt: number;
+    // Keyed by path relative to the project root, with '/' separators
+    files: { [relativePath: string]: ProjectIndexEntry };
+}
+
+export type ProjectIndexSection = 'models' | 'forms' | 'admin' | 'views';
+
+export function hashContent(content: string): string {
+    return crypto.createHash('sha1').update(content).digest('hex');
+}
+
+/**
+ * Normalized index key of a file below the project root
+ */
+export function toIndexPath(root: string, filePath: string): string {
+    return path.relative(root, filePath).split(path.sep).join('/');
+}
+
+/**
+ * Parse an index file; returns undefined when it is malformed or was written
+ * for another index version
+ */
+export function readProjectIndex(content: string): ProjectIndex | undefined {
+    try {
+        const index = JSON.parse(content);
+        if (index && index.version === PROJECT_INDEX_VERSION && typeof index.files === 'object') {
+            return index as ProjectIndex;
+        }
+    } catch {
+        // Fall through
+    }
+    return undefined;
+}
+
+export function fromIndexedForms(entry: NonNullable<ProjectIndexEntry['forms']>, filePath: string): { forms: FormInfo[]; hasUnparsedFormPatterns: boolean } {
+    return {
+        forms: entry.forms.map(form => ({ ...form, filePath })),
+        hasUnparsedFormPatterns: entry.hasUnparsedFormPatterns
+    };
+}
+
+export function fromIndexedAdmin(entry: NonNullable<ProjectIndexEntry['admin']>, filePath: string): AdminParseResult {
+    return {
+        adminClasses: entry.adminClasses.map(adminClass => ({
+            ...adminClass,
+            filePath,
+            attributes: new Map(adminClass.attributes)
+        })),
+        inlines: entry.inlines.map(inline => ({ ...inline, filePath })),
+        registrations: entry.registrations
+    };
+}
+
+export function fromIndexedViews(entry: IndexedViewContext[], filePath: string): ViewContext[] {
+    return entry.map(view => ({
+        ...view,
+        viewFile: filePath,
+        contextVariables: new Map(view.contextVariables.map(variable => [variable.name, variable]))
+    }));
+}
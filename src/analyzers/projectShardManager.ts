@@ -0,0 +1,259 @@
+import { injectable, inject, optional } from 'inversify';
+import * as vscode from 'vscode';
+import * as path from 'path';
+import * as fs from 'fs';
+import { TYPES } from '../container/types';
+import { DjangoProjectAnalyzer } from './djangoProjectAnalyzer';
+import { OptimizedDjangoProjectAnalyzer } from './optimizedDjangoProjectAnalyzer';
+import { AdvancedModelAnalyzer } from './advancedModelAnalyzer';
+import { AnalysisQuarantine } from './analysisQuarantine';
+
+/**
+ * Analyzer state for one Django project (a manage.py/settings pair)
+ */
+export interface ProjectShard {
+    root: string;
+    managePyPath: string;
+    settingsPath?: string;
+    modelAnalyzer: AdvancedModelAnalyzer;
+    projectAnalyzer: DjangoProjectAnalyzer;
+    isPrimary: boolean;
+    startedAt: number;
+}
+
+export interface ProjectShardStatus {
+    root: string;
+    started: boolean;
+    isPrimary: boolean;
+    modelCount: number;
+}
+
+interface ProjectLocation {
+    root: string;
+    managePyPath: string;
+    settingsPath?: string;
+}
+
+const PROJECT_EXCLUDE = '**/{node_modules,.venv,venv,site-packages,.tox}/**';
+
+/**
+ * Splits a workspace with several Django projects into shards. Each shard owns
+ * its model analyzer, caches, scan queue and memory budget, and is started
+ * lazily the first time a file of that project is opened.
+ *
+ * The project found by the primary DjangoProjectAnalyzer reuses the global
+ * analyzers, so single-project workspaces pay nothing extra.
+ */
+@injectable()
+export class ProjectShardManager {
+    private locations: ProjectLocation[] = [];
+    private discovered = false;
+    private shards: Map<string, ProjectShard> = new Map();
+    private starting: Map<string, Promise<ProjectShard>> = new Map();
+    private disposables: vscode.Disposable[] = [];
+    private _onDidStartShard = new vscode.EventEmitter<ProjectShard>();
+
+    readonly onDidStartShard = this._onDidStartShard.event;
+
+    constructor(
+        @inject(TYPES.ExtensionContext) private context: vscode.ExtensionContext,
+        @inject(TYPES.DjangoProjectAnalyzer) private primaryAnalyzer: DjangoProjectAnalyzer,
+        @inject(TYPES.AdvancedModelAnalyzer) private primaryModelAnalyzer: AdvancedModelAnalyzer,
+        @inject(TYPES.AnalysisQuarantine) @optional() private quarantine?: AnalysisQuarantine
+    ) {}
+
+    /**
+     * Discover Django projects and start shards for files that are already open
+     */
+    async initialize(): Promise<void> {
+        if (!this.discovered) {
+            await this.discoverProjects();
+        }
+
+        const primaryRoot = this.primaryAnalyzer.getProjectRoot();
+        const primary = this.locations.find(location => location.root === primaryRoot);
+        if (primaryRoot) {
+            this.shards.set(primaryRoot, {
+                root: primaryRoot,
+                managePyPath: primary?.managePyPath || path.join(primaryRoot, 'manage.py'),
+                settingsPath: primary?.settingsPath,
+                modelAnalyzer: this.primaryModelAnalyzer,
+                projectAnalyzer: this.primaryAnalyzer,
+                isPrimary: true,
+                startedAt: Date.now()
+            });
+        }
+
+        if (this.locations.length > 1) {
+            console.log(`Found ${this.locations.length} Django projects in workspace`);
+        }
+
+        this.disposables.push(
+            vscode.workspace.onDidOpenTextDocument(document => {
+                this.ensureShard(document.uri.fsPath);
+            })
+        );
+        vscode.workspace.textDocuments.forEach(document => this.ensureShard(document.uri.fsPath));
+
+        this.context.subscriptions.push(...this.disposables);
+    }
+
+    /**
+     * Find manage.py files and pair each with its settings module
+     */
+    async discoverProjects(): Promise<void> {
+        const managePyFiles = await vscode.workspace.findFiles('**/manage.py', PROJECT_EXCLUDE);
+
+        this.locations = managePyFiles
+            .map(uri => {
+                const root = path.dirname(uri.fsPath);
+                return { root, managePyPath: uri.fsPath, settingsPath: this.findSettingsPath(root) };
+            })
+            // Deepest roots first so nested projects win when routing
+            .sort((a, b) => b.root.length - a.root.length);
+        this.discovered = true;
+    }
+
+    private findSettingsPath(root: string): string | undefined {
+        const candidates = [
+            path.join(root, 'settings.py'),
+            path.join(root, path.basename(root), 'settings.py'),
+            path.join(root, 'config', 'settings.py'),
+            path.join(root, 'settings', 'base.py')
+        ];
+
+        try {
+            for (const entry of fs.readdirSync(root, { withFileTypes: true })) {
+                if (entry.isDirectory()) {
+                    candidates.push(path.join(root, entry.name, 'settings.py'));
+                }
+            }
+        } catch {
+            // Root vanished since discovery
+        }
+
+        return candidates.find(candidate => fs.existsSync(candidate));
+    }
+
+    getProjectRoots(): string[] {
+        return this.locations.map(location => location.root);
+    }
+
+    /**
+     * Get the root of the project that owns a file
+     */
+    findRootForPath(filePath: string): string | undefined {
+        for (const location of this.locations) {
+            const relative = path.relative(location.root, filePath);
+            if (!relative.startsWith('..') && !path.isAbsolute(relative)) {
+                return location.root;
+            }
+        }
+        return this.primaryAnalyzer.getProjectRoot();
+    }
+
+    /**
+     * Root to scope project-wide names such as URL names to for a file.
+     * Undefined while the workspace holds a single project, whose URLconfs
+     * may live outside its root.
+     */
+    getScopeRoot(filePath: string): string | undefined {
+        return this.locations.length > 1 ? this.findRootForPath(filePath) : undefined;
+    }
+
+    /**
+     * Get the started shard for a file without starting one
+     */
+    getShard(filePath: string): ProjectShard | undefined {
+        const root = this.findRootForPath(filePath);
+        return root ? this.shards.get(root) : undefined;
+    }
+
+    /**
+     * Get the shard for a file, starting it on first use
+     */
+    async ensureShard(filePath: string): Promise<ProjectShard | undefined> {
+        const root = this.findRootForPath(filePath);
+        if (!root) {
+            return undefined;
+        }
+
+        const existing = this.shards.get(root);
+        if (existing) {
+            return existing;
+        }
+
+        let pending = this.starting.get(root);
+        if (!pending) {
+            pending = this.startShard(root).finally(() => this.starting.delete(root));
+            this.starting.set(root, pending);
+        }
+
+        try {
+            return await pending;
+        } catch (error) {
+            console.error(`Failed to start Django project shard at ${root}:`, error);
+            return undefined;
+        }
+    }
+
+    private async startShard(root: string): Promise<ProjectShard> {
+        const location = this.locations.find(candidate => candidate.root === root)!;
+        const config = vscode.workspace.getConfiguration('djangoPowerTools.performance');
+        const modelAnalyzer = new AdvancedModelAnalyzer(undefined, undefined, this.quarantine);
+
+        let projectAnalyzer: DjangoProjectAnalyzer;
+        if (config.get('enableProgressiveAnalysis', true)) {
+            const optimized = new OptimizedDjangoProjectAnalyzer(modelAnalyzer);
+            // Split the cache budget between the projects of the workspace
+            const cacheMaxSizeMB = config.get<number>('cacheMaxSizeMB', 100);
+            optimized.setMemoryBudget(Math.max(10, Math.floor(cacheMaxSizeMB / this.locations.length)));
+            projectAnalyzer = optimized;
+        } else {
+            projectAnalyzer = new DjangoProjectAnalyzer(modelAnalyzer);
+        }
+
+        // Every project's URLconfs go into the one engine, which keeps a
+        // snapshot per project root so URL names of projects do not collide
+        projectAnalyzer.setUrlConfEngine(this.primaryAnalyzer.getUrlConfEngine());
+        projectAnalyzer.setStorageDirectory((this.context.storageUri || this.context.globalStorageUri)?.fsPath);
+        await projectAnalyzer.initializeAt(root);
+
+        const shard: ProjectShard = {
+            root,
+            managePyPath: location.managePyPath,
+            settingsPath: location.settingsPath,
+            modelAnalyzer,
+            projectAnalyzer,
+            isPrimary: false,
+            startedAt: Date.now()
+        };
+        this.shards.set(root, shard);
+        this._onDidStartShard.fire(shard);
+
+        return shard;
+    }
+
+    getStatus(): ProjectShardStatus[] {
+        return this.locations.map(location => {
+            const shard = this.shards.get(location.root);
+            return {
+                root: location.root,
+                started: !!shard,
+                isPrimary: !!shard?.isPrimary,
+                modelCount: shard ? shard.modelAnalyzer.getModels().size : 0
+            };
+        });
+    }
+
+    dispose(): void {
+        for (const shard of this.shards.values()) {
+            if (!shard.isPrimary) {
+                shard.projectAnalyzer.dispose();
+            }
+        }
+        this.shards.clear();
+        this.disposables.forEach(disposable => disposable.dispose());
+        this._onDidStartShard.dispose();
+    }
+}
@@ -0,0 +1,341 @@
+import * as vscode from 'vscode';
+import * as fs from 'fs';
+import { injectable, inject, optional } from 'inversify';
+import { TYPES } from '../container/types';
+import { AdvancedModelAnalyzer } from './advancedModelAnalyzer';
+import { DjangoProjectAnalyzer } from './djangoProjectAnalyzer';
+import { GitCheckoutMonitor } from './gitCheckoutMonitor';
+import { IdentifierOccurrence, ModelSchema, extractIdentifiers, getIdentifierKind } from '../parsers/identifierExtractor';
+import { DebouncedTaskExecutor } from '../workers/analysisWorkerPool';
+
+export interface IndexedOccurrence extends IdentifierOccurrence {
+    filePath: string;
+}
+
+const PYTHON_GLOB = '**/*.py';
+const TEMPLATE_GLOB = '**/templates/**/*.{html,txt}';
+const EXCLUDE_GLOB = '**/{node_modules,.venv,venv,site-packages,.tox}/**';
+
+/**
+ * Inverted index from identifiers (models, model fields, URL names and
+ * template names) to the places that use them, across Python modules and
+ * templates. Files are indexed once at startup and then one at a time as
+ * they change on disk or in the editor, so queries never read files.
+ */
+@injectable()
+export class ReferenceIndex {
+    // Identifier key -> file -> occurrences
+    private byKey: Map<string, Map<string, IdentifierOccurrence[]>> = new Map();
+    // File -> occurrences sorted by position
+    private byFile: Map<string, IdentifierOccurrence[]> = new Map();
+    // Model -> keys of its fields that are used, to find the files a model change can affect
+    private fieldKeys: Map<string, Set<string>> = new Map();
+    // Capitalized names in each Python file, to find the files a model change can affect
+    private nameFiles: Map<string, Set<string>> = new Map();
+    private fileNames: Map<string, string[]> = new Map();
+    private staleFiles: Set<string> = new Set();
+    private refreshing: Promise<void> | undefined;
+    private debouncer: DebouncedTaskExecutor;
+    private disposables: vscode.Disposable[] = [];
+    private initialization: Promise<void> | undefined;
+
+    private readonly schema: ModelSchema = {
+        isModel: name => this.modelAnalyzer.getModel(name) !== undefined,
+        getField: (model, field) => this.modelAnalyzer.getModel(model)?.fields.find(f => f.name === field),
+        getManagerNames: model => this.modelAnalyzer.getModel(model)?.managers.map(manager => manager.name) || []
+    };
+
+    constructor(
+        @inject(TYPES.AdvancedModelAnalyzer) private modelAnalyzer: AdvancedModelAnalyzer,
+        @inject(TYPES.DjangoProjectAnalyzer) private projectAnalyzer: DjangoProjectAnalyzer,
+        @inject(TYPES.GitCheckoutMonitor) @optional() private checkoutMonitor?: GitCheckoutMonitor
+    ) {
+        const delay = vscode.workspace.getConfiguration('djangoPowerTools.performance').get<number>('debounceDelay', 500);
+        this.debouncer = new DebouncedTaskExecutor(delay);
+    }
+
+    initialize(): Promise<void> {
+        if (!this.initialization) {
+            this.initialization = this.build();
+        }
+        return this.initialization;
+    }
+
+    private async build(): Promise<void> {
+        const projectRoot = this.projectAnalyzer.getProjectRoot();
+        if (!projectRoot) {
+            return;
+        }
+
+        const files = [
+            ...await vscode.workspace.findFiles(new vscode.RelativePattern(projectRoot, PYTHON_GLOB), EXCLUDE_GLOB),
+            ...await vscode.workspace.findFiles(new vscode.RelativePattern(projectRoot, TEMPLATE_GLOB), EXCLUDE_GLOB)
+        ];
+        for (const file of files) {
+            await this.indexFileFromDisk(file.fsPath);
+        }
+
+        this.setupListeners(projectRoot);
+        console.log(`Reference index built from ${files.length} files`);
+    }
+
+    private setupListeners(projectRoot: string): void {
+        for (const glob of [PYTHON_GLOB, TEMPLATE_GLOB]) {
+            const watcher = vscode.workspace.createFileSystemWatcher(new vscode.RelativePattern(projectRoot, glob));
+            this.disposables.push(
+                watcher,
+                watcher.onDidCreate(uri => this.onFileChanged(uri.fsPath)),
+                watcher.onDidChange(uri => this.onFileChanged(uri.fsPath)),
+                watcher.onDidDelete(uri => {
+                    if (!this.checkoutMonitor?.defer(uri.fsPath)) {
+                        this.removeFile(uri.fsPath);
+                    }
+                })
+            );
+        }
+
+        if (this.checkoutMonitor) {
+            this.disposables.push(this.checkoutMonitor.onDidFinishSwitch(event => {
+                event.changedFiles.forEach(filePath => this.markStale(filePath));
+            }));
+        }
+
+        this.disposables.push(
+            // Unsaved edits move identifiers around; keep positions in step with the buffer
+            vscode.workspace.onDidChangeTextDocument(event => {
+                if (this.byFile.has(event.document.uri.fsPath)) {
+                    this.markStale(event.document.uri.fsPath);
+                }
+            }),
+            vscode.workspace.onDidCloseTextDocument(document => {
+                if (document.isDirty && this.byFile.has(document.uri.fsPath)) {
+                    this.markStale(document.uri.fsPath);
+                }
+            }),
+            this.modelAnalyzer.onDidChangeModels(names => this.onModelsChanged(names))
+        );
+    }
+
+    private onFileChanged(filePath: string): void {
+        if (!this.checkoutMonitor?.defer(filePath)) {
+            this.markStale(filePath);
+        }
+    }
+
+    /**
+     * Files whose identifiers may resolve differently now: those naming a
+     * changed model and those using its fields
+     */
+    private onModelsChanged(names: string[]): void {
+        for (const name of names) {
+            this.nameFiles.get(name)?.forEach(filePath => this.staleFiles.add(filePath));
+            for (const key of this.fieldKeys.get(name) || []) {
+                this.byKey.get(key)?.forEach((_, filePath) => this.staleFiles.add(filePath));
+            }
+        }
+        this.scheduleRefresh();
+    }
+
+    private markStale(filePath: string): void {
+        this.staleFiles.add(filePath);
+        this.scheduleRefresh();
+    }
+
+    private scheduleRefresh(): void {
+        if (this.staleFiles.size > 0) {
+            this.debouncer.execute('referenceIndex', () => this.refreshStaleFiles());
+        }
+    }
+
+    /**
+     * Bring the index up to date before a request is answered: the
+     * requesting document is indexed from its buffer and the other stale
+     * files are indexed again. Returns false when the offsets still cannot
+     * be trusted, e.g. because the document changed meanwhile.
+     */
+    async ensureCurrent(document: vscode.TextDocument): Promise<boolean> {
+        const filePath = document.uri.fsPath;
+        const version = document.version;
+        if (this.staleFiles.delete(filePath)) {
+            this.indexFile(filePath, document.getText());
+        }
+
+        if (this.staleFiles.size > 0) {
+            this.debouncer.cancel('referenceIndex');
+            await this.refreshStaleFiles();
+        } else if (this.refreshing) {
+            await this.refreshing;
+        }
+        return document.version === version && this.staleFiles.size === 0;
+    }
+
+    /**
+     * Index the stale files again, after any refresh that is still running
+     */
+    private refreshStaleFiles(): Promise<void> {
+        const refresh = (this.refreshing || Promise.resolve()).then(() => this.indexStaleFiles());
+        const done = () => {
+            if (this.refreshing === refresh) {
+                this.refreshing = undefined;
+            }
+        };
+        this.refreshing = refresh;
+        refresh.then(done, done);
+        return refresh;
+    }
+
+    private async indexStaleFiles(): Promise<void> {
+        const files = Array.from(this.staleFiles);
+        this.staleFiles.clear();
+
+        for (const filePath of files) {
+            // Open documents may hold unsaved changes
+            const document = vscode.workspace.textDocuments.find(doc => doc.uri.fsPath === filePath);
+            if (document) {
+                this.indexFile(filePath, document.getText());
+            } else if (fs.existsSync(filePath)) {
+                await this.indexFileFromDisk(filePath);
+            } else {
+                this.removeFile(filePath);
+            }
+        }
+    }
+
+    private async indexFileFromDisk(filePath: string): Promise<void> {
+        try {
+            this.indexFile(filePath, await fs.promises.readFile(filePath, 'utf8'));
+        } catch (error) {
+            console.error(`Error indexing references in ${filePath}:`, error);
+        }
+    }
+
+    /**
+     * Replace the occurrences recorded for a file
+     */
+    indexFile(filePath: string, content: string): void {
+        this.removeFile(filePath);
+
+        const languageId = filePath.endsWith('.py') ? 'python' : 'django-html';
+        const occurrences = extractIdentifiers(content, languageId, filePath, this.schema);
+        this.byFile.set(filePath, occurrences);
+        for (const occurrence of occurrences) {
+            let files = this.byKey.get(occurrence.key);
+            if (!files) {
+                files = new Map();
+                this.byKey.set(occurrence.key, files);
+            }
+            const fileOccurrences = files.get(filePath);
+            if (fileOccurrences) {
+                fileOccurrences.push(occurrence);
+            } else {
+                files.set(filePath, [occurrence]);
+            }
+            if (files.size === 1 && getIdentifierKind(occurrence.key) === 'field') {
+                const model = getFieldModel(occurrence.key);
+                let keys = this.fieldKeys.get(model);
+                if (!keys) {
+                    keys = new Set();
+                    this.fieldKeys.set(model, keys);
+                }
+                keys.add(occurrence.key);
+            }
+        }
+
+        if (languageId === 'python') {
+            const names = Array.from(new Set(content.match(/\b[A-Z]\w*/g) || []));
+            this.fileNames.set(filePath, names);
+            for (const name of names) {
+                let files = this.nameFiles.get(name);
+                if (!files) {
+                    files = new Set();
+                    this.nameFiles.set(name, files);
+                }
+                files.add(filePath);
+            }
+        }
+    }
+
+    removeFile(filePath: string): void {
+        for (const occurrence of this.byFile.get(filePath) || []) {
+            const files = this.byKey.get(occurrence.key);
+            files?.delete(filePath);
+            if (files?.size === 0) {
+                this.byKey.delete(occurrence.key);
+                this.forgetFieldKey(occurrence.key);
+            }
+        }
+        this.byFile.delete(filePath);
+
+        for (const name of this.fileNames.get(filePath) || []) {
+            const files = this.nameFiles.get(name);
+            files?.delete(filePath);
+            if (files?.size === 0) {
+                this.nameFiles.delete(name);
+            }
+        }
+        this.fileNames.delete(filePath);
+    }
+
+    private forgetFieldKey(key: string): void {
+        if (getIdentifierKind(key) !== 'field') {
+            return;
+        }
+        const model = getFieldModel(key);
+        const keys = this.fieldKeys.get(model);
+        keys?.delete(key);
+        if (keys?.size === 0) {
+            this.fieldKeys.delete(model);
+        }
+    }
+
+    /**
+     * Identifier at a position of an indexed file
+     */
+    getOccurrenceAt(filePath: string, line: number, character: number): IdentifierOccurrence | undefined {
+        return this.byFile.get(filePath)?.find(occurrence =>
+            occurrence.line === line && occurrence.start <= character && character <= occurrence.end
+        );
+    }
+
+    /**
+     * Every indexed use of an identifier, definitions included
+     */
+    getOccurrences(key: string): IndexedOccurrence[] {
+        const result: IndexedOccurrence[] = [];
+        this.byKey.get(key)?.forEach((occurrences, filePath) => {
+            occurrences.forEach(occurrence => result.push({ ...occurrence, filePath }));
+        });
+        return result;
+    }
+
+    /**
+     * Whether the project itself defines an identifier, as opposed to e.g. a
+     * model from an installed package
+     */
+    hasDefinition(key: string): boolean {
+        for (const occurrences of this.byKey.get(key)?.values() || []) {
+            if (occurrences.some(occurrence => occurrence.isDefinition)) {
+                return true;
+            }
+        }
+        return false;
+    }
+
+    dispose(): void {
+        this.debouncer.cancelAll();
+        this.disposables.forEach(d => d.dispose());
+        this.disposables = [];
+        this.byKey.clear();
+        this.byFile.clear();
+        this.fieldKeys.clear();
+        this.nameFiles.clear();
+        this.fileNames.clear();
+    }
+}
+
+/**
+ * Model of a field key such as "field:Post.title"
+ */
+function getFieldModel(key: string): string {
+    return key.substring('field:'.length, key.indexOf('.'));
+}
@@ -0,0 +1,306 @@
+import { injectable, inject } from 'inversify';
+import * as vscode from 'vscode';
+import * as path from 'path';
+import * as fs from 'fs';
+import * as crypto from 'crypto';
+import { TYPES } from '../container/types';
+import { PythonExecutor } from '../pythonIntegration';
+import { AdvancedModelAnalyzer, EnhancedModelInfo } from './advancedModelAnalyzer';
+import { DjangoProjectAnalyzer } from './djangoProjectAnalyzer';
+
+/**
+ * Description of the active interpreter as reported by the probe script
+ */
+export interface InterpreterEnvironment {
+    pythonPath: string;
+    pythonVersion: string;
+    packages: { [name: string]: string };
+    apps: { app: string; module: string; files: string[] }[];
+}
+
+interface PersistedIndex {
+    version: number;
+    key: string;
+    pythonPath: string;
+    createdAt: number;
+    models: EnhancedModelInfo[];
+}
+
+export interface SitePackagesIndexStatus {
+    key?: string;
+    pythonPath?: string;
+    modelCount: number;
+    source: 'none' | 'disk' | 'built';
+    buildTime: number;
+}
+
+const INDEX_FORMAT_VERSION = 1;
+
+// Locates the models modules of INSTALLED_APPS without running django.setup()
+const PROBE_SCRIPT = `
+import sys, os, json, importlib.util
+try:
+    from importlib import metadata
+except ImportError:
+    metadata = None
+
+apps = json.loads(sys.argv[1])
+packages = {}
+if metadata is not None:
+    for dist in metadata.distributions():
+        name = dist.metadata['Name']
+        if name:
+            packages[name.lower()] = dist.version
+
+found = []
+for entry in apps:
+    parts = entry.split('.')
+    if parts and parts[-1][:1].isupper():
+        parts = parts[:-1]
+        if parts and parts[-1] == 'apps':
+            parts = parts[:-1]
+    module = '.'.join(parts)
+    if not module:
+        continue
+    try:
+        spec = importlib.util.find_spec(module + '.models')
+    except Exception:
+        spec = None
+    if spec is None or not spec.origin or not spec.origin.endswith('.py'):
+        continue
+    files = []
+    if spec.submodule_search_locations:
+        for location in spec.submodule_search_locations:
+            for name in sorted(os.listdir(location)):
+                if name.endswith('.py'):
+                    files.append(os.path.join(location, name))
+    else:
+        files.append(spec.origin)
+    found.append({'app': parts[-1], 'module': module, 'files': files})
+
+print(json.dumps({
+    'pythonPath': sys.executable,
+    'pythonVersion': sys.version.split()[0],
+    'packages': packages,
+    'apps': found
+}))
+`;
+
+/**
+ * Persisted index of models defined by installed packages (django.contrib and
+ * third-party apps referenced in INSTALLED_APPS).
+ *
+ * The index is built once per interpreter environment and stored on disk,
+ * keyed by the interpreter path and the installed package versions, so later
+ * sessions only pay for a cheap environment probe.
+ */
+@injectable()
+export class SitePackagesModelIndex {
+    private status: SitePackagesIndexStatus = { modelCount: 0, source: 'none', buildTime: 0 };
+    private refreshPromise: Promise<void> | null = null;
+    private refreshQueued = false;
+    private disposables: vscode.Disposable[] = [];
+
+    constructor(
+        @inject(TYPES.ExtensionContext) private context: vscode.ExtensionContext,
+        @inject(TYPES.PythonExecutor) private pythonExecutor: PythonExecutor,
+        @inject(TYPES.AdvancedModelAnalyzer) private advancedAnalyzer: AdvancedModelAnalyzer,
+        @inject(TYPES.DjangoProjectAnalyzer) private projectAnalyzer: DjangoProjectAnalyzer
+    ) {}
+
+    /**
+     * Load or build the index in the background
+     */
+    initialize(): Promise<void> {
+        if (this.disposables.length === 0) {
+            this.disposables.push(
+                this.pythonExecutor.onDidChangeEnvironment(() => {
+                    this.refresh().catch(error => {
+                        console.error('Failed to refresh site-packages model index:', error);
+                    });
+                })
+            );
+        }
+        return this.refresh();
+    }
+
+    /**
+     * Re-probe the interpreter and rebuild the index only if the environment
+     * changed. A refresh requested while one runs probes again afterwards.
+     */
+    refresh(): Promise<void> {
+        if (this.refreshPromise) {
+            this.refreshQueued = true;
+            return this.refreshPromise;
+        }
+        this.refreshPromise = this.doRefresh().finally(() => {
+            this.refreshPromise = null;
+            if (this.refreshQueued) {
+                this.refreshQueued = false;
+                this.refresh().catch(error => {
+                    console.error('Failed to refresh site-packages model index:', error);
+                });
+            }
+        });
+        return this.refreshPromise;
+    }
+
+    dispose(): void {
+        this.disposables.forEach(d => d.dispose());
+        this.disposables = [];
+    }
+
+    private async doRefresh(): Promise<void> {
+        const installedApps = this.projectAnalyzer.getInstalledApps();
+        if (installedApps.length === 0 || !this.pythonExecutor.getCurrentPythonPath()) {
+            return;
+        }
+
+        const environment = await this.probeEnvironment(installedApps);
+        if (!environment) {
+            return;
+        }
+
+        const key = SitePackagesModelIndex.computeIndexKey(environment, installedApps);
+        if (key === this.status.key) {
+            return; // Environment unchanged since the last refresh
+        }
+
+        const startTime = Date.now();
+        let models = await this.loadIndex(key);
+        let source: 'disk' | 'built' = 'disk';
+
+        if (!models) {
+            models = await this.buildModels(environment);
+            source = 'built';
+            await this.saveIndex({
+                version: INDEX_FORMAT_VERSION,
+                key,
+                pythonPath: environment.pythonPath,
+                createdAt: Date.now(),
+                models
+            });
+        }
+
+        this.advancedAnalyzer.addExternalModels(models);
+        this.status = {
+            key,
+            pythonPath: environment.pythonPath,
+            modelCount: models.length,
+            source,
+            buildTime: Date.now() - startTime
+        };
+        console.log(`Site-packages model index ready: ${models.length} models (${source})`);
+    }
+
+    /**
+     * Compute the cache key for an environment. Any change of interpreter,
+     * package version or installed app produces a different key.
+     */
+    static computeIndexKey(environment: InterpreterEnvironment, installedApps: string[]): string {
+        const packages = Object.keys(environment.packages)
+            .sort()
+            .map(name => `${name}==${environment.packages[name]}`);
+
+        return crypto.createHash('sha1')
+            .update(JSON.stringify({
+                version: INDEX_FORMAT_VERSION,
+                pythonPath: environment.pythonPath,
+                pythonVersion: environment.pythonVersion,
+                packages,
+                installedApps: [...installedApps].sort()
+            }))
+            .digest('hex');
+    }
+
+    private async probeEnvironment(installedApps: string[]): Promise<InterpreterEnvironment | undefined> {
+        try {
+            const result = await this.pythonExecutor.execute(
+                ['-c', PROBE_SCRIPT, JSON.stringify(installedApps)],
+                this.projectAnalyzer.getProjectRoot()
+            );
+            return JSON.parse(result.stdout) as InterpreterEnvironment;
+        } catch (error) {
+            console.error('Failed to probe Python environment for installed apps:', error);
+            return undefined;
+        }
+    }
+
+    /**
+     * Parse the models modules of installed packages. Apps that live inside the
+     * workspace are skipped because the workspace analyzers already cover them.
+     */
+    async buildModels(environment: InterpreterEnvironment): Promise<EnhancedModelInfo[]> {
+        const models: EnhancedModelInfo[] = [];
+
+        for (const app of environment.apps) {
+            for (const filePath of app.files) {
+                if (this.isInWorkspace(filePath)) {
+                    continue;
+                }
+
+                try {
+                    const content = await fs.promises.readFile(filePath, 'utf8');
+                    const fileModels = await this.advancedAnalyzer.extractModels(content, filePath);
+                    for (const model of fileModels || []) {
+                        model.app = app.app;
+                        models.push(model);
+                    }
+                } catch (error) {
+                    console.error(`Error indexing installed models in ${filePath}:`, error);
+                }
+            }
+        }
+
+        return models;
+    }
+
+    private isInWorkspace(filePath: string): boolean {
+        const folders = vscode.workspace.workspaceFolders || [];
+        return folders.some(folder => {
+            const relative = path.relative(folder.uri.fsPath, filePath);
+            return !relative.startsWith('..') && !path.isAbsolute(relative);
+        });
+    }
+
+    private getIndexDirectory(): string | undefined {
+        const storageUri = this.context.globalStorageUri;
+        return storageUri ? path.join(storageUri.fsPath, 'site-packages-index') : undefined;
+    }
+
+    private async loadIndex(key: string): Promise<EnhancedModelInfo[] | undefined> {
+        const directory = this.getIndexDirectory();
+        if (!directory) {
+            return undefined;
+        }
+
+        try {
+            const content = await fs.promises.readFile(path.join(directory, `${key}.json`), 'utf8');
+            const persisted = JSON.parse(content) as PersistedIndex;
+            if (persisted.version !== INDEX_FORMAT_VERSION || persisted.key !== key) {
+                return undefined;
+            }
+            return persisted.models;
+        } catch {
+            return undefined; // Not built yet for this environment
+        }
+    }
+
+    private async saveIndex(index: PersistedIndex): Promise<void> {
+        const directory = this.getIndexDirectory();
+        if (!directory) {
+            return;
+        }
+
+        try {
+            await fs.promises.mkdir(directory, { recursive: true });
+            await fs.promises.writeFile(path.join(directory, `${index.key}.json`), JSON.stringify(index), 'utf8');
+        } catch (error) {
+            console.error('Failed to persist site-packages model index:', error);
+        }
+    }
+
+    getStatus(): SitePackagesIndexStatus {
+        return { ...this.status };
+    }
+}
@@ -1,20 +1,23 @@
 import * as vscode from 'vscode';
 import * as fs from 'fs';
 import * as path from 'path';
-import { injectable, inject } from 'inversify';
+import { injectable, inject, optional } from 'inversify';
 import { TYPES } from '../container/types';
 import { DjangoProjectAnalyzer } from './djangoProjectAnalyzer';
+import { ProjectShardManager } from './projectShardManager';
 
 export interface StaticFile {
     relativePath: string;
     absolutePath: string;
     type: 'css' | 'js' | 'image' | 'font' | 'other';
     size: number;
+    projectRoot?: string;
 }
 
 export interface StaticDirectory {
     path: string;
     priority: number; // Order in STATICFILES_DIRS
+    projectRoot?: string;
 }
 
 @injectable()
@@ -23,9 +26,16 @@ export class StaticFileAnalyzer {
     private staticDirectories: StaticDirectory[] = [];
     private fileWatcher: vscode.FileSystemWatcher | undefined;
     private isInitialized: boolean = false;
+    private scannedRoots: Map<string, Promise<void>> = new Map();
+    // Number of indexed files per relative path, across static directories
+    private relativePaths: Map<string, number> = new Map();
+    private readonly changeEmitter = new vscode.EventEmitter<string[]>();
+    // Fires with the relative paths of static files that were added or removed
+    readonly onDidChangeStaticFiles = this.changeEmitter.event;
 
     constructor(
-        @inject(TYPES.DjangoProjectAnalyzer) private projectAnalyzer: DjangoProjectAnalyzer
+        @inject(TYPES.DjangoProjectAnalyzer) private projectAnalyzer: DjangoProjectAnalyzer,
+        @inject(TYPES.ProjectShardManager) @optional() private shardManager?: ProjectShardManager
     ) {}
 
     public async initialize(): Promise<void> {
@@ -38,8 +48,41 @@ export class StaticFileAnalyzer {
         this.isInitialized = true;
     }
 
-    public getStaticFiles(): StaticFile[] {
-        return Array.from(this.staticFiles.values());
+    /**
+     * Get static files, limited to the project owning `forPath` when given
+     */
+    public getStaticFiles(forPath?: string): StaticFile[] {
+        const files = Array.from(this.staticFiles.values());
+        const root = forPath && this.shardManager ? this.shardManager.findRootForPath(forPath) : undefined;
+        if (!root) {
+            return files;
+        }
+        return files.filter(file => !file.projectRoot || file.projectRoot === root);
+    }
+
+    /**
+     * Look up an indexed static file by its absolute path
+     */
+    public getStaticFile(absolutePath: string): StaticFile | undefined {
+        return this.staticFiles.get(absolutePath);
+    }
+
+    /**
+     * Scan the static directories of the project owning a file if that has
+     * not happened yet. Projects nobody opens are never scanned.
+     */
+    public async ensureProjectScanned(filePath: string): Promise<void> {
+        const root = this.shardManager?.findRootForPath(filePath);
+        if (root) {
+            await this.analyzeProjectRoot(root);
+        }
+    }
+
+    /**
+     * Check whether a path usable in {% static %} exists in any static directory
+     */
+    public hasStaticFile(relativePath: string): boolean {
+        return this.relativePaths.has(relativePath);
     }
 
     public getStaticFilesInDirectory(directory: string): StaticFile[] {
@@ -62,31 +105,42 @@ export class StaticFileAnalyzer {
             return;
         }
 
-        const projectRoots = [projectRoot];
-        for (const projectRoot of projectRoots) {
-            // Parse settings.py to find static directories
-            const staticDirs = await this.parseStaticSettings(projectRoot);
-            
-            // Always check default 'static' directory
-            const defaultStaticDir = path.join(projectRoot, 'static');
-            if (fs.existsSync(defaultStaticDir)) {
-                staticDirs.unshift(defaultStaticDir);
-            }
+        await this.analyzeProjectRoot(projectRoot);
+    }
 
-            // Also check app-specific static directories
-            const appDirs = await this.findAppStaticDirectories(projectRoot);
-            staticDirs.push(...appDirs);
-
-            // Scan each directory
-            for (let i = 0; i < staticDirs.length; i++) {
-                const dir = staticDirs[i];
-                if (fs.existsSync(dir)) {
-                    this.staticDirectories.push({
-                        path: dir,
-                        priority: i
-                    });
-                    await this.scanStaticDirectory(dir);
-                }
+    private analyzeProjectRoot(projectRoot: string): Promise<void> {
+        let scan = this.scannedRoots.get(projectRoot);
+        if (!scan) {
+            scan = this.scanProjectRoot(projectRoot);
+            this.scannedRoots.set(projectRoot, scan);
+        }
+        return scan;
+    }
+
+    private async scanProjectRoot(projectRoot: string): Promise<void> {
+        // Parse settings.py to find static directories
+        const staticDirs = await this.parseStaticSettings(projectRoot);
+        
+        // Always check default 'static' directory
+        const defaultStaticDir = path.join(projectRoot, 'static');
+        if (fs.existsSync(defaultStaticDir)) {
+            staticDirs.unshift(defaultStaticDir);
+        }
+
+        // Also check app-specific static directories
+        const appDirs = await this.findAppStaticDirectories(projectRoot);
+        staticDirs.push(...appDirs);
+
+        // Scan each directory
+        for (let i = 0; i < staticDirs.length; i++) {
+            const dir = staticDirs[i];
+            if (fs.existsSync(dir)) {
+                this.staticDirectories.push({
+                    path: dir,
+                    priority: i,
+                    projectRoot
+                });
+                await this.scanStaticDirectory(dir, projectRoot);
             }
         }
     }
@@ -141,7 +195,7 @@ export class StaticFileAnalyzer {
         }
 
         // Search for any settings.py file
-        const files = await vscode.workspace.findFiles('**/settings.py', '**/node_modules/**', 5);
+        const files = await vscode.workspace.findFiles(this.getSearchPattern(projectRoot, '**/settings.py'), '**/node_modules/**', 5);
         if (files.length > 0) {
             return files[0].fsPath;
         }
@@ -153,7 +207,7 @@ export class StaticFileAnalyzer {
         const appStaticDirs: string[] = [];
         
         // Find all apps (directories with __init__.py)
-        const files = await vscode.workspace.findFiles('**/__init__.py', '**/node_modules/**');
+        const files = await vscode.workspace.findFiles(this.getSearchPattern(projectRoot, '**/__init__.py'), '**/node_modules/**');
         
         for (const file of files) {
             const appDir = path.dirname(file.fsPath);
@@ -167,22 +221,63 @@ export class StaticFileAnalyzer {
         return appStaticDirs;
     }
 
-    private async scanStaticDirectory(directory: string): Promise<void> {
+    /**
+     * Limit searches to the project root when the workspace has several projects
+     */
+    private getSearchPattern(projectRoot: string, glob: string): vscode.GlobPattern {
+        if (this.shardManager && this.shardManager.getProjectRoots().length > 1) {
+            return new vscode.RelativePattern(projectRoot, glob);
+        }
+        return glob;
+    }
+
+    private async scanStaticDirectory(directory: string, projectRoot: string): Promise<void> {
         const files = await this.walkDirectory(directory);
+        const added: string[] = [];
         
         for (const file of files) {
             const relativePath = path.relative(directory, file).replace(/\\/g, '/');
             const stats = fs.statSync(file);
             
-            this.staticFiles.set(file, {
+            this.setStaticFile({
                 relativePath,
                 absolutePath: file,
                 type: this.getFileType(file),
-                size: stats.size
+                size: stats.size,
+                projectRoot
             });
+            added.push(relativePath);
+        }
+
+        if (added.length > 0) {
+            this.changeEmitter.fire(added);
         }
     }
 
+    private setStaticFile(file: StaticFile): void {
+        const previous = this.staticFiles.get(file.absolutePath);
+        if (previous) {
+            this.deleteStaticFile(previous.absolutePath);
+        }
+        this.staticFiles.set(file.absolutePath, file);
+        this.relativePaths.set(file.relativePath, (this.relativePaths.get(file.relativePath) || 0) + 1);
+    }
+
+    private deleteStaticFile(absolutePath: string): StaticFile | undefined {
+        const file = this.staticFiles.get(absolutePath);
+        if (!file) {
+            return undefined;
+        }
+        this.staticFiles.delete(absolutePath);
+        const count = (this.relativePaths.get(file.relativePath) || 0) - 1;
+        if (count > 0) {
+            this.relativePaths.set(file.relativePath, count);
+        } else {
+            this.relativePaths.delete(file.relativePath);
+        }
+        return file;
+    }
+
     private async walkDirectory(dir: string): Promise<string[]> {
         const files: string[] = [];
         
@@ -219,11 +314,8 @@ export class StaticFileAnalyzer {
     }
 
     private setupFileWatcher(): void {
-        // Watch for changes in static directories
-        const pattern = new vscode.RelativePattern(
-            vscode.workspace.workspaceFolders?.[0] || '',
-            '**/static/**/*'
-        );
+        // Watch for changes in static directories of every workspace folder
+        const pattern = '**/static/**/*';
         
         this.fileWatcher = vscode.workspace.createFileSystemWatcher(pattern);
         
@@ -244,7 +336,10 @@ export class StaticFileAnalyzer {
         const filePath = uri.fsPath;
         
         if (changeType === 'delete') {
-            this.staticFiles.delete(filePath);
+            const removed = this.deleteStaticFile(filePath);
+            if (removed) {
+                this.changeEmitter.fire([removed.relativePath]);
+            }
         } else {
             // Find which static directory this file belongs to
             for (const dir of this.staticDirectories) {
@@ -252,12 +347,17 @@ export class StaticFileAnalyzer {
                     const relativePath = path.relative(dir.path, filePath).replace(/\\/g, '/');
                     const stats = fs.statSync(filePath);
                     
-                    this.staticFiles.set(filePath, {
+                    const isNew = !this.staticFiles.has(filePath);
+                    this.setStaticFile({
                         relativePath,
                         absolutePath: filePath,
                         type: this.getFileType(filePath),
-                        size: stats.size
+                        size: stats.size,
+                        projectRoot: dir.projectRoot
                     });
+                    if (isNew) {
+                        this.changeEmitter.fire([relativePath]);
+                    }
                     break;
                 }
             }
@@ -268,5 +368,6 @@ export class StaticFileAnalyzer {
         if (this.fileWatcher) {
             this.fileWatcher.dispose();
         }
+        this.changeEmitter.dispose();
     }
 }
\ No newline at end of file
@@ -0,0 +1,380 @@
+import * as vscode from 'vscode';
+import * as fs from 'fs';
+import * as path from 'path';
+import { injectable, inject } from 'inversify';
+import { TYPES } from '../container/types';
+import { DjangoProjectAnalyzer } from './djangoProjectAnalyzer';
+import { parseTemplate, ParsedTemplate } from '../parsers/templateParser';
+
+export interface IndexedTemplate extends ParsedTemplate {
+    // Loader name, e.g. "blog/post_detail.html"
+    name: string;
+    filePath: string;
+    // Position of the template directory in loader order
+    dirIndex: number;
+}
+
+export interface TemplateBlockLocation {
+    name: string;
+    filePath: string;
+    line: number;
+}
+
+/**
+ * Index of the project's templates: name resolution in Django's loader order
+ * (TEMPLATES DIRS, then app templates/ folders in INSTALLED_APPS order), the
+ * extends/include edges between templates and the blocks each one defines.
+ * Files are re-indexed one at a time as they change.
+ */
+@injectable()
+export class TemplateIndex {
+    private templateDirs: string[] = [];
+    private templates: Map<string, IndexedTemplate> = new Map();
+    // Templates sharing a name, in loader order; the first one wins
+    private byName: Map<string, IndexedTemplate[]> = new Map();
+    private extendedBy: Map<string, Set<string>> = new Map();
+    private includedBy: Map<string, Set<string>> = new Map();
+    private blockCache: Map<string, TemplateBlockLocation[]> = new Map();
+    private watchers: vscode.Disposable[] = [];
+    private initialization: Promise<void> | undefined;
+
+    private readonly changeEmitter = new vscode.EventEmitter<string[]>();
+    // Fires with the names of templates that were added, changed or removed
+    readonly onDidChangeTemplates = this.changeEmitter.event;
+
+    constructor(
+        @inject(TYPES.DjangoProjectAnalyzer) private projectAnalyzer: DjangoProjectAnalyzer
+    ) {}
+
+    initialize(): Promise<void> {
+        if (!this.initialization) {
+            this.initialization = this.build();
+        }
+        return this.initialization;
+    }
+
+    /**
+     * Rebuild from scratch, e.g. after TEMPLATES or INSTALLED_APPS changed
+     */
+    async rebuild(): Promise<void> {
+        this.initialization = this.build();
+        await this.initialization;
+    }
+
+    private async build(): Promise<void> {
+        this.clear();
+        this.templateDirs = this.findTemplateDirs();
+
+        for (let dirIndex = 0; dirIndex < this.templateDirs.length; dirIndex++) {
+            const dir = this.templateDirs[dirIndex];
+            for (const filePath of await this.walkDirectory(dir)) {
+                await this.indexFile(filePath, dirIndex);
+            }
+        }
+
+        this.setupWatchers();
+        this.changeEmitter.fire(Array.from(this.byName.keys()));
+    }
+
+    /**
+     * Template directories in the order Django's loaders search them
+     */
+    private findTemplateDirs(): string[] {
+        const projectRoot = this.projectAnalyzer.getProjectRoot();
+        if (!projectRoot) {
+            return [];
+        }
+
+        const dirs: string[] = [...this.projectAnalyzer.getTemplateDirs()];
+
+        for (const app of this.projectAnalyzer.getInstalledApps()) {
+            const appDir = this.findAppDirectory(projectRoot, app);
+            if (appDir) {
+                dirs.push(path.join(appDir, 'templates'));
+            }
+        }
+
+        // Without usable settings, fall back to the conventional locations
+        if (dirs.length === 0) {
+            dirs.push(path.join(projectRoot, 'templates'));
+            for (const entry of this.readDirectorySync(projectRoot)) {
+                if (entry.isDirectory() && !entry.name.startsWith('.') && entry.name !== 'node_modules') {
+                    dirs.push(path.join(projectRoot, entry.name, 'templates'));
+                }
+            }
+        }
+
+        return dirs.filter((dir, index) => dirs.indexOf(dir) === index && fs.existsSync(dir));
+    }
+
+    /**
+     * Package directory of an INSTALLED_APPS entry such as "blog" or
+     * "blog.apps.BlogConfig"; third-party apps outside the project are skipped
+     */
+    private findAppDirectory(projectRoot: string, app: string): string | undefined {
+        const parts = app.split('.');
+        for (let length = parts.length; length > 0; length--) {
+            const dir = path.join(projectRoot, ...parts.slice(0, length));
+            if (fs.existsSync(path.join(dir, '__init__.py')) || fs.existsSync(path.join(dir, 'apps.py'))) {
+                return dir;
+            }
+        }
+        return undefined;
+    }
+
+    private readDirectorySync(dir: string): fs.Dirent[] {
+        try {
+            return fs.readdirSync(dir, { withFileTypes: true });
+        } catch {
+            return [];
+        }
+    }
+
+    private async walkDirectory(dir: string): Promise<string[]> {
+        const files: string[] = [];
+        let entries: fs.Dirent[];
+        try {
+            entries = await fs.promises.readdir(dir, { withFileTypes: true });
+        } catch {
+            return files;
+        }
+
+        for (const entry of entries) {
+            const fullPath = path.join(dir, entry.name);
+            if (entry.isDirectory()) {
+                files.push(...await this.walkDirectory(fullPath));
+            } else {
+                files.push(fullPath);
+            }
+        }
+        return files;
+    }
+
+    private setupWatchers(): void {
+        this.watchers.forEach(watcher => watcher.dispose());
+        this.watchers = [];
+
+        for (const dir of this.templateDirs) {
+            const watcher = vscode.workspace.createFileSystemWatcher(new vscode.RelativePattern(dir, '**/*'));
+            this.watchers.push(
+                watcher,
+                watcher.onDidCreate(uri => this.updateFile(uri.fsPath)),
+                watcher.onDidChange(uri => this.updateFile(uri.fsPath)),
+                watcher.onDidDelete(uri => this.removeFile(uri.fsPath))
+            );
+        }
+    }
+
+    /**
+     * Re-index one template after it was created or changed
+     */
+    async updateFile(filePath: string): Promise<void> {
+        const dirIndex = this.templateDirs.findIndex(dir => filePath.startsWith(dir + path.sep));
+        if (dirIndex === -1) {
+            return;
+        }
+
+        const name = await this.indexFile(filePath, dirIndex);
+        if (name) {
+            this.changeEmitter.fire([name]);
+        }
+    }
+
+    removeFile(filePath: string): void {
+        const template = this.templates.get(filePath);
+        if (!template) {
+            return;
+        }
+
+        this.unlink(template);
+        this.changeEmitter.fire([template.name]);
+    }
+
+    private async indexFile(filePath: string, dirIndex: number): Promise<string | undefined> {
+        let parsed: ParsedTemplate;
+        try {
+            parsed = parseTemplate(await fs.promises.readFile(filePath, 'utf8'));
+        } catch (error) {
+            console.error(`Error indexing template ${filePath}:`, error);
+            return undefined;
+        }
+
+        const name = path.relative(this.templateDirs[dirIndex], filePath).split(path.sep).join('/');
+        const template: IndexedTemplate = { ...parsed, name, filePath, dirIndex };
+
+        const previous = this.templates.get(filePath);
+        if (previous) {
+            this.unlink(previous);
+        }
+
+        this.templates.set(filePath, template);
+
+        const candidates = this.byName.get(name) || [];
+        candidates.push(template);
+        candidates.sort((a, b) => a.dirIndex - b.dirIndex);
+        this.byName.set(name, candidates);
+
+        if (template.extends) {
+            this.addEdge(this.extendedBy, template.extends.name, filePath);
+        }
+        for (const include of template.includes) {
+            this.addEdge(this.includedBy, include.name, filePath);
+        }
+
+        this.blockCache.clear();
+        return name;
+    }
+
+    private unlink(template: IndexedTemplate): void {
+        this.templates.delete(template.filePath);
+
+        const candidates = this.byName.get(template.name)?.filter(candidate => candidate !== template);
+        if (candidates && candidates.length > 0) {
+            this.byName.set(template.name, candidates);
+        } else {
+            this.byName.delete(template.name);
+        }
+
+        if (template.extends) {
+            this.removeEdge(this.extendedBy, template.extends.name, template.filePath);
+        }
+        for (const include of template.includes) {
+            this.removeEdge(this.includedBy, include.name, template.filePath);
+        }
+
+        this.blockCache.clear();
+    }
+
+    private addEdge(edges: Map<string, Set<string>>, name: string, filePath: string): void {
+        let sources = edges.get(name);
+        if (!sources) {
+            sources = new Set();
+            edges.set(name, sources);
+        }
+        sources.add(filePath);
+    }
+
+    private removeEdge(edges: Map<string, Set<string>>, name: string, filePath: string): void {
+        const sources = edges.get(name);
+        if (sources) {
+            sources.delete(filePath);
+            if (sources.size === 0) {
+                edges.delete(name);
+            }
+        }
+    }
+
+    /**
+     * Template the loader would pick for a name
+     */
+    resolve(name: string): IndexedTemplate | undefined {
+        return this.byName.get(name)?.[0];
+    }
+
+    getTemplate(filePath: string): IndexedTemplate | undefined {
+        return this.templates.get(filePath);
+    }
+
+    getTemplateNames(): string[] {
+        return Array.from(this.byName.keys());
+    }
+
+    /**
+     * Files that {% extends %} a template name
+     */
+    getChildren(name: string): string[] {
+        return Array.from(this.extendedBy.get(name) || []);
+    }
+
+    /**
+     * Files that {% include %} a template name
+     */
+    getIncluders(name: string): string[] {
+        return Array.from(this.includedBy.get(name) || []);
+    }
+
+    /**
+     * Blocks a template defines or inherits, nearest definition first.
+     * The result is cached until any template changes.
+     */
+    getAvailableBlocks(filePath: string): TemplateBlockLocation[] {
+        const cached = this.blockCache.get(filePath);
+        if (cached) {
+            return cached;
+        }
+
+        const blocks: TemplateBlockLocation[] = [];
+        const seenBlocks = new Set<string>();
+        const visited = new Set<string>();
+        let template = this.templates.get(filePath);
+
+        while (template && !visited.has(template.filePath)) {
+            visited.add(template.filePath);
+            for (const block of template.blocks) {
+                if (!seenBlocks.has(block.name)) {
+                    seenBlocks.add(block.name);
+                    blocks.push({ name: block.name, filePath: template.filePath, line: block.line });
+                }
+            }
+            template = template.extends ? this.resolve(template.extends.name) : undefined;
+        }
+
+        this.blockCache.set(filePath, blocks);
+        return blocks;
+    }
+
+    /**
+     * Definition of a block as seen from a template name, searching its
+     * ancestors when the template itself does not define the block
+     */
+    findBlock(templateName: string, blockName: string): TemplateBlockLocation | undefined {
+        const template = this.resolve(templateName);
+        if (!template) {
+            return undefined;
+        }
+        return this.getAvailableBlocks(template.filePath).find(block => block.name === blockName);
+    }
+
+    /**
+     * Target of the {% extends %}, {% include %} or {% block %} tag under the
+     * cursor; a block leads to the definition it overrides
+     */
+    findTemplateTagDefinition(document: vscode.TextDocument, position: vscode.Position): vscode.Location | undefined {
+        const line = document.lineAt(position).text;
+        const tagRegex = /\{%-?\s*(extends|include|block)\s+(['"]?)([\w./-]+)\2/g;
+
+        let match: RegExpExecArray | null;
+        while ((match = tagRegex.exec(line)) !== null) {
+            if (position.character < match.index || position.character > match.index + match[0].length) {
+                continue;
+            }
+
+            if (match[1] !== 'block') {
+                const template = this.resolve(match[3]);
+                return template ? new vscode.Location(vscode.Uri.file(template.filePath), new vscode.Position(0, 0)) : undefined;
+            }
+
+            // Read the parent from the buffer, which may be unsaved
+            const parentName = parseTemplate(document.getText()).extends?.name;
+            const block = parentName ? this.findBlock(parentName, match[3]) : undefined;
+            return block ? new vscode.Location(vscode.Uri.file(block.filePath), new vscode.Position(block.line, 0)) : undefined;
+        }
+
+        return undefined;
+    }
+
+    private clear(): void {
+        this.templates.clear();
+        this.byName.clear();
+        this.extendedBy.clear();
+        this.includedBy.clear();
+        this.blockCache.clear();
+    }
+
+    dispose(): void {
+        this.watchers.forEach(watcher => watcher.dispose());
+        this.watchers = [];
+        this.changeEmitter.dispose();
+        this.clear();
+    }
+}
@@ -0,0 +1,512 @@
+import { injectable } from 'inversify';
+import * as vscode from 'vscode';
+import * as path from 'path';
+import * as fs from 'fs';
+import * as crypto from 'crypto';
+import { parseUrlConf, getRouteParams, ParsedUrlConf, UrlConfEntry } from '../parsers/urlConfParser';
+
+export interface UrlPattern {
+    name: string;
+    // Route as written in its own URLconf
+    pattern: string;
+    // Route from ROOT_URLCONF when the file is included from there, else the pattern
+    route: string;
+    // Kwargs of the route, including those captured by the include() prefixes
+    params: string[];
+    // Namespace path, e.g. "shop" or "shop:api"; the file's app_name when it
+    // is not reached from ROOT_URLCONF
+    appName?: string;
+    filePath: string;
+    view?: string;
+    line?: number;
+    character?: number;
+}
+
+interface UrlConfFile {
+    hash: string;
+    parsed: ParsedUrlConf;
+}
+
+/**
+ * Immutable set of the named URL patterns of the URLconf modules of the
+ * workspace or of one project. A new
+ * snapshot replaces it whenever a module changes, so readers can keep one
+ * for as long as they need it.
+ */
+export class UrlConfSnapshot {
+    private readonly byKey: Map<string, UrlPattern> = new Map();
+
+    constructor(readonly version: number, readonly patterns: readonly UrlPattern[]) {
+        // Like reverse(), the last pattern declared with a name wins
+        for (const pattern of patterns) {
+            this.byKey.set(UrlConfSnapshot.keyOf(pattern), pattern);
+        }
+    }
+
+    static keyOf(pattern: UrlPattern): string {
+        return pattern.appName ? `${pattern.appName}:${pattern.name}` : pattern.name;
+    }
+
+    get(name: string, namespace?: string): UrlPattern | undefined {
+        return this.byKey.get(namespace ? `${namespace}:${name}` : name);
+    }
+
+    has(key: string): boolean {
+        return this.byKey.has(key);
+    }
+
+    keys(): IterableIterator<string> {
+        return this.byKey.keys();
+    }
+}
+
+/**
+ * The one parser of URLconf modules. Each file is parsed once per content
+ * change and the include() tree is walked from every project's
+ * ROOT_URLCONF to qualify names with their namespaces; all URL consumers
+ * read the resulting snapshot, or the one of the project they serve.
+ */
+@injectable()
+export class UrlConfEngine {
+    private files: Map<string, UrlConfFile> = new Map();
+    // ROOT_URLCONF module by project root
+    private rootUrlconfs: Map<string, string> = new Map();
+    private snapshot: UrlConfSnapshot | undefined;
+    // Snapshots of single projects, so their URL names do not collide
+    private projectSnapshots: Map<string, UrlConfSnapshot> = new Map();
+    private version = 0;
+    // Patterns of the include() trees of the ROOT_URLCONFs, by project root
+    private treePatterns: Map<string, UrlPattern[]> = new Map();
+    // Files of the trees and the module paths their include()s look for
+    private treeFiles: Set<string> = new Set();
+    private reached: Set<string> = new Set();
+    // Patterns of the modules no ROOT_URLCONF includes, by file
+    private filePatterns: Map<string, UrlPattern[]> = new Map();
+    private changedFiles: Set<string> = new Set();
+    // Set when the patterns no longer reflect the files and roots
+    private stale = false;
+    private treeStale = false;
+    private batchDepth = 0;
+    private scanPromise: Promise<void> | undefined;
+
+    private readonly patternsEmitter = new vscode.EventEmitter<string[]>();
+    private readonly filesEmitter = new vscode.EventEmitter<string[]>();
+    // Fires with the keys ("name" or "namespace:name") of patterns that were added, removed or moved
+    readonly onDidChangePatterns = this.patternsEmitter.event;
+    // Fires with the URLconf files whose content changed or that were removed
+    readonly onDidChangeFiles = this.filesEmitter.event;
+
+    /**
+     * Parse a file unless its content is unchanged. Returns whether it was parsed.
+     */
+    updateFile(filePath: string, content: string): boolean {
+        const hash = crypto.createHash('sha1').update(content).digest('hex');
+        if (this.files.get(filePath)?.hash === hash) {
+            return false;
+        }
+
+        this.files.set(filePath, { hash, parsed: parseUrlConf(content) });
+        this.markChanged(filePath);
+        return true;
+    }
+
+    removeFile(filePath: string): void {
+        if (this.files.delete(filePath)) {
+            this.markChanged(filePath);
+        }
+    }
+
+    /**
+     * Read a file from disk into the engine and return its parsed form
+     */
+    async readFile(filePath: string): Promise<ParsedUrlConf | undefined> {
+        try {
+            const content = await fs.promises.readFile(filePath, 'utf8');
+            this.updateFile(filePath, content);
+            return this.files.get(filePath)?.parsed;
+        } catch (error) {
+            console.error(`Error reading URLconf ${filePath}:`, error);
+            this.removeFile(filePath);
+            return undefined;
+        }
+    }
+
+    getParsed(filePath: string): ParsedUrlConf | undefined {
+        return this.files.get(filePath)?.parsed;
+    }
+
+    isTracked(filePath: string): boolean {
+        return this.files.has(filePath);
+    }
+
+    /**
+     * Set the ROOT_URLCONF of a project; undefined forgets it
+     */
+    setRootUrlconf(projectRoot: string, module: string | undefined): void {
+        if (this.rootUrlconfs.get(projectRoot) === module) {
+            return;
+        }
+        if (module) {
+            this.rootUrlconfs.set(projectRoot, module);
+        } else {
+            this.rootUrlconfs.delete(projectRoot);
+        }
+        this.stale = true;
+        this.treeStale = true;
+        this.flush();
+    }
+
+    /**
+     * The current snapshot; during a batch of updates, the one from before it.
+     * It is assembled from the patterns of each file on the first read after
+     * a change. With a project root, only the patterns of that project's
+     * include() tree and of the modules below its root are in it.
+     */
+    getSnapshot(projectRoot?: string): UrlConfSnapshot {
+        if (projectRoot) {
+            let snapshot = this.projectSnapshots.get(projectRoot);
+            if (!snapshot) {
+                snapshot = this.assembleSnapshot(projectRoot);
+                this.projectSnapshots.set(projectRoot, snapshot);
+            }
+            return snapshot;
+        }
+        if (!this.snapshot) {
+            this.snapshot = this.assembleSnapshot();
+        }
+        return this.snapshot;
+    }
+
+    /**
+     * Read every urls.py of the workspace plus the modules their include()
+     * calls name. Files whose content did not change are not parsed again.
+     */
+    async scanWorkspace(): Promise<void> {
+        const urlFiles = await vscode.workspace.findFiles('**/urls.py', '**/node_modules/**');
+
+        await this.batch(async () => {
+            for (const file of urlFiles) {
+                await this.readFile(file.fsPath);
+            }
+            await this.readIncludedModules();
+        });
+    }
+
+    /**
+     * Scan the workspace once; later calls wait for the same scan
+     */
+    ensureScanned(): Promise<void> {
+        if (!this.scanPromise) {
+            this.scanPromise = this.scanWorkspace();
+        }
+        return this.scanPromise;
+    }
+
+    /**
+     * Drop the content hashes so that the next update of each file parses it
+     */
+    clearCache(): void {
+        for (const file of this.files.values()) {
+            file.hash = '';
+        }
+    }
+
+    /**
+     * Run several updates, or an async action making them, and publish one
+     * snapshot afterwards
+     */
+    batch<T>(action: () => T): T {
+        const endBatch = () => {
+            this.batchDepth--;
+            this.flush();
+        };
+
+        this.batchDepth++;
+        let result: T;
+        try {
+            result = action();
+        } catch (error) {
+            endBatch();
+            throw error;
+        }
+        if (result instanceof Promise) {
+            return result.finally(endBatch) as unknown as T;
+        }
+        endBatch();
+        return result;
+    }
+
+    private markChanged(filePath: string): void {
+        this.changedFiles.add(filePath);
+        this.stale = true;
+        this.flush();
+    }
+
+    /**
+     * Collect the patterns of the changed files again. The include() trees
+     * are walked again only when a changed file is part of one (or may
+     * join one); other modules only collect their own patterns.
+     */
+    private flush(): void {
+        if (this.batchDepth > 0 || !this.stale) {
+            return;
+        }
+
+        this.stale = false;
+        const changedFiles = Array.from(this.changedFiles);
+        this.changedFiles.clear();
+        const changedKeys = new Set<string>();
+        const standaloneFiles = new Set(changedFiles);
+
+        if (this.treeStale || changedFiles.some(filePath => this.treeFiles.has(filePath))) {
+            const before = Array.from(this.treePatterns.values()).flat();
+            const reachedBefore = this.reached;
+            this.collectTrees();
+            addChangedKeys(before, Array.from(this.treePatterns.values()).flat(), changedKeys);
+            // Modules that were included from a tree before or are now
+            for (const filePath of [...reachedBefore, ...this.reached]) {
+                if (reachedBefore.has(filePath) !== this.reached.has(filePath)) {
+                    standaloneFiles.add(filePath);
+                }
+            }
+        }
+
+        for (const filePath of standaloneFiles) {
+            const before = this.filePatterns.get(filePath) || [];
+            const file = this.files.get(filePath);
+            let after: UrlPattern[] = [];
+            if (file && !this.reached.has(filePath)) {
+                // Modules not included from a ROOT_URLCONF keep their app_name
+                const namespaces = file.parsed.appName ? [file.parsed.appName] : [];
+                this.collect(filePath, file.parsed.entries, namespaces, '', [], after, new Set([filePath]));
+                freezePatterns(after);
+                this.filePatterns.set(filePath, after);
+            } else {
+                this.filePatterns.delete(filePath);
+            }
+            addChangedKeys(before, after, changedKeys);
+        }
+
+        if (changedFiles.length > 0 || changedKeys.size > 0) {
+            this.snapshot = undefined;
+            this.projectSnapshots.clear();
+        }
+        if (changedFiles.length > 0) {
+            this.filesEmitter.fire(changedFiles);
+        }
+        if (changedKeys.size > 0) {
+            this.patternsEmitter.fire(Array.from(changedKeys));
+        }
+    }
+
+    /**
+     * Walk the include() tree of every project's ROOT_URLCONF
+     */
+    private collectTrees(): void {
+        this.treeStale = false;
+        this.treePatterns = new Map();
+        this.treeFiles = new Set();
+        this.reached = new Set();
+
+        for (const [projectRoot, module] of this.rootUrlconfs) {
+            this.getModuleCandidates(projectRoot, module).forEach(filePath => this.treeFiles.add(filePath));
+            const filePath = this.locateModule(projectRoot, module);
+            const root = filePath ? this.files.get(filePath) : undefined;
+            const patterns: UrlPattern[] = [];
+            if (filePath && root) {
+                this.reached.add(filePath);
+                this.collect(filePath, root.parsed.entries, [], '', [], patterns, new Set([filePath]), this.reached, projectRoot);
+            }
+            this.treePatterns.set(projectRoot, freezePatterns(patterns));
+        }
+    }
+
+    private assembleSnapshot(projectRoot?: string): UrlConfSnapshot {
+        const trees = projectRoot ? [this.treePatterns.get(projectRoot) || []] : Array.from(this.treePatterns.values());
+        const patterns: UrlPattern[] = trees.flat();
+        for (const filePath of this.files.keys()) {
+            if (!projectRoot || this.isInProject(projectRoot, filePath)) {
+                patterns.push(...this.filePatterns.get(filePath) || []);
+            }
+        }
+        return new UrlConfSnapshot(++this.version, Object.freeze(patterns));
+    }
+
+    /**
+     * Whether a file is below a project root and not below a project nested in it
+     */
+    private isInProject(projectRoot: string, filePath: string): boolean {
+        if (!this.isBelow(projectRoot, filePath)) {
+            return false;
+        }
+        for (const otherRoot of this.rootUrlconfs.keys()) {
+            if (otherRoot.length > projectRoot.length && this.isBelow(otherRoot, filePath)) {
+                return false;
+            }
+        }
+        return true;
+    }
+
+    /**
+     * Add the named patterns of a pattern list, following include()s of
+     * other modules when a project root is given
+     */
+    private collect(
+        filePath: string,
+        entries: UrlConfEntry[],
+        namespaces: string[],
+        routePrefix: string,
+        params: string[],
+        patterns: UrlPattern[],
+        ancestors: Set<string>,
+        reached?: Set<string>,
+        projectRoot?: string
+    ): void {
+        for (const entry of entries) {
+            const route = routePrefix + entry.route;
+            const routeParams = [...params, ...getRouteParams(entry.route, entry.isRegex)];
+
+            if (entry.kind === 'pattern') {
+                if (entry.name) {
+                    patterns.push({
+                        name: entry.name,
+                        pattern: entry.route,
+                        route,
+                        params: routeParams,
+                        appName: namespaces.length > 0 ? namespaces.join(':') : undefined,
+                        filePath,
+                        view: entry.view,
+                        line: entry.line,
+                        character: entry.column
+                    });
+                }
+                continue;
+            }
+
+            if (entry.entries) {
+                const namespace = entry.namespace || entry.appName;
+                this.collect(filePath, entry.entries, namespace ? [...namespaces, namespace] : namespaces,
+                    route, routeParams, patterns, ancestors, reached, projectRoot);
+                continue;
+            }
+
+            if (!reached || !projectRoot || !entry.module) {
+                continue;
+            }
+            this.getModuleCandidates(projectRoot, entry.module).forEach(candidate => this.treeFiles.add(candidate));
+            const childPath = this.locateModule(projectRoot, entry.module);
+            const child = childPath ? this.files.get(childPath) : undefined;
+            if (!childPath || !child || ancestors.has(childPath)) {
+                continue;
+            }
+
+            // An instance namespace overrides the included module's app_name
+            const namespace = entry.namespace || entry.appName || child.parsed.appName;
+            reached.add(childPath);
+            ancestors.add(childPath);
+            this.collect(childPath, child.parsed.entries, namespace ? [...namespaces, namespace] : namespaces,
+                route, routeParams, patterns, ancestors, reached, projectRoot);
+            ancestors.delete(childPath);
+        }
+    }
+
+    /**
+     * Read the modules named by include() calls that are not loaded yet,
+     * e.g. "api.routes" next to a urls.py
+     */
+    private async readIncludedModules(): Promise<void> {
+        const attempted = new Set<string>();
+        let pending = this.findIncludedFiles().filter(filePath => !this.files.has(filePath));
+
+        while (pending.length > 0) {
+            for (const filePath of pending) {
+                attempted.add(filePath);
+                if (fs.existsSync(filePath)) {
+                    await this.readFile(filePath);
+                }
+            }
+            pending = this.findIncludedFiles().filter(filePath => !this.files.has(filePath) && !attempted.has(filePath));
+        }
+    }
+
+    private findIncludedFiles(): string[] {
+        const result = new Set<string>();
+        const visit = (entries: UrlConfEntry[], projectRoot: string) => {
+            for (const entry of entries) {
+                if (entry.kind !== 'include') {
+                    continue;
+                }
+                if (entry.entries) {
+                    visit(entry.entries, projectRoot);
+                } else if (entry.module) {
+                    result.add(this.getModuleCandidates(projectRoot, entry.module)[0]);
+                }
+            }
+        };
+
+        for (const [projectRoot, module] of this.rootUrlconfs) {
+            result.add(this.getModuleCandidates(projectRoot, module)[0]);
+            for (const [filePath, file] of this.files) {
+                if (this.isBelow(projectRoot, filePath)) {
+                    visit(file.parsed.entries, projectRoot);
+                }
+            }
+        }
+        return Array.from(result);
+    }
+
+    /**
+     * Loaded file of a dotted module path below a project root
+     */
+    private locateModule(projectRoot: string, module: string): string | undefined {
+        return this.getModuleCandidates(projectRoot, module).find(filePath => this.files.has(filePath));
+    }
+
+    private getModuleCandidates(projectRoot: string, module: string): string[] {
+        const relative = path.join(projectRoot, ...module.split('.'));
+        return [`${relative}.py`, path.join(relative, '__init__.py')];
+    }
+
+    private isBelow(projectRoot: string, filePath: string): boolean {
+        const relative = path.relative(projectRoot, filePath);
+        return !relative.startsWith('..') && !path.isAbsolute(relative);
+    }
+
+    dispose(): void {
+        this.patternsEmitter.dispose();
+        this.filesEmitter.dispose();
+        this.files.clear();
+        this.treePatterns.clear();
+        this.filePatterns.clear();
+        this.snapshot = undefined;
+        this.projectSnapshots.clear();
+    }
+}
+
+function freezePatterns(patterns: UrlPattern[]): UrlPattern[] {
+    patterns.forEach(pattern => {
+        Object.freeze(pattern.params);
+        Object.freeze(pattern);
+    });
+    return patterns;
+}
+
+/**
+ * Add the keys of the patterns that were added, removed or moved
+ */
+function addChangedKeys(before: UrlPattern[], after: UrlPattern[], changedKeys: Set<string>): void {
+    const previous = new Map(before.map(pattern => [UrlConfSnapshot.keyOf(pattern), pattern]));
+    const current = new Map(after.map(pattern => [UrlConfSnapshot.keyOf(pattern), pattern]));
+    for (const [key, pattern] of previous) {
+        const other = current.get(key);
+        if (!other || other.filePath !== pattern.filePath || other.route !== pattern.route ||
+            other.line !== pattern.line || other.view !== pattern.view) {
+            changedKeys.add(key);
+        }
+    }
+    for (const key of current.keys()) {
+        if (!previous.has(key)) {
+            changedKeys.add(key);
+        }
+    }
+}
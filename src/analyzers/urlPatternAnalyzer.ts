@@ -1,148 +1,51 @@
-import { injectable } from 'inversify';
+import { injectable, inject, optional } from 'inversify';
 import * as vscode from 'vscode';
-import * as path from 'path';
+import { TYPES } from '../container/types';
+import { UrlConfEngine, UrlConfSnapshot, UrlPattern } from './urlConfEngine';
 
-export interface UrlPattern {
-    name: string;
-    pattern: string;
-    params: string[];
-    appName?: string;
-    filePath: string;
-    view?: string;
-}
-
-interface FileCache {
-    content: string;
-    timestamp: number;
-    patterns: UrlPattern[];
-}
+export type { UrlPattern } from './urlConfEngine';
 
+/**
+ * Named URL patterns for completion, navigation and diagnostics, read from
+ * the shared URLconf engine
+ */
 @injectable()
 export class UrlPatternAnalyzer {
-    private urlPatterns: Map<string, UrlPattern> = new Map();
-    private fileCache: Map<string, FileCache> = new Map();
-    private readonly cacheDuration = 5000; // 5 seconds
-    
-    async analyzeUrlFile(content: string, filePath: string): Promise<void> {
-        // Check cache
-        const cached = this.fileCache.get(filePath);
-        if (cached && Date.now() - cached.timestamp < this.cacheDuration) {
-            if (cached.content === content) {
-                return; // Already analyzed
-            }
-        }
-
-        const patterns = this.parseUrlPatterns(content, filePath);
-        
-        // Cache the results
-        this.fileCache.set(filePath, {
-            content,
-            timestamp: Date.now(),
-            patterns
-        });
-
-        // Update global patterns map
-        // Remove old patterns from this file
-        for (const [key, pattern] of this.urlPatterns.entries()) {
-            if (pattern.filePath === filePath) {
-                this.urlPatterns.delete(key);
-            }
-        }
-
-        // Add new patterns
-        for (const pattern of patterns) {
-            const key = pattern.appName ? `${pattern.appName}:${pattern.name}` : pattern.name;
-            this.urlPatterns.set(key, pattern);
-        }
+    private engine: UrlConfEngine;
+    // Fires with the keys ("name" or "app:name") of URL patterns that were added or removed
+    readonly onDidChangePatterns: vscode.Event<string[]>;
+
+    constructor(
+        @inject(TYPES.UrlConfEngine) @optional() engine?: UrlConfEngine
+    ) {
+        this.engine = engine || new UrlConfEngine();
+        this.onDidChangePatterns = this.engine.onDidChangePatterns;
     }
 
-    private parseUrlPatterns(content: string, filePath: string): UrlPattern[] {
-        const patterns: UrlPattern[] = [];
-        const lines = content.split('\n');
-        
-        // Extract app_name if present
-        let appName: string | undefined;
-        const appNameMatch = content.match(/app_name\s*=\s*['"]([^'"]+)['"]/);
-        if (appNameMatch) {
-            appName = appNameMatch[1];
-        }
-
-        // Parse path() and re_path() patterns
-        // This regex handles multi-line patterns and various formats
-        // Updated to handle class-based views with .as_view()
-        // Using a more specific approach to handle nested parentheses
-        const pathRegex = /(?:path|re_path)\s*\(\s*r?['"]([^'"]*)['\"]\s*,\s*([^,]+(?:\([^)]*\))?[^,]*)(?:\s*,\s*name\s*=\s*['"]([^'"]+)['"])?\s*\)/g;
-        
-        let match;
-        while ((match = pathRegex.exec(content)) !== null) {
-            const [_, pattern, view, name] = match;
-            
-            if (name) {
-                const params = this.extractUrlParams(pattern);
-                patterns.push({
-                    name,
-                    pattern,
-                    params,
-                    appName: appName,
-                    filePath: filePath,
-                    view: view.trim()
-                });
-            }
-        }
-
-        // Parse include() patterns
-        const includeRegex = /path\s*\(\s*['"]([^'"]+)['"]\s*,\s*include\s*\(\s*['"]([^'"]+)['"]\s*\)/g;
-        while ((match = includeRegex.exec(content)) !== null) {
-            const [_, prefix, module] = match;
-            // Store include information for later resolution
-            // In a real implementation, we would recursively analyze the included module
-        }
-
-        return patterns;
+    async analyzeUrlFile(content: string, filePath: string): Promise<void> {
+        this.engine.updateFile(filePath, content);
     }
 
-    private extractUrlParams(pattern: string): string[] {
-        const params: string[] = [];
-        
-        // Django path converters: <type:name>
-        const pathParamRegex = /<(?:[^:]+:)?([^>]+)>/g;
-        let match;
-        while ((match = pathParamRegex.exec(pattern)) !== null) {
-            params.push(match[1]);
-        }
-
-        // Django re_path named groups: (?P<name>...)
-        const rePathParamRegex = /\(\?P<([^>]+)>/g;
-        while ((match = rePathParamRegex.exec(pattern)) !== null) {
-            params.push(match[1]);
-        }
-
-        return params;
+    /**
+     * Patterns of the whole workspace, or of one project when its root is given
+     */
+    getSnapshot(projectRoot?: string): UrlConfSnapshot {
+        return this.engine.getSnapshot(projectRoot);
     }
 
-    getAllUrlPatterns(): UrlPattern[] {
-        return Array.from(this.urlPatterns.values());
+    getAllUrlPatterns(projectRoot?: string): readonly UrlPattern[] {
+        return this.engine.getSnapshot(projectRoot).patterns;
     }
 
-    getUrlPattern(name: string, appName?: string): UrlPattern | undefined {
-        const key = appName ? `${appName}:${name}` : name;
-        return this.urlPatterns.get(key);
+    getUrlPattern(name: string, appName?: string, projectRoot?: string): UrlPattern | undefined {
+        return this.engine.getSnapshot(projectRoot).get(name, appName);
     }
 
     async scanWorkspace(): Promise<void> {
-        const urlFiles = await vscode.workspace.findFiles('**/urls.py', '**/node_modules/**');
-        
-        for (const file of urlFiles) {
-            try {
-                const document = await vscode.workspace.openTextDocument(file);
-                await this.analyzeUrlFile(document.getText(), file.fsPath);
-            } catch (error) {
-                console.error(`Error analyzing URL file ${file.fsPath}:`, error);
-            }
-        }
+        await this.engine.scanWorkspace();
     }
 
     clearCache(): void {
-        this.fileCache.clear();
+        this.engine.clearCache();
     }
-}
\ No newline at end of file
+}
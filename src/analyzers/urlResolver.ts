@@ -0,0 +1,385 @@
+import { injectable, inject, optional } from 'inversify';
+import * as vscode from 'vscode';
+import * as path from 'path';
+import * as fs from 'fs';
+import { TYPES } from '../container/types';
+import { DjangoProjectAnalyzer } from './djangoProjectAnalyzer';
+import { UrlConfEntry } from '../parsers/urlConfParser';
+import { UrlConfEngine } from './urlConfEngine';
+
+export interface UrlResolution {
+    view: string;
+    // URL name qualified with its namespaces, e.g. "shop:order-detail"
+    name?: string;
+    // Named groups of the matched patterns
+    kwargs: { [name: string]: string };
+    // Unnamed groups, only used by Django when there are no named groups
+    args: string[];
+    // Full route from the root URLconf, e.g. "shop/orders/<int:pk>/"
+    route: string;
+    filePath: string;
+    line: number;
+}
+
+interface CompiledEntry {
+    index: number;
+    entry: UrlConfEntry;
+    regex: RegExp;
+    // Set for include([...]) with an inline pattern list
+    inline?: ResolverNode;
+}
+
+/**
+ * Compiled URLconf module. Entries are partitioned by the literal first path
+ * segment of their route so a lookup only tries the entries that can match.
+ */
+interface ResolverNode {
+    module: string;
+    filePath: string;
+    appName?: string;
+    partitions: Map<string, CompiledEntry[]>;
+    // Entries whose first segment is not literal; tried for every path
+    dynamic: CompiledEntry[];
+}
+
+const CONVERTERS: { [name: string]: string } = {
+    str: '[^/]+',
+    int: '[0-9]+',
+    slug: '[-a-zA-Z0-9_]+',
+    uuid: '[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}',
+    path: '.+'
+};
+
+const REGEX_META = /[\\^$.|?*+()[\]{}]/;
+
+/**
+ * Resolves a request path to the view that handles it by walking the
+ * include() tree from ROOT_URLCONF, like django.urls.resolve(). Each URLconf
+ * module is compiled once from the shared engine's parse; when a file changes
+ * only its module is recompiled.
+ */
+@injectable()
+export class UrlResolver {
+    private nodes: Map<string, ResolverNode> = new Map();
+    private loading: Map<string, Promise<ResolverNode | undefined>> = new Map();
+    private missingModules: Set<string> = new Set();
+    private fileModules: Map<string, Set<string>> = new Map();
+    private disposables: vscode.Disposable[] = [];
+    private engine: UrlConfEngine;
+
+    constructor(
+        @inject(TYPES.DjangoProjectAnalyzer) private projectAnalyzer: DjangoProjectAnalyzer,
+        @inject(TYPES.UrlConfEngine) @optional() engine?: UrlConfEngine
+    ) {
+        this.engine = engine || new UrlConfEngine();
+        this.disposables.push(
+            this.engine.onDidChangeFiles(filePaths => {
+                filePaths.forEach(filePath => this.invalidateFile(filePath));
+                // A new module may satisfy an include() that failed before
+                this.missingModules.clear();
+            })
+        );
+    }
+
+    /**
+     * Resolve a path such as "/shop/orders/42/" (a full URL or a path with a
+     * query string is accepted too)
+     */
+    async resolve(urlPath: string): Promise<UrlResolution | undefined> {
+        const rootModule = this.projectAnalyzer.getRootUrlconf();
+        if (!rootModule) {
+            return undefined;
+        }
+
+        const root = await this.getNode(rootModule);
+        if (!root) {
+            return undefined;
+        }
+
+        return this.resolveIn(root, this.normalizePath(urlPath), '', [], {}, []);
+    }
+
+    private async resolveIn(
+        node: ResolverNode,
+        remaining: string,
+        routePrefix: string,
+        namespaces: string[],
+        kwargs: { [name: string]: string },
+        args: string[]
+    ): Promise<UrlResolution | undefined> {
+        for (const compiled of this.getCandidates(node, remaining)) {
+            const match = compiled.regex.exec(remaining);
+            if (!match) {
+                continue;
+            }
+
+            const groups = match.groups || {};
+            const matchKwargs = { ...kwargs, ...groups };
+            const named = new Set(Object.values(groups));
+            const matchArgs = [...args, ...match.slice(1).filter(value => value !== undefined && !named.has(value))];
+            const entry = compiled.entry;
+            const route = routePrefix + entry.route;
+
+            if (entry.kind === 'pattern') {
+                return {
+                    view: entry.view,
+                    name: entry.name ? [...namespaces, entry.name].join(':') : undefined,
+                    kwargs: matchKwargs,
+                    args: Object.keys(matchKwargs).length > 0 ? [] : matchArgs,
+                    route,
+                    filePath: node.filePath,
+                    line: entry.line
+                };
+            }
+
+            const child = compiled.inline || (entry.module ? await this.getNode(entry.module) : undefined);
+            if (!child) {
+                continue;
+            }
+
+            const namespace = entry.namespace || entry.appName || (compiled.inline ? undefined : child.appName);
+            const result = await this.resolveIn(
+                child,
+                remaining.substring(match[0].length),
+                route,
+                namespace ? [...namespaces, namespace] : namespaces,
+                matchKwargs,
+                matchArgs
+            );
+            if (result) {
+                return result;
+            }
+        }
+
+        return undefined;
+    }
+
+    /**
+     * Entries of the remaining path's first-segment partition plus the
+     * dynamic ones, in declaration order
+     */
+    private getCandidates(node: ResolverNode, remaining: string): CompiledEntry[] {
+        const slash = remaining.indexOf('/');
+        const segment = slash === -1 ? remaining : remaining.substring(0, slash);
+        const partition = node.partitions.get(segment);
+        if (!partition) {
+            return node.dynamic;
+        }
+        if (node.dynamic.length === 0) {
+            return partition;
+        }
+
+        const merged: CompiledEntry[] = [];
+        let i = 0;
+        let j = 0;
+        while (i < partition.length || j < node.dynamic.length) {
+            if (j >= node.dynamic.length || (i < partition.length && partition[i].index < node.dynamic[j].index)) {
+                merged.push(partition[i++]);
+            } else {
+                merged.push(node.dynamic[j++]);
+            }
+        }
+        return merged;
+    }
+
+    private normalizePath(urlPath: string): string {
+        let result = urlPath.replace(/^[a-z][a-z0-9+.-]*:\/\/[^/]*/i, '');
+        result = result.replace(/[?#].*$/, '');
+        return result.replace(/^\/+/, '');
+    }
+
+    private async getNode(module: string): Promise<ResolverNode | undefined> {
+        const existing = this.nodes.get(module);
+        if (existing) {
+            return existing;
+        }
+        if (this.missingModules.has(module)) {
+            return undefined;
+        }
+
+        let pending = this.loading.get(module);
+        if (!pending) {
+            pending = this.loadNode(module).finally(() => this.loading.delete(module));
+            this.loading.set(module, pending);
+        }
+        return pending;
+    }
+
+    private async loadNode(module: string): Promise<ResolverNode | undefined> {
+        const filePath = this.locateModule(module);
+        if (!filePath) {
+            this.missingModules.add(module);
+            return undefined;
+        }
+
+        try {
+            const parsed = await this.engine.readFile(filePath);
+            if (!parsed) {
+                return undefined;
+            }
+            const node = this.compileNode(module, filePath, parsed.entries, parsed.appName);
+
+            this.nodes.set(module, node);
+            let modules = this.fileModules.get(filePath);
+            if (!modules) {
+                modules = new Set();
+                this.fileModules.set(filePath, modules);
+            }
+            modules.add(module);
+
+            return node;
+        } catch (error) {
+            console.error(`Error loading URLconf ${module}:`, error);
+            return undefined;
+        }
+    }
+
+    private compileNode(module: string, filePath: string, entries: UrlConfEntry[], appName?: string): ResolverNode {
+        const node: ResolverNode = { module, filePath, appName, partitions: new Map(), dynamic: [] };
+
+        entries.forEach((entry, index) => {
+            const regex = this.compileRoute(entry);
+            if (!regex) {
+                return;
+            }
+
+            const compiled: CompiledEntry = { index, entry, regex };
+            if (entry.kind === 'include' && entry.entries) {
+                compiled.inline = this.compileNode(module, filePath, entry.entries);
+            }
+
+            const segment = this.getLiteralSegment(entry);
+            if (segment === undefined) {
+                node.dynamic.push(compiled);
+            } else {
+                let partition = node.partitions.get(segment);
+                if (!partition) {
+                    partition = [];
+                    node.partitions.set(segment, partition);
+                }
+                partition.push(compiled);
+            }
+        });
+
+        return node;
+    }
+
+    /**
+     * Literal first path segment of a route, when the route can only match
+     * paths starting with exactly that segment
+     */
+    private getLiteralSegment(entry: UrlConfEntry): string | undefined {
+        let route = entry.route;
+        if (entry.isRegex) {
+            route = route.replace(/^\^/, '');
+            // Stop at the first regex metacharacter
+            const meta = route.search(REGEX_META);
+            const literal = meta === -1 ? route : route.substring(0, meta);
+            // Regex routes are not anchored at the end unless they say so,
+            // so only a literal segment followed by a slash is safe
+            const slash = literal.indexOf('/');
+            return slash > 0 ? literal.substring(0, slash) : undefined;
+        }
+
+        const slash = route.indexOf('/');
+        const segment = slash === -1 ? route : route.substring(0, slash);
+        if (!segment || segment.includes('<')) {
+            return undefined;
+        }
+        // A final route without a slash must match the whole remaining path;
+        // an include prefix without one may match a longer segment
+        return slash === -1 && entry.kind === 'include' ? undefined : segment;
+    }
+
+    private compileRoute(entry: UrlConfEntry): RegExp | undefined {
+        const isFinal = entry.kind === 'pattern';
+
+        try {
+            if (entry.isRegex) {
+                let source = entry.route
+                    .replace(/\(\?P<(\w+)>/g, '(?<$1>')
+                    .replace(/\(\?P=(\w+)\)/g, '\\k<$1>')
+                    .replace(/\\Z$/, '$')
+                    .replace(/^\^/, '');
+                if (!isFinal) {
+                    source = source.replace(/\$$/, '');
+                }
+                return new RegExp('^' + source);
+            }
+
+            let source = '';
+            const converterRegex = /<(?:(\w+):)?(\w+)>/g;
+            let lastIndex = 0;
+            let match: RegExpExecArray | null;
+            while ((match = converterRegex.exec(entry.route)) !== null) {
+                source += this.escapeRegex(entry.route.substring(lastIndex, match.index));
+                source += `(?<${match[2]}>${CONVERTERS[match[1] || 'str'] || CONVERTERS.str})`;
+                lastIndex = match.index + match[0].length;
+            }
+            source += this.escapeRegex(entry.route.substring(lastIndex));
+
+            return new RegExp('^' + source + (isFinal ? '$' : ''));
+        } catch (error) {
+            console.warn(`Skipping URL pattern with unsupported regex "${entry.route}":`, error);
+            return undefined;
+        }
+    }
+
+    private escapeRegex(text: string): string {
+        return text.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+    }
+
+    /**
+     * Map a dotted module path to a file in the project
+     */
+    private locateModule(module: string): string | undefined {
+        const roots: string[] = [];
+        const projectRoot = this.projectAnalyzer.getProjectRoot();
+        if (projectRoot) {
+            roots.push(projectRoot);
+        }
+        vscode.workspace.workspaceFolders?.forEach(folder => {
+            if (!roots.includes(folder.uri.fsPath)) {
+                roots.push(folder.uri.fsPath);
+            }
+        });
+
+        const relative = path.join(...module.split('.'));
+        for (const root of roots) {
+            for (const candidate of [`${relative}.py`, path.join(relative, '__init__.py')]) {
+                const filePath = path.join(root, candidate);
+                if (fs.existsSync(filePath)) {
+                    return filePath;
+                }
+            }
+        }
+        return undefined;
+    }
+
+    /**
+     * Drop the compiled modules of a changed file; they are recompiled on the
+     * next lookup while every other module keeps its compiled form
+     */
+    invalidateFile(filePath: string): void {
+        const modules = this.fileModules.get(filePath);
+        if (!modules) {
+            return;
+        }
+        modules.forEach(module => this.nodes.delete(module));
+        this.fileModules.delete(filePath);
+    }
+
+    /**
+     * Forget everything, e.g. after ROOT_URLCONF changed
+     */
+    clear(): void {
+        this.nodes.clear();
+        this.fileModules.clear();
+        this.missingModules.clear();
+    }
+
+    dispose(): void {
+        this.disposables.forEach(disposable => disposable.dispose());
+        this.clear();
+    }
+}
@@ -0,0 +1,66 @@
+import * as vscode from 'vscode';
+import { injectable } from 'inversify';
+import { BindingTable } from '../parsers/variableBindings';
+
+interface DocumentBindings {
+    document: vscode.TextDocument;
+    version: number;
+    table: BindingTable;
+}
+
+/**
+ * Variable bindings of open Python documents, kept in step with edits: a
+ * change re-parses only the lines it replaced, and completions look names
+ * up without reading the document again
+ */
+@injectable()
+export class VariableBindingIndex {
+    private documents: Map<string, DocumentBindings> = new Map();
+    private disposables: vscode.Disposable[] = [];
+
+    constructor() {
+        this.disposables.push(
+            vscode.workspace.onDidChangeTextDocument(event => this.onDidChange(event)),
+            vscode.workspace.onDidCloseTextDocument(document => this.documents.delete(document.uri.toString()))
+        );
+    }
+
+    private onDidChange(event: vscode.TextDocumentChangeEvent): void {
+        const cached = this.documents.get(event.document.uri.toString());
+        if (!cached) {
+            return;
+        }
+
+        // Changes of one event apply in order, each in the coordinates left by the previous
+        for (const change of event.contentChanges) {
+            const lineCount = (change.text.match(/\n/g)?.length ?? 0) + 1;
+            cached.table.replaceLines(change.range.start.line, change.range.end.line, lineCount);
+        }
+        cached.version = event.document.version;
+    }
+
+    /**
+     * Class of the value a variable holds at a line of a document
+     */
+    lookup(document: vscode.TextDocument, line: number, name: string): string | undefined {
+        return this.getTable(document).lookup(name, line);
+    }
+
+    private getTable(document: vscode.TextDocument): BindingTable {
+        const key = document.uri.toString();
+        let cached = this.documents.get(key);
+        if (!cached || cached.document !== document || cached.version !== document.version || cached.table.lineCount !== document.lineCount) {
+            cached = { document, version: document.version, table: new BindingTable(document.lineCount) };
+            this.documents.set(key, cached);
+        }
+
+        cached.table.fill(line => document.lineAt(line).text);
+        return cached.table;
+    }
+
+    dispose(): void {
+        this.disposables.forEach(d => d.dispose());
+        this.disposables = [];
+        this.documents.clear();
+    }
+}
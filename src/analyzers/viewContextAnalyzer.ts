@@ -1,27 +1,55 @@
 import * as vscode from 'vscode';
 import * as path from 'path';
 import * as fs from 'fs/promises';
-import { injectable } from 'inversify';
-
-export interface ViewContext {
-    templatePath: string;
-    contextVariables: Map<string, ContextVariable>;
-    viewFile: string;
-    viewFunction?: string;
-    viewClass?: string;
-}
-
-export interface ContextVariable {
-    name: string;
-    type?: string;
-    value?: string;
-    isLoop?: boolean;
-    loopTarget?: string;
-}
+import { injectable, inject, optional } from 'inversify';
+import { TYPES } from '../container/types';
+import { AdvancedModelAnalyzer } from './advancedModelAnalyzer';
+import { ModelDependencyGraph } from './modelDependencyGraph';
+import { PrebuiltProjectIndex } from './prebuiltProjectIndex';
+import { AnalysisQuarantine } from './analysisQuarantine';
+import { ClassHierarchyIndex } from './classHierarchyIndex';
+import { extractViewContexts, extractViewClasses, ViewContext, ViewClassInfo, ContextVariable } from '../parsers/viewContextParser';
+import { estimateSize } from '../cache/lruCache';
+import { MemoryConsumer } from '../cache/memoryBudgetManager';
+
+export type { ViewContext, ContextVariable } from '../parsers/viewContextParser';
 
 @injectable()
 export class ViewContextAnalyzer {
     private contextCache = new Map<string, ViewContext[]>();
+    // view key -> variable name -> resolved model field names
+    private resolvedFieldCache = new Map<string, Map<string, string[]>>();
+    // What the classes of a file contribute to the views deriving from them
+    private viewClassCache = new Map<string, ViewClassInfo[]>();
+    private quarantine: AnalysisQuarantine;
+
+    constructor(
+        @inject(TYPES.AdvancedModelAnalyzer) @optional() private modelAnalyzer?: AdvancedModelAnalyzer,
+        @inject(TYPES.ModelDependencyGraph) @optional() private dependencyGraph?: ModelDependencyGraph,
+        @inject(TYPES.PrebuiltProjectIndex) @optional() private prebuiltIndex?: PrebuiltProjectIndex,
+        @inject(TYPES.AnalysisQuarantine) @optional() quarantine?: AnalysisQuarantine,
+        @inject(TYPES.ClassHierarchyIndex) @optional() private classHierarchy?: ClassHierarchyIndex
+    ) {
+        this.quarantine = quarantine || new AnalysisQuarantine();
+        // Views inherit templates and context variables from their bases
+        this.classHierarchy?.onDidChangeClasses(change => {
+            change.filePaths.forEach(filePath => this.viewClassCache.delete(filePath));
+            for (const className of change.classes) {
+                const filePath = this.classHierarchy?.getClass(className)?.filePath;
+                if (filePath) {
+                    this.contextCache.delete(filePath);
+                    this.viewClassCache.delete(filePath);
+                }
+            }
+        });
+        if (this.dependencyGraph) {
+            this.dependencyGraph.onDidInvalidate(dependents => {
+                dependents
+                    .filter(dependent => dependent.kind === 'view')
+                    .forEach(dependent => this.resolvedFieldCache.delete(dependent.name));
+            });
+        }
+    }
 
     public async analyzeViewFile(viewFilePath: string): Promise<ViewContext[]> {
         // Check cache first
@@ -31,148 +59,148 @@ export class ViewContextAnalyzer {
 
         try {
             const content = await fs.readFile(viewFilePath, 'utf-8');
-            const contexts = this.extractContexts(content, viewFilePath);
+            const contexts = this.prebuiltIndex?.takeViews(viewFilePath, content)
+                || await this.quarantine.run('view', viewFilePath, content, () => extractViewContexts(content, viewFilePath));
+            if (!contexts) {
+                return []; // Quarantined
+            }
+            const resolved = await this.addInheritedContexts(viewFilePath, content, contexts);
             
             // Cache the results
-            this.contextCache.set(viewFilePath, contexts);
+            this.contextCache.set(viewFilePath, resolved);
+            this.registerDependencies(resolved);
             
-            return contexts;
+            return resolved;
         } catch (error) {
             console.error(`Error analyzing view file ${viewFilePath}:`, error);
             return [];
         }
     }
 
-    private extractContexts(content: string, viewFilePath: string): ViewContext[] {
-        const contexts: ViewContext[] = [];
-        
-        // Extract render() calls from function-based views
-        const renderPattern = /render\s*\(\s*request\s*,\s*['"]([\w/\-\.]+)['"]\s*(?:,\s*({[^}]+}|context|\w+))?\s*\)/g;
-        let match;
-        
-        while ((match = renderPattern.exec(content)) !== null) {
-            const templatePath = match[1];
-            const contextArg = match[2];
-            
-            const context: ViewContext = {
-                templatePath,
-                contextVariables: new Map(),
-                viewFile: viewFilePath,
-                viewFunction: this.findEnclosingFunction(content, match.index)
-            };
-            
-            if (contextArg) {
-                if (contextArg.startsWith('{')) {
-                    // Inline context dictionary
-                    this.parseInlineContext(contextArg, context.contextVariables);
-                } else {
-                    // Variable reference - try to find its definition
-                    this.findContextVariable(content, contextArg, context.contextVariables);
+    /**
+     * Add the template and context variables class-based views inherit
+     * from their bases, e.g. a mixin's get_context_data() in another module
+     */
+    private async addInheritedContexts(viewFilePath: string, content: string, contexts: ViewContext[]): Promise<ViewContext[]> {
+        const hierarchy = this.classHierarchy;
+        if (!hierarchy) {
+            return contexts;
+        }
+        hierarchy.updateFile(viewFilePath, content);
+        this.viewClassCache.set(viewFilePath, extractViewClasses(content));
+
+        const result = [...contexts];
+        for (const cls of hierarchy.getClassesForFile(viewFilePath)) {
+            let templatePath: string | undefined;
+            let inherited = false;
+            const variables = new Map<string, ContextVariable>();
+
+            for (const className of hierarchy.getMro(cls.qualifiedName)) {
+                const owner = hierarchy.getClass(className);
+                const viewClass = owner && (await this.getViewClasses(owner.filePath)).find(candidate => candidate.name === owner.name);
+                if (!viewClass) {
+                    continue;
                 }
+                inherited = inherited || className !== cls.qualifiedName;
+                templatePath = templatePath || viewClass.templatePath;
+                viewClass.contextVariables.forEach((variable, name) => {
+                    if (!variables.has(name)) {
+                        variables.set(name, variable);
+                    }
+                });
+            }
+            if (!inherited || !templatePath) {
+                continue;
+            }
+
+            const index = result.findIndex(context => context.viewClass === cls.name);
+            if (index >= 0) {
+                const contextVariables = new Map(result[index].contextVariables);
+                variables.forEach((variable, name) => {
+                    if (!contextVariables.has(name)) {
+                        contextVariables.set(name, variable);
+                    }
+                });
+                result[index] = { ...result[index], contextVariables };
+            } else if (variables.size > 0) {
+                result.push({ templatePath, contextVariables: variables, viewFile: viewFilePath, viewClass: cls.name });
             }
-            
-            contexts.push(context);
         }
-        
-        // Extract context from class-based views
-        const classContexts = this.extractClassBasedViewContexts(content, viewFilePath);
-        contexts.push(...classContexts);
-        
-        return contexts;
+        return result;
     }
 
-    private parseInlineContext(contextStr: string, variables: Map<string, ContextVariable>) {
-        // Parse inline context like {'posts': posts, 'form': form}
-        const keyValuePattern = /['"](\w+)['"]\s*:\s*(\w+)/g;
-        let match;
-        
-        while ((match = keyValuePattern.exec(contextStr)) !== null) {
-            const name = match[1];
-            const value = match[2];
-            
-            variables.set(name, {
-                name,
-                value,
-                type: this.inferTypeFromValue(value)
-            });
+    private async getViewClasses(filePath: string): Promise<ViewClassInfo[]> {
+        let viewClasses = this.viewClassCache.get(filePath);
+        if (!viewClasses) {
+            try {
+                viewClasses = extractViewClasses(await fs.readFile(filePath, 'utf-8'));
+            } catch {
+                viewClasses = [];
+            }
+            this.viewClassCache.set(filePath, viewClasses);
         }
+        return viewClasses;
     }
 
-    private findContextVariable(content: string, varName: string, variables: Map<string, ContextVariable>) {
-        // Look for context variable definition like: context = {'key': value}
-        const contextDefPattern = new RegExp(`${varName}\\s*=\\s*({[^}]+})`, 'g');
-        const match = contextDefPattern.exec(content);
-        
-        if (match) {
-            this.parseInlineContext(match[1], variables);
-        }
+    private getViewKey(context: ViewContext): string {
+        return `${context.viewFile}#${context.viewClass || context.viewFunction || context.templatePath}`;
     }
 
-    private extractClassBasedViewContexts(content: string, viewFilePath: string): ViewContext[] {
-        const contexts: ViewContext[] = [];
-        
-        // Find get_context_data methods in class-based views
-        const getContextPattern = /class\s+(\w+)[\s\S]*?def\s+get_context_data\s*\([^)]*\)[\s\S]*?context\s*=\s*super\(\)\.get_context_data\([^)]*\)([\s\S]*?)(?=\n\s{0,4}\S|\n\s*def|\Z)/g;
-        let match;
-        
-        while ((match = getContextPattern.exec(content)) !== null) {
-            const className = match[1];
-            const contextBody = match[2];
-            
-            // Extract template_name from class
-            const templateMatch = content.match(new RegExp(`class\\s+${className}[\\s\\S]*?template_name\\s*=\\s*['"]([\\w/\\-\\.]+)['"]`));
-            
-            if (templateMatch) {
-                const context: ViewContext = {
-                    templatePath: templateMatch[1],
-                    contextVariables: new Map(),
-                    viewFile: viewFilePath,
-                    viewClass: className
-                };
-                
-                // Extract context['key'] = value patterns
-                const contextUpdatePattern = /context\[['"](\w+)['"]\]\s*=\s*([^\n]+)/g;
-                let updateMatch;
-                
-                while ((updateMatch = contextUpdatePattern.exec(contextBody)) !== null) {
-                    const name = updateMatch[1];
-                    const value = updateMatch[2].trim();
-                    
-                    context.contextVariables.set(name, {
-                        name,
-                        value,
-                        type: this.inferTypeFromValue(value)
-                    });
-                }
-                
-                contexts.push(context);
-            }
+    /**
+     * Record which models the context variables of each view refer to
+     */
+    private registerDependencies(contexts: ViewContext[]): void {
+        if (!this.dependencyGraph) {
+            return;
         }
-        
-        return contexts;
-    }
 
-    private findEnclosingFunction(content: string, position: number): string | undefined {
-        // Find the function that contains this render call
-        const beforePosition = content.substring(0, position);
-        const functionMatch = beforePosition.match(/def\s+(\w+)\s*\([^)]*\):\s*$/m);
-        
-        return functionMatch ? functionMatch[1] : undefined;
+        for (const context of contexts) {
+            const modelNames = Array.from(context.contextVariables.values())
+                .map(variable => variable.modelName)
+                .filter((modelName): modelName is string => !!modelName);
+            this.dependencyGraph.setDependencies('view', this.getViewKey(context), modelNames);
+        }
     }
 
-    private inferTypeFromValue(value: string): string | undefined {
-        // Simple type inference based on common patterns
-        if (value.includes('.objects.') || value.includes('.all()') || value.includes('.filter(')) {
-            return 'QuerySet';
+    /**
+     * Get the field names of the model behind a context variable, from the
+     * given model analyzer or the global one. Cached per view until one of
+     * the global analyzer's models changes.
+     */
+    public getVariableModelFields(
+        context: ViewContext,
+        variableName: string,
+        modelAnalyzer: AdvancedModelAnalyzer | undefined = this.modelAnalyzer
+    ): string[] | undefined {
+        const variable = context.contextVariables.get(variableName);
+        if (!variable?.modelName || !modelAnalyzer) {
+            return undefined;
         }
-        if (value.includes('Form(') || value.endsWith('Form')) {
-            return 'Form';
+        // The dependency graph only follows the global analyzer's models
+        const cacheable = !!this.dependencyGraph && modelAnalyzer === this.modelAnalyzer;
+
+        const viewKey = this.getViewKey(context);
+        let viewCache = this.resolvedFieldCache.get(viewKey);
+        const cached = cacheable ? viewCache?.get(variableName) : undefined;
+        if (cached) {
+            return cached;
         }
-        if (value.includes('get_object_or_404')) {
-            return 'Model';
+
+        const model = modelAnalyzer.getModel(variable.modelName);
+        if (!model) {
+            return undefined;
         }
-        
-        return undefined;
+
+        const fields = model.fields.map(field => field.name);
+        if (cacheable) {
+            if (!viewCache) {
+                viewCache = new Map();
+                this.resolvedFieldCache.set(viewKey, viewCache);
+            }
+            viewCache.set(variableName, fields);
+        }
+
+        return fields;
     }
 
     public async findContextForTemplate(templatePath: string): Promise<ViewContext | undefined> {
@@ -200,5 +228,16 @@ export class ViewContextAnalyzer {
 
     public clearCache() {
         this.contextCache.clear();
+        this.resolvedFieldCache.clear();
+        this.viewClassCache.clear();
+    }
+
+    public getMemoryConsumers(): MemoryConsumer[] {
+        return [{
+            name: 'View contexts',
+            tier: 'analysis',
+            cost: () => estimateSize(this.contextCache) + estimateSize(this.resolvedFieldCache) + estimateSize(this.viewClassCache),
+            shed: () => this.clearCache()
+        }];
     }
 }
\ No newline at end of file
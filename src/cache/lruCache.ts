@@ -1,3 +1,47 @@
+/**
+ * Estimate the size of a value in bytes. Objects reached twice, e.g. shared
+ * or cyclic references, are counted once.
+ */
+export function estimateSize(obj: any, seen: WeakSet<object> = new WeakSet()): number {
+    if (obj === null || obj === undefined) {
+        return 0;
+    }
+
+    switch (typeof obj) {
+        case 'string':
+            return obj.length * 2; // 2 bytes per character (UTF-16)
+        case 'number':
+            return 8;
+        case 'boolean':
+            return 4;
+        case 'object':
+            if (seen.has(obj)) {
+                return 0;
+            }
+            seen.add(obj);
+            if (obj instanceof Map || obj instanceof Set) {
+                let size = 0;
+                obj.forEach((value: any) => {
+                    size += estimateSize(value, seen);
+                });
+                return size;
+            } else if (Array.isArray(obj)) {
+                return obj.reduce((size, item) => size + estimateSize(item, seen), 0);
+            } else {
+                // Regular object
+                let size = 0;
+                for (const key in obj) {
+                    if (obj.hasOwnProperty(key)) {
+                        size += estimateSize(key, seen) + estimateSize(obj[key], seen);
+                    }
+                }
+                return size;
+            }
+        default:
+            return 0;
+    }
+}
+
 /**
  * LRU (Least Recently Used) Cache implementation with size limits
  */
@@ -115,7 +159,7 @@ export class LRUCache<K, V> {
         
         for (const [key, value] of this.cache) {
             if (count >= sampleSize) break;
-            sampledSize += this.estimateSize(key) + this.estimateSize(value);
+            sampledSize += estimateSize(key) + estimateSize(value);
             count++;
         }
         
@@ -137,7 +181,7 @@ export class LRUCache<K, V> {
             
             for (const [key, value] of this.cache) {
                 if (newCount >= newSampleSize) break;
-                newSampledSize += this.estimateSize(key) + this.estimateSize(value);
+                newSampledSize += estimateSize(key) + estimateSize(value);
                 newCount++;
             }
             
@@ -147,45 +191,6 @@ export class LRUCache<K, V> {
         }
     }
 
-    /**
-     * Estimate size of an object in bytes
-     */
-    private estimateSize(obj: any): number {
-        if (obj === null || obj === undefined) {
-            return 0;
-        }
-
-        switch (typeof obj) {
-            case 'string':
-                return obj.length * 2; // 2 bytes per character (UTF-16)
-            case 'number':
-                return 8;
-            case 'boolean':
-                return 4;
-            case 'object':
-                if (obj instanceof Map || obj instanceof Set) {
-                    let size = 0;
-                    obj.forEach((value: any) => {
-                        size += this.estimateSize(value);
-                    });
-                    return size;
-                } else if (Array.isArray(obj)) {
-                    return obj.reduce((size, item) => size + this.estimateSize(item), 0);
-                } else {
-                    // Regular object
-                    let size = 0;
-                    for (const key in obj) {
-                        if (obj.hasOwnProperty(key)) {
-                            size += this.estimateSize(key) + this.estimateSize(obj[key]);
-                        }
-                    }
-                    return size;
-                }
-            default:
-                return 0;
-        }
-    }
-
     /**
      * Get cache statistics
      */
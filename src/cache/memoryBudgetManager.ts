@@ -0,0 +1,203 @@
+import { injectable } from 'inversify';
+import * as v8 from 'v8';
+
+/**
+ * How expensive a cache is to rebuild. Under pressure, transient results
+ * are shed first, then copies of file contents and last parsed analysis.
+ */
+export type MemoryTier = 'transient' | 'content' | 'analysis';
+
+const SHED_ORDER: MemoryTier[] = ['transient', 'content', 'analysis'];
+
+/**
+ * A cache that is kept within the global memory budget
+ */
+export interface MemoryConsumer {
+    name: string;
+    tier: MemoryTier;
+    // Estimated size in bytes
+    cost(): number;
+    // Drop the cached entries; they are rebuilt on demand
+    shed(): void;
+}
+
+export interface MemoryConsumerUsage {
+    name: string;
+    tier: MemoryTier;
+    bytes: number;
+    sheds: number;
+}
+
+export interface MemoryBudgetStatus {
+    budgetBytes: number;
+    usedBytes: number;
+    heapUsedBytes: number;
+    heapLimitBytes: number;
+    consumers: MemoryConsumerUsage[];
+}
+
+export interface MemoryBudgetOptions {
+    budgetMB?: number;
+    // Share of the V8 heap limit above which caches are shed regardless of the budget
+    pressureRatio?: number;
+}
+
+const DEFAULT_BUDGET_MB = 200;
+const DEFAULT_PRESSURE_RATIO = 0.85;
+const DEFAULT_CHECK_INTERVAL = 30000; // 30 seconds
+
+/**
+ * One memory budget for the caches of all analyzers and providers. Caches
+ * register with a tier and a cost estimate; when their total exceeds the
+ * budget or the extension host heap nears its limit, whole caches are shed,
+ * least valuable tier first and largest first within a tier.
+ */
+@injectable()
+export class MemoryBudgetManager {
+    private consumers: Map<MemoryConsumer, { sheds: number }> = new Map();
+    private budgetBytes = DEFAULT_BUDGET_MB * 1024 * 1024;
+    private pressureRatio = DEFAULT_PRESSURE_RATIO;
+    private timer: NodeJS.Timeout | undefined;
+    private shedding = false;
+
+    configure(options: MemoryBudgetOptions): void {
+        if (options.budgetMB !== undefined) {
+            this.budgetBytes = options.budgetMB * 1024 * 1024;
+        }
+        this.pressureRatio = options.pressureRatio ?? this.pressureRatio;
+    }
+
+    register(consumer: MemoryConsumer): { dispose(): void } {
+        this.consumers.set(consumer, { sheds: 0 });
+        return { dispose: () => this.consumers.delete(consumer) };
+    }
+
+    /**
+     * Check the budget periodically
+     */
+    start(intervalMs: number = DEFAULT_CHECK_INTERVAL): void {
+        this.stop();
+        this.timer = setInterval(() => this.check(), intervalMs);
+        this.timer.unref?.();
+    }
+
+    stop(): void {
+        if (this.timer) {
+            clearInterval(this.timer);
+            this.timer = undefined;
+        }
+    }
+
+    /**
+     * Shed caches until their total is within the budget. Under heap
+     * pressure the cheapest non-empty tier is shed completely; the next
+     * check moves on to the next tier if the heap is still near its limit.
+     * Returns the estimated number of bytes freed.
+     */
+    check(
+        heapUsedBytes: number = process.memoryUsage().heapUsed,
+        heapLimitBytes: number = v8.getHeapStatistics().heap_size_limit
+    ): number {
+        const costs = this.measure();
+        let usedBytes = Array.from(costs.values()).reduce((sum, bytes) => sum + bytes, 0);
+        let underPressure = heapUsedBytes > heapLimitBytes * this.pressureRatio;
+        if (usedBytes <= this.budgetBytes && !underPressure) {
+            return 0;
+        }
+
+        this.shedding = true;
+        try {
+            return this.shedTiers(costs, usedBytes, underPressure);
+        } finally {
+            this.shedding = false;
+        }
+    }
+
+    /**
+     * Whether caches are being shed or would be by the next check. Work
+     * that only fills caches, like idle-time prefetch, should not run then.
+     */
+    isOverBudget(
+        heapUsedBytes: number = process.memoryUsage().heapUsed,
+        heapLimitBytes: number = v8.getHeapStatistics().heap_size_limit
+    ): boolean {
+        if (this.shedding || heapUsedBytes > heapLimitBytes * this.pressureRatio) {
+            return true;
+        }
+        const usedBytes = Array.from(this.measure().values()).reduce((sum, bytes) => sum + bytes, 0);
+        return usedBytes > this.budgetBytes;
+    }
+
+    private shedTiers(costs: Map<MemoryConsumer, number>, usedBytes: number, underPressure: boolean): number {
+        let freedBytes = 0;
+        for (const tier of SHED_ORDER) {
+            const candidates = Array.from(costs.entries())
+                .filter(([consumer, bytes]) => consumer.tier === tier && bytes > 0)
+                .sort((a, b) => b[1] - a[1]);
+            if (candidates.length === 0) {
+                continue;
+            }
+
+            for (const [consumer, bytes] of candidates) {
+                if (!underPressure && usedBytes <= this.budgetBytes) {
+                    return freedBytes;
+                }
+                this.shed(consumer);
+                usedBytes -= bytes;
+                freedBytes += bytes;
+            }
+
+            // The heap only shrinks after the next GC, so one tier per check
+            underPressure = false;
+            if (usedBytes <= this.budgetBytes) {
+                break;
+            }
+        }
+        return freedBytes;
+    }
+
+    getStatus(): MemoryBudgetStatus {
+        const costs = this.measure();
+        const consumers = Array.from(costs.entries()).map(([consumer, bytes]) => ({
+            name: consumer.name,
+            tier: consumer.tier,
+            bytes,
+            sheds: this.consumers.get(consumer)?.sheds || 0
+        }));
+
+        return {
+            budgetBytes: this.budgetBytes,
+            usedBytes: consumers.reduce((sum, consumer) => sum + consumer.bytes, 0),
+            heapUsedBytes: process.memoryUsage().heapUsed,
+            heapLimitBytes: v8.getHeapStatistics().heap_size_limit,
+            consumers
+        };
+    }
+
+    private measure(): Map<MemoryConsumer, number> {
+        const costs = new Map<MemoryConsumer, number>();
+        for (const consumer of this.consumers.keys()) {
+            try {
+                costs.set(consumer, consumer.cost());
+            } catch (error) {
+                console.error(`Error measuring cache ${consumer.name}:`, error);
+                costs.set(consumer, 0);
+            }
+        }
+        return costs;
+    }
+
+    private shed(consumer: MemoryConsumer): void {
+        try {
+            consumer.shed();
+            this.consumers.get(consumer)!.sheds++;
+        } catch (error) {
+            console.error(`Error shedding cache ${consumer.name}:`, error);
+        }
+    }
+
+    dispose(): void {
+        this.stop();
+        this.consumers.clear();
+    }
+}
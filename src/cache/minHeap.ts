@@ -0,0 +1,84 @@
+/**
+ * Binary min-heap with O(log n) push/pop and O(1) peek
+ */
+export class MinHeap<T> {
+    private items: T[] = [];
+
+    constructor(private readonly compare: (a: T, b: T) => number) {}
+
+    get size(): number {
+        return this.items.length;
+    }
+
+    peek(): T | undefined {
+        return this.items[0];
+    }
+
+    push(item: T): void {
+        this.items.push(item);
+        this.siftUp(this.items.length - 1);
+    }
+
+    pop(): T | undefined {
+        const items = this.items;
+        if (items.length === 0) {
+            return undefined;
+        }
+
+        const top = items[0];
+        const last = items.pop()!;
+        if (items.length > 0) {
+            items[0] = last;
+            this.siftDown(0);
+        }
+        return top;
+    }
+
+    /**
+     * Keep only the items matching the predicate, in O(n)
+     */
+    retain(predicate: (item: T) => boolean): void {
+        this.items = this.items.filter(predicate);
+        for (let i = (this.items.length >> 1) - 1; i >= 0; i--) {
+            this.siftDown(i);
+        }
+    }
+
+    clear(): void {
+        this.items = [];
+    }
+
+    private siftUp(index: number): void {
+        const items = this.items;
+        const item = items[index];
+        while (index > 0) {
+            const parent = (index - 1) >> 1;
+            if (this.compare(item, items[parent]) >= 0) {
+                break;
+            }
+            items[index] = items[parent];
+            index = parent;
+        }
+        items[index] = item;
+    }
+
+    private siftDown(index: number): void {
+        const items = this.items;
+        const length = items.length;
+        const item = items[index];
+        while (true) {
+            const left = 2 * index + 1;
+            if (left >= length) {
+                break;
+            }
+            const right = left + 1;
+            const child = right < length && this.compare(items[right], items[left]) < 0 ? right : left;
+            if (this.compare(items[child], item) >= 0) {
+                break;
+            }
+            items[index] = items[child];
+            index = child;
+        }
+        items[index] = item;
+    }
+}
@@ -0,0 +1,145 @@
+import * as path from 'path';
+import * as fs from 'fs';
+import * as crypto from 'crypto';
+
+interface PersistedCache<V> {
+    version: number;
+    key: string;
+    files: { [filePath: string]: { hash: string; value: V } };
+}
+
+const CACHE_FORMAT_VERSION = 1;
+const DEFAULT_MAX_FILES = 5000;
+const SAVE_DELAY = 2000; // 2 seconds
+
+/**
+ * Analysis results kept on disk between sessions, validated by content
+ * hash like FileCache. All entries of one key (e.g. a project root) live
+ * in one JSON file below `directory`; writes are saved shortly after the
+ * last change, oldest entries are dropped beyond `maxFiles`.
+ */
+export class PersistentAnalysisCache<V> {
+    private files: Map<string, { hash: string; value: V }> = new Map();
+    private saveTimer: NodeJS.Timeout | undefined;
+    private loaded = false;
+
+    constructor(
+        private directory: string,
+        private key: string,
+        private maxFiles: number = DEFAULT_MAX_FILES
+    ) {}
+
+    /**
+     * Read the entries saved by an earlier session. Returns the number of entries.
+     */
+    async load(): Promise<number> {
+        try {
+            const content = await fs.promises.readFile(this.getCachePath(), 'utf8');
+            const persisted = JSON.parse(content) as PersistedCache<V>;
+            if (persisted.version === CACHE_FORMAT_VERSION && persisted.key === this.key) {
+                for (const [filePath, entry] of Object.entries(persisted.files)) {
+                    if (!this.files.has(filePath)) {
+                        this.files.set(filePath, entry);
+                    }
+                }
+            }
+        } catch {
+            // Nothing saved for this key yet
+        }
+        this.loaded = true;
+        return this.files.size;
+    }
+
+    isLoaded(): boolean {
+        return this.loaded;
+    }
+
+    getIfValid(filePath: string, content: string): V | undefined {
+        const entry = this.files.get(filePath);
+        return entry && entry.hash === hashContent(content) ? entry.value : undefined;
+    }
+
+    setWithHash(filePath: string, content: string, value: V): void {
+        this.files.delete(filePath);
+        this.files.set(filePath, { hash: hashContent(content), value });
+        for (const oldest of this.files.keys()) {
+            if (this.files.size <= this.maxFiles) {
+                break;
+            }
+            this.files.delete(oldest);
+        }
+        this.scheduleSave();
+    }
+
+    delete(filePath: string): void {
+        if (this.files.delete(filePath)) {
+            this.scheduleSave();
+        }
+    }
+
+    get size(): number {
+        return this.files.size;
+    }
+
+    /**
+     * Write pending changes now
+     */
+    async flush(): Promise<void> {
+        if (!this.saveTimer) {
+            return;
+        }
+        clearTimeout(this.saveTimer);
+        this.saveTimer = undefined;
+
+        try {
+            await fs.promises.mkdir(this.directory, { recursive: true });
+            await fs.promises.writeFile(this.getCachePath(), this.serialize(), 'utf8');
+        } catch (error) {
+            console.error('Failed to persist analysis cache:', error);
+        }
+    }
+
+    /**
+     * Write pending changes before returning, for shutdown where a pending
+     * asynchronous write would be cut off
+     */
+    flushSync(): void {
+        if (!this.saveTimer) {
+            return;
+        }
+        clearTimeout(this.saveTimer);
+        this.saveTimer = undefined;
+
+        try {
+            fs.mkdirSync(this.directory, { recursive: true });
+            fs.writeFileSync(this.getCachePath(), this.serialize(), 'utf8');
+        } catch (error) {
+            console.error('Failed to persist analysis cache:', error);
+        }
+    }
+
+    private serialize(): string {
+        const persisted: PersistedCache<V> = {
+            version: CACHE_FORMAT_VERSION,
+            key: this.key,
+            files: Object.fromEntries(this.files)
+        };
+        return JSON.stringify(persisted);
+    }
+
+    private scheduleSave(): void {
+        if (this.saveTimer) {
+            return;
+        }
+        this.saveTimer = setTimeout(() => this.flush(), SAVE_DELAY);
+        this.saveTimer.unref?.();
+    }
+
+    private getCachePath(): string {
+        return path.join(this.directory, `${hashContent(this.key)}.json`);
+    }
+}
+
+function hashContent(content: string): string {
+    return crypto.createHash('sha1').update(content).digest('hex');
+}
@@ -0,0 +1,106 @@
+import * as fs from 'fs';
+import * as path from 'path';
+import { ProjectIndexBuilder, ProjectIndexBuildResult } from './projectIndex';
+import { DEFAULT_INDEX_PATH } from '../analyzers/projectIndexFormat';
+
+const USAGE = `Usage: build-index [projectDir] [--out <file>] [--benchmark [runs]]
+
+Parses the models, forms, admin and views modules of a Django project and
+writes an index the extension imports at startup. Paths in the index are
+relative to projectDir, which should be the workspace folder opened in VS Code.
+
+  --out <file>        Index file to write (default: <projectDir>/${DEFAULT_INDEX_PATH})
+  --benchmark [runs]  Print per-parser timings; with runs > 1, build repeatedly
+                      and report the median without writing the index`;
+
+interface CliOptions {
+    projectDir: string;
+    outFile: string;
+    benchmarkRuns: number;
+}
+
+function parseArguments(args: string[]): CliOptions | undefined {
+    let projectDir: string | undefined;
+    let outFile: string | undefined;
+    let benchmarkRuns = 0;
+
+    for (let i = 0; i < args.length; i++) {
+        const arg = args[i];
+        if (arg === '--help' || arg === '-h') {
+            return undefined;
+        } else if (arg === '--out') {
+            outFile = args[++i];
+            if (!outFile) {
+                return undefined;
+            }
+        } else if (arg === '--benchmark') {
+            benchmarkRuns = 1;
+            const runs = Number(args[i + 1]);
+            if (Number.isInteger(runs) && runs > 0) {
+                benchmarkRuns = runs;
+                i++;
+            }
+        } else if (!arg.startsWith('-') && !projectDir) {
+            projectDir = arg;
+        } else {
+            return undefined;
+        }
+    }
+
+    const root = path.resolve(projectDir || '.');
+    return {
+        projectDir: root,
+        outFile: path.resolve(outFile || path.join(root, DEFAULT_INDEX_PATH)),
+        benchmarkRuns
+    };
+}
+
+function printTimings(result: ProjectIndexBuildResult, runs: number): void {
+    const prefix = runs > 1 ? `median of ${runs} runs: ` : '';
+    console.log(`${prefix}${Object.keys(result.index.files).length} files in ${result.totalTimeMs} ms`);
+    for (const [section, timing] of Object.entries(result.timings)) {
+        const average = timing.files > 0 ? timing.timeMs / timing.files : 0;
+        console.log(`  ${section.padEnd(8)}${String(timing.files).padStart(6)} files${timing.timeMs.toFixed(1).padStart(10)} ms${average.toFixed(2).padStart(10)} ms/file`);
+    }
+}
+
+async function main(args: string[]): Promise<number> {
+    const options = parseArguments(args);
+    if (!options) {
+        console.error(USAGE);
+        return 2;
+    }
+    if (!fs.existsSync(options.projectDir)) {
+        console.error(`Project directory not found: ${options.projectDir}`);
+        return 1;
+    }
+
+    if (options.benchmarkRuns > 1) {
+        const results: ProjectIndexBuildResult[] = [];
+        for (let run = 0; run < options.benchmarkRuns; run++) {
+            // A fresh builder per run so no parser cache is reused
+            results.push(await new ProjectIndexBuilder().build(options.projectDir));
+        }
+        results.sort((a, b) => a.totalTimeMs - b.totalTimeMs);
+        printTimings(results[Math.floor(results.length / 2)], results.length);
+        return 0;
+    }
+
+    const result = await new ProjectIndexBuilder().build(options.projectDir);
+    fs.mkdirSync(path.dirname(options.outFile), { recursive: true });
+    fs.writeFileSync(options.outFile, JSON.stringify(result.index));
+
+    if (options.benchmarkRuns > 0) {
+        printTimings(result, 1);
+    }
+    console.log(`Wrote ${Object.keys(result.index.files).length} files to ${options.outFile}`);
+    return 0;
+}
+
+main(process.argv.slice(2)).then(
+    code => process.exit(code),
+    error => {
+        console.error(error);
+        process.exit(1);
+    }
+);
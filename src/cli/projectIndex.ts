@@ -0,0 +1,152 @@
+import * as path from 'path';
+import { FileSystem, nodeFileSystem } from '../utils/fileSystem';
+import { ModelExtractor } from '../parsers/modelExtractor';
+import { FormParser } from '../parsers/formParser';
+import { parseAdminModule } from '../parsers/adminParser';
+import { extractViewContexts } from '../parsers/viewContextParser';
+import {
+    PROJECT_INDEX_VERSION,
+    ProjectIndex,
+    ProjectIndexEntry,
+    ProjectIndexSection,
+    hashContent,
+    toIndexPath
+} from '../analyzers/projectIndexFormat';
+
+// Directories never scanned for project modules
+const EXCLUDED_DIRS = new Set(['node_modules', '.git', '.venv', 'venv', 'site-packages', '.tox', '__pycache__']);
+
+export interface SectionTiming {
+    files: number;
+    timeMs: number;
+}
+
+export interface ProjectIndexBuildResult {
+    index: ProjectIndex;
+    timings: { [section in ProjectIndexSection]: SectionTiming };
+    totalTimeMs: number;
+}
+
+const SECTION_FILES: { [fileName: string]: ProjectIndexSection } = {
+    'models.py': 'models',
+    'forms.py': 'forms',
+    'admin.py': 'admin',
+    'views.py': 'views'
+};
+
+/**
+ * Runs the editor-independent parsers over a project directory and collects
+ * their output into a relocatable index, timing each parser on the way
+ */
+export class ProjectIndexBuilder {
+    private extractor = new ModelExtractor();
+    private formParser = new FormParser();
+
+    constructor(private fileSystem: FileSystem = nodeFileSystem) {}
+
+    async build(root: string): Promise<ProjectIndexBuildResult> {
+        const startTime = Date.now();
+        const index: ProjectIndex = { version: PROJECT_INDEX_VERSION, createdAt: startTime, files: {} };
+        const timings: ProjectIndexBuildResult['timings'] = {
+            models: { files: 0, timeMs: 0 },
+            forms: { files: 0, timeMs: 0 },
+            admin: { files: 0, timeMs: 0 },
+            views: { files: 0, timeMs: 0 }
+        };
+
+        for (const filePath of this.findModules(root)) {
+            const section = SECTION_FILES[path.basename(filePath)];
+            let content: string;
+            try {
+                content = this.fileSystem.readFileSync(filePath, 'utf8').toString();
+            } catch (error) {
+                console.error(`Error reading ${filePath}:`, error);
+                continue;
+            }
+
+            const indexPath = toIndexPath(root, filePath);
+            const entry: ProjectIndexEntry = { hash: hashContent(content) };
+            const sectionStart = process.hrtime.bigint();
+
+            try {
+                await this.parseSection(entry, section, content, filePath);
+            } catch (error) {
+                console.error(`Error parsing ${filePath}:`, error);
+                continue;
+            }
+
+            timings[section].files++;
+            timings[section].timeMs += Number(process.hrtime.bigint() - sectionStart) / 1e6;
+            index.files[indexPath] = entry;
+        }
+
+        this.formParser.clear();
+        return { index, timings, totalTimeMs: Date.now() - startTime };
+    }
+
+    private async parseSection(entry: ProjectIndexEntry, section: ProjectIndexSection, content: string, filePath: string): Promise<void> {
+        switch (section) {
+            case 'models':
+                entry.models = await this.extractor.extractModels(content, filePath);
+                break;
+            case 'forms': {
+                const result = this.formParser.parse(content, filePath);
+                entry.forms = {
+                    forms: result.forms.map(({ filePath: _filePath, ...form }) => form),
+                    hasUnparsedFormPatterns: result.hasUnparsedFormPatterns
+                };
+                break;
+            }
+            case 'admin': {
+                const result = parseAdminModule(content, filePath);
+                entry.admin = {
+                    adminClasses: result.adminClasses.map(({ filePath: _filePath, model: _model, attributes, ...adminClass }) => ({
+                        ...adminClass,
+                        attributes: Array.from(attributes)
+                    })),
+                    inlines: result.inlines.map(({ filePath: _filePath, ...inline }) => inline),
+                    registrations: result.registrations
+                };
+                break;
+            }
+            case 'views':
+                entry.views = extractViewContexts(content, filePath).map(({ viewFile: _viewFile, contextVariables, ...view }) => ({
+                    ...view,
+                    contextVariables: Array.from(contextVariables.values())
+                }));
+                break;
+        }
+    }
+
+    /**
+     * Module files the index covers, in a stable order
+     */
+    private findModules(dir: string): string[] {
+        const files: string[] = [];
+        let entries: string[];
+        try {
+            entries = this.fileSystem.readdirSync(dir).sort();
+        } catch {
+            return files;
+        }
+
+        for (const name of entries) {
+            const fullPath = path.join(dir, name);
+            let isDirectory: boolean;
+            try {
+                isDirectory = this.fileSystem.statSync(fullPath).isDirectory();
+            } catch {
+                continue;
+            }
+
+            if (isDirectory) {
+                if (!EXCLUDED_DIRS.has(name) && !name.startsWith('.')) {
+                    files.push(...this.findModules(fullPath));
+                }
+            } else if (SECTION_FILES[name]) {
+                files.push(fullPath);
+            }
+        }
+        return files;
+    }
+}
@@ -1,14 +1,24 @@
 import * as vscode from 'vscode';
-import { injectable, inject } from 'inversify';
+import { injectable, inject, optional } from 'inversify';
 import { TYPES } from '../container/types';
 import { DjangoProjectAnalyzer } from '../analyzers/djangoProjectAnalyzer';
 import { OptimizedDjangoProjectAnalyzer } from '../analyzers/optimizedDjangoProjectAnalyzer';
+import { CacheService } from '../services/cacheService';
+import { GitCheckoutMonitor } from '../analyzers/gitCheckoutMonitor';
+import { PrefetchService } from '../services/prefetchService';
+import { MemoryBudgetManager } from '../cache/memoryBudgetManager';
+import { AnalysisQuarantine } from '../analyzers/analysisQuarantine';
 
 @injectable()
 export class PerformanceCommands {
     constructor(
         @inject(TYPES.ExtensionContext) private context: vscode.ExtensionContext,
-        @inject(TYPES.DjangoProjectAnalyzer) private projectAnalyzer: DjangoProjectAnalyzer
+        @inject(TYPES.DjangoProjectAnalyzer) private projectAnalyzer: DjangoProjectAnalyzer,
+        @inject(TYPES.CacheService) @optional() private cacheService?: CacheService,
+        @inject(TYPES.GitCheckoutMonitor) @optional() private checkoutMonitor?: GitCheckoutMonitor,
+        @inject(TYPES.PrefetchService) @optional() private prefetchService?: PrefetchService,
+        @inject(TYPES.MemoryBudgetManager) @optional() private memoryBudget?: MemoryBudgetManager,
+        @inject(TYPES.AnalysisQuarantine) @optional() private quarantine?: AnalysisQuarantine
     ) {}
 
     /**
@@ -66,6 +76,67 @@ export class PerformanceCommands {
         content += `- **Cache Size**: ${cacheStats.size} / ${cacheStats.maxSize} items\n`;
         content += `- **Memory Usage**: ${cacheStats.memoryUsageMB.toFixed(2)} / ${cacheStats.maxMemoryMB} MB\n`;
         
+        if (this.cacheService) {
+            content += '\n### Cache Namespaces\n\n';
+            content += '| Namespace | Entries | Hits | Misses | Hit Rate | Evictions | Expirations |\n';
+            content += '|-----------|---------|------|--------|----------|-----------|-------------|\n';
+            for (const stats of this.cacheService.getStats()) {
+                const lookups = stats.hits + stats.misses;
+                const hitRate = lookups > 0 ? `${(stats.hits / lookups * 100).toFixed(1)}%` : '-';
+                content += `| ${stats.name} | ${stats.size} / ${stats.maxEntries} | ${stats.hits} | ${stats.misses} | ${hitRate} | ${stats.evictions} | ${stats.expirations} |\n`;
+            }
+        }
+        
+        if (this.memoryBudget) {
+            const memory = this.memoryBudget.getStatus();
+            const mb = (bytes: number) => (bytes / 1024 / 1024).toFixed(2);
+            content += '\n### Memory Budget\n\n';
+            content += `- **Caches**: ${mb(memory.usedBytes)} / ${mb(memory.budgetBytes)} MB\n`;
+            content += `- **Extension Host Heap**: ${mb(memory.heapUsedBytes)} / ${mb(memory.heapLimitBytes)} MB\n\n`;
+            content += '| Cache | Tier | Size (MB) | Times Shed |\n';
+            content += '|-------|------|-----------|------------|\n';
+            for (const consumer of memory.consumers) {
+                content += `| ${consumer.name} | ${consumer.tier} | ${mb(consumer.bytes)} | ${consumer.sheds} |\n`;
+            }
+        }
+        
+        const quarantined = this.quarantine?.getQuarantinedFiles() || [];
+        if (quarantined.length > 0) {
+            content += '\n### Quarantined Files\n\n';
+            content += '| File | Kind | Analysis Time (ms) | Retry |\n';
+            content += '|------|------|--------------------|-------|\n';
+            for (const file of quarantined) {
+                content += `| ${vscode.workspace.asRelativePath(file.filePath)} | ${file.kind} | ${file.durationMs} | ${file.retry || '-'} |\n`;
+            }
+        }
+        
+        if (this.checkoutMonitor) {
+            const checkout = this.checkoutMonitor.getStatus();
+            const lookups = checkout.snapshotHits + checkout.snapshotMisses;
+            content += '\n### Branch Snapshots\n\n';
+            content += `- **Commits Cached**: ${checkout.snapshots}\n`;
+            content += `- **Files Restored**: ${checkout.snapshotHits} / ${lookups}\n`;
+            content += `- **Branch Switch Running**: ${checkout.switching ? 'Yes' : 'No'}\n`;
+        }
+        
+        if (this.prefetchService) {
+            const prefetch = this.prefetchService.getStats();
+            content += '\n## Idle-Time Prefetch\n\n';
+            content += `- **Hit Rate**: ${prefetch.opened > 0 ? `${(prefetch.hitRate * 100).toFixed(1)}%` : '-'} (${prefetch.hits} / ${prefetch.opened} opened files were warm)\n`;
+            content += `- **Files Prefetched**: ${prefetch.prefetched}\n`;
+            content += `- **Warm Files**: ${prefetch.warmFiles} (${prefetch.warmMB.toFixed(2)} MB of source)\n`;
+            content += `- **Runs Cancelled**: ${prefetch.cancelled}\n`;
+            content += `- **Runs Stopped at Time Budget**: ${prefetch.budgetStops}\n`;
+            content += `- **Runs Skipped over Memory Budget**: ${prefetch.memoryStops}\n`;
+        }
+        
+        if (report.demandScope) {
+            content += '\n## Demand-Driven Analysis\n\n';
+            content += `- **Files Analyzed**: ${report.demandScope.analyzedFiles}\n`;
+            content += `- **Model Files Located**: ${report.demandScope.locatorFiles}\n`;
+            content += `- **Persisted Results**: ${report.demandScope.persistedResults}\n`;
+        }
+        
         // Worker Status
         content += '\n## Background Worker Status\n\n';
         const workerStatus = report.workerStatus;
@@ -73,6 +144,13 @@ export class PerformanceCommands {
         content += `- **Active Tasks**: ${workerStatus.activeTasks}\n`;
         content += `- **Status**: ${workerStatus.isRunning ? 'Running' : 'Stopped'}\n`;
         
+        const concurrency = report.concurrency;
+        content += '\n### Adaptive Concurrency\n\n';
+        content += `- **Concurrent Tasks**: ${concurrency.concurrency} / ${concurrency.maxConcurrency}${concurrency.userActive ? ' (backed off while typing)' : ''}\n`;
+        content += `- **Task Latency**: ${concurrency.latencyMs.toFixed(2)} ms\n`;
+        content += `- **Event Loop Delay**: ${concurrency.eventLoopDelayMs.toFixed(2)} ms\n`;
+        content += `- **Increases / Decreases**: ${concurrency.increases} / ${concurrency.decreases}\n`;
+        
         // Create and show document
         const doc = await vscode.workspace.openTextDocument({
             content,
@@ -4,15 +4,48 @@ import * as path from 'path';
 import { TYPES } from '../container/types';
 import { DjangoAdminAnalyzer } from '../analyzers/djangoAdminAnalyzer';
 import { DjangoProjectAnalyzer } from '../analyzers/djangoProjectAnalyzer';
-import { CacheService } from '../services/cacheService';
+import { CacheService, CacheNamespace } from '../services/cacheService';
+import {
+    LazyCompletionItem,
+    StaticCompletionItems,
+    CompletionDetails,
+    resolveLazyCompletionItem
+} from '../providers/lazyCompletion';
+
+/**
+ * Identifies a model, or a field or method of one, offered as a completion
+ */
+interface AdminCompletionId {
+    model: string;
+    member?: string;
+}
 
 @injectable()
 export class DjangoAdminCompletionProvider implements vscode.CompletionItemProvider {
+    private completionCache: CacheNamespace<vscode.CompletionItem[]>;
+    // Attribute, method and decorator items only depend on Django itself
+    private readonly modelAdminAttributeItems = new StaticCompletionItems(() => this.buildModelAdminAttributeCompletions());
+    private readonly modelAdminMethodItems = new StaticCompletionItems(() => this.buildModelAdminMethodCompletions());
+    private readonly inlineAttributeItems = new StaticCompletionItems(() => this.buildInlineAttributeCompletions());
+    private readonly decoratorItems = new StaticCompletionItems(() => this.buildAdminDecoratorCompletions());
+
     constructor(
         @inject(TYPES.DjangoAdminAnalyzer) private adminAnalyzer: DjangoAdminAnalyzer,
         @inject(TYPES.DjangoProjectAnalyzer) private projectAnalyzer: DjangoProjectAnalyzer,
-        @inject(TYPES.CacheService) private cacheService: CacheService
-    ) {}
+        @inject(TYPES.CacheService) cacheService: CacheService
+    ) {
+        this.completionCache = cacheService.namespace('adminCompletions', { maxEntries: 200, ttl: 5000 });
+    }
+
+    /**
+     * Build the items that do not depend on the project before they are first requested
+     */
+    prebuild(): void {
+        this.modelAdminAttributeItems.get();
+        this.modelAdminMethodItems.get();
+        this.inlineAttributeItems.get();
+        this.decoratorItems.get();
+    }
 
     async provideCompletionItems(
         document: vscode.TextDocument,
@@ -29,7 +62,7 @@ export class DjangoAdminCompletionProvider implements vscode.CompletionItemProvi
         }
 
         const cacheKey = `admin_completion_${document.fileName}_${position.line}_${position.character}`;
-        const cached = this.cacheService.get<vscode.CompletionItem[]>(cacheKey);
+        const cached = this.completionCache.get(cacheKey);
         if (cached) {
             return cached;
         }
@@ -42,11 +75,11 @@ export class DjangoAdminCompletionProvider implements vscode.CompletionItemProvi
         if (adminContext) {
             if (adminContext.type === 'ModelAdmin') {
                 // Provide ModelAdmin attribute completions
-                completions.push(...this.getModelAdminAttributeCompletions(linePrefix));
+                completions.push(...this.modelAdminAttributeItems.get());
                 
                 // Provide ModelAdmin method completions
                 if (linePrefix.trim().startsWith('def ')) {
-                    completions.push(...this.getModelAdminMethodCompletions());
+                    completions.push(...this.modelAdminMethodItems.get());
                 }
 
                 // Provide field name completions for list_display, fields, etc.
@@ -55,13 +88,13 @@ export class DjangoAdminCompletionProvider implements vscode.CompletionItemProvi
                 }
             } else if (adminContext.type === 'Inline') {
                 // Provide Inline attribute completions
-                completions.push(...this.getInlineAttributeCompletions(linePrefix));
+                completions.push(...this.inlineAttributeItems.get());
             }
         }
 
         // Provide admin decorators
         if (linePrefix.trim() === '@' || linePrefix.trim().startsWith('@admin')) {
-            completions.push(...this.getAdminDecoratorCompletions());
+            completions.push(...this.decoratorItems.get());
         }
 
         // Provide model names for admin.register
@@ -69,10 +102,33 @@ export class DjangoAdminCompletionProvider implements vscode.CompletionItemProvi
             completions.push(...await this.getModelNameCompletions());
         }
 
-        this.cacheService.set(cacheKey, completions, 5000); // Cache for 5 seconds
+        this.completionCache.set(cacheKey, completions);
         return completions;
     }
 
+    resolveCompletionItem(item: vscode.CompletionItem): vscode.CompletionItem {
+        return resolveLazyCompletionItem<AdminCompletionId>(item, id => this.describe(id));
+    }
+
+    private describe(id: AdminCompletionId): CompletionDetails | undefined {
+        const model = this.projectAnalyzer.getAdvancedAnalyzer()?.getModel(id.model);
+        if (!model) {
+            return undefined;
+        }
+        if (!id.member) {
+            return {
+                detail: `Django Model (${model.app})`,
+                documentation: `Model from ${model.app} app`
+            };
+        }
+
+        const field = model.fields.find(candidate => candidate.name === id.member);
+        if (field) {
+            return { detail: `${field.type} field`, documentation: `Field from ${model.name} model` };
+        }
+        return { detail: 'Model method', documentation: `Method from ${model.name} model` };
+    }
+
     private getAdminContext(document: vscode.TextDocument, position: vscode.Position): { type: string, modelName?: string } | null {
         const text = document.getText();
         const lines = text.split('\n');
@@ -112,7 +168,7 @@ export class DjangoAdminCompletionProvider implements vscode.CompletionItemProvi
         return null;
     }
 
-    private getModelAdminAttributeCompletions(linePrefix: string): vscode.CompletionItem[] {
+    private buildModelAdminAttributeCompletions(): vscode.CompletionItem[] {
         const attributes = this.adminAnalyzer.getAdminAttributes();
         const completions: vscode.CompletionItem[] = [];
         
@@ -170,7 +226,7 @@ export class DjangoAdminCompletionProvider implements vscode.CompletionItemProvi
         return completions;
     }
 
-    private getModelAdminMethodCompletions(): vscode.CompletionItem[] {
+    private buildModelAdminMethodCompletions(): vscode.CompletionItem[] {
         const methods = this.adminAnalyzer.getAdminMethods();
         const completions: vscode.CompletionItem[] = [];
         
@@ -222,7 +278,7 @@ export class DjangoAdminCompletionProvider implements vscode.CompletionItemProvi
         return completions;
     }
 
-    private getInlineAttributeCompletions(linePrefix: string): vscode.CompletionItem[] {
+    private buildInlineAttributeCompletions(): vscode.CompletionItem[] {
         const attributes = this.adminAnalyzer.getInlineAttributes();
         const completions: vscode.CompletionItem[] = [];
         
@@ -253,7 +309,7 @@ export class DjangoAdminCompletionProvider implements vscode.CompletionItemProvi
         return completions;
     }
 
-    private getAdminDecoratorCompletions(): vscode.CompletionItem[] {
+    private buildAdminDecoratorCompletions(): vscode.CompletionItem[] {
         const completions: vscode.CompletionItem[] = [];
         
         const registerItem = new vscode.CompletionItem('@admin.register', vscode.CompletionItemKind.Snippet);
@@ -274,11 +330,8 @@ export class DjangoAdminCompletionProvider implements vscode.CompletionItemProvi
         const models = advancedAnalyzer.getModels();
         const completions: vscode.CompletionItem[] = [];
         
-        for (const [modelName, model] of models) {
-            const item = new vscode.CompletionItem(model.name, vscode.CompletionItemKind.Class);
-            item.detail = `Django Model (${model.app})`;
-            item.documentation = `Model from ${model.app} app`;
-            completions.push(item);
+        for (const model of models.values()) {
+            completions.push(new LazyCompletionItem(model.name, vscode.CompletionItemKind.Class, { model: model.name }));
         }
         
         return completions;
@@ -303,18 +356,22 @@ export class DjangoAdminCompletionProvider implements vscode.CompletionItemProvi
         
         // Add field completions
         for (const field of model.fields) {
-            const item = new vscode.CompletionItem(`'${field.name}'`, vscode.CompletionItemKind.Field);
-            item.detail = `${field.type} field`;
-            item.documentation = `Field from ${model.name} model`;
+            const item = new LazyCompletionItem(
+                `'${field.name}'`,
+                vscode.CompletionItemKind.Field,
+                { model: model.name, member: field.name }
+            );
             item.sortText = `0${field.name}`; // Sort fields first
             completions.push(item);
         }
         
         // Add method completions for list_display
         for (const method of model.methods) {
-            const item = new vscode.CompletionItem(`'${method.name}'`, vscode.CompletionItemKind.Method);
-            item.detail = 'Model method';
-            item.documentation = `Method from ${model.name} model`;
+            const item = new LazyCompletionItem(
+                `'${method.name}'`,
+                vscode.CompletionItemKind.Method,
+                { model: model.name, member: method.name }
+            );
             item.sortText = `1${method.name}`; // Sort methods after fields
             completions.push(item);
         }
@@ -9,12 +9,25 @@ import { PythonIntegration, PythonExecutor } from '../pythonIntegration';
 import { DjangoProjectAnalyzer } from '../analyzers/djangoProjectAnalyzer';
 import { OptimizedDjangoProjectAnalyzer } from '../analyzers/optimizedDjangoProjectAnalyzer';
 import { AdvancedModelAnalyzer } from '../analyzers/advancedModelAnalyzer';
+import { ModelStore } from '../analyzers/modelStore';
 import { UrlPatternAnalyzer } from '../analyzers/urlPatternAnalyzer';
 import { EnhancedUrlPatternAnalyzer } from '../analyzers/enhancedUrlPatternAnalyzer';
 import { DjangoFormAnalyzer } from '../analyzers/djangoFormAnalyzer';
 import { ViewContextAnalyzer } from '../analyzers/viewContextAnalyzer';
 import { StaticFileAnalyzer } from '../analyzers/staticFileAnalyzer';
 import { DjangoAdminAnalyzer } from '../analyzers/djangoAdminAnalyzer';
+import { UrlResolver } from '../analyzers/urlResolver';
+import { UrlConfEngine } from '../analyzers/urlConfEngine';
+import { TemplateIndex } from '../analyzers/templateIndex';
+import { PrebuiltProjectIndex } from '../analyzers/prebuiltProjectIndex';
+import { GitCheckoutMonitor } from '../analyzers/gitCheckoutMonitor';
+import { SitePackagesModelIndex } from '../analyzers/sitePackagesModelIndex';
+import { LiveModelRegistry } from '../analyzers/liveModelRegistry';
+import { ReferenceIndex } from '../analyzers/referenceIndex';
+import { VariableBindingIndex } from '../analyzers/variableBindingIndex';
+import { ModelDependencyGraph } from '../analyzers/modelDependencyGraph';
+import { ClassHierarchyIndex } from '../analyzers/classHierarchyIndex';
+import { ProjectShardManager } from '../analyzers/projectShardManager';
 
 // Configuration
 import { ProjectPathConfigurator } from '../projectPathConfigurator';
@@ -32,19 +45,27 @@ import { DjangoModelFormCompletionProvider } from '../providers/djangoModelFormC
 import { TemplateContextCompletionProvider } from '../providers/templateContextCompletionProvider';
 import { StaticPathCompletionProvider } from '../providers/staticPathCompletionProvider';
 import { DjangoAdminCompletionProvider } from '../completions/djangoAdminCompletionProvider';
+import { TemplateBlockCompletionProvider } from '../providers/templateBlockCompletionProvider';
 
 // Definition providers
 import { DjangoDefinitionProvider } from '../providers/djangoDefinitionProvider';
 import { EnhancedDjangoDefinitionProvider } from '../providers/enhancedDjangoDefinitionProvider';
+import { UrlPathHoverProvider } from '../providers/urlPathHoverProvider';
+import { DjangoReferenceProvider } from '../providers/djangoReferenceProvider';
 
 // Services
 import { ExtensionService } from '../services/extensionService';
 import { CompletionService } from '../services/completionService';
 import { CommandService } from '../services/commandService';
-import { FileWatcherService } from '../services/fileWatcherService';
 import { EnhancedFileWatcherService } from '../services/enhancedFileWatcherService';
 import { DefinitionService } from '../services/definitionService';
 import { CacheService } from '../services/cacheService';
+import { MemoryBudgetManager } from '../cache/memoryBudgetManager';
+import { AnalysisQuarantine } from '../analyzers/analysisQuarantine';
+import { AnalysisServerClient } from '../services/analysisServerClient';
+import { ReferenceDiagnosticsService } from '../services/referenceDiagnosticsService';
+import { BufferAnalysisService } from '../services/bufferAnalysisService';
+import { PrefetchService } from '../services/prefetchService';
 
 // Parsers
 import { PythonParser } from '../parsers/pythonParser';
@@ -67,6 +88,7 @@ export function createContainer(context: vscode.ExtensionContext): Container {
     } else {
         container.bind<DjangoProjectAnalyzer>(TYPES.DjangoProjectAnalyzer).to(DjangoProjectAnalyzer).inSingletonScope();
     }
+    container.bind<ModelStore>(TYPES.ModelStore).to(ModelStore).inSingletonScope();
     container.bind<AdvancedModelAnalyzer>(TYPES.AdvancedModelAnalyzer).to(AdvancedModelAnalyzer).inSingletonScope();
     container.bind<UrlPatternAnalyzer>(TYPES.UrlPatternAnalyzer).to(UrlPatternAnalyzer).inSingletonScope();
     container.bind<EnhancedUrlPatternAnalyzer>(TYPES.EnhancedUrlPatternAnalyzer).to(EnhancedUrlPatternAnalyzer).inSingletonScope();
@@ -74,6 +96,18 @@ export function createContainer(context: vscode.ExtensionContext): Container {
     container.bind<ViewContextAnalyzer>(TYPES.ViewContextAnalyzer).to(ViewContextAnalyzer).inSingletonScope();
     container.bind<StaticFileAnalyzer>(TYPES.StaticFileAnalyzer).to(StaticFileAnalyzer).inSingletonScope();
     container.bind<DjangoAdminAnalyzer>(TYPES.DjangoAdminAnalyzer).to(DjangoAdminAnalyzer).inSingletonScope();
+    container.bind<SitePackagesModelIndex>(TYPES.SitePackagesModelIndex).to(SitePackagesModelIndex).inSingletonScope();
+    container.bind<ModelDependencyGraph>(TYPES.ModelDependencyGraph).to(ModelDependencyGraph).inSingletonScope();
+    container.bind<ClassHierarchyIndex>(TYPES.ClassHierarchyIndex).to(ClassHierarchyIndex).inSingletonScope();
+    container.bind<ProjectShardManager>(TYPES.ProjectShardManager).to(ProjectShardManager).inSingletonScope();
+    container.bind<UrlConfEngine>(TYPES.UrlConfEngine).to(UrlConfEngine).inSingletonScope();
+    container.bind<UrlResolver>(TYPES.UrlResolver).to(UrlResolver).inSingletonScope();
+    container.bind<TemplateIndex>(TYPES.TemplateIndex).to(TemplateIndex).inSingletonScope();
+    container.bind<PrebuiltProjectIndex>(TYPES.PrebuiltProjectIndex).to(PrebuiltProjectIndex).inSingletonScope();
+    container.bind<GitCheckoutMonitor>(TYPES.GitCheckoutMonitor).to(GitCheckoutMonitor).inSingletonScope();
+    container.bind<LiveModelRegistry>(TYPES.LiveModelRegistry).to(LiveModelRegistry).inSingletonScope();
+    container.bind<ReferenceIndex>(TYPES.ReferenceIndex).to(ReferenceIndex).inSingletonScope();
+    container.bind<VariableBindingIndex>(TYPES.VariableBindingIndex).to(VariableBindingIndex).inSingletonScope();
     
     // Configuration - Singleton
     container.bind<ProjectPathConfigurator>(TYPES.ProjectPathConfigurator).to(ProjectPathConfigurator).inSingletonScope();
@@ -92,19 +126,27 @@ export function createContainer(context: vscode.ExtensionContext): Container {
     container.bind<TemplateContextCompletionProvider>(TYPES.TemplateContextCompletionProvider).to(TemplateContextCompletionProvider);
     container.bind<StaticPathCompletionProvider>(TYPES.StaticPathCompletionProvider).to(StaticPathCompletionProvider);
     container.bind<DjangoAdminCompletionProvider>(TYPES.DjangoAdminCompletionProvider).to(DjangoAdminCompletionProvider);
+    container.bind<TemplateBlockCompletionProvider>(TYPES.TemplateBlockCompletionProvider).to(TemplateBlockCompletionProvider);
     
     // Definition providers - Transient
     container.bind<DjangoDefinitionProvider>(TYPES.DjangoDefinitionProvider).to(DjangoDefinitionProvider);
     container.bind<EnhancedDjangoDefinitionProvider>(TYPES.EnhancedDjangoDefinitionProvider).to(EnhancedDjangoDefinitionProvider);
+    container.bind<UrlPathHoverProvider>(TYPES.UrlPathHoverProvider).to(UrlPathHoverProvider);
+    container.bind<DjangoReferenceProvider>(TYPES.DjangoReferenceProvider).to(DjangoReferenceProvider);
     
     // Services - Singleton
     container.bind<ExtensionService>(TYPES.ExtensionService).to(ExtensionService).inSingletonScope();
     container.bind<CompletionService>(TYPES.CompletionService).to(CompletionService).inSingletonScope();
     container.bind<CommandService>(TYPES.CommandService).to(CommandService).inSingletonScope();
-    container.bind<FileWatcherService>(TYPES.FileWatcherService).to(FileWatcherService).inSingletonScope();
     container.bind<EnhancedFileWatcherService>(TYPES.EnhancedFileWatcherService).to(EnhancedFileWatcherService).inSingletonScope();
     container.bind<DefinitionService>(TYPES.DefinitionService).to(DefinitionService).inSingletonScope();
     container.bind<CacheService>(TYPES.CacheService).to(CacheService).inSingletonScope();
+    container.bind<MemoryBudgetManager>(TYPES.MemoryBudgetManager).to(MemoryBudgetManager).inSingletonScope();
+    container.bind<AnalysisQuarantine>(TYPES.AnalysisQuarantine).to(AnalysisQuarantine).inSingletonScope();
+    container.bind<AnalysisServerClient>(TYPES.AnalysisServerClient).to(AnalysisServerClient).inSingletonScope();
+    container.bind<ReferenceDiagnosticsService>(TYPES.ReferenceDiagnosticsService).to(ReferenceDiagnosticsService).inSingletonScope();
+    container.bind<BufferAnalysisService>(TYPES.BufferAnalysisService).to(BufferAnalysisService).inSingletonScope();
+    container.bind<PrefetchService>(TYPES.PrefetchService).to(PrefetchService).inSingletonScope();
     
     // Parsers
     container.bind<PythonParser>(TYPES.PythonParser).to(PythonParser).inSingletonScope();
@@ -10,12 +10,25 @@ export const TYPES = {
     // Analyzers
     DjangoProjectAnalyzer: Symbol.for('DjangoProjectAnalyzer'),
     AdvancedModelAnalyzer: Symbol.for('AdvancedModelAnalyzer'),
+    ModelStore: Symbol.for('ModelStore'),
     UrlPatternAnalyzer: Symbol.for('UrlPatternAnalyzer'),
     EnhancedUrlPatternAnalyzer: Symbol.for('EnhancedUrlPatternAnalyzer'),
     DjangoFormAnalyzer: Symbol.for('DjangoFormAnalyzer'),
     ViewContextAnalyzer: Symbol.for('ViewContextAnalyzer'),
     StaticFileAnalyzer: Symbol.for('StaticFileAnalyzer'),
     DjangoAdminAnalyzer: Symbol.for('DjangoAdminAnalyzer'),
+    SitePackagesModelIndex: Symbol.for('SitePackagesModelIndex'),
+    ModelDependencyGraph: Symbol.for('ModelDependencyGraph'),
+    ClassHierarchyIndex: Symbol.for('ClassHierarchyIndex'),
+    ProjectShardManager: Symbol.for('ProjectShardManager'),
+    UrlResolver: Symbol.for('UrlResolver'),
+    UrlConfEngine: Symbol.for('UrlConfEngine'),
+    TemplateIndex: Symbol.for('TemplateIndex'),
+    PrebuiltProjectIndex: Symbol.for('PrebuiltProjectIndex'),
+    GitCheckoutMonitor: Symbol.for('GitCheckoutMonitor'),
+    LiveModelRegistry: Symbol.for('LiveModelRegistry'),
+    ReferenceIndex: Symbol.for('ReferenceIndex'),
+    VariableBindingIndex: Symbol.for('VariableBindingIndex'),
     
     // Configuration
     ProjectPathConfigurator: Symbol.for('ProjectPathConfigurator'),
@@ -34,19 +47,27 @@ export const TYPES = {
     TemplateContextCompletionProvider: Symbol.for('TemplateContextCompletionProvider'),
     StaticPathCompletionProvider: Symbol.for('StaticPathCompletionProvider'),
     DjangoAdminCompletionProvider: Symbol.for('DjangoAdminCompletionProvider'),
+    TemplateBlockCompletionProvider: Symbol.for('TemplateBlockCompletionProvider'),
     
     // Definition Providers
     DjangoDefinitionProvider: Symbol.for('DjangoDefinitionProvider'),
     EnhancedDjangoDefinitionProvider: Symbol.for('EnhancedDjangoDefinitionProvider'),
+    UrlPathHoverProvider: Symbol.for('UrlPathHoverProvider'),
+    DjangoReferenceProvider: Symbol.for('DjangoReferenceProvider'),
     
     // Services
     ExtensionService: Symbol.for('ExtensionService'),
     CompletionService: Symbol.for('CompletionService'),
     CommandService: Symbol.for('CommandService'),
-    FileWatcherService: Symbol.for('FileWatcherService'),
     EnhancedFileWatcherService: Symbol.for('EnhancedFileWatcherService'),
     DefinitionService: Symbol.for('DefinitionService'),
     CacheService: Symbol.for('CacheService'),
+    MemoryBudgetManager: Symbol.for('MemoryBudgetManager'),
+    AnalysisQuarantine: Symbol.for('AnalysisQuarantine'),
+    AnalysisServerClient: Symbol.for('AnalysisServerClient'),
+    ReferenceDiagnosticsService: Symbol.for('ReferenceDiagnosticsService'),
+    BufferAnalysisService: Symbol.for('BufferAnalysisService'),
+    PrefetchService: Symbol.for('PrefetchService'),
     
     // Parsers
     PythonParser: Symbol.for('PythonParser')
@@ -0,0 +1,279 @@
+/**
+ * Regex-based parser for Django admin modules: ModelAdmin classes, inlines
+ * and their registrations. Has no editor dependencies so it can run in the
+ * command line tools as well.
+ */
+
+export interface DjangoModel {
+    name: string;
+    appName: string;
+    fields: Map<string, { name: string; type: string; }>;
+    methods: string[];
+    filePath: string;
+    line: number;
+}
+
+export interface AdminClass {
+    name: string;
+    modelName: string;
+    model?: DjangoModel;
+    filePath: string;
+    line: number;
+    attributes: Map<string, any>;
+    methods: string[];
+    inlines: string[];
+    isRegistered: boolean;
+}
+
+export interface AdminInline {
+    name: string;
+    modelName: string;
+    type: 'TabularInline' | 'StackedInline';
+    filePath: string;
+    line: number;
+}
+
+/**
+ * admin.site.register(Model, AdminClass) call; the admin class may be
+ * defined in another module
+ */
+export interface AdminRegistration {
+    modelName: string;
+    adminClassName: string;
+}
+
+export interface AdminParseResult {
+    adminClasses: AdminClass[];
+    inlines: AdminInline[];
+    registrations: AdminRegistration[];
+}
+
+// Common ModelAdmin attributes
+export const ADMIN_ATTRIBUTES = [
+    'list_display', 'list_display_links', 'list_filter', 'list_select_related',
+    'list_per_page', 'list_max_show_all', 'list_editable', 'search_fields',
+    'search_help_text', 'date_hierarchy', 'save_as', 'save_as_continue',
+    'save_on_top', 'paginator', 'preserve_filters', 'inlines', 'actions',
+    'actions_on_top', 'actions_on_bottom', 'actions_selection_counter',
+    'fields', 'exclude', 'fieldsets', 'form', 'filter_horizontal',
+    'filter_vertical', 'ordering', 'view_on_site', 'show_full_result_count',
+    'sortable_by', 'readonly_fields', 'raw_id_fields', 'formfield_overrides',
+    'prepopulated_fields', 'radio_fields', 'autocomplete_fields'
+];
+
+// Common ModelAdmin methods
+export const ADMIN_METHODS = [
+    'get_queryset', 'get_list_display', 'get_list_display_links',
+    'get_fields', 'get_fieldsets', 'get_list_filter', 'get_list_select_related',
+    'get_search_fields', 'get_search_results', 'get_sortable_by',
+    'get_ordering', 'get_readonly_fields', 'get_prepopulated_fields',
+    'get_form', 'get_formsets_with_inlines', 'get_inline_instances',
+    'formfield_for_foreignkey', 'formfield_for_manytomany', 'formfield_for_choice_field',
+    'get_changelist', 'get_changelist_form', 'get_changelist_formset',
+    'has_add_permission', 'has_change_permission', 'has_delete_permission',
+    'has_view_permission', 'has_module_permission',
+    'save_model', 'delete_model', 'save_formset', 'save_related',
+    'get_autocomplete_fields', 'get_actions', 'get_urls',
+    'add_view', 'change_view', 'delete_view', 'history_view', 'changelist_view'
+];
+
+// Inline attributes
+export const INLINE_ATTRIBUTES = [
+    'model', 'fk_name', 'formset', 'form', 'classes', 'extra', 'min_num',
+    'max_num', 'validate_min', 'validate_max', 'fields', 'exclude',
+    'raw_id_fields', 'verbose_name', 'verbose_name_plural', 'can_delete',
+    'show_change_link', 'autocomplete_fields', 'readonly_fields'
+];
+
+/**
+ * Parse an admin module. Classes deriving from ModelAdmin directly are
+ * admin classes; `isAdminBase` may accept other bases, e.g. project classes
+ * that derive from ModelAdmin themselves.
+ */
+export function parseAdminModule(
+    content: string,
+    filePath: string,
+    isAdminBase?: (base: string) => boolean
+): AdminParseResult {
+    const result: AdminParseResult = { adminClasses: [], inlines: [], registrations: [] };
+    const lines = content.split('\n');
+
+    // Find admin class definitions
+    const adminClassRegex = /class\s+(\w+)\s*\(\s*(admin\.)?ModelAdmin\s*\)/;
+    const inlineRegex = /class\s+(\w+)\s*\(\s*(admin\.)?(TabularInline|StackedInline)\s*\)/;
+    const registerRegex = /@admin\.register\s*\(\s*(\w+)\s*\)/;
+    const classRegex = /^class\s+(\w+)\s*\(([^)]*)\)/;
+
+    let currentClass: AdminClass | null = null;
+    let currentInline: AdminInline | null = null;
+    let indentLevel = 0;
+    let nextClassModel: string | null = null;
+
+    for (let i = 0; i < lines.length; i++) {
+        const line = lines[i];
+        const trimmedLine = line.trim();
+
+        // Check for @admin.register decorator
+        const registerMatch = line.match(registerRegex);
+        if (registerMatch) {
+            nextClassModel = registerMatch[1];
+            continue;
+        }
+
+        // Check for ModelAdmin class
+        const adminMatch = line.match(adminClassRegex) || (isAdminBase ? matchDerivedClass(line, classRegex, isAdminBase) : null);
+        if (adminMatch) {
+            currentClass = {
+                name: adminMatch[1],
+                modelName: nextClassModel || '',
+                filePath,
+                line: i,
+                attributes: new Map(),
+                methods: [],
+                inlines: [],
+                isRegistered: nextClassModel !== null
+            };
+            result.adminClasses.push(currentClass);
+            nextClassModel = null;
+            indentLevel = getIndentLevel(line);
+            continue;
+        }
+
+        // Check for Inline class
+        const inlineMatch = line.match(inlineRegex);
+        if (inlineMatch) {
+            currentInline = {
+                name: inlineMatch[1],
+                modelName: '',
+                type: inlineMatch[3] as 'TabularInline' | 'StackedInline',
+                filePath,
+                line: i
+            };
+            result.inlines.push(currentInline);
+            currentClass = null;
+            indentLevel = getIndentLevel(line);
+            continue;
+        }
+
+        // Parse class content
+        if (currentClass && getIndentLevel(line) > indentLevel && trimmedLine) {
+            // Check for model assignment in Meta class
+            if (trimmedLine.startsWith('model =')) {
+                const modelMatch = trimmedLine.match(/model\s*=\s*(\w+)/);
+                if (modelMatch) {
+                    currentClass.modelName = modelMatch[1];
+                }
+            }
+
+            // Check for attributes
+            for (const attr of ADMIN_ATTRIBUTES) {
+                if (trimmedLine.startsWith(`${attr} =`) || trimmedLine.startsWith(`${attr}=`)) {
+                    currentClass.attributes.set(attr, parseAttributeValue(trimmedLine));
+                    break;
+                }
+            }
+
+            // Check for methods
+            const methodMatch = trimmedLine.match(/def\s+(\w+)\s*\(/);
+            if (methodMatch) {
+                currentClass.methods.push(methodMatch[1]);
+            }
+
+            // Check for inlines
+            if (trimmedLine.startsWith('inlines =')) {
+                currentClass.inlines = parseListValue(trimmedLine);
+            }
+        }
+
+        // Parse inline content
+        if (currentInline && getIndentLevel(line) > indentLevel && trimmedLine) {
+            if (trimmedLine.startsWith('model =')) {
+                const modelMatch = trimmedLine.match(/model\s*=\s*(\w+)/);
+                if (modelMatch) {
+                    currentInline.modelName = modelMatch[1];
+                }
+            }
+        }
+
+        // Reset current class/inline if dedented
+        if (trimmedLine && getIndentLevel(line) <= indentLevel) {
+            currentClass = null;
+            currentInline = null;
+        }
+    }
+
+    // Find admin.site.register() calls
+    const siteRegisterRegex = /admin\.site\.register\s*\(\s*(\w+)\s*,\s*(\w+)\s*\)/g;
+    let match;
+    while ((match = siteRegisterRegex.exec(content)) !== null) {
+        result.registrations.push({ modelName: match[1], adminClassName: match[2] });
+    }
+
+    return result;
+}
+
+function matchDerivedClass(line: string, classRegex: RegExp, isBase: (base: string) => boolean): RegExpMatchArray | null {
+    const match = line.match(classRegex);
+    return match && match[2].split(',').some(base => isBase(base.trim())) ? match : null;
+}
+
+function getIndentLevel(line: string): number {
+    const match = line.match(/^(\s*)/);
+    return match ? match[1].length : 0;
+}
+
+/**
+ * Value of an `attribute = value` line: lists and tuples as string arrays,
+ * strings, booleans and numbers; anything else as written
+ */
+export function parseAttributeValue(line: string): any {
+    const valueStart = line.indexOf('=') + 1;
+    const value = line.substring(valueStart).trim();
+
+    // Parse list values
+    if (value.startsWith('[')) {
+        return parseListValue(value);
+    }
+
+    // Parse tuple values
+    if (value.startsWith('(')) {
+        return parseTupleValue(value);
+    }
+
+    // Parse string values
+    if (value.startsWith("'") || value.startsWith('"')) {
+        return value.slice(1, -1);
+    }
+
+    // Parse boolean/numeric values
+    if (value === 'True' || value === 'False') {
+        return value === 'True';
+    }
+
+    if (!isNaN(Number(value))) {
+        return Number(value);
+    }
+
+    return value;
+}
+
+function parseListValue(value: string): string[] {
+    // Simple list parsing - can be enhanced for nested structures
+    return splitItems(value.match(/\[(.*?)\]/));
+}
+
+function parseTupleValue(value: string): string[] {
+    // Simple tuple parsing
+    return splitItems(value.match(/\((.*?)\)/));
+}
+
+function splitItems(match: RegExpMatchArray | null): string[] {
+    if (!match) {
+        return [];
+    }
+    return match[1]
+        .split(',')
+        .map(item => item.trim())
+        .filter(item => item.length > 0)
+        .map(item => item.replace(/['"]/g, ''));
+}
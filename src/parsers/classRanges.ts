@@ -0,0 +1,132 @@
+/**
+ * Line ranges of the top-level classes of a Python module, used to map
+ * edits to the classes they touch. Has no editor dependencies.
+ */
+
+export interface TopLevelClass {
+    name: string;
+    // First line of the class, including its decorators
+    startLine: number;
+    // Last line of the class body, including trailing blank and comment lines
+    endLine: number;
+    // Names in the class signature, e.g. ["models.Model"]
+    bases: string[];
+}
+
+/**
+ * Inclusive range of lines, in current document coordinates
+ */
+export type LineSpan = [number, number];
+
+const CLASS_PATTERN = /^class\s+(\w+)\s*(?:\(([^)]*)\))?/;
+
+/**
+ * Find the top-level classes of a module. A class ends right before the next
+ * top-level statement (or the decorators of the next class).
+ */
+export function findTopLevelClasses(content: string): TopLevelClass[] {
+    const lines = content.split('\n');
+    const classes: TopLevelClass[] = [];
+    let current: TopLevelClass | undefined;
+    let decoratorStart: number | undefined;
+
+    for (let i = 0; i < lines.length; i++) {
+        const line = lines[i];
+        const trimmed = line.trim();
+        const isTopLevel = trimmed !== '' && !trimmed.startsWith('#') && !/^\s/.test(line);
+        if (!isTopLevel) {
+            continue;
+        }
+
+        if (line.startsWith('@')) {
+            decoratorStart = decoratorStart ?? i;
+            continue;
+        }
+
+        const startLine = decoratorStart ?? i;
+        decoratorStart = undefined;
+        if (current) {
+            current.endLine = startLine - 1;
+            current = undefined;
+        }
+
+        const match = line.match(CLASS_PATTERN);
+        if (match) {
+            current = {
+                name: match[1],
+                startLine,
+                endLine: lines.length - 1,
+                bases: (match[2] || '').split(',').map(base => base.trim()).filter(base => base && !base.includes('='))
+            };
+            classes.push(current);
+        }
+    }
+
+    return classes;
+}
+
+/**
+ * Update the dirty spans of a document for one content change, given in the
+ * coordinates of the document before the change
+ */
+export function recordLineChange(spans: LineSpan[], startLine: number, endLine: number, text: string): LineSpan[] {
+    const newEnd = startLine + (text.match(/\n/g)?.length ?? 0);
+    const delta = newEnd - endLine;
+
+    const updated = spans.map(([start, end]): LineSpan => {
+        if (start > endLine) {
+            return [start + delta, end + delta];
+        }
+        if (end < startLine) {
+            return [start, end];
+        }
+        return [Math.min(start, startLine), Math.max(newEnd, end > endLine ? end + delta : newEnd)];
+    });
+    updated.push([startLine, newEnd]);
+    return updated;
+}
+
+/**
+ * Split dirty spans into the classes they touch, and whether any of them
+ * reaches code outside a class (imports, module-level statements)
+ */
+export function classesTouchedBy(classes: TopLevelClass[], spans: LineSpan[]): { classes: TopLevelClass[]; outside: boolean } {
+    const touched = classes.filter(cls => spans.some(([start, end]) => start <= cls.endLine && end >= cls.startLine));
+    const outside = spans.some(([start, end]) =>
+        !classes.some(cls => start >= cls.startLine && end <= cls.endLine)
+    );
+    return { classes: touched, outside };
+}
+
+/**
+ * Module text holding the imports, the given classes and the classes they
+ * derive from within the module, so the classes parse as in the full file.
+ * Other lines are blanked rather than dropped to keep line numbers intact.
+ */
+export function buildClassSnippet(content: string, classes: TopLevelClass[], names: string[]): string {
+    const lines = content.split('\n');
+    const byName = new Map(classes.map(cls => [cls.name, cls]));
+    const included = new Set<string>();
+
+    const include = (name: string) => {
+        const cls = byName.get(name);
+        if (!cls || included.has(name)) {
+            return;
+        }
+        included.add(name);
+        cls.bases.forEach(base => include(base.split('.').pop() || base));
+    };
+    names.forEach(include);
+
+    const keep = new Array<boolean>(lines.length).fill(false);
+    lines.forEach((line, index) => {
+        keep[index] = /^(import|from)\s/.test(line);
+    });
+    for (const cls of classes) {
+        if (included.has(cls.name)) {
+            keep.fill(true, cls.startLine, cls.endLine + 1);
+        }
+    }
+
+    return lines.map((line, index) => keep[index] ? line : '').join('\n');
+}
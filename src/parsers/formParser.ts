@@ -0,0 +1,607 @@
+import * as crypto from 'crypto';
+import { LRUCache } from '../cache/lruCache';
+
+export interface FormInfo {
+    name: string;
+    type: 'Form' | 'ModelForm';
+    fields: FormFieldInfo[];
+    modelName?: string; // For ModelForm
+    filePath: string;
+}
+
+export interface FormFieldInfo {
+    name: string;
+    fieldType: string;
+    required: boolean;
+    widget?: string;
+    helpText?: string;
+}
+
+export interface FormParseResult {
+    forms: FormInfo[];
+    /** The file looks like it defines forms but none could be parsed */
+    hasUnparsedFormPatterns: boolean;
+    /** Number of top-level classes re-extracted during this parse */
+    parsedClasses: number;
+    /** Number of top-level classes reused from the previous parse */
+    reusedClasses: number;
+}
+
+interface ClassChunk {
+    text: string;
+}
+
+interface ImportLine {
+    text: string;
+    /** Names the statement binds; undefined when it binds any (star import) */
+    names?: string[];
+}
+
+// Base class lists and regexes are shared across files; bound their number
+const MAX_CONTEXTS = 500;
+const MAX_REGEXES = 200;
+
+// Class statements and their base lists, possibly spanning lines
+const CLASS_BASES_REGEX = /class\s+\w+\s*\(([^)]*)\)/g;
+
+// Common Django form field types
+const FORM_FIELD_TYPES = new Set([
+    'CharField', 'EmailField', 'IntegerField', 'DecimalField', 'FloatField',
+    'BooleanField', 'DateField', 'DateTimeField', 'TimeField', 'URLField',
+    'SlugField', 'ChoiceField', 'MultipleChoiceField', 'FileField', 'ImageField',
+    'JSONField', 'GenericIPAddressField', 'RegexField', 'TypedChoiceField',
+    'TypedMultipleChoiceField', 'ModelChoiceField', 'ModelMultipleChoiceField',
+    'DurationField', 'SplitDateTimeField', 'FilePathField', 'UUIDField'
+]);
+
+// Form-like patterns used to detect files whose forms could not be parsed
+const FORM_PATTERNS = [
+    /class\s+\w+\s*\(\s*.*Form.*\s*\)/,           // class MyForm(Form)
+    /from\s+django\.forms\s+import/,               // from django.forms import
+    /from\s+django\s+import\s+forms/,              // from django import forms
+    /import\s+django\.forms/,                      // import django.forms
+    /=\s*forms\.\w+\s*\(/,                         // = forms.CharField(
+    /class\s+Meta\s*:[\s\S]*?model\s*=/            // class Meta: model =
+];
+
+/**
+ * Regex-based parser for Django forms modules.
+ *
+ * Results are cached per file by content hash, and per top-level class by the
+ * class text plus the imports and same-file forms its bases refer to, so an
+ * edited forms.py only re-extracts the classes that changed or whose bases
+ * did.
+ */
+export class FormParser {
+    private fileCache: Map<string, { hash: string; result: FormParseResult }> = new Map();
+    private classCache: Map<string, Map<string, FormInfo[]>> = new Map();
+    private baseClassCache = new LRUCache<string, string[]>(MAX_CONTEXTS);
+    private regexCache = new LRUCache<string, RegExp>(MAX_REGEXES);
+
+    parse(content: string, filePath: string): FormParseResult {
+        const hash = this.computeHash(content);
+        const cachedFile = this.fileCache.get(filePath);
+        if (cachedFile && cachedFile.hash === hash) {
+            return {
+                ...cachedFile.result,
+                parsedClasses: 0,
+                reusedClasses: cachedFile.result.parsedClasses + cachedFile.result.reusedClasses
+            };
+        }
+
+        const { header, classes } = this.splitTopLevel(content);
+        const imports = this.parseImportLines(header);
+
+        const previousClasses = this.classCache.get(filePath) || new Map<string, FormInfo[]>();
+        const currentClasses = new Map<string, FormInfo[]>();
+        const forms: FormInfo[] = [];
+        const localForms = new Set<string>();
+        let parsedClasses = 0;
+        let reusedClasses = 0;
+
+        for (const chunk of classes) {
+            // A class only depends on what its bases refer to
+            const bases = this.getBaseNames(chunk.text);
+            const context = this.getClassContext(chunk.text, bases, imports);
+            const localBases = bases.filter(base => localForms.has(base));
+            const key = this.computeHash(context + '\0' + localBases.join(',') + '\0' + chunk.text);
+            let chunkForms = previousClasses.get(key) || currentClasses.get(key);
+
+            if (chunkForms) {
+                reusedClasses++;
+            } else {
+                chunkForms = this.extractForms(chunk.text, filePath, this.getFormClassRegex(context, localBases));
+                parsedClasses++;
+            }
+
+            currentClasses.set(key, chunkForms);
+            chunkForms.forEach(form => localForms.add(form.name));
+            forms.push(...chunkForms);
+        }
+
+        this.classCache.set(filePath, currentClasses);
+
+        const result: FormParseResult = {
+            forms,
+            hasUnparsedFormPatterns: forms.length === 0 && FORM_PATTERNS.some(pattern => pattern.test(content)),
+            parsedClasses,
+            reusedClasses
+        };
+        this.fileCache.set(filePath, { hash, result });
+
+        return result;
+    }
+
+    /**
+     * Drop cached state for a file (e.g. when it is deleted)
+     */
+    forget(filePath: string): void {
+        this.fileCache.delete(filePath);
+        this.classCache.delete(filePath);
+    }
+
+    clear(): void {
+        this.fileCache.clear();
+        this.classCache.clear();
+        this.baseClassCache.clear();
+        this.regexCache.clear();
+    }
+
+    /**
+     * Split a module into its top-level statements (imports etc.) and
+     * top-level class blocks
+     */
+    private splitTopLevel(content: string): { header: string; classes: ClassChunk[] } {
+        const lines = content.split('\n');
+        const headerLines: string[] = [];
+        const classes: ClassChunk[] = [];
+        let current: string[] | null = null;
+
+        for (const line of lines) {
+            const isTopLevel = line.trim() !== '' && !/^\s/.test(line);
+
+            if (isTopLevel) {
+                if (current) {
+                    classes.push({ text: current.join('\n') });
+                    current = null;
+                }
+                if (/^class\s+\w+/.test(line)) {
+                    current = [line];
+                    continue;
+                }
+                headerLines.push(line);
+            } else if (current) {
+                current.push(line);
+            }
+        }
+
+        if (current) {
+            classes.push({ text: current.join('\n') });
+        }
+
+        return { header: headerLines.filter(line => line.includes('import')).join('\n'), classes };
+    }
+
+    /**
+     * The names each top-level import statement binds
+     */
+    private parseImportLines(header: string): ImportLine[] {
+        return header.split('\n').filter(line => line.trim() !== '').map(text => {
+            const fromMatch = text.match(/^from\s+[\w.]+\s+import\s+\(?([^)#]*)/);
+            const importMatch = text.match(/^import\s+([^#]*)/);
+            const list = fromMatch?.[1] ?? importMatch?.[1];
+            if (list === undefined || list.includes('*')) {
+                return { text };
+            }
+            const names = list.split(',').map(part => part.trim()).filter(Boolean).map(part => {
+                const alias = part.match(/\s+as\s+(\w+)$/);
+                if (alias) {
+                    return alias[1];
+                }
+                // `import django.forms` binds `django`
+                return fromMatch ? part : part.split('.')[0];
+            });
+            return { text, names };
+        });
+    }
+
+    /**
+     * First names of the bases of every class statement in a block
+     */
+    private getBaseNames(classText: string): string[] {
+        const names = new Set<string>();
+        let match: RegExpExecArray | null;
+        CLASS_BASES_REGEX.lastIndex = 0;
+        while ((match = CLASS_BASES_REGEX.exec(classText)) !== null) {
+            for (const base of match[1].split(',')) {
+                const name = base.trim().match(/^(\w+)(?:\.\w+)*$/);
+                if (name) {
+                    names.add(name[1]);
+                }
+            }
+        }
+        return Array.from(names);
+    }
+
+    /**
+     * The import statements a class block's bases refer to, followed by its
+     * class statements. Base classes are extracted from this text only.
+     */
+    private getClassContext(classText: string, bases: string[], imports: ImportLine[]): string {
+        const referenced = imports
+            .filter(line => !line.names || line.names.some(name => bases.includes(name)))
+            .map(line => line.text);
+        const statements = classText.match(CLASS_BASES_REGEX) || [];
+        return [...referenced, ...statements].join('\n');
+    }
+
+    /**
+     * Build (or reuse) the form class regex for the base classes a class
+     * context imports plus the forms of the same file it derives from
+     */
+    private getFormClassRegex(context: string, localBases: string[] = []): RegExp {
+        let importedBaseClasses = this.baseClassCache.get(context);
+        if (!importedBaseClasses) {
+            importedBaseClasses = this.extractFormBaseClasses(context);
+            this.baseClassCache.set(context, importedBaseClasses);
+        }
+        const formBaseClasses = [...importedBaseClasses, ...localBases];
+
+        const regexKey = formBaseClasses.join('|');
+        let regex = this.regexCache.get(regexKey);
+        if (regex) {
+            return regex;
+        }
+
+        // Build regex pattern for form class definitions with various inheritance patterns
+        const baseClassPattern = formBaseClasses.map(cls => cls.replace(/[.*+?^${}()|[\]\\]/g, '\\$&')).join('|');
+
+        // Create a comprehensive regex pattern that handles various inheritance patterns
+        const patterns = [
+            `forms\\.(?:Model)?Form`,              // forms.Form or forms.ModelForm
+            `(?:Model)?Form`,                      // Form or ModelForm (direct import)
+            `\\w+\\.(?:Model)?Form`,               // alias.Form or alias.ModelForm
+            `\\w+Form`,                            // Any class ending with Form
+        ];
+
+        if (baseClassPattern) {
+            patterns.push(baseClassPattern);      // Custom imported forms
+        }
+
+        regex = new RegExp(
+            `class\\s+(\\w+)\\s*\\(\\s*(?:` +
+            patterns.join('|') +
+            `)(?:\\s*,\\s*[\\w\\.]+)*\\s*\\)\\s*:`,  // Support multiple inheritance
+            'g'
+        );
+        this.regexCache.set(regexKey, regex);
+
+        return regex;
+    }
+
+    /**
+     * Extract form information from a top-level class block
+     */
+    private extractForms(content: string, filePath: string, formClassRegex: RegExp): FormInfo[] {
+        const forms: FormInfo[] = [];
+        let match;
+
+        formClassRegex.lastIndex = 0;
+        while ((match = formClassRegex.exec(content)) !== null) {
+            const formName = match[1];
+            const fullMatch = match[0];
+
+            // Determine form type from the full match
+            const formType = this.determineFormType(fullMatch, content);
+
+            // Extract form body with improved regex that handles indentation
+            const formBody = this.extractFormBody(content, match.index);
+
+            if (formBody) {
+                const fields = this.extractFormFields(formBody);
+                const modelName = formType === 'ModelForm' ? this.extractModelName(formBody) : undefined;
+
+                forms.push({
+                    name: formName,
+                    type: formType,
+                    fields: fields,
+                    modelName: modelName,
+                    filePath: filePath
+                });
+            }
+        }
+
+        return forms;
+    }
+
+    /**
+     * Extract form base classes from imports
+     */
+    private extractFormBaseClasses(content: string): string[] {
+        const baseClasses: string[] = [];
+        const importAliases: Map<string, string> = new Map();
+
+        // Match various import patterns
+        const importPatterns = [
+            // from django.forms import Form, ModelForm
+            /from\s+django\.forms\s+import\s+([^;\n]+)/g,
+            // from django import forms
+            /from\s+django\s+import\s+forms/g,
+            // from myapp.forms import CustomForm
+            /from\s+[\w\.]+\s+import\s+(\w*Form\w*)/g,
+            // import django.forms as forms
+            /import\s+django\.forms\s+as\s+(\w+)/g,
+            // from django.forms import Form as BaseForm
+            /from\s+django\.forms\s+import\s+(\w+)\s+as\s+(\w+)/g,
+            // import django.forms
+            /import\s+django\.forms/g
+        ];
+
+        // First pass: collect imports and aliases
+        importPatterns.forEach((pattern, index) => {
+            let match;
+            pattern.lastIndex = 0;
+
+            while ((match = pattern.exec(content)) !== null) {
+                if (index === 0 && match[1]) {
+                    // from django.forms import X, Y, Z
+                    const imports = match[1].split(',').map(s => s.trim());
+                    imports.forEach(imp => {
+                        // Handle 'as' aliases within the import
+                        const asMatch = imp.match(/(\w+)\s+as\s+(\w+)/);
+                        if (asMatch) {
+                            if (asMatch[1].includes('Form')) {
+                                baseClasses.push(asMatch[2]);
+                                importAliases.set(asMatch[2], asMatch[1]);
+                            }
+                        } else if (imp.includes('Form')) {
+                            baseClasses.push(imp);
+                        }
+                    });
+                } else if (index === 2 && match[1]) {
+                    // from custom.module import CustomForm
+                    baseClasses.push(match[1]);
+                } else if (index === 3 && match[1]) {
+                    // import django.forms as X
+                    importAliases.set(match[1], 'forms');
+                } else if (index === 4 && match[1] && match[2]) {
+                    // from django.forms import X as Y
+                    if (match[1].includes('Form')) {
+                        baseClasses.push(match[2]);
+                        importAliases.set(match[2], match[1]);
+                    }
+                }
+            }
+        });
+
+        // Second pass: look for aliased form usage
+        importAliases.forEach((value, alias) => {
+            if (value === 'forms') {
+                // Look for alias.Form or alias.ModelForm usage
+                const aliasPattern = new RegExp(`${alias}\\.(\\w*Form)`, 'g');
+                let match;
+                while ((match = aliasPattern.exec(content)) !== null) {
+                    baseClasses.push(`${alias}.${match[1]}`);
+                }
+            }
+        });
+
+        return [...new Set(baseClasses)]; // Remove duplicates
+    }
+
+    /**
+     * Determine form type based on class definition and the class block
+     */
+    private determineFormType(classDefinition: string, content: string): 'Form' | 'ModelForm' {
+        // Check if ModelForm is explicitly mentioned
+        if (classDefinition.includes('ModelForm')) {
+            return 'ModelForm';
+        }
+
+        // Check if the class has a Meta class with a model attribute
+        const className = classDefinition.match(/class\s+(\w+)/)?.[1];
+        if (className) {
+            const metaRegex = new RegExp(
+                `class\\s+${className}[^:]*:[\\s\\S]*?class\\s+Meta\\s*:[\\s\\S]*?model\\s*=`,
+                'm'
+            );
+            if (metaRegex.test(content)) {
+                return 'ModelForm';
+            }
+        }
+
+        return 'Form';
+    }
+
+    /**
+     * Extract form body with better handling of indentation
+     */
+    private extractFormBody(content: string, startIndex: number): string | null {
+        const lines = content.split('\n');
+        let currentIndex = 0;
+        let lineIndex = 0;
+
+        // Find the line containing the class definition
+        for (let i = 0; i < lines.length; i++) {
+            if (currentIndex + lines[i].length >= startIndex) {
+                lineIndex = i;
+                break;
+            }
+            currentIndex += lines[i].length + 1; // +1 for newline
+        }
+
+        // Get the indentation level of the class definition
+        const classLine = lines[lineIndex];
+        const classIndent = classLine.match(/^(\s*)/)?.[1]?.length || 0;
+
+        // Collect lines that belong to the class body
+        const bodyLines: string[] = [classLine];
+        for (let i = lineIndex + 1; i < lines.length; i++) {
+            const line = lines[i];
+            const lineIndent = line.match(/^(\s*)/)?.[1]?.length || 0;
+
+            // Skip empty lines
+            if (line.trim() === '') {
+                bodyLines.push(line);
+                continue;
+            }
+
+            // If we find a line with same or less indentation (and it's not empty), we're done
+            if (lineIndent <= classIndent) {
+                break;
+            }
+
+            bodyLines.push(line);
+        }
+
+        return bodyLines.join('\n');
+    }
+
+    /**
+     * Extract form fields from form body
+     */
+    private extractFormFields(formBody: string): FormFieldInfo[] {
+        const fields: FormFieldInfo[] = [];
+
+        // Split the form body into lines for better processing
+        const lines = formBody.split('\n');
+
+        for (let i = 0; i < lines.length; i++) {
+            const line = lines[i];
+
+            // Check if this line starts a field definition
+            // Support both 'forms.CharField' and aliased patterns like 'f.CharField'
+            const fieldStartMatch = line.match(/^\s*(\w+)\s*=\s*(\w+)\.(\w+)\s*\(/);
+
+            if (fieldStartMatch) {
+                const fieldName = fieldStartMatch[1];
+                const moduleOrAlias = fieldStartMatch[2];
+                const fieldType = fieldStartMatch[3];
+
+                // Check if this is actually a forms field
+                if (!this.isFormsField(moduleOrAlias, fieldType, formBody)) {
+                    continue;
+                }
+
+                // Skip if it's a method (starts with underscore or is 'Meta')
+                if (fieldName.startsWith('_') || fieldName === 'Meta') {
+                    continue;
+                }
+
+                // Extract the full field definition (might span multiple lines)
+                const fieldDefinition = this.extractMultilineFieldDefinition(lines, i);
+
+                // Extract parameters from the full definition
+                const paramsMatch = fieldDefinition.match(/\w+\.\w+\s*\(([\s\S]*?)\)$/);
+                const fieldParams = paramsMatch ? paramsMatch[1] : '';
+
+                fields.push({
+                    name: fieldName,
+                    fieldType: fieldType,
+                    required: !fieldParams.includes('required=False'),
+                    widget: this.extractWidget(fieldParams),
+                    helpText: this.extractHelpText(fieldParams)
+                });
+
+                // Skip lines that were part of this field definition
+                const definitionLines = fieldDefinition.split('\n').length - 1;
+                i += definitionLines;
+            }
+        }
+
+        return fields;
+    }
+
+    /**
+     * Extract multi-line field definition starting from the given line
+     */
+    private extractMultilineFieldDefinition(lines: string[], startIndex: number): string {
+        let definition = lines[startIndex];
+        let openParens = (definition.match(/\(/g) || []).length;
+        let closeParens = (definition.match(/\)/g) || []).length;
+        let i = startIndex;
+
+        // Continue reading lines until parentheses are balanced
+        while (openParens > closeParens && i < lines.length - 1) {
+            i++;
+            const nextLine = lines[i];
+            definition += '\n' + nextLine;
+            openParens += (nextLine.match(/\(/g) || []).length;
+            closeParens += (nextLine.match(/\)/g) || []).length;
+        }
+
+        return definition;
+    }
+
+    /**
+     * Check if the given module/alias and field type represent a Django forms field
+     */
+    private isFormsField(moduleOrAlias: string, fieldType: string, content: string): boolean {
+        // Check if it's a known form field type
+        if (!FORM_FIELD_TYPES.has(fieldType)) {
+            return false;
+        }
+
+        // Check common patterns
+        if (moduleOrAlias === 'forms') {
+            return true;
+        }
+
+        // Check if there's an import alias for forms
+        const aliasPatterns = [
+            new RegExp(`import\\s+django\\.forms\\s+as\\s+${moduleOrAlias}\\b`),
+            new RegExp(`from\\s+django\\s+import\\s+forms\\s+as\\s+${moduleOrAlias}\\b`),
+            new RegExp(`import\\s+forms\\s+as\\s+${moduleOrAlias}\\b`)
+        ];
+
+        return aliasPatterns.some(pattern => pattern.test(content));
+    }
+
+    /**
+     * Extract model name from ModelForm
+     */
+    private extractModelName(formBody: string): string | undefined {
+        const metaMatch = formBody.match(/class\s+Meta\s*:[\s\S]*?model\s*=\s*(\w+)/);
+        return metaMatch ? metaMatch[1] : undefined;
+    }
+
+    /**
+     * Extract widget from field parameters
+     */
+    private extractWidget(params: string): string | undefined {
+        // Match various widget patterns
+        const widgetPatterns = [
+            /widget\s*=\s*forms\.(\w+)/,          // widget=forms.TextInput
+            /widget\s*=\s*widgets\.(\w+)/,        // widget=widgets.TextInput
+            /widget\s*=\s*(\w+)\.(\w+)/,          // widget=f.TextInput (aliased)
+            /widget\s*=\s*(\w+)\(/                // widget=TextInput( (direct import)
+        ];
+
+        for (const pattern of widgetPatterns) {
+            const match = params.match(pattern);
+            if (match) {
+                if (match.length === 3) {
+                    // For patterns with module.Widget format
+                    return match[2];
+                } else {
+                    // For other patterns
+                    return match[1];
+                }
+            }
+        }
+
+        return undefined;
+    }
+
+    /**
+     * Extract help text from field parameters
+     */
+    private extractHelpText(params: string): string | undefined {
+        const helpTextMatch = params.match(/help_text\s*=\s*['"](.*?)['"]/);
+        return helpTextMatch ? helpTextMatch[1] : undefined;
+    }
+
+    private computeHash(content: string): string {
+        return crypto.createHash('md5').update(content).digest('hex');
+    }
+}
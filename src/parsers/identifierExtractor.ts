@@ -0,0 +1,360 @@
+/**
+ * Extracts the identifiers a file uses — model names, model fields, URL names
+ * and template names — with their positions, for the reference index. Field
+ * uses are found in model definitions, ORM lookup strings, ModelAdmin
+ * options and ModelForm/generic view field lists. Has no editor dependencies.
+ */
+
+import * as path from 'path';
+import { extractReferences } from './referenceExtractor';
+import { findTopLevelClasses } from './classRanges';
+
+export type IdentifierKind = 'model' | 'field' | 'url' | 'template';
+
+export interface IdentifierOccurrence {
+    // "model:Post", "field:Post.title", "url:blog:post_detail" or "template:blog/post.html"
+    key: string;
+    line: number;
+    // Columns of the identifier on the line; for URL names only the part after the namespace
+    start: number;
+    end: number;
+    isDefinition: boolean;
+}
+
+/**
+ * What the extractor needs to know about the project's models
+ */
+export interface ModelSchema {
+    isModel(name: string): boolean;
+    getField(model: string, field: string): { relatedModel?: string } | undefined;
+    getManagerNames(model: string): string[];
+}
+
+export function modelKey(model: string): string {
+    return `model:${model}`;
+}
+
+export function fieldKey(model: string, field: string): string {
+    return `field:${model}.${field}`;
+}
+
+export function getIdentifierKind(key: string): IdentifierKind {
+    return key.substring(0, key.indexOf(':')) as IdentifierKind;
+}
+
+// QuerySet methods taking lookups as keyword arguments
+const KEYWORD_LOOKUP_METHODS = new Set([
+    'filter', 'exclude', 'get', 'get_or_create', 'update_or_create', 'create', 'update', 'aggregate'
+]);
+
+// QuerySet methods taking field names or lookups as strings
+const STRING_LOOKUP_METHODS = new Set([
+    'order_by', 'values', 'values_list', 'only', 'defer', 'select_related', 'prefetch_related',
+    'distinct', 'latest', 'earliest', 'in_bulk', 'dates', 'datetimes'
+]);
+
+// Class attributes of ModelAdmin, ModelForm Meta and generic views that list fields
+const FIELD_LIST_ATTRIBUTES = new Set([
+    'list_display', 'list_display_links', 'list_filter', 'list_editable', 'list_select_related',
+    'search_fields', 'ordering', 'readonly_fields', 'fields', 'exclude', 'fieldsets', 'raw_id_fields',
+    'autocomplete_fields', 'filter_horizontal', 'filter_vertical', 'date_hierarchy',
+    'prepopulated_fields', 'sortable_by', 'fk_name', 'slug_field', 'date_field'
+]);
+
+const STRING_PATTERN = /(['"])([^'"\n]*)\1/g;
+
+export function extractIdentifiers(content: string, languageId: string, filePath: string, schema: ModelSchema): IdentifierOccurrence[] {
+    const locator = new OffsetLocator(content);
+    const occurrences: IdentifierOccurrence[] = [];
+    const add = (key: string, start: number, end: number, isDefinition = false) => {
+        const position = locator.locate(start);
+        occurrences.push({ key, line: position.line, start: position.character, end: position.character + end - start, isDefinition });
+    };
+
+    for (const reference of extractReferences(content, languageId)) {
+        if (reference.kind === 'url') {
+            // Renaming a URL name keeps its namespace
+            const separator = reference.name.lastIndexOf(':');
+            add(`url:${reference.name}`, reference.start + separator + 1, reference.end);
+        } else if (reference.kind === 'template') {
+            add(`template:${reference.name}`, reference.start, reference.end);
+        }
+    }
+
+    if (languageId !== 'python') {
+        return occurrences;
+    }
+
+    const code = maskComments(content);
+    if (path.basename(filePath) === 'urls.py') {
+        extractUrlNameDefinitions(code, add);
+    }
+    extractModelNames(code, schema, add);
+    extractFieldDefinitions(code, schema, add);
+    extractFieldLists(code, schema, add);
+    extractQuerySetLookups(code, schema, add);
+
+    return occurrences.sort((a, b) => a.line - b.line || a.start - b.start);
+}
+
+type AddOccurrence = (key: string, start: number, end: number, isDefinition?: boolean) => void;
+
+function extractUrlNameDefinitions(code: string, add: AddOccurrence): void {
+    const appName = code.match(/^app_name\s*=\s*['"]([\w-]+)['"]/m)?.[1];
+    const regex = /\bname\s*=\s*(['"])([\w-]+)\1/g;
+    let match: RegExpExecArray | null;
+    while ((match = regex.exec(code)) !== null) {
+        const start = match.index + match[0].length - match[2].length - 1;
+        add(`url:${appName ? `${appName}:` : ''}${match[2]}`, start, start + match[2].length, true);
+    }
+}
+
+function extractModelNames(code: string, schema: ModelSchema, add: AddOccurrence): void {
+    const regex = /\b[A-Z]\w*/g;
+    let match: RegExpExecArray | null;
+    while ((match = regex.exec(code)) !== null) {
+        if (schema.isModel(match[0])) {
+            const isDefinition = /(?:^|\n)class\s+$/.test(code.substring(Math.max(0, match.index - 7), match.index));
+            add(modelKey(match[0]), match.index, match.index + match[0].length, isDefinition);
+        }
+    }
+}
+
+/**
+ * Field assignments directly in the body of model classes
+ */
+function extractFieldDefinitions(code: string, schema: ModelSchema, add: AddOccurrence): void {
+    const lines = code.split('\n');
+    const lineStarts = getLineStarts(lines);
+
+    for (const cls of findTopLevelClasses(code)) {
+        if (!schema.isModel(cls.name)) {
+            continue;
+        }
+        let bodyIndent: string | undefined;
+        for (let line = cls.startLine + 1; line <= cls.endLine; line++) {
+            const match = lines[line].match(/^(\s+)(\w+)\s*(?::[^=]*)?=(?!=)/);
+            const indent = lines[line].match(/^\s+(?=\S)/)?.[0];
+            bodyIndent = bodyIndent ?? indent;
+            if (!match || match[1] !== bodyIndent || !schema.getField(cls.name, match[2])) {
+                continue;
+            }
+            const start = lineStarts[line] + match[1].length;
+            add(fieldKey(cls.name, match[2]), start, start + match[2].length, true);
+        }
+    }
+}
+
+/**
+ * Field names in the options of classes bound to a model: Meta of the model
+ * itself, ModelAdmin and inline options, ModelForm Meta and generic views
+ * with `model = X`
+ */
+function extractFieldLists(code: string, schema: ModelSchema, add: AddOccurrence): void {
+    const lines = code.split('\n');
+    const lineStarts = getLineStarts(lines);
+
+    // admin.site.register(Model, AdminClass)
+    const registered = new Map<string, string>();
+    const registerRegex = /admin\.site\.register\s*\(\s*(\w+)\s*,\s*(\w+)\s*\)/g;
+    let registration: RegExpExecArray | null;
+    while ((registration = registerRegex.exec(code)) !== null) {
+        registered.set(registration[2], registration[1]);
+    }
+
+    for (const cls of findTopLevelClasses(code)) {
+        const classLines = lines.slice(cls.startLine, cls.endLine + 1);
+        // A model's own Meta options (ordering etc.) name its fields
+        const model = (schema.isModel(cls.name) ? cls.name : undefined)
+            || classLines.map(line => line.match(/^@admin\.register\s*\(\s*(\w+)/)?.[1]).find(Boolean)
+            || classLines.map(line => line.match(/^\s+model\s*=\s*(\w+)\s*$/)?.[1]).find(Boolean)
+            || registered.get(cls.name);
+        if (!model || !schema.isModel(model)) {
+            continue;
+        }
+
+        for (let line = cls.startLine; line <= cls.endLine; line++) {
+            const match = lines[line].match(/^\s+(\w+)\s*=/);
+            if (!match || !FIELD_LIST_ATTRIBUTES.has(match[1])) {
+                continue;
+            }
+            const valueStart = lineStarts[line] + match[0].length;
+            const valueEnd = findValueEnd(code, valueStart);
+            forEachString(code, valueStart, valueEnd, (value, start) => {
+                // Strip the prefixes of ordering and search_fields
+                const prefix = value.match(/^[-^=@]?/)![0];
+                resolveLookup(model, value.substring(prefix.length), start + prefix.length, schema, add);
+            });
+        }
+    }
+}
+
+/**
+ * Lookups in Model.objects chains, e.g. Post.objects.filter(author__name=...)
+ */
+function extractQuerySetLookups(code: string, schema: ModelSchema, add: AddOccurrence): void {
+    const regex = /\b([A-Z]\w*)\s*\.\s*(\w+)(?=\s*\.)/g;
+    let match: RegExpExecArray | null;
+    while ((match = regex.exec(code)) !== null) {
+        const model = match[1];
+        if (!schema.isModel(model) || (match[2] !== 'objects' && !schema.getManagerNames(model).includes(match[2]))) {
+            continue;
+        }
+
+        const callRegex = /^(?:\s|\\\n)*\.\s*(\w+)\s*\(/;
+        let position = match.index + match[0].length;
+        let call: RegExpMatchArray | null;
+        while ((call = code.substring(position, position + 200).match(callRegex)) !== null) {
+            const argsStart = position + call[0].length;
+            const argsEnd = findClosingParen(code, argsStart);
+            const method = call[1];
+
+            if (KEYWORD_LOOKUP_METHODS.has(method)) {
+                const keywordRegex = /(?<![\w.'"])(\w+)\s*=(?!=)/g;
+                keywordRegex.lastIndex = argsStart;
+                let keyword: RegExpExecArray | null;
+                while ((keyword = keywordRegex.exec(code)) !== null && keyword.index < argsEnd) {
+                    resolveLookup(model, keyword[1], keyword.index, schema, add);
+                }
+            }
+            if (STRING_LOOKUP_METHODS.has(method)) {
+                forEachString(code, argsStart, argsEnd, (value, start) => {
+                    const prefix = value.startsWith('-') ? 1 : 0;
+                    resolveLookup(model, value.substring(prefix), start + prefix, schema, add);
+                });
+            }
+            // F('field') and Q objects can appear in any method
+            const expressionRegex = /\bF\s*\(\s*(['"])(\w+)\1/g;
+            expressionRegex.lastIndex = argsStart;
+            let expression: RegExpExecArray | null;
+            while ((expression = expressionRegex.exec(code)) !== null && expression.index < argsEnd) {
+                resolveLookup(model, expression[2], expression.index + expression[0].length - expression[2].length - 1, schema, add);
+            }
+
+            position = argsEnd + 1;
+        }
+        regex.lastIndex = position;
+    }
+}
+
+/**
+ * Record the fields along a lookup path such as "author__profile__name__icontains",
+ * following relations from one model to the next; the first segment that is
+ * not a field (a lookup, transform or "pk") ends the path
+ */
+function resolveLookup(model: string, lookup: string, offset: number, schema: ModelSchema, add: AddOccurrence): void {
+    if (!/^\w+$/.test(lookup)) {
+        return;
+    }
+
+    let current: string | undefined = model;
+    let start = offset;
+    for (const segment of lookup.split('__')) {
+        const field = current ? schema.getField(current, segment) : undefined;
+        if (!current || !field) {
+            return;
+        }
+        add(fieldKey(current, segment), start, start + segment.length);
+        start += segment.length + 2;
+        current = field.relatedModel ? normalizeRelatedModel(field.relatedModel, current) : undefined;
+    }
+}
+
+function normalizeRelatedModel(relatedModel: string, fromModel: string): string {
+    return relatedModel === 'self' ? fromModel : relatedModel.split('.').pop() || relatedModel;
+}
+
+function forEachString(code: string, from: number, to: number, callback: (value: string, start: number) => void): void {
+    const regex = new RegExp(STRING_PATTERN.source, 'g');
+    regex.lastIndex = from;
+    let match: RegExpExecArray | null;
+    while ((match = regex.exec(code)) !== null && match.index < to) {
+        callback(match[2], match.index + 1);
+    }
+}
+
+/**
+ * End of an assignment value: the end of its line once brackets are balanced
+ */
+function findValueEnd(code: string, from: number): number {
+    let depth = 0;
+    let quote: string | undefined;
+    for (let i = from; i < code.length; i++) {
+        const char = code[i];
+        if (quote) {
+            if (char === quote) {
+                quote = undefined;
+            }
+        } else if (char === '\'' || char === '"') {
+            quote = char;
+        } else if ('([{'.includes(char)) {
+            depth++;
+        } else if (')]}'.includes(char)) {
+            depth--;
+        } else if (char === '\n' && depth <= 0) {
+            return i;
+        }
+    }
+    return code.length;
+}
+
+function findClosingParen(code: string, from: number): number {
+    let depth = 1;
+    let quote: string | undefined;
+    for (let i = from; i < code.length; i++) {
+        const char = code[i];
+        if (quote) {
+            if (char === quote) {
+                quote = undefined;
+            }
+        } else if (char === '\'' || char === '"') {
+            quote = char;
+        } else if (char === '(') {
+            depth++;
+        } else if (char === ')' && --depth === 0) {
+            return i;
+        }
+    }
+    return code.length;
+}
+
+/**
+ * Replace comments with spaces so offsets stay the same
+ */
+function maskComments(content: string): string {
+    return content.replace(/^([^#'"\n]*(?:(['"])[^'"\n]*\2[^#'"\n]*)*)(#.*)$/gm, (_, code: string, _quote, comment: string) =>
+        code + ' '.repeat(comment.length)
+    );
+}
+
+function getLineStarts(lines: string[]): number[] {
+    const starts: number[] = [];
+    let offset = 0;
+    for (const line of lines) {
+        starts.push(offset);
+        offset += line.length + 1;
+    }
+    return starts;
+}
+
+class OffsetLocator {
+    private lineStarts: number[];
+
+    constructor(content: string) {
+        this.lineStarts = getLineStarts(content.split('\n'));
+    }
+
+    locate(offset: number): { line: number; character: number } {
+        let low = 0;
+        let high = this.lineStarts.length - 1;
+        while (low < high) {
+            const middle = (low + high + 1) >> 1;
+            if (this.lineStarts[middle] <= offset) {
+                low = middle;
+            } else {
+                high = middle - 1;
+            }
+        }
+        return { line: low, character: offset - this.lineStarts[low] };
+    }
+}
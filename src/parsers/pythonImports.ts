@@ -0,0 +1,114 @@
+import * as path from 'path';
+
+/**
+ * Parser for the import statements of a Python module, and resolution of
+ * the imported modules to candidate files, without evaluating Python.
+ */
+
+export interface ImportedName {
+    name: string;
+    // Name bound in the importing module ("as" alias or the name itself)
+    alias: string;
+}
+
+export interface PythonImport {
+    // Dotted module path; empty for "from . import x"
+    module: string;
+    // Number of leading dots of a relative import, 0 for absolute imports
+    level: number;
+    // Names of "from ... import"; empty for "import a.b"
+    names: ImportedName[];
+    // Alias of "import a.b as c"
+    alias?: string;
+    line: number;
+}
+
+// Statements may continue over lines in parentheses or after a backslash
+const FROM_IMPORT_REGEX = /^[ \t]*from[ \t]+(\.*)([\w.]*)[ \t]+import[ \t]+(\([^)]*\)|(?:\\\r?\n|[^\n#;])*)/gm;
+const IMPORT_REGEX = /^[ \t]*import[ \t]+((?:\\\r?\n|[^\n#;])+)/gm;
+
+export function parseImports(content: string): PythonImport[] {
+    const lineOf = createLineLookup(content);
+    const imports: PythonImport[] = [];
+
+    let match: RegExpExecArray | null;
+    FROM_IMPORT_REGEX.lastIndex = 0;
+    while ((match = FROM_IMPORT_REGEX.exec(content)) !== null) {
+        if (!match[1] && !match[2]) {
+            continue;
+        }
+        const names = splitNames(match[3].replace(/^\(|\)$/g, '')).map(part => {
+            const [name, alias] = part.split(/\s+as\s+/);
+            return { name, alias: alias || name };
+        });
+        imports.push({ module: match[2], level: match[1].length, names, line: lineOf(match.index) });
+    }
+
+    IMPORT_REGEX.lastIndex = 0;
+    while ((match = IMPORT_REGEX.exec(content)) !== null) {
+        const line = lineOf(match.index);
+        for (const part of splitNames(match[1])) {
+            const [module, alias] = part.split(/\s+as\s+/);
+            imports.push({ module, level: 0, names: [], alias, line });
+        }
+    }
+
+    return imports.sort((a, b) => a.line - b.line);
+}
+
+/**
+ * Files an import may refer to, most likely first. Relative imports resolve
+ * against the importing file; absolute ones against each source root.
+ * Whether a candidate exists is left to the caller.
+ */
+export function getImportCandidates(imp: PythonImport, fromFile: string, sourceRoots: string[]): string[] {
+    const bases = imp.level > 0
+        ? [path.resolve(path.dirname(fromFile), ...Array(imp.level - 1).fill('..'))]
+        : sourceRoots;
+
+    const candidates: string[] = [];
+    for (const base of bases) {
+        const modulePath = imp.module ? path.join(base, ...imp.module.split('.')) : base;
+        if (imp.module) {
+            candidates.push(`${modulePath}.py`);
+        }
+        candidates.push(path.join(modulePath, '__init__.py'));
+        // "from package import submodule"
+        for (const { name } of imp.names) {
+            if (name !== '*') {
+                candidates.push(path.join(modulePath, `${name}.py`));
+            }
+        }
+    }
+    return candidates;
+}
+
+function splitNames(list: string): string[] {
+    return list
+        .replace(/#.*$/gm, '')
+        .split(',')
+        .map(part => part.replace(/\\\r?\n/g, ' ').trim().replace(/\s+/g, ' '))
+        .filter(part => /^[\w.*]+( as \w+)?$/.test(part));
+}
+
+function createLineLookup(text: string): (offset: number) => number {
+    const lineStarts = [0];
+    for (let i = 0; i < text.length; i++) {
+        if (text[i] === '\n') {
+            lineStarts.push(i + 1);
+        }
+    }
+    return offset => {
+        let low = 0;
+        let high = lineStarts.length - 1;
+        while (low < high) {
+            const mid = (low + high + 1) >> 1;
+            if (lineStarts[mid] <= offset) {
+                low = mid;
+            } else {
+                high = mid - 1;
+            }
+        }
+        return low;
+    };
+}
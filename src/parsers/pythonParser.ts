@@ -1,4 +1,4 @@
-import { PythonExecutor } from '../pythonIntegration';
+import type { PythonExecutor } from '../pythonIntegration';
 
 export interface FieldInfo {
     name: string;
@@ -36,7 +36,18 @@ export class PythonParser {
         this.pythonExecutor = executor;
     }
 
-    async parseModelFile(content: string, filePath: string): Promise<ParseResult> {
+    /**
+     * Parse the models of a file. `modelBases` names classes of other
+     * modules that are models, as the file refers to them.
+     */
+    async parseModelFile(content: string, filePath: string, modelBases: string[] = []): Promise<ParseResult> {
+        return this.parseModelSource(content, filePath, modelBases);
+    }
+
+    /**
+     * parseModelFile() without the promise, for callers that time the parse
+     */
+    parseModelSource(content: string, filePath: string, modelBases: string[] = []): ParseResult {
         // For now, use regex-based parsing. 
         // In a production version, we would use the Python AST through pythonExecutor
         
@@ -53,17 +64,24 @@ export class PythonParser {
         
         // Extract model classes
         const modelRegex = /class\s+(\w+)\s*\(([^)]*)\)\s*:/g;
+        const classes: { name: string; baseClasses: string }[] = [];
         
         while ((match = modelRegex.exec(content)) !== null) {
-            const [_, modelName, baseClasses] = match;
-            
-            // Check if it's a Django model
-            if (baseClasses.includes('Model') || baseClasses.includes('models.Model')) {
+            classes.push({ name: match[1], baseClasses: match[2] });
+        }
+        
+        // A class is a Django model if it derives from Model, or from another
+        // model class defined in the same file (e.g. AbstractUser -> User)
+        // or named in modelBases
+        const modelNames = this.findModelClasses(classes, new Set(modelBases.map(base => base.split('.').pop() || base)));
+        
+        for (const cls of classes) {
+            if (modelNames.has(cls.name)) {
                 const model: ModelInfo = {
-                    name: modelName,
+                    name: cls.name,
                     app: this.extractAppFromPath(filePath),
-                    fields: this.extractFields(content, modelName),
-                    managers: this.extractManagerNames(content, modelName)
+                    fields: this.extractFields(content, cls.name),
+                    managers: this.extractManagerNames(content, cls.name)
                 };
                 
                 models.push(model);
@@ -73,6 +91,31 @@ export class PythonParser {
         return { models, imports };
     }
 
+    private findModelClasses(classes: { name: string; baseClasses: string }[], modelBases: Set<string>): Set<string> {
+        const modelNames = new Set<string>();
+        let changed = true;
+        
+        while (changed) {
+            changed = false;
+            for (const cls of classes) {
+                if (modelNames.has(cls.name)) {
+                    continue;
+                }
+                
+                const bases = cls.baseClasses
+                    .split(',')
+                    .map(base => base.trim().split('.').pop() || '');
+                
+                if (cls.baseClasses.includes('Model') || bases.some(base => modelNames.has(base) || modelBases.has(base))) {
+                    modelNames.add(cls.name);
+                    changed = true;
+                }
+            }
+        }
+        
+        return modelNames;
+    }
+
     private extractAppFromPath(filePath: string): string {
         const parts = filePath.split(/[/\\]/);
         
@@ -0,0 +1,62 @@
+/**
+ * Extracts references to URL names, static files and templates from Python
+ * modules and Django templates, with the offsets of the referenced string.
+ */
+
+export type ReferenceKind = 'url' | 'static' | 'template';
+
+export interface NameReference {
+    kind: ReferenceKind;
+    name: string;
+    // Offsets of the name inside the document, without quotes
+    start: number;
+    end: number;
+}
+
+interface ReferencePattern {
+    kind: ReferenceKind;
+    regex: RegExp;
+}
+
+// Each pattern captures the quote in group 1 and the name in group 2
+const TEMPLATE_PATTERNS: ReferencePattern[] = [
+    { kind: 'url', regex: /\{%-?\s*url\s+(['"])([^'"\s]+)\1/g },
+    { kind: 'static', regex: /\{%-?\s*static\s+(['"])([^'"]+)\1/g },
+    { kind: 'template', regex: /\{%-?\s*(?:extends|include)\s+(['"])([^'"]+)\1/g }
+];
+
+const PYTHON_PATTERNS: ReferencePattern[] = [
+    { kind: 'url', regex: /\breverse(?:_lazy)?\s*\(\s*(['"])([^'"\s]+)\1/g },
+    { kind: 'template', regex: /\brender\s*\(\s*[\w.]+\s*,\s*(['"])([^'"]+)\1/g },
+    { kind: 'template', regex: /\b(?:render_to_string|get_template)\s*\(\s*(['"])([^'"]+)\1/g },
+    { kind: 'template', regex: /\btemplate_name\s*=\s*(['"])([^'"]+)\1/g }
+];
+
+export function extractReferences(content: string, languageId: string): NameReference[] {
+    const patterns = languageId === 'python' ? PYTHON_PATTERNS : TEMPLATE_PATTERNS;
+    const references: NameReference[] = [];
+
+    for (const pattern of patterns) {
+        const regex = new RegExp(pattern.regex.source, 'g');
+        let match: RegExpExecArray | null;
+        while ((match = regex.exec(content)) !== null) {
+            const name = match[2];
+            // Names built from template variables or string formatting cannot be checked
+            if (/[{}%]/.test(name)) {
+                continue;
+            }
+            if (languageId === 'python' && isInPythonComment(content, match.index)) {
+                continue;
+            }
+            const start = match.index + match[0].length - name.length - 1;
+            references.push({ kind: pattern.kind, name, start, end: start + name.length });
+        }
+    }
+
+    return references.sort((a, b) => a.start - b.start);
+}
+
+function isInPythonComment(content: string, offset: number): boolean {
+    const lineStart = content.lastIndexOf('\n', offset - 1) + 1;
+    return content.substring(lineStart, offset).includes('#');
+}
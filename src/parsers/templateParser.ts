@@ -0,0 +1,70 @@
+/**
+ * Parser for the structural tags of Django templates: {% extends %},
+ * {% include %} and {% block %}. Only literal template names are recorded.
+ */
+
+export interface TemplateReference {
+    name: string;
+    line: number;
+}
+
+export interface TemplateBlock {
+    name: string;
+    line: number;
+}
+
+export interface ParsedTemplate {
+    extends?: TemplateReference;
+    includes: TemplateReference[];
+    blocks: TemplateBlock[];
+}
+
+const TAG_REGEX = /\{%-?\s*(extends|include|block|comment|verbatim)\b([\s\S]*?)-?%\}/g;
+const STRING_REGEX = /^\s*(['"])([^'"]+)\1/;
+
+export function parseTemplate(content: string): ParsedTemplate {
+    const result: ParsedTemplate = { includes: [], blocks: [] };
+    const regex = new RegExp(TAG_REGEX.source, 'g');
+
+    let line = 0;
+    let lineOffset = 0;
+    let match: RegExpExecArray | null;
+    while ((match = regex.exec(content)) !== null) {
+        const tag = match[1];
+
+        // Contents of {% comment %} and {% verbatim %} are not template code
+        if (tag === 'comment' || tag === 'verbatim') {
+            const end = content.indexOf(`end${tag}`, regex.lastIndex);
+            regex.lastIndex = end === -1 ? content.length : end;
+            continue;
+        }
+
+        for (; lineOffset < match.index; lineOffset++) {
+            if (content.charCodeAt(lineOffset) === 10) {
+                line++;
+            }
+        }
+
+        if (tag === 'block') {
+            const name = match[2].trim().split(/\s+/)[0];
+            if (/^\w+$/.test(name)) {
+                result.blocks.push({ name, line });
+            }
+            continue;
+        }
+
+        const literal = match[2].match(STRING_REGEX);
+        if (!literal) {
+            continue;
+        }
+
+        const reference = { name: literal[2], line };
+        if (tag === 'extends') {
+            result.extends = result.extends || reference;
+        } else {
+            result.includes.push(reference);
+        }
+    }
+
+    return result;
+}
@@ -0,0 +1,310 @@
+/**
+ * Parser for Django URLconf modules. Extracts path()/re_path()/url() entries,
+ * including nested include() calls, without evaluating Python.
+ */
+
+export interface UrlConfPatternEntry {
+    kind: 'pattern';
+    route: string;
+    isRegex: boolean;
+    view: string;
+    name?: string;
+    line: number;
+    column: number;
+}
+
+export interface UrlConfIncludeEntry {
+    kind: 'include';
+    route: string;
+    isRegex: boolean;
+    // Dotted module path, or undefined for include() of an inline list
+    module?: string;
+    // Entries of include([...]) with an inline list
+    entries?: UrlConfEntry[];
+    namespace?: string;
+    appName?: string;
+    line: number;
+    column: number;
+}
+
+export type UrlConfEntry = UrlConfPatternEntry | UrlConfIncludeEntry;
+
+export interface ParsedUrlConf {
+    appName?: string;
+    entries: UrlConfEntry[];
+}
+
+const CALL_REGEX = /(?:^|[^\w])(re_path|path|url)\s*\(/g;
+const STRING_LITERAL_REGEX = /^([rRuUbB]{0,2})('''|"""|'|")([\s\S]*)\2$/;
+
+export function parseUrlConf(content: string): ParsedUrlConf {
+    const appNameMatch = content.match(/^app_name\s*=\s*['"]([^'"]+)['"]/m);
+    const lineStarts = computeLineStarts(content);
+
+    return {
+        appName: appNameMatch ? appNameMatch[1] : undefined,
+        entries: parseEntries(content, 0, content.length, lineStarts)
+    };
+}
+
+function parseEntries(content: string, start: number, end: number, lineStarts: number[]): UrlConfEntry[] {
+    const entries: UrlConfEntry[] = [];
+    const regex = new RegExp(CALL_REGEX.source, 'g');
+    regex.lastIndex = start;
+
+    let match: RegExpExecArray | null;
+    while ((match = regex.exec(content)) !== null && match.index < end) {
+        const callStart = match.index + match[0].indexOf(match[1]);
+        const openParen = match.index + match[0].length - 1;
+
+        if (isInComment(content, callStart)) {
+            continue;
+        }
+
+        const closeParen = findClosing(content, openParen);
+        if (closeParen === -1 || closeParen > end) {
+            break;
+        }
+
+        const line = lineOf(lineStarts, callStart);
+        const entry = parseCall(content, match[1], openParen, closeParen, lineStarts, line, callStart - lineStarts[line]);
+        if (entry) {
+            entries.push(entry);
+        }
+        regex.lastIndex = closeParen + 1;
+    }
+
+    return entries;
+}
+
+function parseCall(
+    content: string,
+    func: string,
+    openParen: number,
+    closeParen: number,
+    lineStarts: number[],
+    line: number,
+    column: number
+): UrlConfEntry | undefined {
+    const args = splitArguments(content, openParen + 1, closeParen);
+    if (args.length < 2) {
+        return undefined;
+    }
+
+    const route = parseStringLiteral(args[0].text);
+    if (route === undefined) {
+        return undefined;
+    }
+
+    const isRegex = func !== 'path';
+    const target = args[1].text;
+    let name: string | undefined;
+    for (const arg of args.slice(2)) {
+        const kwarg = arg.text.match(/^name\s*=\s*([\s\S]+)$/);
+        if (kwarg) {
+            name = parseStringLiteral(kwarg[1].trim());
+        }
+    }
+
+    const includeMatch = target.match(/^include\s*\(/);
+    if (!includeMatch) {
+        return { kind: 'pattern', route, isRegex, view: target.replace(/\s+/g, ' '), name, line, column };
+    }
+
+    // include(...) arguments
+    const includeOpen = args[1].start + target.indexOf('(');
+    const includeClose = findClosing(content, includeOpen);
+    const includeArgs = splitArguments(content, includeOpen + 1, includeClose);
+    const entry: UrlConfIncludeEntry = { kind: 'include', route, isRegex, line, column };
+
+    for (const arg of includeArgs.slice(1)) {
+        const kwarg = arg.text.match(/^namespace\s*=\s*([\s\S]+)$/);
+        if (kwarg) {
+            entry.namespace = parseStringLiteral(kwarg[1].trim());
+        }
+    }
+
+    const first = includeArgs[0];
+    if (!first) {
+        return entry;
+    }
+
+    if (first.text.startsWith('[')) {
+        entry.entries = parseEntries(content, first.start, first.start + first.text.length, lineStarts);
+    } else if (first.text.startsWith('(')) {
+        // include(('app.urls', 'app_name'), namespace=...)
+        const tupleArgs = splitArguments(content, first.start + 1, first.start + first.text.length - 1);
+        if (tupleArgs[0]?.text.startsWith('[')) {
+            entry.entries = parseEntries(content, tupleArgs[0].start, tupleArgs[0].start + tupleArgs[0].text.length, lineStarts);
+        } else {
+            entry.module = tupleArgs[0] ? parseStringLiteral(tupleArgs[0].text) : undefined;
+        }
+        entry.appName = tupleArgs[1] ? parseStringLiteral(tupleArgs[1].text) : undefined;
+    } else {
+        entry.module = parseStringLiteral(first.text);
+    }
+
+    return entry;
+}
+
+interface Argument {
+    text: string;
+    start: number;
+}
+
+/**
+ * Split the text between two offsets at top-level commas
+ */
+function splitArguments(content: string, start: number, end: number): Argument[] {
+    const args: Argument[] = [];
+    let depth = 0;
+    let argStart = start;
+    let i = start;
+
+    const pushArg = (argEnd: number) => {
+        const raw = content.substring(argStart, argEnd);
+        const text = raw.trim();
+        if (text) {
+            args.push({ text, start: argStart + raw.indexOf(text) });
+        }
+    };
+
+    while (i < end) {
+        const char = content[i];
+        if (char === '#') {
+            const newline = content.indexOf('\n', i);
+            i = newline === -1 ? end : newline;
+            continue;
+        }
+        if (char === '"' || char === "'") {
+            i = skipString(content, i);
+            continue;
+        }
+        if (char === '(' || char === '[' || char === '{') {
+            depth++;
+        } else if (char === ')' || char === ']' || char === '}') {
+            depth--;
+        } else if (char === ',' && depth === 0) {
+            pushArg(i);
+            argStart = i + 1;
+        }
+        i++;
+    }
+    pushArg(end);
+
+    return args;
+}
+
+/**
+ * Find the bracket closing the one at `open`, skipping strings and comments
+ */
+function findClosing(content: string, open: number): number {
+    let depth = 0;
+    let i = open;
+
+    while (i < content.length) {
+        const char = content[i];
+        if (char === '#') {
+            const newline = content.indexOf('\n', i);
+            if (newline === -1) {
+                return -1;
+            }
+            i = newline;
+            continue;
+        }
+        if (char === '"' || char === "'") {
+            i = skipString(content, i);
+            continue;
+        }
+        if (char === '(' || char === '[' || char === '{') {
+            depth++;
+        } else if (char === ')' || char === ']' || char === '}') {
+            depth--;
+            if (depth === 0) {
+                return i;
+            }
+        }
+        i++;
+    }
+
+    return -1;
+}
+
+/**
+ * Return the offset just after the string literal starting at `start`
+ */
+function skipString(content: string, start: number): number {
+    const quote = content[start];
+    const triple = content.startsWith(quote.repeat(3), start);
+    const delimiter = triple ? quote.repeat(3) : quote;
+    let i = start + delimiter.length;
+
+    while (i < content.length) {
+        if (content[i] === '\\') {
+            i += 2;
+            continue;
+        }
+        if (content.startsWith(delimiter, i)) {
+            return i + delimiter.length;
+        }
+        if (!triple && content[i] === '\n') {
+            return i;
+        }
+        i++;
+    }
+
+    return content.length;
+}
+
+function parseStringLiteral(text: string): string | undefined {
+    const match = text.match(STRING_LITERAL_REGEX);
+    if (!match || match[3].includes(match[2])) {
+        return undefined;
+    }
+    const isRaw = /[rR]/.test(match[1]);
+    return isRaw ? match[3] : match[3].replace(/\\(['"\\])/g, '$1');
+}
+
+function isInComment(content: string, offset: number): boolean {
+    const lineStart = content.lastIndexOf('\n', offset - 1) + 1;
+    const prefix = content.substring(lineStart, offset);
+    return prefix.includes('#') && !/['"]/.test(prefix);
+}
+
+function computeLineStarts(content: string): number[] {
+    const starts = [0];
+    for (let i = 0; i < content.length; i++) {
+        if (content[i] === '\n') {
+            starts.push(i + 1);
+        }
+    }
+    return starts;
+}
+
+function lineOf(lineStarts: number[], offset: number): number {
+    let low = 0;
+    let high = lineStarts.length - 1;
+    while (low < high) {
+        const mid = (low + high + 1) >> 1;
+        if (lineStarts[mid] <= offset) {
+            low = mid;
+        } else {
+            high = mid - 1;
+        }
+    }
+    return low;
+}
+
+/**
+ * Names of the kwargs a route captures: path() converters such as
+ * <int:pk> and named re_path() groups such as (?P<year>...)
+ */
+export function getRouteParams(route: string, isRegex: boolean): string[] {
+    const regex = isRegex ? /\(\?P<(\w+)>/g : /<(?:\w+:)?(\w+)>/g;
+    const params: string[] = [];
+    let match: RegExpExecArray | null;
+    while ((match = regex.exec(route)) !== null) {
+        params.push(match[1]);
+    }
+    return params;
+}
@@ -0,0 +1,342 @@
+/**
+ * Table of the variables a Python module binds — assignments, for targets,
+ * function parameters and get_object_or_404() results — answering which
+ * class a name holds at a given line. Lines are parsed once and re-parsed
+ * individually as they change. Has no editor dependencies.
+ */
+
+export interface VariableBinding {
+    name: string;
+    // Class of the bound value when the line tells, e.g. Post for Post.objects.get()
+    className?: string;
+    // Model of the QuerySet the value is, e.g. Post for Post.objects.filter()
+    querySetOf?: string;
+    // For targets iterating over another variable: its name
+    iterates?: string;
+    // Parameters are bound in the function they belong to
+    isParameter: boolean;
+}
+
+export interface LineBindings {
+    // Indentation width, or -1 for blank and comment lines
+    indent: number;
+    // Name of the function or class the line starts
+    def?: string;
+    isClass: boolean;
+    bindings: VariableBinding[];
+}
+
+interface FunctionScope {
+    start: number;
+    end: number;
+    // Class the function is a method of
+    ownerClass?: string;
+}
+
+interface BindingEntry {
+    line: number;
+    // Index of the function scope, or -1 for module level
+    scope: number;
+    binding: VariableBinding;
+}
+
+// Methods whose result is a single model instance (the call may continue on the next lines)
+const INSTANCE_METHODS = /\.(get|first|last|latest|earliest|create|get_or_create|update_or_create)\s*\((?:[^()]*(?:\([^()]*\)[^()]*)*\)(?:\[0\])?\s*|[^)]*)$/;
+// Class methods whose names suggest they return a QuerySet
+const QUERYSET_METHOD_NAMES = ['get_pending', 'get_active', 'get_published', 'filter_by', 'active', 'published'];
+
+const ASSIGNMENT_PATTERN = /^([\w\s,()]+?)\s*(?::\s*([^=]+?))?\s*=(?!=)\s*(.+)$/;
+const FOR_PATTERN = /^(?:async\s+)?for\s+([\w\s,()]+?)\s+in\s+(.+?):?\s*$/;
+const DEF_PATTERN = /^(?:async\s+)?def\s+(\w+)\s*\((.*)$/;
+const CLASS_PATTERN = /^class\s+(\w+)/;
+
+export function parseLineBindings(text: string): LineBindings {
+    const trimmed = text.trim();
+    if (trimmed === '' || trimmed.startsWith('#')) {
+        return { indent: -1, isClass: false, bindings: [] };
+    }
+
+    const indent = text.length - text.trimStart().length;
+    // Statements separated by semicolons bind in order
+    const statements = trimmed.split(/;\s*(?=\w)/);
+    if (statements.length > 1 && !/['"]/.test(trimmed)) {
+        return {
+            indent,
+            isClass: false,
+            bindings: statements.flatMap(statement => parseLineBindings(statement).bindings)
+        };
+    }
+
+    const classMatch = trimmed.match(CLASS_PATTERN);
+    if (classMatch) {
+        return { indent, def: classMatch[1], isClass: true, bindings: [] };
+    }
+
+    const defMatch = trimmed.match(DEF_PATTERN);
+    if (defMatch) {
+        return { indent, def: defMatch[1], isClass: false, bindings: parseParameters(defMatch[2]) };
+    }
+
+    const forMatch = trimmed.match(FOR_PATTERN);
+    if (forMatch) {
+        const targets = splitTargets(forMatch[1]);
+        const iterable = forMatch[2].trim();
+        const model = iterable.match(/^(\w+)\.objects\b/)?.[1];
+        const iterates = /^\w+$/.test(iterable) ? iterable : undefined;
+        return {
+            indent,
+            isClass: false,
+            // Only a single target takes the items; tuples unpack them
+            bindings: targets.map(name => targets.length === 1
+                ? { name, className: model, iterates, isParameter: false }
+                : { name, isParameter: false })
+        };
+    }
+
+    const assignment = trimmed.match(ASSIGNMENT_PATTERN);
+    // Keyword arguments on continuation lines of a call look like assignments
+    if (assignment && !/^(if|elif|while|return|assert|with|del)\b/.test(trimmed) && !isCallContinuation(assignment[3])) {
+        const targets = splitTargets(assignment[1]);
+        const annotated = assignment[2] ? getAnnotatedClass(assignment[2]) : undefined;
+        const value = annotated ? { className: annotated } : inferValue(assignment[3].trim());
+        return {
+            indent,
+            isClass: false,
+            // get_or_create() returns (object, created)
+            bindings: targets.map((name, index) => index === 0 && (targets.length === 1 || value.className)
+                ? { name, ...value, isParameter: false }
+                : { name, isParameter: false })
+        };
+    }
+
+    return { indent, isClass: false, bindings: [] };
+}
+
+function isCallContinuation(value: string): boolean {
+    const closers = (value.match(/[)\]]/g) || []).length;
+    const openers = (value.match(/[(\[]/g) || []).length;
+    return value.trimEnd().endsWith(',') || closers > openers;
+}
+
+function splitTargets(targets: string): string[] {
+    const names = targets.trim().replace(/^\(|\)$/g, '').split(',').map(name => name.trim());
+    return names.every(name => /^\w+$/.test(name)) ? names : [];
+}
+
+function inferValue(value: string): Pick<VariableBinding, 'className' | 'querySetOf'> {
+    const shortcut = value.match(/^get_object_or_404\s*\(\s*(\w+)/);
+    if (shortcut) {
+        return { className: shortcut[1] };
+    }
+
+    const manager = value.match(/^(\w+)\.objects\b/);
+    if (manager) {
+        return INSTANCE_METHODS.test(value) ? { className: manager[1] } : { querySetOf: manager[1] };
+    }
+
+    const call = value.match(/^([A-Z]\w*)(?:\.(\w+))?\s*\(/);
+    if (call) {
+        const method = call[2];
+        // Most class methods of models are factories; QuerySet-like names are not
+        if (method && QUERYSET_METHOD_NAMES.some(name => method.includes(name))) {
+            return {};
+        }
+        return { className: call[1] };
+    }
+
+    return {};
+}
+
+function parseParameters(parameters: string): VariableBinding[] {
+    const bindings: VariableBinding[] = [];
+    let depth = 0;
+    let current = '';
+    const flush = () => {
+        const match = current.trim().match(/^\**(\w+)\s*(?::\s*([^=]+))?/);
+        if (match) {
+            bindings.push({ name: match[1], className: match[2] ? getAnnotatedClass(match[2]) : undefined, isParameter: true });
+        }
+        current = '';
+    };
+
+    for (const char of parameters) {
+        if (char === '(' || char === '[') {
+            depth++;
+        } else if (char === ')' || char === ']') {
+            if (depth === 0) {
+                break;
+            }
+            depth--;
+        } else if (char === ',' && depth === 0) {
+            flush();
+            continue;
+        }
+        current += char;
+    }
+    flush();
+    return bindings;
+}
+
+/**
+ * Class named by an annotation such as Post, 'blog.Post', Optional[Post] or Post | None
+ */
+function getAnnotatedClass(annotation: string): string | undefined {
+    let type = annotation.trim().replace(/^['"]|['"]$/g, '');
+    type = type.match(/^Optional\[\s*['"]?([\w.]+)['"]?\s*\]$/)?.[1] || type.replace(/\s*\|\s*None$/, '');
+    const name = type.split('.').pop() || '';
+    return /^[A-Z]\w*$/.test(name) ? name : undefined;
+}
+
+/**
+ * Bindings of one document, kept per line so that edits only re-parse the
+ * lines they replace
+ */
+export class BindingTable {
+    private lines: (LineBindings | undefined)[];
+    private scopes: FunctionScope[] = [];
+    private byName: Map<string, BindingEntry[]> | undefined;
+    private hasUnparsedLines = true;
+
+    constructor(lineCount: number) {
+        this.lines = new Array(lineCount).fill(undefined);
+    }
+
+    static fromText(text: string): BindingTable {
+        const lines = text.split('\n');
+        const table = new BindingTable(lines.length);
+        table.fill(line => lines[line]);
+        return table;
+    }
+
+    get lineCount(): number {
+        return this.lines.length;
+    }
+
+    /**
+     * Replace lines startLine..endLine (before the change) with lineCount
+     * lines to be parsed by the next fill()
+     */
+    replaceLines(startLine: number, endLine: number, lineCount: number): void {
+        this.lines.splice(startLine, endLine - startLine + 1, ...new Array<LineBindings | undefined>(lineCount).fill(undefined));
+        this.byName = undefined;
+        this.hasUnparsedLines = true;
+    }
+
+    /**
+     * Parse the lines that changed since the last call
+     */
+    fill(getLine: (line: number) => string): void {
+        if (!this.hasUnparsedLines) {
+            return;
+        }
+        this.hasUnparsedLines = false;
+        for (let line = 0; line < this.lines.length; line++) {
+            if (!this.lines[line]) {
+                this.lines[line] = parseLineBindings(getLine(line));
+                this.byName = undefined;
+            }
+        }
+    }
+
+    /**
+     * Class of the value `name` holds at `line`: the nearest binding before
+     * it in a scope that contains the line
+     */
+    lookup(name: string, line: number): string | undefined {
+        const entry = this.findBinding(name, line);
+        if (!entry) {
+            return undefined;
+        }
+
+        const binding = entry.binding;
+        if (binding.isParameter && (name === 'self' || name === 'cls') && !binding.className && entry.scope !== -1) {
+            return this.scopes[entry.scope].ownerClass;
+        }
+        if (binding.iterates && binding.iterates !== name) {
+            return this.findBinding(binding.iterates, entry.line - 1)?.binding.querySetOf;
+        }
+        return binding.className;
+    }
+
+    private findBinding(name: string, line: number): BindingEntry | undefined {
+        const entries = this.getIndex().get(name);
+        if (!entries) {
+            return undefined;
+        }
+
+        // Last binding at or before the line
+        let low = 0;
+        let high = entries.length - 1;
+        let index = -1;
+        while (low <= high) {
+            const middle = (low + high) >> 1;
+            if (entries[middle].line <= line) {
+                index = middle;
+                low = middle + 1;
+            } else {
+                high = middle - 1;
+            }
+        }
+
+        for (; index >= 0; index--) {
+            const entry = entries[index];
+            const scope = entry.scope === -1 ? undefined : this.scopes[entry.scope];
+            if (!scope || (scope.start <= line && line <= scope.end)) {
+                return entry;
+            }
+        }
+        return undefined;
+    }
+
+    private getIndex(): Map<string, BindingEntry[]> {
+        if (this.byName) {
+            return this.byName;
+        }
+
+        const byName = new Map<string, BindingEntry[]>();
+        this.scopes = [];
+        // Open functions and classes, innermost last
+        const open: { indent: number; scope: number; className?: string }[] = [];
+        let lastCodeLine = -1;
+
+        this.lines.forEach((info, line) => {
+            if (!info || info.indent === -1) {
+                return;
+            }
+            while (open.length > 0 && info.indent <= open[open.length - 1].indent) {
+                const closed = open.pop()!;
+                if (closed.scope !== -1) {
+                    this.scopes[closed.scope].end = lastCodeLine;
+                }
+            }
+            lastCodeLine = line;
+
+            const enclosing = open.length > 0 ? open[open.length - 1] : undefined;
+            let outerScope = -1;
+            for (let i = open.length - 1; i >= 0 && outerScope === -1; i--) {
+                outerScope = open[i].scope;
+            }
+            let scope = outerScope;
+            if (info.def && info.isClass) {
+                open.push({ indent: info.indent, scope: -1, className: info.def });
+            } else if (info.def) {
+                scope = this.scopes.length;
+                this.scopes.push({ start: line, end: this.lines.length - 1, ownerClass: enclosing?.className });
+                open.push({ indent: info.indent, scope });
+            }
+
+            for (const binding of info.bindings) {
+                const entry = { line, scope: binding.isParameter ? scope : outerScope, binding };
+                const entries = byName.get(binding.name);
+                if (entries) {
+                    entries.push(entry);
+                } else {
+                    byName.set(binding.name, [entry]);
+                }
+            }
+        });
+
+        this.byName = byName;
+        return byName;
+    }
+}
@@ -0,0 +1,211 @@
+import { findTopLevelClasses } from './classRanges';
+
+/**
+ * Extracts the templates rendered by views and the context variables passed
+ * to them, for function-based render() calls and class-based views with
+ * get_context_data(). Has no editor dependencies so it can run in the
+ * command line tools as well.
+ */
+
+export interface ViewContext {
+    templatePath: string;
+    contextVariables: Map<string, ContextVariable>;
+    viewFile: string;
+    viewFunction?: string;
+    viewClass?: string;
+}
+
+/**
+ * What a class contributes to the views deriving from it: its template_name
+ * and the variables its get_context_data() adds
+ */
+export interface ViewClassInfo {
+    name: string;
+    templatePath?: string;
+    contextVariables: Map<string, ContextVariable>;
+}
+
+export interface ContextVariable {
+    name: string;
+    type?: string;
+    value?: string;
+    isLoop?: boolean;
+    loopTarget?: string;
+    modelName?: string;
+}
+
+export function extractViewContexts(content: string, viewFilePath: string): ViewContext[] {
+    const contexts: ViewContext[] = [];
+    
+    // Extract render() calls from function-based views
+    const renderPattern = /render\s*\(\s*request\s*,\s*['"]([\w/\-\.]+)['"]\s*(?:,\s*({[^}]+}|context|\w+))?\s*\)/g;
+    let match;
+    
+    while ((match = renderPattern.exec(content)) !== null) {
+        const templatePath = match[1];
+        const contextArg = match[2];
+        
+        const context: ViewContext = {
+            templatePath,
+            contextVariables: new Map(),
+            viewFile: viewFilePath,
+            viewFunction: findEnclosingFunction(content, match.index)
+        };
+        
+        if (contextArg) {
+            if (contextArg.startsWith('{')) {
+                // Inline context dictionary
+                parseInlineContext(contextArg, context.contextVariables);
+            } else {
+                // Variable reference - try to find its definition
+                findContextVariable(content, contextArg, context.contextVariables);
+            }
+        }
+        
+        contexts.push(context);
+    }
+    
+    // Extract context from class-based views
+    const classContexts = extractClassBasedViewContexts(content, viewFilePath);
+    contexts.push(...classContexts);
+    
+    return contexts;
+}
+
+function parseInlineContext(contextStr: string, variables: Map<string, ContextVariable>) {
+    // Parse inline context like {'posts': posts, 'form': form}
+    const keyValuePattern = /['"](\w+)['"]\s*:\s*(\w+)/g;
+    let match;
+    
+    while ((match = keyValuePattern.exec(contextStr)) !== null) {
+        const name = match[1];
+        const value = match[2];
+        
+        variables.set(name, {
+            name,
+            value,
+            type: inferTypeFromValue(value),
+            modelName: inferModelFromValue(value)
+        });
+    }
+}
+
+function findContextVariable(content: string, varName: string, variables: Map<string, ContextVariable>) {
+    // Look for context variable definition like: context = {'key': value}
+    const contextDefPattern = new RegExp(`${varName}\\s*=\\s*({[^}]+})`, 'g');
+    const match = contextDefPattern.exec(content);
+    
+    if (match) {
+        parseInlineContext(match[1], variables);
+    }
+}
+
+function extractClassBasedViewContexts(content: string, viewFilePath: string): ViewContext[] {
+    const contexts: ViewContext[] = [];
+    
+    // Find get_context_data methods in class-based views
+    const getContextPattern = /class\s+(\w+)[\s\S]*?def\s+get_context_data\s*\([^)]*\)[\s\S]*?context\s*=\s*super\(\)\.get_context_data\([^)]*\)([\s\S]*?)(?=\n\s{0,4}\S|\n\s*def|\Z)/g;
+    let match;
+    
+    while ((match = getContextPattern.exec(content)) !== null) {
+        const className = match[1];
+        const contextBody = match[2];
+        
+        // Extract template_name from class
+        const templateMatch = content.match(new RegExp(`class\\s+${className}[\\s\\S]*?template_name\\s*=\\s*['"]([\\w/\\-\\.]+)['"]`));
+        
+        if (templateMatch) {
+            const context: ViewContext = {
+                templatePath: templateMatch[1],
+                contextVariables: new Map(),
+                viewFile: viewFilePath,
+                viewClass: className
+            };
+            
+            // Extract context['key'] = value patterns
+            const contextUpdatePattern = /context\[['"](\w+)['"]\]\s*=\s*([^\n]+)/g;
+            let updateMatch;
+            
+            while ((updateMatch = contextUpdatePattern.exec(contextBody)) !== null) {
+                const name = updateMatch[1];
+                const value = updateMatch[2].trim();
+                
+                context.contextVariables.set(name, {
+                    name,
+                    value,
+                    type: inferTypeFromValue(value),
+                    modelName: inferModelFromValue(value)
+                });
+            }
+            
+            contexts.push(context);
+        }
+    }
+    
+    return contexts;
+}
+
+/**
+ * template_name and get_context_data() variables of each top-level class,
+ * for combining them along the class hierarchy
+ */
+export function extractViewClasses(content: string): ViewClassInfo[] {
+    const lines = content.split('\n');
+    const viewClasses: ViewClassInfo[] = [];
+
+    for (const cls of findTopLevelClasses(content)) {
+        const body = lines.slice(cls.startLine, cls.endLine + 1).join('\n');
+        const templateMatch = body.match(/^\s+template_name\s*=\s*['"]([\w/\-\.]+)['"]/m);
+        const contextVariables = new Map<string, ContextVariable>();
+
+        // The method ends at the next statement indented like its def
+        const methodMatch = body.match(/^([ \t]+)def\s+get_context_data\s*\([^)]*\)[^\n]*\n([\s\S]*?)(?=\n\1\S|(?![\s\S]))/m);
+        if (methodMatch) {
+            const contextUpdatePattern = /context\[['"](\w+)['"]\]\s*=\s*([^\n]+)/g;
+            let updateMatch;
+            while ((updateMatch = contextUpdatePattern.exec(methodMatch[2])) !== null) {
+                const value = updateMatch[2].trim();
+                contextVariables.set(updateMatch[1], {
+                    name: updateMatch[1],
+                    value,
+                    type: inferTypeFromValue(value),
+                    modelName: inferModelFromValue(value)
+                });
+            }
+        }
+
+        if (templateMatch || contextVariables.size > 0) {
+            viewClasses.push({ name: cls.name, templatePath: templateMatch?.[1], contextVariables });
+        }
+    }
+
+    return viewClasses;
+}
+
+function findEnclosingFunction(content: string, position: number): string | undefined {
+    // Find the function that contains this render call
+    const beforePosition = content.substring(0, position);
+    const functionMatch = beforePosition.match(/def\s+(\w+)\s*\([^)]*\):\s*$/m);
+    
+    return functionMatch ? functionMatch[1] : undefined;
+}
+
+function inferTypeFromValue(value: string): string | undefined {
+    // Simple type inference based on common patterns
+    if (value.includes('.objects.') || value.includes('.all()') || value.includes('.filter(')) {
+        return 'QuerySet';
+    }
+    if (value.includes('Form(') || value.endsWith('Form')) {
+        return 'Form';
+    }
+    if (value.includes('get_object_or_404')) {
+        return 'Model';
+    }
+    
+    return undefined;
+}
+
+function inferModelFromValue(value: string): string | undefined {
+    const match = value.match(/(\w+)\.objects\b/) || value.match(/get_object_or_404\(\s*(\w+)/);
+    return match ? match[1] : undefined;
+}
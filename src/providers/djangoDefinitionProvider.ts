@@ -1,10 +1,12 @@
 import * as vscode from 'vscode';
 import * as path from 'path';
 import * as fs from 'fs';
-import { injectable, inject } from 'inversify';
+import { injectable, inject, optional } from 'inversify';
 import { TYPES } from '../container/types';
 import { DjangoProjectAnalyzer } from '../analyzers/djangoProjectAnalyzer';
 import { UrlPatternAnalyzer } from '../analyzers/urlPatternAnalyzer';
+import { ProjectShardManager } from '../analyzers/projectShardManager';
+import { TemplateIndex } from '../analyzers/templateIndex';
 
 /**
  * Django Definition Provider
@@ -14,7 +16,9 @@ import { UrlPatternAnalyzer } from '../analyzers/urlPatternAnalyzer';
 export class DjangoDefinitionProvider implements vscode.DefinitionProvider {
     constructor(
         @inject(TYPES.DjangoProjectAnalyzer) private projectAnalyzer: DjangoProjectAnalyzer,
-        @inject(TYPES.UrlPatternAnalyzer) private urlAnalyzer: UrlPatternAnalyzer
+        @inject(TYPES.UrlPatternAnalyzer) private urlAnalyzer: UrlPatternAnalyzer,
+        @inject(TYPES.TemplateIndex) @optional() private templateIndex?: TemplateIndex,
+        @inject(TYPES.ProjectShardManager) @optional() private shardManager?: ProjectShardManager
     ) {}
 
     async provideDefinition(
@@ -37,6 +41,10 @@ export class DjangoDefinitionProvider implements vscode.DefinitionProvider {
         if (this.isTemplatePathReference(document, line, position)) {
             return this.getTemplateFileDefinition(document, position);
         }
+
+        if (this.templateIndex && (document.languageId === 'html' || document.languageId === 'django-html')) {
+            return this.templateIndex.findTemplateTagDefinition(document, position);
+        }
         
         return undefined;
     }
@@ -95,13 +103,20 @@ export class DjangoDefinitionProvider implements vscode.DefinitionProvider {
             [namespace, name] = urlName.split(':', 2);
         }
         
-        // Find the URL pattern
-        const urlPattern = this.urlAnalyzer.getUrlPattern(name, namespace);
+        // Find the URL pattern among those of the document's project
+        const projectRoot = this.shardManager?.getScopeRoot(document.uri.fsPath);
+        const urlPattern = this.urlAnalyzer.getUrlPattern(name, namespace, projectRoot);
         if (!urlPattern) {
             return undefined;
         }
         
         // Return the location directly from the URL pattern
+        if (urlPattern.line !== undefined && urlPattern.character !== undefined) {
+            return new vscode.Location(
+                vscode.Uri.file(urlPattern.filePath),
+                new vscode.Position(urlPattern.line, urlPattern.character)
+            );
+        }
         const urlPosition = await this.findPositionInFile(urlPattern.filePath, urlPattern.name);
         if (urlPosition) {
             return new vscode.Location(vscode.Uri.file(urlPattern.filePath), urlPosition);
@@ -363,6 +378,11 @@ export class DjangoDefinitionProvider implements vscode.DefinitionProvider {
      * Find template file location
      */
     private async findTemplateLocation(templatePath: string): Promise<vscode.Location | undefined> {
+        const indexed = this.templateIndex?.resolve(templatePath);
+        if (indexed) {
+            return new vscode.Location(vscode.Uri.file(indexed.filePath), new vscode.Position(0, 0));
+        }
+
         // Common template directories
         const templateDirs = [
             'templates',
@@ -1,12 +1,14 @@
-import { injectable, inject } from 'inversify';
+import { injectable, inject, optional } from 'inversify';
 import * as vscode from 'vscode';
 import { DjangoProjectAnalyzer } from '../analyzers/djangoProjectAnalyzer';
+import { ProjectShardManager } from '../analyzers/projectShardManager';
 import { TYPES } from '../container/types';
 
 @injectable()
 export class DjangoModelCompletionProvider implements vscode.CompletionItemProvider {
     constructor(
-        @inject(TYPES.DjangoProjectAnalyzer) private analyzer: DjangoProjectAnalyzer
+        @inject(TYPES.DjangoProjectAnalyzer) private analyzer: DjangoProjectAnalyzer,
+        @inject(TYPES.ProjectShardManager) @optional() private shardManager?: ProjectShardManager
     ) {}
 
     async provideCompletionItems(
@@ -24,12 +26,12 @@ export class DjangoModelCompletionProvider implements vscode.CompletionItemProvi
         
         // 모델 필드 접근 감지
         if (this.isModelFieldContext(linePrefix)) {
-            return this.getModelFieldCompletions(linePrefix);
+            return this.getModelFieldCompletions(linePrefix, document.uri.fsPath);
         }
         
         // 모델 클래스 import 감지
         if (this.isModelImportContext(linePrefix)) {
-            return this.getModelClassCompletions();
+            return this.getModelClassCompletions(document.uri.fsPath);
         }
 
         return [];
@@ -101,9 +103,9 @@ export class DjangoModelCompletionProvider implements vscode.CompletionItemProvi
         });
     }
 
-    private async getModelFieldCompletions(linePrefix: string): Promise<vscode.CompletionItem[]> {
+    private async getModelFieldCompletions(linePrefix: string, documentPath: string): Promise<vscode.CompletionItem[]> {
         // 실제 구현에서는 analyzer를 통해 모델 필드를 가져옴
-        const modelInfo = await this.analyzer.getModelInfo();
+        const modelInfo = await this.getAnalyzer(documentPath).getModelInfo();
         
         // 현재 컨텍스트에서 모델 이름 추출
         const modelName = this.extractModelName(linePrefix);
@@ -120,8 +122,8 @@ export class DjangoModelCompletionProvider implements vscode.CompletionItemProvi
         });
     }
 
-    private async getModelClassCompletions(): Promise<vscode.CompletionItem[]> {
-        const modelInfo = await this.analyzer.getModelInfo();
+    private async getModelClassCompletions(documentPath: string): Promise<vscode.CompletionItem[]> {
+        const modelInfo = await this.getAnalyzer(documentPath).getModelInfo();
         
         return Object.keys(modelInfo).map(modelName => {
             const item = new vscode.CompletionItem(modelName, vscode.CompletionItemKind.Class);
@@ -131,6 +133,13 @@ export class DjangoModelCompletionProvider implements vscode.CompletionItemProvi
         });
     }
 
+    /**
+     * Use the project analyzer of the project that owns the document
+     */
+    private getAnalyzer(documentPath: string): DjangoProjectAnalyzer {
+        return this.shardManager?.getShard(documentPath)?.projectAnalyzer || this.analyzer;
+    }
+
     private extractModelName(linePrefix: string): string | undefined {
         // 간단한 패턴 매칭으로 모델 이름 추출
         const match = linePrefix.match(/(\w+)\.\w*$/);
@@ -1,7 +1,8 @@
 import * as vscode from 'vscode';
-import { injectable, inject } from 'inversify';
+import { injectable, inject, optional } from 'inversify';
 import { TYPES } from '../container/types';
 import { DjangoProjectAnalyzer } from '../analyzers/djangoProjectAnalyzer';
+import { ProjectShardManager } from '../analyzers/projectShardManager';
 
 /**
  * Django ModelForm 자동완성 제공자
@@ -41,7 +42,8 @@ export class DjangoModelFormCompletionProvider implements vscode.CompletionItemP
     ];
 
     constructor(
-        @inject(TYPES.DjangoProjectAnalyzer) private projectAnalyzer: DjangoProjectAnalyzer
+        @inject(TYPES.DjangoProjectAnalyzer) private projectAnalyzer: DjangoProjectAnalyzer,
+        @inject(TYPES.ProjectShardManager) @optional() private shardManager?: ProjectShardManager
     ) {}
 
     async provideCompletionItems(
@@ -195,7 +197,7 @@ export class DjangoModelFormCompletionProvider implements vscode.CompletionItemP
         }
 
         // Get fields from the model
-        const modelFields = await this.getModelFieldsFromAnalyzer(modelName);
+        const modelFields = await this.getModelFieldsFromAnalyzer(modelName, document.uri.fsPath);
         
         modelFields.forEach(field => {
             const item = new vscode.CompletionItem(field.name, vscode.CompletionItemKind.Field);
@@ -267,10 +269,11 @@ export class DjangoModelFormCompletionProvider implements vscode.CompletionItemP
     }
 
     /**
-     * Get model fields from analyzer
+     * Get model fields from the analyzer of the project that owns the document
      */
-    private async getModelFieldsFromAnalyzer(modelName: string): Promise<Array<{ name: string, type: string }>> {
-        const modelInfo = await this.projectAnalyzer.getModelInfo();
+    private async getModelFieldsFromAnalyzer(modelName: string, documentPath: string): Promise<Array<{ name: string, type: string }>> {
+        const analyzer = this.shardManager?.getShard(documentPath)?.projectAnalyzer || this.projectAnalyzer;
+        const modelInfo = await analyzer.getModelInfo();
         const model = modelInfo[modelName];
         
         if (model && model.fields) {
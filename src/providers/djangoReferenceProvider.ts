@@ -0,0 +1,85 @@
+import * as vscode from 'vscode';
+import { injectable, inject } from 'inversify';
+import { TYPES } from '../container/types';
+import { ReferenceIndex, IndexedOccurrence } from '../analyzers/referenceIndex';
+import { getIdentifierKind } from '../parsers/identifierExtractor';
+
+/**
+ * Find all references and rename for models, model fields and URL names,
+ * answered from the reference index. Field renames include ORM lookup
+ * strings, ModelAdmin options and ModelForm field lists. Edited files are
+ * indexed again before answering, so offsets match the buffers.
+ */
+@injectable()
+export class DjangoReferenceProvider implements vscode.ReferenceProvider, vscode.RenameProvider {
+    constructor(
+        @inject(TYPES.ReferenceIndex) private referenceIndex: ReferenceIndex
+    ) {}
+
+    async provideReferences(
+        document: vscode.TextDocument,
+        position: vscode.Position,
+        context: vscode.ReferenceContext
+    ): Promise<vscode.Location[] | undefined> {
+        if (!await this.referenceIndex.ensureCurrent(document)) {
+            return undefined;
+        }
+        const occurrence = this.referenceIndex.getOccurrenceAt(document.uri.fsPath, position.line, position.character);
+        if (!occurrence) {
+            return undefined;
+        }
+
+        return this.referenceIndex.getOccurrences(occurrence.key)
+            .filter(reference => context.includeDeclaration || !reference.isDefinition)
+            .map(reference => new vscode.Location(vscode.Uri.file(reference.filePath), this.toRange(reference)));
+    }
+
+    async prepareRename(
+        document: vscode.TextDocument,
+        position: vscode.Position
+    ): Promise<{ range: vscode.Range; placeholder: string }> {
+        // Edits at offsets from before the last changes would corrupt the files
+        if (!await this.referenceIndex.ensureCurrent(document)) {
+            throw new Error('Files changed while preparing the rename; try again');
+        }
+        const occurrence = this.referenceIndex.getOccurrenceAt(document.uri.fsPath, position.line, position.character);
+        if (!occurrence || getIdentifierKind(occurrence.key) === 'template') {
+            throw new Error('Only Django models, model fields and URL names can be renamed here');
+        }
+        if (!this.referenceIndex.hasDefinition(occurrence.key)) {
+            throw new Error('This name is not defined in the project');
+        }
+
+        const range = new vscode.Range(occurrence.line, occurrence.start, occurrence.line, occurrence.end);
+        return { range, placeholder: document.getText(range) };
+    }
+
+    async provideRenameEdits(
+        document: vscode.TextDocument,
+        position: vscode.Position,
+        newName: string
+    ): Promise<vscode.WorkspaceEdit> {
+        const { range } = await this.prepareRename(document, position);
+        const occurrence = this.referenceIndex.getOccurrenceAt(document.uri.fsPath, range.start.line, range.start.character)!;
+
+        // A URL name may be given with its namespace, which stays as it is
+        const name = getIdentifierKind(occurrence.key) === 'url' ? newName.substring(newName.lastIndexOf(':') + 1) : newName;
+        if (!/^[A-Za-z_][\w-]*$/.test(name) || (getIdentifierKind(occurrence.key) !== 'url' && name.includes('-'))) {
+            throw new Error(`'${newName}' is not a valid name`);
+        }
+
+        const edit = new vscode.WorkspaceEdit();
+        for (const reference of this.referenceIndex.getOccurrences(occurrence.key)) {
+            // Uses found in strings are matched by name; have them confirmed in the preview
+            edit.replace(vscode.Uri.file(reference.filePath), this.toRange(reference), name, {
+                label: reference.isDefinition ? 'Definitions' : 'References',
+                needsConfirmation: !reference.isDefinition
+            });
+        }
+        return edit;
+    }
+
+    private toRange(occurrence: IndexedOccurrence): vscode.Range {
+        return new vscode.Range(occurrence.line, occurrence.start, occurrence.line, occurrence.end);
+    }
+}
@@ -1,14 +1,74 @@
-import { injectable, inject } from 'inversify';
+import { injectable, inject, optional } from 'inversify';
 import * as vscode from 'vscode';
-import { AdvancedModelAnalyzer } from '../analyzers/advancedModelAnalyzer';
+import { AdvancedModelAnalyzer, EnhancedModelInfo, ModelRelation } from '../analyzers/advancedModelAnalyzer';
+import { ProjectShardManager } from '../analyzers/projectShardManager';
+import { VariableBindingIndex } from '../analyzers/variableBindingIndex';
 import { DJANGO_QUERYSET_METHODS, DJANGO_MODEL_METHODS, DJANGO_MODEL_PROPERTIES } from '../data/djangoMethods';
+import { getFieldLookups } from '../data/djangoFieldTypes';
 import { TYPES } from '../container/types';
+import { LazyCompletionItem, StaticCompletionItems, CompletionDetails, resolveLazyCompletionItem } from './lazyCompletion';
+
+// The models of one published snapshot, keyed by name
+type ModelRecord = { readonly [name: string]: EnhancedModelInfo };
+
+/**
+ * Identifies a model member offered as a completion; detail and
+ * documentation are looked up from it when the item is resolved
+ */
+interface ModelMemberId {
+    documentPath: string;
+    model: string;
+    member: string;
+    // Lookup appended to the member (or related field), e.g. "icontains"
+    lookup?: string;
+    // Set for fields of the model `member` points to, e.g. author__name
+    relatedModel?: string;
+    relatedField?: string;
+    // Member is reached through a relation, e.g. book.author.
+    viaRelation?: boolean;
+}
+
+const QUERYSET_METHOD_ITEMS = new StaticCompletionItems(() => DJANGO_QUERYSET_METHODS.map(method => {
+    const item = new vscode.CompletionItem(method.name, vscode.CompletionItemKind.Method);
+    item.detail = method.signature;
+    item.documentation = new vscode.MarkdownString(method.doc);
+
+    // Add appropriate snippet
+    if (method.name === 'filter' || method.name === 'exclude' || method.name === 'get') {
+        item.insertText = new vscode.SnippetString(`${method.name}($0)`);
+    } else if (method.name === 'order_by' || method.name === 'values' || method.name === 'values_list') {
+        item.insertText = new vscode.SnippetString(`${method.name}('$0')`);
+    } else if (method.name === 'annotate' || method.name === 'aggregate') {
+        item.insertText = new vscode.SnippetString(`${method.name}($0)`);
+    } else {
+        item.insertText = new vscode.SnippetString(`${method.name}()`);
+    }
+
+    return item;
+}));
+
+const RELATED_MANAGER_ITEMS = new StaticCompletionItems(() => {
+    // RelatedManager has all QuerySet methods plus create()
+    const createMethod = new vscode.CompletionItem('create', vscode.CompletionItemKind.Method);
+    createMethod.detail = 'create(**kwargs)';
+    createMethod.documentation = new vscode.MarkdownString('Create and save a new related object');
+    createMethod.insertText = new vscode.SnippetString('create($0)');
+    return [createMethod];
+});
 
 @injectable()
 export class EnhancedCompletionProvider implements vscode.CompletionItemProvider {
+    private bindingIndex: VariableBindingIndex;
+    // Manager and reverse relation names of all models, per models snapshot
+    private managerNames: WeakMap<ModelRecord, Set<string>> = new WeakMap();
+
     constructor(
-        @inject(TYPES.AdvancedModelAnalyzer) private analyzer: AdvancedModelAnalyzer
-    ) {}
+        @inject(TYPES.AdvancedModelAnalyzer) private defaultAnalyzer: AdvancedModelAnalyzer,
+        @inject(TYPES.ProjectShardManager) @optional() private shardManager?: ProjectShardManager,
+        @inject(TYPES.VariableBindingIndex) @optional() bindingIndex?: VariableBindingIndex
+    ) {
+        this.bindingIndex = bindingIndex || new VariableBindingIndex();
+    }
 
     async provideCompletionItems(
         document: vscode.TextDocument,
@@ -21,26 +81,110 @@ export class EnhancedCompletionProvider implements vscode.CompletionItemProvider
         
         // Analyze context to provide appropriate completions
         const completions: vscode.CompletionItem[] = [];
+        // One snapshot of the models for the whole request, even if the
+        // analyzer publishes a new one while the request awaits
+        const models = await this.resolveReferencedModels(this.getAnalyzer(document.uri.fsPath), linePrefix);
         
         // Check different contexts - order matters!
         if (this.isFilterContext(linePrefix)) {
-            const filterCompletions = await this.getFilterFieldCompletions(linePrefix);
+            const filterCompletions = await this.getFilterFieldCompletions(models, linePrefix, document.uri.fsPath);
             completions.push(...filterCompletions);
-        } else if (this.isRelatedFieldContext(linePrefix)) {
-            const relatedCompletions = await this.getRelatedFieldCompletions(linePrefix);
+        } else if (this.isRelatedFieldContext(models, linePrefix)) {
+            const relatedCompletions = await this.getRelatedFieldCompletions(models, linePrefix, document.uri.fsPath);
             completions.push(...relatedCompletions);
-        } else if (this.isManagerContext(linePrefix)) {
-            const managerCompletions = await this.getManagerCompletions(linePrefix);
+        } else if (this.isManagerContext(models, linePrefix)) {
+            const managerCompletions = await this.getManagerCompletions(models, linePrefix);
             completions.push(...managerCompletions);
-        } else if (this.isModelInstanceContext(linePrefix)) {
-            const instanceCompletions = await this.getModelInstanceCompletions(linePrefix, document, position);
+        } else if (this.isModelInstanceContext(models, linePrefix)) {
+            const instanceCompletions = await this.getModelInstanceCompletions(models, linePrefix, document, position);
             completions.push(...instanceCompletions);
         }
         
         return completions;
     }
 
-    private isManagerContext(linePrefix: string): boolean {
+    resolveCompletionItem(item: vscode.CompletionItem): vscode.CompletionItem {
+        return resolveLazyCompletionItem<ModelMemberId>(item, id => this.describeMember(id));
+    }
+
+    /**
+     * Build the items that do not depend on the project before they are first requested
+     */
+    prebuild(): void {
+        QUERYSET_METHOD_ITEMS.get();
+        RELATED_MANAGER_ITEMS.get();
+    }
+
+    /**
+     * Detail and documentation of a model member, read from the analyzer of
+     * the project the completion was requested in
+     */
+    private describeMember(id: ModelMemberId): CompletionDetails | undefined {
+        const model = this.getAnalyzer(id.documentPath).getModel(id.relatedModel || id.model);
+        const name = id.relatedField || id.member;
+        const field = model?.fields.find(candidate => candidate.name === name);
+        if (!model || !field) {
+            const method = model?.methods.find(candidate => candidate.name === name);
+            if (!method) {
+                return undefined;
+            }
+            return { detail: method.isProperty ? 'property' : `(${method.parameters.join(', ')})` };
+        }
+
+        if (id.relatedModel) {
+            if (id.lookup) {
+                return { detail: `Related ${model.name}.${field.name} ${id.lookup}` };
+            }
+            return {
+                detail: `Related ${model.name}.${field.name}`,
+                documentation: new vscode.MarkdownString(`Filter by ${id.member}.${field.name}`)
+            };
+        }
+        if (id.lookup) {
+            return {
+                detail: `${field.type} lookup`,
+                documentation: new vscode.MarkdownString(`Filter by ${field.name} using ${id.lookup} lookup`)
+            };
+        }
+        return {
+            detail: id.viaRelation ? `${field.type} field on ${model.name}` : `${field.type} field`,
+            documentation: field.helpText ? new vscode.MarkdownString(field.helpText) : undefined
+        };
+    }
+
+    /**
+     * Use the model analyzer of the project that owns the document
+     */
+    private getAnalyzer(documentPath: string): AdvancedModelAnalyzer {
+        return this.shardManager?.getShard(documentPath)?.modelAnalyzer || this.defaultAnalyzer;
+    }
+
+    /**
+     * The models after looking up those the line names, e.g. Book in
+     * "Book.objects.filter(", and the models their relations point to.
+     * With demand-driven analysis this analyzes models not indexed yet.
+     */
+    private async resolveReferencedModels(analyzer: AdvancedModelAnalyzer, linePrefix: string): Promise<ModelRecord> {
+        const names = new Set(Array.from(linePrefix.matchAll(/\b([A-Z]\w*)\./g), match => match[1]));
+        for (const name of names) {
+            const model = await analyzer.resolveModel(name);
+            for (const relation of model?.relations || []) {
+                await analyzer.resolveModel(relation.toModel);
+            }
+        }
+        return analyzer.getAllModels();
+    }
+
+    private getManagerNames(models: ModelRecord): Set<string> {
+        let names = this.managerNames.get(models);
+        if (!names) {
+            names = new Set(Object.values(models).flatMap(model => model.managers.map(manager => manager.name)));
+            this.managerNames.set(models, names);
+        }
+        return names;
+    }
+
+    private isManagerContext(models: ModelRecord, linePrefix: string): boolean {
         // Patterns that indicate we're working with a manager or QuerySet
         const patterns = [
             /\w+\.objects\.$/,
@@ -57,13 +201,10 @@ export class EnhancedCompletionProvider implements vscode.CompletionItemProvider
         const match = linePrefix.match(/(\w+)\.(\w+)\.$/);
         if (match) {
             const [_, variableName, attributeName] = match;
-            const models = this.analyzer.getAllModels();
             
             // Check all models to see if any have this as a manager/reverse relation
-            for (const model of Object.values(models)) {
-                if (model.managers.some(m => m.name === attributeName)) {
-                    return true;
-                }
+            if (this.getManagerNames(models).has(attributeName)) {
+                return true;
             }
         }
         
@@ -95,12 +236,12 @@ export class EnhancedCompletionProvider implements vscode.CompletionItemProvider
         return /\.(filter|exclude|get|annotate|aggregate)\s*\(\s*$/.test(linePrefix);
     }
 
-    private isModelInstanceContext(linePrefix: string): boolean {
+    private isModelInstanceContext(models: ModelRecord, linePrefix: string): boolean {
         // Simple heuristic: variable followed by dot
-        return /\w+\.$/.test(linePrefix) && !this.isManagerContext(linePrefix);
+        return /\w+\.$/.test(linePrefix) && !this.isManagerContext(models, linePrefix);
     }
 
-    private isRelatedFieldContext(linePrefix: string): boolean {
+    private isRelatedFieldContext(models: ModelRecord, linePrefix: string): boolean {
         // Check if we're accessing a related field (not a manager)
         const match = linePrefix.match(/(\w+)\.(\w+)\.$/);
         
@@ -111,12 +252,9 @@ export class EnhancedCompletionProvider implements vscode.CompletionItemProvider
         const [_, variable, field] = match;
         
         // Check if this field is a manager/reverse relation
-        const models = this.analyzer.getAllModels();
-        for (const model of Object.values(models)) {
-            if (model.managers.some(m => m.name === field)) {
-                // This is a manager, not a related field
-                return false;
-            }
+        if (this.getManagerNames(models).has(field)) {
+            // This is a manager, not a related field
+            return false;
         }
         
         // Check if it's a common manager pattern
@@ -131,29 +269,11 @@ export class EnhancedCompletionProvider implements vscode.CompletionItemProvider
         return beforeCursor.includes(`${variable} =`) || beforeCursor.includes(`${variable}=`);
     }
 
-    private async getManagerCompletions(linePrefix: string): Promise<vscode.CompletionItem[]> {
+    private async getManagerCompletions(models: ModelRecord, linePrefix: string): Promise<vscode.CompletionItem[]> {
         const completions: vscode.CompletionItem[] = [];
         
         // Add standard QuerySet methods
-        const standardMethods = DJANGO_QUERYSET_METHODS.map(method => {
-            const item = new vscode.CompletionItem(method.name, vscode.CompletionItemKind.Method);
-            item.detail = method.signature;
-            item.documentation = new vscode.MarkdownString(method.doc);
-            
-            // Add appropriate snippet
-            if (method.name === 'filter' || method.name === 'exclude' || method.name === 'get') {
-                item.insertText = new vscode.SnippetString(`${method.name}($0)`);
-            } else if (method.name === 'order_by' || method.name === 'values' || method.name === 'values_list') {
-                item.insertText = new vscode.SnippetString(`${method.name}('$0')`);
-            } else if (method.name === 'annotate' || method.name === 'aggregate') {
-                item.insertText = new vscode.SnippetString(`${method.name}($0)`);
-            } else {
-                item.insertText = new vscode.SnippetString(`${method.name}()`);
-            }
-            
-            return item;
-        });
-        completions.push(...standardMethods);
+        completions.push(...QUERYSET_METHOD_ITEMS.get());
         
         // Try to extract custom manager methods or reverse relations
         const managerMatch = linePrefix.match(/(\w+)\.(\w+)\.$/);
@@ -161,8 +281,6 @@ export class EnhancedCompletionProvider implements vscode.CompletionItemProvider
             const variableName = managerMatch[1];
             const managerName = managerMatch[2];
             
-            const models = this.analyzer.getAllModels();
-            
             // First try exact match with variable name as model name
             let model = models[variableName];
             
@@ -177,12 +295,7 @@ export class EnhancedCompletionProvider implements vscode.CompletionItemProvider
                 if (manager) {
                     // For RelatedManager, use standard QuerySet methods
                     if (manager.type === 'RelatedManager') {
-                        // RelatedManager has all QuerySet methods plus create()
-                        const createMethod = new vscode.CompletionItem('create', vscode.CompletionItemKind.Method);
-                        createMethod.detail = 'create(**kwargs)';
-                        createMethod.documentation = new vscode.MarkdownString('Create and save a new related object');
-                        createMethod.insertText = new vscode.SnippetString('create($0)');
-                        completions.push(createMethod);
+                        completions.push(...RELATED_MANAGER_ITEMS.get());
                         // Don't forget to return standard methods too - they're already added above
                     } else if (manager.methods) {
                         // Custom manager methods
@@ -200,7 +313,11 @@ export class EnhancedCompletionProvider implements vscode.CompletionItemProvider
         return completions;
     }
 
-    private async getFilterFieldCompletions(linePrefix: string): Promise<vscode.CompletionItem[]> {
+    private async getFilterFieldCompletions(
+        models: ModelRecord,
+        linePrefix: string,
+        documentPath: string
+    ): Promise<vscode.CompletionItem[]> {
         const completions: vscode.CompletionItem[] = [];
         
         // Extract model name from the line
@@ -210,7 +327,6 @@ export class EnhancedCompletionProvider implements vscode.CompletionItemProvider
         }
         
         const modelName = modelMatch[1];
-        const models = this.analyzer.getAllModels();
         
         // Find the model
         let model = models[modelName];
@@ -228,21 +344,21 @@ export class EnhancedCompletionProvider implements vscode.CompletionItemProvider
         
         // Add field lookups
         for (const field of model.fields) {
+            const id: ModelMemberId = { documentPath, model: model.name, member: field.name };
+
             // Basic field
-            const fieldItem = new vscode.CompletionItem(field.name, vscode.CompletionItemKind.Field);
-            fieldItem.detail = `${field.type} field`;
+            const fieldItem = new LazyCompletionItem(field.name, vscode.CompletionItemKind.Field, id);
             fieldItem.insertText = new vscode.SnippetString(`${field.name}=$0`);
             completions.push(fieldItem);
             
             // Field lookups
-            const lookups = this.analyzer.getFieldLookups(field.type);
+            const lookups = getFieldLookups(field.type);
             for (const lookup of lookups) {
-                const lookupItem = new vscode.CompletionItem(
+                const lookupItem = new LazyCompletionItem(
                     `${field.name}__${lookup}`,
-                    vscode.CompletionItemKind.Field
+                    vscode.CompletionItemKind.Field,
+                    { ...id, lookup }
                 );
-                lookupItem.detail = `${field.type} lookup`;
-                lookupItem.documentation = new vscode.MarkdownString(`Filter by ${field.name} using ${lookup} lookup`);
                 lookupItem.insertText = new vscode.SnippetString(`${field.name}__${lookup}=$0`);
                 completions.push(lookupItem);
             }
@@ -285,23 +401,27 @@ export class EnhancedCompletionProvider implements vscode.CompletionItemProvider
                 if (relatedModel) {
                     // Add related model fields
                     for (const relatedField of relatedModel.fields) {
-                        const relatedItem = new vscode.CompletionItem(
+                        const relatedId: ModelMemberId = {
+                            ...id,
+                            relatedModel: relatedModel.name,
+                            relatedField: relatedField.name
+                        };
+                        const relatedItem = new LazyCompletionItem(
                             `${field.name}__${relatedField.name}`,
-                            vscode.CompletionItemKind.Field
+                            vscode.CompletionItemKind.Field,
+                            relatedId
                         );
-                        relatedItem.detail = `Related ${relatedModel.name}.${relatedField.name}`;
-                        relatedItem.documentation = new vscode.MarkdownString(`Filter by ${field.name}.${relatedField.name}`);
                         relatedItem.insertText = new vscode.SnippetString(`${field.name}__${relatedField.name}=$0`);
                         completions.push(relatedItem);
                         
                         // Add lookups for the related field
-                        const relatedLookups = this.analyzer.getFieldLookups(relatedField.type);
+                        const relatedLookups = getFieldLookups(relatedField.type);
                         for (const lookup of relatedLookups) {
-                            const relatedLookupItem = new vscode.CompletionItem(
+                            const relatedLookupItem = new LazyCompletionItem(
                                 `${field.name}__${relatedField.name}__${lookup}`,
-                                vscode.CompletionItemKind.Field
+                                vscode.CompletionItemKind.Field,
+                                { ...relatedId, lookup }
                             );
-                            relatedLookupItem.detail = `Related ${relatedModel.name}.${relatedField.name} ${lookup}`;
                             relatedLookupItem.insertText = new vscode.SnippetString(`${field.name}__${relatedField.name}__${lookup}=$0`);
                             completions.push(relatedLookupItem);
                         }
@@ -328,6 +448,7 @@ export class EnhancedCompletionProvider implements vscode.CompletionItemProvider
     }
 
     private async getModelInstanceCompletions(
+        models: ModelRecord,
         linePrefix: string,
         document: vscode.TextDocument,
         position: vscode.Position
@@ -346,30 +467,31 @@ export class EnhancedCompletionProvider implements vscode.CompletionItemProvider
             return completions;
         }
         
-        const model = this.analyzer.getModel(modelType);
+        const model = models[modelType];
         if (!model) {
             return completions;
         }
         
+        const documentPath = document.uri.fsPath;
+
         // Add fields
         for (const field of model.fields) {
-            const item = new vscode.CompletionItem(field.name, vscode.CompletionItemKind.Field);
-            item.detail = `${field.type} field`;
-            if (field.helpText) {
-                item.documentation = new vscode.MarkdownString(field.helpText);
-            }
-            completions.push(item);
+            completions.push(new LazyCompletionItem(
+                field.name,
+                vscode.CompletionItemKind.Field,
+                { documentPath, model: model.name, member: field.name }
+            ));
         }
         
         // Add methods
         for (const method of model.methods) {
-            const item = new vscode.CompletionItem(method.name, vscode.CompletionItemKind.Method);
+            const item = new LazyCompletionItem(
+                method.name,
+                method.isProperty ? vscode.CompletionItemKind.Property : vscode.CompletionItemKind.Method,
+                { documentPath, model: model.name, member: method.name }
+            );
             
-            if (method.isProperty) {
-                item.kind = vscode.CompletionItemKind.Property;
-                item.detail = 'property';
-            } else {
-                item.detail = `(${method.parameters.join(', ')})`;
+            if (!method.isProperty) {
                 if (method.parameters.length > 0) {
                     item.insertText = new vscode.SnippetString(`${method.name}($0)`);
                 } else {
@@ -390,7 +512,11 @@ export class EnhancedCompletionProvider implements vscode.CompletionItemProvider
         return completions;
     }
 
-    private async getRelatedFieldCompletions(linePrefix: string): Promise<vscode.CompletionItem[]> {
+    private async getRelatedFieldCompletions(
+        models: ModelRecord,
+        linePrefix: string,
+        documentPath: string
+    ): Promise<vscode.CompletionItem[]> {
         const completions: vscode.CompletionItem[] = [];
         
         // Extract the chain of properties
@@ -410,8 +536,6 @@ export class EnhancedCompletionProvider implements vscode.CompletionItemProvider
         // 2. Find that 'author' is a ForeignKey to Author
         // 3. Return Author fields
         
-        const models = this.analyzer.getAllModels();
-        
         // Try to find model by variable name pattern (e.g., 'book' -> 'Book')
         const variableName = parts[0];
         const modelName = variableName.charAt(0).toUpperCase() + variableName.slice(1);
@@ -434,7 +558,7 @@ export class EnhancedCompletionProvider implements vscode.CompletionItemProvider
         
         if (field && ['ForeignKey', 'OneToOneField', 'ManyToManyField'].includes(field.type)) {
             // Try to find the related model
-            const relations = this.analyzer.getRelationsForModel(currentModel.name);
+            const relations: ModelRelation[] = currentModel.relations;
             const relation = relations.find(r => r.fieldName === fieldName);
             
             if (relation) {
@@ -442,12 +566,11 @@ export class EnhancedCompletionProvider implements vscode.CompletionItemProvider
                 if (relatedModel) {
                     // Add fields from the related model
                     for (const relatedField of relatedModel.fields) {
-                        const item = new vscode.CompletionItem(
+                        completions.push(new LazyCompletionItem(
                             relatedField.name,
-                            vscode.CompletionItemKind.Field
-                        );
-                        item.detail = `${relatedField.type} field on ${relatedModel.name}`;
-                        completions.push(item);
+                            vscode.CompletionItemKind.Field,
+                            { documentPath, model: relatedModel.name, member: relatedField.name, viaRelation: true }
+                        ));
                     }
                     
                     // Add methods from the related model
@@ -473,65 +596,8 @@ export class EnhancedCompletionProvider implements vscode.CompletionItemProvider
         position: vscode.Position,
         variableName: string
     ): Promise<string | undefined> {
-        // Simple inference - look for patterns like:
-        // - variable = Model.objects.get(...)
-        // - variable = Model.objects.first()
-        // - variable = Model()
-        // - variable = Model.method() where method returns objects
-        
-        const text = document.getText();
-        const lines = text.split('\n');
-        
-        // Look backwards from current position
-        for (let i = position.line; i >= 0; i--) {
-            const line = lines[i];
-            
-            // Pattern 1: variable = Model.objects.method()
-            const objectsPattern = new RegExp(`${variableName}\\s*=\\s*(\\w+)\\.objects\\.(get|first|last|create)`);
-            const objectsMatch = line.match(objectsPattern);
-            if (objectsMatch) {
-                return objectsMatch[1];
-            }
-            
-            // Pattern 2: variable = Model()
-            const instancePattern = new RegExp(`${variableName}\\s*=\\s*(\\w+)\\s*\\(`);
-            const instanceMatch = line.match(instancePattern);
-            if (instanceMatch) {
-                const modelName = instanceMatch[1];
-                // Check if this is actually a model class (capitalized)
-                if (modelName[0] === modelName[0].toUpperCase()) {
-                    return modelName;
-                }
-            }
-            
-            // Pattern 3: for variable in Model.objects.all()
-            const forPattern = new RegExp(`for\\s+${variableName}\\s+in\\s+(\\w+)\\.objects`);
-            const forMatch = line.match(forPattern);
-            if (forMatch) {
-                return forMatch[1];
-            }
-            
-            // Pattern 4: variable = Model.method() - check if method returns QuerySet
-            const methodPattern = new RegExp(`${variableName}\\s*=\\s*(\\w+)\\.(\\w+)\\s*\\(`);
-            const methodMatch = line.match(methodPattern);
-            if (methodMatch) {
-                const modelName = methodMatch[1];
-                const methodName = methodMatch[2];
-                
-                // Common methods that return QuerySet
-                const querySetMethods = ['get_pending', 'get_active', 'get_published', 'filter_by', 'active', 'published'];
-                if (querySetMethods.some(m => methodName.includes(m))) {
-                    // This is likely a QuerySet, not a model instance
-                    return undefined;
-                }
-                
-                // Check if this is a classmethod that might return instances
-                if (modelName[0] === modelName[0].toUpperCase()) {
-                    return modelName;
-                }
-            }
-        }
-        
-        return undefined;
+        // Assignments, for targets, annotated parameters and get_object_or_404()
+        // results, resolved in the scope of the position
+        return this.bindingIndex.lookup(document, position.line, variableName);
     }
 }
\ No newline at end of file
@@ -1,11 +1,14 @@
 import * as vscode from 'vscode';
 import * as path from 'path';
 import * as fs from 'fs';
-import { injectable, inject } from 'inversify';
+import { injectable, inject, optional } from 'inversify';
 import { TYPES } from '../container/types';
 import { DjangoProjectAnalyzer } from '../analyzers/djangoProjectAnalyzer';
 import { EnhancedUrlPatternAnalyzer } from '../analyzers/enhancedUrlPatternAnalyzer';
+import { ProjectShardManager } from '../analyzers/projectShardManager';
+import { TemplateIndex } from '../analyzers/templateIndex';
 import { FileCache } from '../cache/lruCache';
+import { MemoryConsumer } from '../cache/memoryBudgetManager';
 
 interface FileReadCache {
     content: string;
@@ -40,7 +43,9 @@ export class EnhancedDjangoDefinitionProvider implements vscode.DefinitionProvid
 
     constructor(
         @inject(TYPES.DjangoProjectAnalyzer) private projectAnalyzer: DjangoProjectAnalyzer,
-        @inject(TYPES.EnhancedUrlPatternAnalyzer) private urlAnalyzer: EnhancedUrlPatternAnalyzer
+        @inject(TYPES.EnhancedUrlPatternAnalyzer) private urlAnalyzer: EnhancedUrlPatternAnalyzer,
+        @inject(TYPES.TemplateIndex) @optional() private templateIndex?: TemplateIndex,
+        @inject(TYPES.ProjectShardManager) @optional() private shardManager?: ProjectShardManager
     ) {
         this.fileReadCache = new FileCache<string>(100, 50);
     }
@@ -74,6 +79,8 @@ export class EnhancedDjangoDefinitionProvider implements vscode.DefinitionProvid
             result = await this.getUrlPatternDefinition(document, position);
         } else if (this.isViewReference(document, line)) {
             result = await this.getViewDefinition(document, position);
+        } else if (this.templateIndex && document.languageId !== 'python') {
+            result = this.templateIndex.findTemplateTagDefinition(document, position);
         } else if (this.isTemplatePathReference(line)) {
             result = await this.getTemplateFileDefinition(line);
         }
@@ -146,8 +153,9 @@ export class EnhancedDjangoDefinitionProvider implements vscode.DefinitionProvid
             name = urlName.substring(colonIndex + 1);
         }
         
-        // Get URL pattern from analyzer
-        const urlPattern = await this.urlAnalyzer.getUrlPattern(name, namespace);
+        // Get URL pattern from analyzer, among those of the document's project
+        const projectRoot = this.shardManager?.getScopeRoot(document.uri.fsPath);
+        const urlPattern = await this.urlAnalyzer.getUrlPattern(name, namespace, projectRoot);
         if (!urlPattern) {
             return undefined;
         }
@@ -315,6 +323,12 @@ export class EnhancedDjangoDefinitionProvider implements vscode.DefinitionProvid
      * Find template location with caching
      */
     private async findTemplateLocation(templatePath: string): Promise<vscode.Location | undefined> {
+        // Resolved in loader order without touching the file system
+        const indexed = this.templateIndex?.resolve(templatePath);
+        if (indexed) {
+            return new vscode.Location(vscode.Uri.file(indexed.filePath), new vscode.Position(0, 0));
+        }
+
         // Common template directories in priority order
         const templateDirs = [
             `**/templates/${templatePath}`,
@@ -381,4 +395,26 @@ export class EnhancedDjangoDefinitionProvider implements vscode.DefinitionProvid
         this.fileReadCache.clear();
         this.locationCache.clear();
     }
+
+    getMemoryConsumers(): MemoryConsumer[] {
+        return [
+            {
+                name: 'Definition file reads',
+                tier: 'content',
+                cost: () => this.fileReadCache.getMemoryUsageMB() * 1024 * 1024,
+                shed: () => this.fileReadCache.clear()
+            },
+            {
+                name: 'Definition locations',
+                tier: 'transient',
+                // Key, URI and position of each entry
+                cost: () => {
+                    let bytes = 0;
+                    this.locationCache.forEach((entry, key) => bytes += (key.length + entry.location.uri.fsPath.length) * 2 + 64);
+                    return bytes;
+                },
+                shed: () => this.locationCache.clear()
+            }
+        ];
+    }
 }
\ No newline at end of file
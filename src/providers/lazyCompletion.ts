@@ -0,0 +1,71 @@
+import * as vscode from 'vscode';
+
+/**
+ * Fields of a completion item that are only needed once the item is
+ * focused in the suggest widget
+ */
+export interface CompletionDetails {
+    detail?: string;
+    documentation?: string | vscode.MarkdownString;
+}
+
+/**
+ * Completion item that carries only what the suggest widget needs to filter
+ * and insert it, plus an ID the provider uses in resolveCompletionItem to
+ * look up detail and documentation in its analyzer
+ */
+export class LazyCompletionItem<T> extends vscode.CompletionItem {
+    resolved = false;
+
+    constructor(
+        label: string | vscode.CompletionItemLabel,
+        kind: vscode.CompletionItemKind,
+        readonly id: T
+    ) {
+        super(label, kind);
+    }
+}
+
+/**
+ * Fill in the details of a lazy item the first time it is resolved. Items
+ * that are not lazy, e.g. prebuilt ones, are returned unchanged.
+ */
+export function resolveLazyCompletionItem<T>(
+    item: vscode.CompletionItem,
+    resolve: (id: T) => CompletionDetails | undefined
+): vscode.CompletionItem {
+    if (!(item instanceof LazyCompletionItem) || item.resolved) {
+        return item;
+    }
+
+    item.resolved = true;
+    try {
+        const details = resolve(item.id as T);
+        if (details?.detail !== undefined) {
+            item.detail = details.detail;
+        }
+        if (details?.documentation !== undefined) {
+            item.documentation = details.documentation;
+        }
+    } catch (error) {
+        console.error('Error resolving completion item:', error);
+    }
+    return item;
+}
+
+/**
+ * Completion items that never change, built on first use and handed out for
+ * every request afterwards
+ */
+export class StaticCompletionItems {
+    private items: readonly vscode.CompletionItem[] | undefined;
+
+    constructor(private build: () => vscode.CompletionItem[]) {}
+
+    get(): readonly vscode.CompletionItem[] {
+        if (!this.items) {
+            this.items = Object.freeze(this.build());
+        }
+        return this.items;
+    }
+}
@@ -3,6 +3,7 @@ import * as path from 'path';
 import { injectable, inject } from 'inversify';
 import { TYPES } from '../container/types';
 import { StaticFileAnalyzer } from '../analyzers/staticFileAnalyzer';
+import { LazyCompletionItem, resolveLazyCompletionItem } from './lazyCompletion';
 
 @injectable()
 export class StaticPathCompletionProvider implements vscode.CompletionItemProvider {
@@ -38,12 +39,13 @@ export class StaticPathCompletionProvider implements vscode.CompletionItemProvid
         const currentPath = staticMatch[1] || '';
         const completionItems: vscode.CompletionItem[] = [];
 
-        // Get all static files
-        const staticFiles = this.staticFileAnalyzer.getStaticFiles();
+        // Get the static files of the project owning this template
+        await this.staticFileAnalyzer.ensureProjectScanned(document.uri.fsPath);
+        const staticFiles = this.staticFileAnalyzer.getStaticFiles(document.uri.fsPath);
         
         // Build directory structure
         const directories = new Set<string>();
-        const files = new Map<string, vscode.CompletionItem>();
+        const files = new Map<string, LazyCompletionItem<string>>();
 
         for (const file of staticFiles) {
             const relativePath = file.relativePath;
@@ -62,15 +64,15 @@ export class StaticPathCompletionProvider implements vscode.CompletionItemProvid
                 const fullDirPath = currentPath + nextDir;
                 directories.add(fullDirPath);
             } else if (remainingPath) {
-                // It's a file in the current directory
-                const item = new vscode.CompletionItem(
+                // It's a file in the current directory; type and size are
+                // looked up by absolute path when the item is resolved
+                const item = new LazyCompletionItem(
                     remainingPath,
-                    vscode.CompletionItemKind.File
+                    vscode.CompletionItemKind.File,
+                    file.absolutePath
                 );
                 
                 item.insertText = remainingPath;
-                item.detail = this.getFileTypeDetail(file.type);
-                item.documentation = `Size: ${this.formatFileSize(file.size)}`;
                 
                 // Add file icon based on type
                 switch (file.type) {
@@ -129,6 +131,19 @@ export class StaticPathCompletionProvider implements vscode.CompletionItemProvid
         return completionItems;
     }
 
+    public resolveCompletionItem(item: vscode.CompletionItem): vscode.CompletionItem {
+        return resolveLazyCompletionItem<string>(item, absolutePath => {
+            const file = this.staticFileAnalyzer.getStaticFile(absolutePath);
+            if (!file) {
+                return undefined;
+            }
+            return {
+                detail: this.getFileTypeDetail(file.type),
+                documentation: `Size: ${this.formatFileSize(file.size)}`
+            };
+        });
+    }
+
     private isDjangoTemplate(document: vscode.TextDocument): boolean {
         const fileName = path.basename(document.fileName);
         return fileName.endsWith('.html') || fileName.endsWith('.jinja') || fileName.endsWith('.jinja2');
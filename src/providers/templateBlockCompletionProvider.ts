@@ -0,0 +1,78 @@
+import * as vscode from 'vscode';
+import * as path from 'path';
+import { injectable, inject } from 'inversify';
+import { TYPES } from '../container/types';
+import { TemplateIndex } from '../analyzers/templateIndex';
+import { parseTemplate } from '../parsers/templateParser';
+
+/**
+ * Completes block names inherited through {% extends %} and template names
+ * in {% extends %}/{% include %} tags from the template index
+ */
+@injectable()
+export class TemplateBlockCompletionProvider implements vscode.CompletionItemProvider {
+    constructor(
+        @inject(TYPES.TemplateIndex) private templateIndex: TemplateIndex
+    ) {}
+
+    public async provideCompletionItems(
+        document: vscode.TextDocument,
+        position: vscode.Position,
+        token: vscode.CancellationToken,
+        context: vscode.CompletionContext
+    ): Promise<vscode.CompletionItem[] | undefined> {
+        const beforeCursor = document.lineAt(position).text.substring(0, position.character);
+
+        if (/\{%-?\s*block\s+\w*$/.test(beforeCursor)) {
+            return this.getBlockCompletions(document);
+        }
+
+        const tagMatch = beforeCursor.match(/\{%-?\s*(?:extends|include)\s+['"]([^'"]*)$/);
+        if (tagMatch) {
+            return this.getTemplateNameCompletions(document, position, tagMatch[1]);
+        }
+
+        return undefined;
+    }
+
+    private getBlockCompletions(document: vscode.TextDocument): vscode.CompletionItem[] {
+        // The document may be unsaved, so read its own tags from the buffer
+        const parsed = parseTemplate(document.getText());
+        const parent = parsed.extends ? this.templateIndex.resolve(parsed.extends.name) : undefined;
+        if (!parent) {
+            return [];
+        }
+
+        const overridden = new Set(parsed.blocks.map(block => block.name));
+        return this.templateIndex.getAvailableBlocks(parent.filePath).map(block => {
+            const item = new vscode.CompletionItem(block.name, vscode.CompletionItemKind.Module);
+            const source = this.templateIndex.getTemplate(block.filePath);
+            item.detail = `block from ${source ? source.name : path.basename(block.filePath)}`;
+            // Blocks not overridden yet first
+            item.sortText = `${overridden.has(block.name) ? '1' : '0'}_${block.name}`;
+            return item;
+        });
+    }
+
+    private getTemplateNameCompletions(
+        document: vscode.TextDocument,
+        position: vscode.Position,
+        prefix: string
+    ): vscode.CompletionItem[] {
+        const current = this.templateIndex.getTemplate(document.uri.fsPath);
+        // Replace the whole typed name, including the part before any slash
+        const range = new vscode.Range(position.translate(0, -prefix.length), position);
+        const items: vscode.CompletionItem[] = [];
+
+        for (const name of this.templateIndex.getTemplateNames()) {
+            if (!name.startsWith(prefix) || name === current?.name) {
+                continue;
+            }
+            const item = new vscode.CompletionItem(name, vscode.CompletionItemKind.File);
+            item.range = range;
+            items.push(item);
+        }
+
+        return items;
+    }
+}
@@ -1,10 +1,11 @@
 import * as vscode from 'vscode';
-import { injectable, inject } from 'inversify';
+import { injectable, inject, optional } from 'inversify';
 import { TYPES } from '../container/types';
 import { ViewContextAnalyzer } from '../analyzers/viewContextAnalyzer';
 import { DjangoProjectAnalyzer } from '../analyzers/djangoProjectAnalyzer';
 import { AdvancedModelAnalyzer } from '../analyzers/advancedModelAnalyzer';
 import { DjangoFormAnalyzer } from '../analyzers/djangoFormAnalyzer';
+import { ProjectShardManager } from '../analyzers/projectShardManager';
 import * as path from 'path';
 
 @injectable()
@@ -13,7 +14,8 @@ export class TemplateContextCompletionProvider implements vscode.CompletionItemP
         @inject(TYPES.ViewContextAnalyzer) private viewContextAnalyzer: ViewContextAnalyzer,
         @inject(TYPES.DjangoProjectAnalyzer) private projectAnalyzer: DjangoProjectAnalyzer,
         @inject(TYPES.AdvancedModelAnalyzer) private modelAnalyzer: AdvancedModelAnalyzer,
-        @inject(TYPES.DjangoFormAnalyzer) private formAnalyzer: DjangoFormAnalyzer
+        @inject(TYPES.DjangoFormAnalyzer) private formAnalyzer: DjangoFormAnalyzer,
+        @inject(TYPES.ProjectShardManager) @optional() private shardManager?: ProjectShardManager
     ) {}
 
     public async provideCompletionItems(
@@ -68,7 +70,10 @@ export class TemplateContextCompletionProvider implements vscode.CompletionItemP
             // Provide properties/methods for the variable
             const variable = viewContext.contextVariables.get(variableBase);
             if (variable) {
-                await this.addVariableCompletions(variable, completionItems, propertyStart);
+                // Models of the project that owns the template
+                const modelAnalyzer = this.shardManager?.getShard(document.uri.fsPath)?.modelAnalyzer || this.modelAnalyzer;
+                const modelFields = this.viewContextAnalyzer.getVariableModelFields(viewContext, variableBase, modelAnalyzer);
+                await this.addVariableCompletions(variable, completionItems, propertyStart, modelFields);
             }
         }
 
@@ -98,7 +103,8 @@ export class TemplateContextCompletionProvider implements vscode.CompletionItemP
     private async addVariableCompletions(
         variable: any,
         completionItems: vscode.CompletionItem[],
-        propertyStart: string
+        propertyStart: string,
+        modelFields?: string[]
     ) {
         // If it's a QuerySet, add QuerySet methods
         if (variable.type === 'QuerySet') {
@@ -109,7 +115,7 @@ export class TemplateContextCompletionProvider implements vscode.CompletionItemP
                 const modelMatch = variable.value.match(/(\w+)\.objects/);
                 if (modelMatch) {
                     const modelName = modelMatch[1];
-                    await this.addModelFields(modelName, completionItems);
+                    await this.addModelFields(modelName, completionItems, modelFields);
                 }
             }
         }
@@ -133,7 +139,7 @@ export class TemplateContextCompletionProvider implements vscode.CompletionItemP
             const modelMatch = variable.value.match(/get_object_or_404\((\w+)/);
             if (modelMatch) {
                 const modelName = modelMatch[1];
-                await this.addModelFields(modelName, completionItems);
+                await this.addModelFields(modelName, completionItems, modelFields);
             }
         }
     }
@@ -165,7 +171,7 @@ export class TemplateContextCompletionProvider implements vscode.CompletionItemP
         }
     }
 
-    private async addModelFields(modelName: string, completionItems: vscode.CompletionItem[]) {
+    private async addModelFields(modelName: string, completionItems: vscode.CompletionItem[], modelFields?: string[]) {
         // For now, we'll add common model methods
         // TODO: Integrate with model analyzer when public API is available
         
@@ -177,9 +183,9 @@ export class TemplateContextCompletionProvider implements vscode.CompletionItemP
             completionItems.push(item);
         }
         
-        // Add common field names as a fallback
+        // Use the analyzed model fields, or common field names as a fallback
         const commonFields = ['id', 'created_at', 'updated_at', 'name', 'title', 'description'];
-        for (const field of commonFields) {
+        for (const field of modelFields || commonFields) {
             const item = new vscode.CompletionItem(field, vscode.CompletionItemKind.Field);
             item.detail = 'Model field';
             completionItems.push(item);
@@ -0,0 +1,50 @@
+import * as vscode from 'vscode';
+import { injectable, inject } from 'inversify';
+import { TYPES } from '../container/types';
+import { UrlResolver } from '../analyzers/urlResolver';
+
+/**
+ * Shows which view handles a URL path literal such as
+ * client.get('/shop/orders/42/') or href="/accounts/login/"
+ */
+@injectable()
+export class UrlPathHoverProvider implements vscode.HoverProvider {
+    constructor(
+        @inject(TYPES.UrlResolver) private urlResolver: UrlResolver
+    ) {}
+
+    async provideHover(
+        document: vscode.TextDocument,
+        position: vscode.Position,
+        token: vscode.CancellationToken
+    ): Promise<vscode.Hover | undefined> {
+        const range = document.getWordRangeAtPosition(position, /(['"])\/[^'"\s{}<>]*\1/);
+        if (!range) {
+            return undefined;
+        }
+
+        const literal = document.getText(range);
+        const resolution = await this.urlResolver.resolve(literal.substring(1, literal.length - 1));
+        if (!resolution || token.isCancellationRequested) {
+            return undefined;
+        }
+
+        const markdown = new vscode.MarkdownString();
+        markdown.appendMarkdown(`**View:** \`${resolution.view}\`\n\n`);
+        if (resolution.name) {
+            markdown.appendMarkdown(`**URL name:** \`${resolution.name}\`\n\n`);
+        }
+        markdown.appendMarkdown(`**Route:** \`${resolution.route}\`\n\n`);
+
+        const captured = Object.entries(resolution.kwargs).map(([name, value]) => `${name}=${value}`);
+        captured.unshift(...resolution.args);
+        if (captured.length > 0) {
+            markdown.appendMarkdown(`**Arguments:** \`${captured.join(', ')}\`\n\n`);
+        }
+
+        const location = vscode.Uri.file(resolution.filePath).with({ fragment: `L${resolution.line + 1}` });
+        markdown.appendMarkdown(`[${vscode.workspace.asRelativePath(resolution.filePath)}:${resolution.line + 1}](${location.toString()})`);
+
+        return new vscode.Hover(markdown, range);
+    }
+}
@@ -1,12 +1,14 @@
-import { injectable, inject } from 'inversify';
+import { injectable, inject, optional } from 'inversify';
 import * as vscode from 'vscode';
 import { UrlPatternAnalyzer, UrlPattern } from '../analyzers/urlPatternAnalyzer';
+import { ProjectShardManager } from '../analyzers/projectShardManager';
 import { TYPES } from '../container/types';
 
 @injectable()
 export class UrlTagCompletionProvider implements vscode.CompletionItemProvider {
     constructor(
-        @inject(TYPES.UrlPatternAnalyzer) private analyzer: UrlPatternAnalyzer
+        @inject(TYPES.UrlPatternAnalyzer) private analyzer: UrlPatternAnalyzer,
+        @inject(TYPES.ProjectShardManager) @optional() private shardManager?: ProjectShardManager
     ) {}
 
     async provideCompletionItems(
@@ -23,7 +25,10 @@ export class UrlTagCompletionProvider implements vscode.CompletionItemProvider {
             return [];
         }
 
-        const urlPatterns = this.analyzer.getAllUrlPatterns();
+        // One snapshot of the document's project for the whole request, even
+        // if a urls.py changes meanwhile
+        const projectRoot = this.shardManager?.getScopeRoot(document.uri.fsPath);
+        const urlPatterns = this.analyzer.getSnapshot(projectRoot).patterns;
         const completionItems: vscode.CompletionItem[] = [];
 
         for (const pattern of urlPatterns) {
@@ -75,7 +80,7 @@ export class UrlTagCompletionProvider implements vscode.CompletionItemProvider {
         item.insertText = label;
 
         // Add detail about the pattern
-        item.detail = `URL: ${pattern.pattern}`;
+        item.detail = `URL: ${pattern.route}`;
         if (pattern.view) {
             item.detail += ` → ${pattern.view}`;
         }
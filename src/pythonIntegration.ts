@@ -15,6 +15,12 @@ interface PythonExtensionAPI {
 export class PythonIntegration {
     private pythonApi: PythonExtensionAPI | undefined;
     private disposables: vscode.Disposable[] = [];
+    private readonly environmentChangeEmitter = new vscode.EventEmitter<string | undefined>();
+
+    /**
+     * Fires when the user selects another interpreter
+     */
+    readonly onDidChangeEnvironment = this.environmentChangeEmitter.event;
 
     constructor(
         @inject(TYPES.ExtensionContext) private context: vscode.ExtensionContext
@@ -85,12 +91,14 @@ export class PythonIntegration {
 
     private onPythonEnvironmentChanged(envPath: string | undefined): void {
         // Python 환경이 변경되면 Django 프로젝트를 다시 스캔
+        this.environmentChangeEmitter.fire(envPath);
         vscode.commands.executeCommand('django-power-tools.rescanProject');
     }
 
     dispose(): void {
         this.disposables.forEach(d => d.dispose());
         this.disposables = [];
+        this.environmentChangeEmitter.dispose();
     }
 }
 
@@ -105,7 +113,15 @@ export class PythonExecutor {
         return this.pythonIntegration.getCurrentPythonPath();
     }
 
-    async execute(args: string[], cwd?: string): Promise<{ stdout: string; stderr: string }> {
+    get onDidChangeEnvironment(): vscode.Event<string | undefined> {
+        return this.pythonIntegration.onDidChangeEnvironment;
+    }
+
+    /**
+     * Run the interpreter. With a timeout, a process still running after it
+     * is killed and the promise rejects.
+     */
+    async execute(args: string[], cwd?: string, timeoutMs?: number): Promise<{ stdout: string; stderr: string }> {
         const pythonPath = this.pythonIntegration.getCurrentPythonPath();
         
         if (!pythonPath) {
@@ -124,6 +140,11 @@ export class PythonExecutor {
             
             let stdout = '';
             let stderr = '';
+            const timer = timeoutMs === undefined ? undefined : setTimeout(() => {
+                pythonProcess.kill();
+                terminal.dispose();
+                reject(new Error(`Python process did not finish within ${timeoutMs}ms`));
+            }, timeoutMs);
 
             pythonProcess.stdout.on('data', (data: Buffer) => {
                 stdout += data.toString();
@@ -134,6 +155,7 @@ export class PythonExecutor {
             });
 
             pythonProcess.on('close', (code: number) => {
+                clearTimeout(timer);
                 terminal.dispose();
                 
                 if (code === 0) {
@@ -144,6 +166,7 @@ export class PythonExecutor {
             });
 
             pythonProcess.on('error', (error: Error) => {
+                clearTimeout(timer);
                 terminal.dispose();
                 reject(error);
             });
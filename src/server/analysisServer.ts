@@ -0,0 +1,125 @@
+import { JsonRpcConnection } from './connection';
+import { ModelExtractor, EnhancedModelInfo } from '../parsers/modelExtractor';
+import { FormParser, FormInfo } from '../parsers/formParser';
+
+export interface ExtractModelsParams {
+    code: string;
+    filePath: string;
+    // Models of other modules the file's classes derive from
+    modelBases?: string[];
+}
+
+export interface ParseFormsParams {
+    content: string;
+    filePath: string;
+}
+
+export interface ParseFormsResult {
+    forms: FormInfo[];
+    hasUnparsedFormPatterns: boolean;
+}
+
+export interface AnalysisServerStatus {
+    pid: number;
+    uptimeMs: number;
+    requestCount: number;
+    heapUsedMB: number;
+    heapTotalMB: number;
+    rssMB: number;
+}
+
+/**
+ * Request methods understood by the analysis server, on top of the standard
+ * `initialize`/`shutdown`/`exit` lifecycle
+ */
+export const AnalysisMethods = {
+    ExtractModels: 'django/extractModels',
+    ParseForms: 'django/parseForms',
+    ForgetFile: 'django/forgetFile',
+    Status: 'django/status'
+};
+
+/**
+ * Runs the editor-independent parsers behind a JSON-RPC connection so that
+ * heavy parsing happens outside the extension host heap.
+ */
+export class AnalysisServer {
+    private extractor = new ModelExtractor();
+    private formParser = new FormParser();
+    private startedAt = Date.now();
+    private requestCount = 0;
+    private shuttingDown = false;
+
+    constructor(private connection: JsonRpcConnection, private onExit: (code: number) => void = () => undefined) {
+        connection.onRequest('initialize', () => ({
+            capabilities: {
+                extractModels: true,
+                parseForms: true
+            },
+            serverInfo: { name: 'django-power-tools-analysis', pid: process.pid }
+        }));
+
+        connection.onRequest('shutdown', () => {
+            this.shuttingDown = true;
+            this.formParser.clear();
+            return null;
+        });
+
+        connection.onNotification('exit', () => {
+            this.connection.dispose();
+            this.onExit(this.shuttingDown ? 0 : 1);
+        });
+
+        connection.onRequest(AnalysisMethods.ExtractModels, (params: ExtractModelsParams) =>
+            this.track(() => this.extractModels(params))
+        );
+
+        connection.onRequest(AnalysisMethods.ParseForms, (params: ParseFormsParams) =>
+            this.track(() => this.parseForms(params))
+        );
+
+        connection.onNotification(AnalysisMethods.ForgetFile, (params: { filePath: string }) => {
+            this.formParser.forget(params.filePath);
+        });
+
+        connection.onRequest(AnalysisMethods.Status, () => this.getStatus());
+    }
+
+    listen(): void {
+        this.connection.listen();
+    }
+
+    private track<T>(handler: () => T): T {
+        if (this.shuttingDown) {
+            throw new Error('Analysis server is shutting down');
+        }
+        this.requestCount++;
+        return handler();
+    }
+
+    private extractModels(params: ExtractModelsParams): Promise<EnhancedModelInfo[]> {
+        return this.extractor.extractModels(params.code, params.filePath, params.modelBases);
+    }
+
+    private parseForms(params: ParseFormsParams): ParseFormsResult {
+        const result = this.formParser.parse(params.content, params.filePath);
+        return {
+            forms: result.forms,
+            hasUnparsedFormPatterns: result.hasUnparsedFormPatterns
+        };
+    }
+
+    getStatus(): AnalysisServerStatus {
+        const memory = process.memoryUsage();
+        const toMB = (bytes: number) => Math.round(bytes / 1024 / 1024 * 10) / 10;
+
+        return {
+            pid: process.pid,
+            uptimeMs: Date.now() - this.startedAt,
+            requestCount: this.requestCount,
+            heapUsedMB: toMB(memory.heapUsed),
+            heapTotalMB: toMB(memory.heapTotal),
+            rssMB: toMB(memory.rss)
+        };
+    }
+}
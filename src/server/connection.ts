@@ -0,0 +1,260 @@
+import { PassThrough, Readable, Writable } from 'stream';
+
+/**
+ * JSON-RPC 2.0 over the LSP base protocol (`Content-Length` framed messages).
+ * Kept dependency-free so the same code runs in the extension host, the
+ * forked analysis server and unit tests.
+ */
+
+export interface RequestMessage {
+    jsonrpc: '2.0';
+    id: number;
+    method: string;
+    params?: any;
+}
+
+export interface NotificationMessage {
+    jsonrpc: '2.0';
+    method: string;
+    params?: any;
+}
+
+export interface ResponseMessage {
+    jsonrpc: '2.0';
+    id: number;
+    result?: any;
+    error?: { code: number; message: string };
+}
+
+type Message = RequestMessage | NotificationMessage | ResponseMessage;
+
+export type RequestHandler = (params: any) => any | Promise<any>;
+export type NotificationHandler = (params: any) => void;
+
+export const ErrorCodes = {
+    MethodNotFound: -32601,
+    InternalError: -32603,
+    ConnectionClosed: -32099
+};
+
+const HEADER_SEPARATOR = '\r\n\r\n';
+
+/**
+ * A request the other side did not answer in time
+ */
+export class RequestTimeoutError extends Error {
+    constructor(readonly method: string, readonly timeoutMs: number) {
+        super(`${method} did not answer within ${timeoutMs}ms`);
+        this.name = 'RequestTimeoutError';
+    }
+}
+
+/**
+ * A request that was never sent because the other side is not running
+ */
+export class ServerUnavailableError extends Error {
+    constructor(message: string) {
+        super(message);
+        this.name = 'ServerUnavailableError';
+    }
+}
+
+export class JsonRpcConnection {
+    private nextId = 1;
+    private buffer: Buffer = Buffer.alloc(0);
+    private pending: Map<number, { resolve: (value: any) => void; reject: (error: Error) => void }> = new Map();
+    private requestHandlers: Map<string, RequestHandler> = new Map();
+    private notificationHandlers: Map<string, NotificationHandler> = new Map();
+    private closeHandlers: (() => void)[] = [];
+    private closed = false;
+
+    constructor(private input: Readable, private output: Writable) {}
+
+    /**
+     * Start reading messages from the input stream
+     */
+    listen(): void {
+        this.input.on('data', (chunk: Buffer) => {
+            this.buffer = Buffer.concat([this.buffer, chunk]);
+            this.readMessages();
+        });
+        this.input.on('close', () => this.handleClose());
+        this.input.on('end', () => this.handleClose());
+    }
+
+    onRequest(method: string, handler: RequestHandler): void {
+        this.requestHandlers.set(method, handler);
+    }
+
+    onNotification(method: string, handler: NotificationHandler): void {
+        this.notificationHandlers.set(method, handler);
+    }
+
+    onClose(handler: () => void): void {
+        this.closeHandlers.push(handler);
+    }
+
+    /**
+     * Send a request. With a timeout, the request is given up when no
+     * response arrives in time; a late response is ignored.
+     */
+    sendRequest<T = any>(method: string, params?: any, timeoutMs?: number): Promise<T> {
+        if (this.closed) {
+            return Promise.reject(new ServerUnavailableError(`Connection closed before sending ${method}`));
+        }
+
+        const id = this.nextId++;
+        return new Promise<T>((resolve, reject) => {
+            const timer = timeoutMs === undefined ? undefined : setTimeout(() => {
+                this.pending.delete(id);
+                reject(new RequestTimeoutError(method, timeoutMs));
+            }, timeoutMs);
+            this.pending.set(id, {
+                resolve: value => {
+                    clearTimeout(timer);
+                    resolve(value);
+                },
+                reject: error => {
+                    clearTimeout(timer);
+                    reject(error);
+                }
+            });
+            this.write({ jsonrpc: '2.0', id, method, params });
+        });
+    }
+
+    sendNotification(method: string, params?: any): void {
+        if (!this.closed) {
+            this.write({ jsonrpc: '2.0', method, params });
+        }
+    }
+
+    private write(message: Message): void {
+        if (this.output.writableEnded) {
+            return;
+        }
+        const content = Buffer.from(JSON.stringify(message), 'utf8');
+        this.output.write(`Content-Length: ${content.length}${HEADER_SEPARATOR}`);
+        this.output.write(content);
+    }
+
+    private readMessages(): void {
+        while (true) {
+            const headerEnd = this.buffer.indexOf(HEADER_SEPARATOR);
+            if (headerEnd === -1) {
+                return;
+            }
+
+            const header = this.buffer.subarray(0, headerEnd).toString('ascii');
+            const lengthMatch = header.match(/Content-Length:\s*(\d+)/i);
+            if (!lengthMatch) {
+                // Malformed header, drop it and resynchronize
+                this.buffer = this.buffer.subarray(headerEnd + HEADER_SEPARATOR.length);
+                continue;
+            }
+
+            const contentStart = headerEnd + HEADER_SEPARATOR.length;
+            const contentLength = parseInt(lengthMatch[1], 10);
+            if (this.buffer.length < contentStart + contentLength) {
+                return; // Wait for the rest of the message
+            }
+
+            const content = this.buffer.subarray(contentStart, contentStart + contentLength).toString('utf8');
+            this.buffer = this.buffer.subarray(contentStart + contentLength);
+
+            try {
+                this.dispatch(JSON.parse(content) as Message);
+            } catch (error) {
+                console.error('Failed to handle analysis server message:', error);
+            }
+        }
+    }
+
+    private dispatch(message: Message): void {
+        if ('id' in message && !('method' in message)) {
+            const pending = this.pending.get(message.id);
+            if (pending) {
+                this.pending.delete(message.id);
+                if (message.error) {
+                    pending.reject(new Error(message.error.message));
+                } else {
+                    pending.resolve(message.result);
+                }
+            }
+            return;
+        }
+
+        if ('id' in message) {
+            this.handleRequest(message as RequestMessage);
+        } else {
+            const handler = this.notificationHandlers.get(message.method);
+            handler?.(message.params);
+        }
+    }
+
+    private async handleRequest(request: RequestMessage): Promise<void> {
+        const handler = this.requestHandlers.get(request.method);
+        if (!handler) {
+            this.write({
+                jsonrpc: '2.0',
+                id: request.id,
+                error: { code: ErrorCodes.MethodNotFound, message: `Unhandled method ${request.method}` }
+            });
+            return;
+        }
+
+        try {
+            const result = await handler(request.params);
+            this.write({ jsonrpc: '2.0', id: request.id, result: result === undefined ? null : result });
+        } catch (error) {
+            this.write({
+                jsonrpc: '2.0',
+                id: request.id,
+                error: {
+                    code: ErrorCodes.InternalError,
+                    message: error instanceof Error ? error.message : String(error)
+                }
+            });
+        }
+    }
+
+    private handleClose(): void {
+        if (this.closed) {
+            return;
+        }
+        this.closed = true;
+
+        for (const pending of this.pending.values()) {
+            pending.reject(new Error('Analysis server connection closed'));
+        }
+        this.pending.clear();
+        this.closeHandlers.forEach(handler => handler());
+    }
+
+    isClosed(): boolean {
+        return this.closed;
+    }
+
+    dispose(): void {
+        this.handleClose();
+        this.output.end();
+    }
+}
+
+/**
+ * Create two connected endpoints backed by in-memory streams, used to run the
+ * analysis server inside the current process (tests, debugging)
+ */
+export function createInProcessConnectionPair(): { client: JsonRpcConnection; server: JsonRpcConnection } {
+    const clientToServer = new PassThrough();
+    const serverToClient = new PassThrough();
+
+    const client = new JsonRpcConnection(serverToClient, clientToServer);
+    const server = new JsonRpcConnection(clientToServer, serverToClient);
+
+    // When one side closes, end its output so the other side sees the close
+    client.onClose(() => clientToServer.end());
+    server.onClose(() => serverToClient.end());
+
+    return { client, server };
+}
@@ -0,0 +1,15 @@
+import { JsonRpcConnection } from './connection';
+import { AnalysisServer } from './analysisServer';
+
+// stdout carries the protocol, so route console logging to stderr
+console.log = console.error;
+console.info = console.error;
+
+const server = new AnalysisServer(
+    new JsonRpcConnection(process.stdin, process.stdout),
+    code => process.exit(code)
+);
+server.listen();
+
+// Stop when the extension host goes away without a clean shutdown
+process.on('disconnect', () => process.exit(1));
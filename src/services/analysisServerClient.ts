@@ -0,0 +1,265 @@
+import { injectable, inject } from 'inversify';
+import * as vscode from 'vscode';
+import * as path from 'path';
+import { fork, ChildProcess } from 'child_process';
+import { TYPES } from '../container/types';
+import { JsonRpcConnection, RequestTimeoutError, ServerUnavailableError } from '../server/connection';
+import { AnalysisMethods, AnalysisServerStatus, ParseFormsResult } from '../server/analysisServer';
+import { EnhancedModelInfo } from '../parsers/modelExtractor';
+import { ModelExtractionBackend } from '../analyzers/advancedModelAnalyzer';
+import { FormParseBackend } from '../analyzers/djangoFormAnalyzer';
+
+export type AnalysisServerState = 'stopped' | 'starting' | 'running';
+
+// Crashes tolerated within CRASH_WINDOW before auto-restart gives up
+const MAX_CRASH_RESTARTS = 3;
+const CRASH_WINDOW = 3 * 60 * 1000;
+const SHUTDOWN_TIMEOUT = 2000;
+// A server that does not answer within this time is treated as hung
+const REQUEST_TIMEOUT = 30000;
+
+/**
+ * Client side of the out-of-process analysis mode. Forks the analysis server,
+ * forwards parsing requests to it and restarts it when it crashes. Analyzers
+ * use it as their extraction backend and parse in-process only while it is
+ * not running; a file whose request fails or times out is quarantined
+ * instead, and a server that stops answering is restarted.
+ */
+@injectable()
+export class AnalysisServerClient implements ModelExtractionBackend, FormParseBackend {
+    private connection: JsonRpcConnection | undefined;
+    private child: ChildProcess | undefined;
+    private starting: Promise<void> | undefined;
+    private state: AnalysisServerState = 'stopped';
+    private stopping = false;
+    private crashTimes: number[] = [];
+    private requestTimeout = REQUEST_TIMEOUT;
+    private _onDidChangeState = new vscode.EventEmitter<AnalysisServerState>();
+
+    readonly onDidChangeState = this._onDidChangeState.event;
+
+    constructor(
+        @inject(TYPES.ExtensionContext) private context: vscode.ExtensionContext
+    ) {}
+
+    getState(): AnalysisServerState {
+        return this.state;
+    }
+
+    isRunning(): boolean {
+        return this.state === 'running';
+    }
+
+    /**
+     * Fork the analysis server process and perform the initialize handshake
+     */
+    start(): Promise<void> {
+        if (this.state === 'running') {
+            return Promise.resolve();
+        }
+        if (!this.starting) {
+            this.starting = this.launch().finally(() => {
+                this.starting = undefined;
+            });
+        }
+        return this.starting;
+    }
+
+    private async launch(): Promise<void> {
+        const serverModule = path.join(this.context.extensionPath, 'out', 'server', 'main.js');
+        const child = fork(serverModule, [], {
+            stdio: ['pipe', 'pipe', 'pipe', 'ipc'],
+            execArgv: []
+        });
+
+        child.stderr?.on('data', (chunk: Buffer) => {
+            console.log(`[analysis server] ${chunk.toString().trimEnd()}`);
+        });
+        child.on('exit', code => this.handleExit(child, code));
+
+        this.child = child;
+        await this.attach(new JsonRpcConnection(child.stdout!, child.stdin!));
+        console.log(`Django analysis server started (pid ${child.pid})`);
+    }
+
+    /**
+     * Use an already established connection instead of forking a process,
+     * e.g. one end of an in-process pair in tests
+     */
+    async startWithConnection(connection: JsonRpcConnection): Promise<void> {
+        await this.attach(connection);
+    }
+
+    private async attach(connection: JsonRpcConnection): Promise<void> {
+        this.stopping = false;
+        this.connection = connection;
+        this.setState('starting');
+
+        connection.onClose(() => {
+            if (this.connection === connection) {
+                this.connection = undefined;
+                this.setState('stopped');
+            }
+        });
+        connection.listen();
+
+        try {
+            await connection.sendRequest('initialize', { processId: process.pid });
+        } catch (error) {
+            this.connection = undefined;
+            connection.dispose();
+            this.setState('stopped');
+            throw error;
+        }
+        connection.sendNotification('initialized', {});
+        this.setState('running');
+    }
+
+    private handleExit(child: ChildProcess, code: number | null): void {
+        if (this.child !== child) {
+            return;
+        }
+        this.child = undefined;
+        this.connection?.dispose();
+        this.connection = undefined;
+        this.setState('stopped');
+
+        if (this.stopping) {
+            return;
+        }
+
+        if (!this.recordCrash()) {
+            return;
+        }
+        console.warn(`Django analysis server exited unexpectedly (code ${code}), restarting`);
+        this.start().catch(error => {
+            console.error('Failed to restart Django analysis server:', error);
+        });
+    }
+
+    /**
+     * Count a crash or hang; returns whether the server may be restarted
+     */
+    private recordCrash(): boolean {
+        const now = Date.now();
+        this.crashTimes = this.crashTimes.filter(time => now - time < CRASH_WINDOW);
+        this.crashTimes.push(now);
+
+        if (this.crashTimes.length > MAX_CRASH_RESTARTS) {
+            vscode.window.showErrorMessage(
+                'The Django analysis server crashed repeatedly and was not restarted. ' +
+                'Analysis continues in the extension host.'
+            );
+            return false;
+        }
+        return true;
+    }
+
+    /**
+     * Replace a server that stopped answering. The requests waiting for it
+     * fail and their files are quarantined; others parse in-process until
+     * the new server runs.
+     */
+    private async recoverFromHang(error: RequestTimeoutError): Promise<void> {
+        console.warn(`Django analysis server is not responding (${error.message}), restarting`);
+        // Only a forked server can be replaced; a provided connection is dropped
+        const restart = this.child !== undefined && this.recordCrash();
+        await this.stop();
+        if (restart) {
+            await this.start();
+        }
+    }
+
+    /**
+     * Shut the server down cleanly, killing it if it does not exit in time
+     */
+    async stop(): Promise<void> {
+        this.stopping = true;
+        await this.starting?.catch(() => undefined);
+
+        const connection = this.connection;
+        const child = this.child;
+        this.connection = undefined;
+        this.child = undefined;
+
+        if (connection && !connection.isClosed()) {
+            try {
+                await Promise.race([
+                    connection.sendRequest('shutdown'),
+                    new Promise(resolve => setTimeout(resolve, SHUTDOWN_TIMEOUT))
+                ]);
+                connection.sendNotification('exit');
+            } catch {
+                // Server already gone
+            }
+            connection.dispose();
+        }
+
+        if (child && child.exitCode === null) {
+            const timer = setTimeout(() => child.kill(), SHUTDOWN_TIMEOUT);
+            child.once('exit', () => clearTimeout(timer));
+        }
+
+        this.setState('stopped');
+    }
+
+    /**
+     * Replace the server with a fresh process, releasing its whole heap
+     */
+    async restart(): Promise<void> {
+        await this.stop();
+        this.crashTimes = [];
+        await this.start();
+    }
+
+    extractModels(code: string, filePath: string, modelBases?: string[]): Promise<EnhancedModelInfo[]> {
+        return this.request<EnhancedModelInfo[]>(AnalysisMethods.ExtractModels, { code, filePath, modelBases });
+    }
+
+    parseForms(content: string, filePath: string): Promise<ParseFormsResult> {
+        return this.request<ParseFormsResult>(AnalysisMethods.ParseForms, { content, filePath });
+    }
+
+    forgetFile(filePath: string): void {
+        this.connection?.sendNotification(AnalysisMethods.ForgetFile, { filePath });
+    }
+
+    getStatus(): Promise<AnalysisServerStatus> {
+        return this.request<AnalysisServerStatus>(AnalysisMethods.Status);
+    }
+
+    /**
+     * Time after which a request is given up and the server restarted
+     */
+    setRequestTimeout(timeoutMs: number): void {
+        this.requestTimeout = timeoutMs;
+    }
+
+    private request<T>(method: string, params?: any): Promise<T> {
+        const connection = this.connection;
+        if (!connection || this.state !== 'running') {
+            return Promise.reject(new ServerUnavailableError('Django analysis server is not running'));
+        }
+        return connection.sendRequest<T>(method, params, this.requestTimeout).catch(error => {
+            // The first request to time out replaces the server
+            if (error instanceof RequestTimeoutError && this.connection === connection) {
+                this.recoverFromHang(error).catch(restartError => {
+                    console.error('Failed to restart Django analysis server:', restartError);
+                });
+            }
+            throw error;
+        });
+    }
+
+    private setState(state: AnalysisServerState): void {
+        if (this.state !== state) {
+            this.state = state;
+            this._onDidChangeState.fire(state);
+        }
+    }
+
+    dispose(): void {
+        this.stop().catch(error => console.error('Failed to stop Django analysis server:', error));
+        this._onDidChangeState.dispose();
+    }
+}
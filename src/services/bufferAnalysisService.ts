@@ -0,0 +1,205 @@
+import { injectable, inject, optional } from 'inversify';
+import * as vscode from 'vscode';
+import * as fs from 'fs';
+import * as path from 'path';
+import { TYPES } from '../container/types';
+import { AdvancedModelAnalyzer } from '../analyzers/advancedModelAnalyzer';
+import { DjangoFormAnalyzer } from '../analyzers/djangoFormAnalyzer';
+import { DjangoAdminAnalyzer } from '../analyzers/djangoAdminAnalyzer';
+import { ProjectShardManager } from '../analyzers/projectShardManager';
+import { LineSpan, buildClassSnippet, classesTouchedBy, findTopLevelClasses, recordLineChange } from '../parsers/classRanges';
+import { DebouncedTaskExecutor } from '../workers/analysisWorkerPool';
+
+type BufferKind = 'models' | 'forms' | 'admin';
+
+interface BufferState {
+    kind: BufferKind;
+    // Lines changed since the last flush, in current document coordinates
+    dirtySpans: LineSpan[];
+    // Whether the stores hold buffer content that differs from the disk
+    patched: boolean;
+}
+
+/**
+ * Keeps the model, form and admin stores in step with unsaved edits. Changes
+ * are mapped to the top-level classes they touch and only those classes are
+ * parsed again. Saving hands the file back to the file watchers; closing a
+ * document without saving restores the analysis of the file on disk.
+ */
+@injectable()
+export class BufferAnalysisService {
+    private buffers: Map<string, BufferState> = new Map();
+    private debouncer: DebouncedTaskExecutor;
+    private disposables: vscode.Disposable[] = [];
+
+    constructor(
+        @inject(TYPES.ExtensionContext) private context: vscode.ExtensionContext,
+        @inject(TYPES.AdvancedModelAnalyzer) private modelAnalyzer: AdvancedModelAnalyzer,
+        @inject(TYPES.DjangoFormAnalyzer) private formAnalyzer: DjangoFormAnalyzer,
+        @inject(TYPES.DjangoAdminAnalyzer) private adminAnalyzer: DjangoAdminAnalyzer,
+        @inject(TYPES.ProjectShardManager) @optional() private shardManager?: ProjectShardManager
+    ) {
+        const delay = vscode.workspace.getConfiguration('djangoPowerTools.performance').get<number>('debounceDelay', 500);
+        this.debouncer = new DebouncedTaskExecutor(delay);
+    }
+
+    register(): void {
+        const config = vscode.workspace.getConfiguration('djangoPowerTools');
+        if (!config.get<boolean>('enableUnsavedChangesAnalysis', true)) {
+            return;
+        }
+
+        this.disposables.push(
+            vscode.workspace.onDidChangeTextDocument(event => this.onDidChange(event)),
+            vscode.workspace.onDidSaveTextDocument(document => this.onDidSave(document)),
+            vscode.workspace.onDidCloseTextDocument(document => this.onDidClose(document))
+        );
+        this.context.subscriptions.push(...this.disposables);
+    }
+
+    private onDidChange(event: vscode.TextDocumentChangeEvent): void {
+        const document = event.document;
+        if (event.contentChanges.length === 0) {
+            return;
+        }
+        const kind = this.getBufferKind(document);
+        if (!kind) {
+            return;
+        }
+
+        const key = document.uri.toString();
+        let state = this.buffers.get(key);
+        if (!state) {
+            state = { kind, dirtySpans: [], patched: false };
+            this.buffers.set(key, state);
+        }
+
+        // Changes of one event apply in order, each in the coordinates left by the previous
+        for (const change of event.contentChanges) {
+            state.dirtySpans = recordLineChange(state.dirtySpans, change.range.start.line, change.range.end.line, change.text);
+        }
+
+        this.debouncer.execute(key, () => this.flush(document));
+    }
+
+    private getBufferKind(document: vscode.TextDocument): BufferKind | undefined {
+        if (document.uri.scheme !== 'file' || document.languageId !== 'python' || !vscode.workspace.getWorkspaceFolder(document.uri)) {
+            return undefined;
+        }
+
+        const fileName = path.basename(document.uri.fsPath);
+        if (fileName === 'models.py' || path.basename(path.dirname(document.uri.fsPath)) === 'models') {
+            return 'models';
+        }
+        if (fileName === 'forms.py') {
+            return 'forms';
+        }
+        if (fileName === 'admin.py') {
+            return 'admin';
+        }
+        return undefined;
+    }
+
+    /**
+     * Re-parse the classes touched since the last flush. Edits outside any
+     * class (imports, module-level statements) re-parse the whole buffer.
+     */
+    private async flush(document: vscode.TextDocument): Promise<void> {
+        const state = this.buffers.get(document.uri.toString());
+        if (!state || document.isClosed || state.dirtySpans.length === 0) {
+            return;
+        }
+
+        const filePath = document.uri.fsPath;
+        const content = document.getText();
+        const spans = state.dirtySpans;
+        state.dirtySpans = [];
+        state.patched = true;
+
+        if (state.kind === 'forms') {
+            this.formAnalyzer.analyzeFormBuffer(filePath, content);
+            return;
+        }
+
+        const modelAnalyzer = this.getModelAnalyzer(filePath);
+        const classes = findTopLevelClasses(content);
+        const touched = classesTouchedBy(classes, spans);
+        if (touched.outside) {
+            if (state.kind === 'models') {
+                await modelAnalyzer.patchModelClasses(filePath, content);
+            } else {
+                await this.adminAnalyzer.analyzeAdminFile(content, filePath);
+            }
+            return;
+        }
+
+        // Known classes that are gone from the buffer were renamed or deleted
+        const classNames = new Set(classes.map(cls => cls.name));
+        const known = state.kind === 'models'
+            ? modelAnalyzer.getModelsForFile(filePath).map(model => model.name)
+            : this.adminAnalyzer.getAdminClassNamesForFile(filePath);
+        const names = [
+            ...touched.classes.map(cls => cls.name),
+            ...known.filter(name => !classNames.has(name))
+        ];
+        if (names.length === 0) {
+            return;
+        }
+
+        const snippet = buildClassSnippet(content, classes, names);
+        if (state.kind === 'models') {
+            await modelAnalyzer.patchModelClasses(filePath, snippet, names, content);
+        } else {
+            await this.adminAnalyzer.patchAdminClasses(snippet, filePath, names);
+        }
+    }
+
+    /**
+     * Use the model analyzer of the project that owns the file
+     */
+    private getModelAnalyzer(filePath: string): AdvancedModelAnalyzer {
+        return this.shardManager?.getShard(filePath)?.modelAnalyzer || this.modelAnalyzer;
+    }
+
+    private onDidSave(document: vscode.TextDocument): void {
+        // The file watchers analyze the saved file
+        const key = document.uri.toString();
+        this.debouncer.cancel(key);
+        this.buffers.delete(key);
+    }
+
+    private async onDidClose(document: vscode.TextDocument): Promise<void> {
+        const key = document.uri.toString();
+        const state = this.buffers.get(key);
+        this.debouncer.cancel(key);
+        this.buffers.delete(key);
+        if (!state?.patched) {
+            return;
+        }
+
+        // Closed without saving: go back to the file on disk
+        const filePath = document.uri.fsPath;
+        try {
+            if (state.kind === 'forms') {
+                await this.formAnalyzer.analyzeFormFile(filePath);
+                return;
+            }
+
+            const content = fs.existsSync(filePath) ? await fs.promises.readFile(filePath, 'utf8') : '';
+            if (state.kind === 'models') {
+                await this.getModelAnalyzer(filePath).analyzeModelCode(content, filePath);
+            } else {
+                await this.adminAnalyzer.analyzeAdminFile(content, filePath);
+            }
+        } catch (error) {
+            console.error(`Error restoring analysis of ${filePath}:`, error);
+        }
+    }
+
+    dispose(): void {
+        this.debouncer.cancelAll();
+        this.disposables.forEach(d => d.dispose());
+        this.disposables = [];
+        this.buffers.clear();
+    }
+}
@@ -1,146 +1,291 @@
 import { injectable } from 'inversify';
+import { MinHeap } from '../cache/minHeap';
+import { estimateSize } from '../cache/lruCache';
+import { MemoryConsumer } from '../cache/memoryBudgetManager';
 
 interface CacheEntry<T> {
     value: T;
-    timestamp: number;
+    expiresAt: number;
+}
+
+interface ExpiryRecord {
+    key: string;
+    expiresAt: number;
+}
+
+export interface CacheNamespaceOptions {
+    maxEntries?: number;
+    ttl?: number;
+}
+
+export interface CacheNamespaceStats {
+    name: string;
+    size: number;
+    maxEntries: number;
     ttl: number;
+    hits: number;
+    misses: number;
+    evictions: number;
+    expirations: number;
 }
 
-@injectable()
-export class CacheService {
-    private cache: Map<string, CacheEntry<any>> = new Map();
-    private defaultTTL: number = 60000; // 60 seconds default
-    private cleanupInterval: NodeJS.Timeout;
-    private maxSize: number = 1000; // Maximum number of entries
+const DEFAULT_NAMESPACE = 'default';
+const DEFAULT_MAX_ENTRIES = 1000;
+const DEFAULT_TTL = 60000; // 60 seconds
 
-    constructor() {
-        // Periodically clean up expired entries
-        this.cleanupInterval = setInterval(() => this.cleanup(), 30000); // Every 30 seconds
-    }
+/**
+ * One isolated cache with its own size and TTL budget. Recency is tracked by
+ * the insertion order of the entry map, so lookups, inserts and LRU eviction
+ * are O(1); expiry times live in a min-heap and expired entries are dropped
+ * lazily on access instead of by sweeping.
+ */
+export class CacheNamespace<T = any> {
+    private entries: Map<string, CacheEntry<T>> = new Map();
+    private expiryHeap = new MinHeap<ExpiryRecord>((a, b) => a.expiresAt - b.expiresAt);
+    private hits = 0;
+    private misses = 0;
+    private evictions = 0;
+    private expirations = 0;
+
+    constructor(
+        readonly name: string,
+        private maxEntries: number = DEFAULT_MAX_ENTRIES,
+        private ttl: number = DEFAULT_TTL
+    ) {}
 
     /**
-     * Get a value from the cache
+     * Change the size and TTL budget; shrinking evicts least recently used entries
      */
-    get<T>(key: string): T | undefined {
-        const entry = this.cache.get(key);
-        
+    configure(options: CacheNamespaceOptions): void {
+        this.maxEntries = options.maxEntries ?? this.maxEntries;
+        this.ttl = options.ttl ?? this.ttl;
+        this.evictOverflow();
+    }
+
+    get(key: string): T | undefined {
+        const entry = this.entries.get(key);
+
         if (!entry) {
+            this.misses++;
             return undefined;
         }
-        
-        // Check if expired
-        if (Date.now() - entry.timestamp > entry.ttl) {
-            this.cache.delete(key);
+
+        if (Date.now() > entry.expiresAt) {
+            this.entries.delete(key);
+            this.expirations++;
+            this.misses++;
             return undefined;
         }
-        
-        return entry.value as T;
+
+        // Move to the most recently used end
+        this.entries.delete(key);
+        this.entries.set(key, entry);
+        this.hits++;
+        return entry.value;
+    }
+
+    set(key: string, value: T, ttl?: number): void {
+        const now = Date.now();
+        this.purgeExpired(now);
+
+        const expiresAt = now + (ttl || this.ttl);
+        this.entries.delete(key);
+        this.entries.set(key, { value, expiresAt });
+        this.expiryHeap.push({ key, expiresAt });
+
+        this.evictOverflow();
+        this.compactExpiryHeap();
+    }
+
+    has(key: string): boolean {
+        const entry = this.entries.get(key);
+        return !!entry && Date.now() <= entry.expiresAt;
+    }
+
+    delete(key: string): boolean {
+        return this.entries.delete(key);
     }
 
     /**
-     * Set a value in the cache
+     * Delete all entries whose key starts with a prefix
      */
-    set<T>(key: string, value: T, ttl?: number): void {
-        // Check cache size limit
-        if (this.cache.size >= this.maxSize) {
-            // Remove oldest entry
-            const oldestKey = this.findOldestKey();
-            if (oldestKey) {
-                this.cache.delete(oldestKey);
+    clearPrefix(prefix: string): void {
+        for (const key of Array.from(this.entries.keys())) {
+            if (key.startsWith(prefix)) {
+                this.entries.delete(key);
             }
         }
-        
-        this.cache.set(key, {
-            value,
-            timestamp: Date.now(),
-            ttl: ttl || this.defaultTTL
-        });
+        this.compactExpiryHeap();
+    }
+
+    clear(): void {
+        this.entries.clear();
+        this.expiryHeap.clear();
+    }
+
+    get size(): number {
+        this.purgeExpired(Date.now());
+        return this.entries.size;
     }
 
     /**
-     * Check if a key exists in the cache
+     * Drop entries whose TTL has passed; only touches expired heap records
      */
-    has(key: string): boolean {
-        const value = this.get(key);
-        return value !== undefined;
+    purgeExpired(now: number = Date.now()): void {
+        let record = this.expiryHeap.peek();
+        while (record && record.expiresAt < now) {
+            this.expiryHeap.pop();
+            // Skip records superseded by a later set() or a delete()
+            if (this.entries.get(record.key)?.expiresAt === record.expiresAt) {
+                this.entries.delete(record.key);
+                this.expirations++;
+            }
+            record = this.expiryHeap.peek();
+        }
+    }
+
+    private evictOverflow(): void {
+        while (this.entries.size > this.maxEntries) {
+            const oldest = this.entries.keys().next().value as string;
+            this.entries.delete(oldest);
+            this.evictions++;
+        }
     }
 
     /**
-     * Delete a value from the cache
+     * Rebuild the heap when superseded records outnumber live entries
      */
-    delete(key: string): boolean {
-        return this.cache.delete(key);
+    private compactExpiryHeap(): void {
+        if (this.expiryHeap.size > 2 * this.entries.size + 64) {
+            this.expiryHeap.retain(record => this.entries.get(record.key)?.expiresAt === record.expiresAt);
+        }
     }
 
     /**
-     * Clear all values from the cache
+     * Estimated size of the live entries in bytes
      */
-    clear(): void {
-        this.cache.clear();
+    estimateBytes(): number {
+        const seen = new WeakSet<object>();
+        let bytes = 0;
+        this.entries.forEach((entry, key) => bytes += key.length * 2 + estimateSize(entry.value, seen));
+        return bytes;
+    }
+
+    getStats(): CacheNamespaceStats {
+        return {
+            name: this.name,
+            size: this.size,
+            maxEntries: this.maxEntries,
+            ttl: this.ttl,
+            hits: this.hits,
+            misses: this.misses,
+            evictions: this.evictions,
+            expirations: this.expirations
+        };
+    }
+}
+
+/**
+ * Shared TTL+LRU cache split into named namespaces, so one busy consumer
+ * cannot evict the entries of another. The flat get/set API operates on the
+ * "default" namespace.
+ */
+@injectable()
+export class CacheService {
+    private namespaces: Map<string, CacheNamespace> = new Map();
+    private defaultNamespace: CacheNamespace;
+
+    constructor() {
+        this.defaultNamespace = this.namespace(DEFAULT_NAMESPACE);
     }
 
     /**
-     * Clear all values with a specific prefix
+     * Get a namespace, creating it on first use. Options passed for an
+     * existing namespace update its budget.
      */
-    clearPrefix(prefix: string): void {
-        const keysToDelete: string[] = [];
-        
-        for (const key of this.cache.keys()) {
-            if (key.startsWith(prefix)) {
-                keysToDelete.push(key);
-            }
+    namespace<T = any>(name: string, options?: CacheNamespaceOptions): CacheNamespace<T> {
+        let namespace = this.namespaces.get(name);
+        if (!namespace) {
+            namespace = new CacheNamespace(name, options?.maxEntries, options?.ttl);
+            this.namespaces.set(name, namespace);
+        } else if (options) {
+            namespace.configure(options);
         }
-        
-        keysToDelete.forEach(key => this.cache.delete(key));
+        return namespace as CacheNamespace<T>;
     }
 
     /**
-     * Get the size of the cache
+     * Get a value from the default namespace
      */
-    size(): number {
-        return this.cache.size;
+    get<T>(key: string): T | undefined {
+        return this.defaultNamespace.get(key) as T | undefined;
     }
 
     /**
-     * Clean up expired entries
+     * Set a value in the default namespace
      */
-    private cleanup(): void {
-        const now = Date.now();
-        const keysToDelete: string[] = [];
-        
-        for (const [key, entry] of this.cache.entries()) {
-            if (now - entry.timestamp > entry.ttl) {
-                keysToDelete.push(key);
-            }
-        }
-        
-        keysToDelete.forEach(key => this.cache.delete(key));
+    set<T>(key: string, value: T, ttl?: number): void {
+        this.defaultNamespace.set(key, value, ttl);
     }
 
     /**
-     * Find the oldest key in the cache
+     * Check if a key exists in the default namespace
      */
-    private findOldestKey(): string | undefined {
-        let oldestKey: string | undefined;
-        let oldestTimestamp = Date.now();
-        
-        for (const [key, entry] of this.cache.entries()) {
-            if (entry.timestamp < oldestTimestamp) {
-                oldestTimestamp = entry.timestamp;
-                oldestKey = key;
-            }
-        }
-        
-        return oldestKey;
+    has(key: string): boolean {
+        return this.defaultNamespace.has(key);
+    }
+
+    /**
+     * Delete a value from the default namespace
+     */
+    delete(key: string): boolean {
+        return this.defaultNamespace.delete(key);
+    }
+
+    /**
+     * Clear all values from every namespace
+     */
+    clear(): void {
+        this.namespaces.forEach(namespace => namespace.clear());
+    }
+
+    /**
+     * Clear all values with a specific prefix from the default namespace
+     */
+    clearPrefix(prefix: string): void {
+        this.defaultNamespace.clearPrefix(prefix);
+    }
+
+    /**
+     * Get the number of live entries across all namespaces
+     */
+    size(): number {
+        let size = 0;
+        this.namespaces.forEach(namespace => size += namespace.size);
+        return size;
+    }
+
+    getStats(): CacheNamespaceStats[] {
+        return Array.from(this.namespaces.values()).map(namespace => namespace.getStats());
+    }
+
+    getMemoryConsumers(): MemoryConsumer[] {
+        return [{
+            name: 'Shared caches',
+            tier: 'transient',
+            cost: () => {
+                let bytes = 0;
+                this.namespaces.forEach(namespace => bytes += namespace.estimateBytes());
+                return bytes;
+            },
+            shed: () => this.clear()
+        }];
     }
 
     /**
      * Dispose of the cache service
      */
     dispose(): void {
-        if (this.cleanupInterval) {
-            clearInterval(this.cleanupInterval);
-        }
-        this.cache.clear();
+        this.clear();
     }
 }
@@ -7,6 +7,9 @@ import { UrlPatternAnalyzer } from '../analyzers/urlPatternAnalyzer';
 import { ProjectPathConfigurator } from '../projectPathConfigurator';
 import { ManagePyCommandHandler } from '../commands/managePyCommandHandler';
 import { PerformanceCommands } from '../commands/performanceCommands';
+import { SitePackagesModelIndex } from '../analyzers/sitePackagesModelIndex';
+import { LiveModelRegistry } from '../analyzers/liveModelRegistry';
+import { AnalysisServerClient } from './analysisServerClient';
 
 @injectable()
 export class CommandService {
@@ -18,7 +21,10 @@ export class CommandService {
         @inject(TYPES.UrlPatternAnalyzer) private urlPatternAnalyzer: UrlPatternAnalyzer,
         @inject(TYPES.ProjectPathConfigurator) private pathConfigurator: ProjectPathConfigurator,
         @inject(TYPES.ManagePyCommandHandler) private managePyCommandHandler: ManagePyCommandHandler,
-        @inject(TYPES.PerformanceCommands) private performanceCommands: PerformanceCommands
+        @inject(TYPES.PerformanceCommands) private performanceCommands: PerformanceCommands,
+        @inject(TYPES.SitePackagesModelIndex) private sitePackagesIndex: SitePackagesModelIndex,
+        @inject(TYPES.AnalysisServerClient) private analysisServer: AnalysisServerClient,
+        @inject(TYPES.LiveModelRegistry) private liveRegistry: LiveModelRegistry
     ) {}
 
     async register(): Promise<void> {
@@ -141,6 +147,11 @@ export class CommandService {
             vscode.commands.registerCommand('django-power-tools.rescanProject', async () => {
                 await this.projectAnalyzer.analyzeProject();
                 await this.urlPatternAnalyzer.scanWorkspace();
+                // Rebuilds only if the interpreter or installed packages changed
+                await this.sitePackagesIndex.refresh();
+                if (this.liveRegistry.getStatus().enabled) {
+                    await this.liveRegistry.refresh();
+                }
                 vscode.window.showInformationMessage('Django project rescanned successfully!');
             })
         );
@@ -172,6 +183,27 @@ ${Object.entries(models).map(([name, info]) => `  - ${info.app}.${name} (${info.
             })
         );
 
+        // Restart the analysis server without reloading the window
+        this.disposables.push(
+            vscode.commands.registerCommand('django-power-tools.restartAnalysisServer', async () => {
+                const mode = vscode.workspace.getConfiguration('djangoPowerTools.performance')
+                    .get<string>('analysisMode', 'inProcess');
+                if (mode !== 'server') {
+                    vscode.window.showInformationMessage(
+                        'The analysis server is only used when djangoPowerTools.performance.analysisMode is "server"'
+                    );
+                    return;
+                }
+
+                try {
+                    await this.analysisServer.restart();
+                    vscode.window.showInformationMessage('Django analysis server restarted');
+                } catch (error) {
+                    vscode.window.showErrorMessage(`Failed to restart Django analysis server: ${error}`);
+                }
+            })
+        );
+
         // Add disposables to extension context
         this.context.subscriptions.push(...this.disposables);
     }
@@ -1,8 +1,7 @@
-import { injectable, inject } from 'inversify';
+import { injectable, inject, optional } from 'inversify';
 import * as vscode from 'vscode';
+import * as path from 'path';
 import { TYPES } from '../container/types';
-import { DjangoProjectAnalyzer } from '../analyzers/djangoProjectAnalyzer';
-import { UrlPatternAnalyzer } from '../analyzers/urlPatternAnalyzer';
 import { DjangoModelCompletionProvider, DjangoFieldCompletionProvider } from '../providers/djangoModelCompletionProvider';
 import { EnhancedCompletionProvider } from '../providers/enhancedCompletionProvider';
 import { UrlTagCompletionProvider } from '../providers/urlTagCompletionProvider';
@@ -11,9 +10,12 @@ import { DjangoModelFormCompletionProvider } from '../providers/djangoModelFormC
 import { TemplateContextCompletionProvider } from '../providers/templateContextCompletionProvider';
 import { StaticPathCompletionProvider } from '../providers/staticPathCompletionProvider';
 import { DjangoAdminCompletionProvider } from '../completions/djangoAdminCompletionProvider';
+import { TemplateBlockCompletionProvider } from '../providers/templateBlockCompletionProvider';
 import { DjangoFormAnalyzer } from '../analyzers/djangoFormAnalyzer';
 import { StaticFileAnalyzer } from '../analyzers/staticFileAnalyzer';
 import { DjangoAdminAnalyzer } from '../analyzers/djangoAdminAnalyzer';
+import { TemplateIndex } from '../analyzers/templateIndex';
+import { PrefetchService } from './prefetchService';
 
 @injectable()
 export class CompletionService {
@@ -21,8 +23,6 @@ export class CompletionService {
 
     constructor(
         @inject(TYPES.ExtensionContext) private context: vscode.ExtensionContext,
-        @inject(TYPES.DjangoProjectAnalyzer) private projectAnalyzer: DjangoProjectAnalyzer,
-        @inject(TYPES.UrlPatternAnalyzer) private urlPatternAnalyzer: UrlPatternAnalyzer,
         @inject(TYPES.DjangoFormAnalyzer) private formAnalyzer: DjangoFormAnalyzer,
         @inject(TYPES.StaticFileAnalyzer) private staticFileAnalyzer: StaticFileAnalyzer,
         @inject(TYPES.DjangoAdminAnalyzer) private adminAnalyzer: DjangoAdminAnalyzer,
@@ -34,7 +34,10 @@ export class CompletionService {
         @inject(TYPES.DjangoModelFormCompletionProvider) private modelFormCompletionProvider: DjangoModelFormCompletionProvider,
         @inject(TYPES.TemplateContextCompletionProvider) private templateContextCompletionProvider: TemplateContextCompletionProvider,
         @inject(TYPES.StaticPathCompletionProvider) private staticPathCompletionProvider: StaticPathCompletionProvider,
-        @inject(TYPES.DjangoAdminCompletionProvider) private adminCompletionProvider: DjangoAdminCompletionProvider
+        @inject(TYPES.DjangoAdminCompletionProvider) private adminCompletionProvider: DjangoAdminCompletionProvider,
+        @inject(TYPES.TemplateIndex) private templateIndex: TemplateIndex,
+        @inject(TYPES.TemplateBlockCompletionProvider) private templateBlockCompletionProvider: TemplateBlockCompletionProvider,
+        @inject(TYPES.PrefetchService) @optional() private prefetchService?: PrefetchService
     ) {}
 
     async register(): Promise<void> {
@@ -44,6 +47,9 @@ export class CompletionService {
         // Initialize static file analyzer
         await this.staticFileAnalyzer.initialize();
         
+        // Index templates, their inheritance and blocks
+        await this.templateIndex.initialize();
+        
         // Scan for admin files
         await this.adminAnalyzer.scanWorkspace();
         
@@ -135,6 +141,18 @@ export class CompletionService {
             )
         );
 
+        // Register block name and template name completion provider
+        this.disposables.push(
+            vscode.languages.registerCompletionItemProvider(
+                [
+                    { scheme: 'file', language: 'html' },
+                    { scheme: 'file', language: 'django-html' }
+                ],
+                this.templateBlockCompletionProvider,
+                ' ', "'", '"'  // Trigger after {% block and on quotes
+            )
+        );
+
         // Register Django Admin completion provider
         this.disposables.push(
             vscode.languages.registerCompletionItemProvider(
@@ -144,6 +162,17 @@ export class CompletionService {
             )
         );
 
+        // Build the completion items of predicted files while the editor is idle
+        if (this.prefetchService) {
+            this.disposables.push(this.prefetchService.registerWarmer(filePath => {
+                if (path.basename(filePath) === 'admin.py') {
+                    this.adminCompletionProvider.prebuild();
+                } else {
+                    this.enhancedCompletionProvider.prebuild();
+                }
+            }));
+        }
+
         // Add disposables to extension context
         this.context.subscriptions.push(...this.disposables);
     }
@@ -152,5 +181,6 @@ export class CompletionService {
         this.disposables.forEach(d => d.dispose());
         this.disposables = [];
         this.staticFileAnalyzer.dispose();
+        this.templateIndex.dispose();
     }
 }
\ No newline at end of file
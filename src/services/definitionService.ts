@@ -1,8 +1,11 @@
-import { injectable, inject } from 'inversify';
+import { injectable, inject, optional } from 'inversify';
 import * as vscode from 'vscode';
 import { TYPES } from '../container/types';
 import { DjangoDefinitionProvider } from '../providers/djangoDefinitionProvider';
 import { EnhancedDjangoDefinitionProvider } from '../providers/enhancedDjangoDefinitionProvider';
+import { UrlPathHoverProvider } from '../providers/urlPathHoverProvider';
+import { DjangoReferenceProvider } from '../providers/djangoReferenceProvider';
+import { MemoryBudgetManager } from '../cache/memoryBudgetManager';
 
 /**
  * Service to register and manage definition providers
@@ -15,7 +18,10 @@ export class DefinitionService {
     constructor(
         @inject(TYPES.ExtensionContext) private context: vscode.ExtensionContext,
         @inject(TYPES.DjangoDefinitionProvider) private djangoDefinitionProvider: DjangoDefinitionProvider,
-        @inject(TYPES.EnhancedDjangoDefinitionProvider) private enhancedDjangoDefinitionProvider: EnhancedDjangoDefinitionProvider
+        @inject(TYPES.EnhancedDjangoDefinitionProvider) private enhancedDjangoDefinitionProvider: EnhancedDjangoDefinitionProvider,
+        @inject(TYPES.UrlPathHoverProvider) private urlPathHoverProvider: UrlPathHoverProvider,
+        @inject(TYPES.DjangoReferenceProvider) private referenceProvider: DjangoReferenceProvider,
+        @inject(TYPES.MemoryBudgetManager) @optional() private memoryBudget?: MemoryBudgetManager
     ) {
         // Use enhanced provider when performance mode is enabled
         this.useEnhancedProvider = vscode.workspace.getConfiguration('djangoPowerTools.performance')
@@ -47,6 +53,38 @@ export class DefinitionService {
             )
         );
 
+        // Show the view behind URL path literals in tests and templates
+        this.disposables.push(
+            vscode.languages.registerHoverProvider(
+                [
+                    { scheme: 'file', language: 'python' },
+                    { scheme: 'file', language: 'html' },
+                    { scheme: 'file', language: 'django-html' }
+                ],
+                this.urlPathHoverProvider
+            )
+        );
+
+        // Find references to and rename models, fields and URL names from the reference index
+        if (vscode.workspace.getConfiguration('djangoPowerTools').get<boolean>('enableReferenceIndex', true)) {
+            const selector = [
+                { scheme: 'file', language: 'python' },
+                { scheme: 'file', language: 'html' },
+                { scheme: 'file', language: 'django-html' }
+            ];
+            this.disposables.push(
+                vscode.languages.registerReferenceProvider(selector, this.referenceProvider),
+                vscode.languages.registerRenameProvider(selector, this.referenceProvider)
+            );
+        }
+
+        // The enhanced provider's file and location caches count toward the memory budget
+        if (this.useEnhancedProvider && this.memoryBudget) {
+            for (const consumer of this.enhancedDjangoDefinitionProvider.getMemoryConsumers()) {
+                this.disposables.push(this.memoryBudget.register(consumer));
+            }
+        }
+
         // Add disposables to extension context
         this.context.subscriptions.push(...this.disposables);
         
@@ -1,5 +1,6 @@
 import { injectable, inject } from 'inversify';
 import * as vscode from 'vscode';
+import * as path from 'path';
 import { TYPES } from '../container/types';
 import { PythonIntegration, PythonExecutor } from '../pythonIntegration';
 import { DjangoProjectAnalyzer } from '../analyzers/djangoProjectAnalyzer';
@@ -7,10 +8,26 @@ import { UrlPatternAnalyzer } from '../analyzers/urlPatternAnalyzer';
 import { ProjectPathConfigurator } from '../projectPathConfigurator';
 import { CompletionService } from './completionService';
 import { CommandService } from './commandService';
-import { FileWatcherService } from './fileWatcherService';
 import { EnhancedFileWatcherService } from './enhancedFileWatcherService';
 import { DefinitionService } from './definitionService';
 import { DjangoAdminAnalyzer } from '../analyzers/djangoAdminAnalyzer';
+import { SitePackagesModelIndex } from '../analyzers/sitePackagesModelIndex';
+import { ProjectShardManager } from '../analyzers/projectShardManager';
+import { AdvancedModelAnalyzer } from '../analyzers/advancedModelAnalyzer';
+import { DjangoFormAnalyzer } from '../analyzers/djangoFormAnalyzer';
+import { AnalysisServerClient } from './analysisServerClient';
+import { ReferenceDiagnosticsService } from './referenceDiagnosticsService';
+import { BufferAnalysisService } from './bufferAnalysisService';
+import { PrebuiltProjectIndex } from '../analyzers/prebuiltProjectIndex';
+import { GitCheckoutMonitor } from '../analyzers/gitCheckoutMonitor';
+import { LiveModelRegistry } from '../analyzers/liveModelRegistry';
+import { ReferenceIndex } from '../analyzers/referenceIndex';
+import { UrlConfEngine } from '../analyzers/urlConfEngine';
+import { PrefetchService } from './prefetchService';
+import { CacheService } from './cacheService';
+import { ViewContextAnalyzer } from '../analyzers/viewContextAnalyzer';
+import { MemoryBudgetManager, MemoryConsumer } from '../cache/memoryBudgetManager';
+import { AnalysisQuarantine } from '../analyzers/analysisQuarantine';
 
 @injectable()
 export class ExtensionService {
@@ -22,10 +39,26 @@ export class ExtensionService {
         @inject(TYPES.ProjectPathConfigurator) private pathConfigurator: ProjectPathConfigurator,
         @inject(TYPES.CompletionService) private completionService: CompletionService,
         @inject(TYPES.CommandService) private commandService: CommandService,
-        @inject(TYPES.FileWatcherService) private fileWatcherService: FileWatcherService,
         @inject(TYPES.EnhancedFileWatcherService) private enhancedFileWatcherService: EnhancedFileWatcherService,
         @inject(TYPES.DefinitionService) private definitionService: DefinitionService,
-        @inject(TYPES.DjangoAdminAnalyzer) private adminAnalyzer: DjangoAdminAnalyzer
+        @inject(TYPES.DjangoAdminAnalyzer) private adminAnalyzer: DjangoAdminAnalyzer,
+        @inject(TYPES.SitePackagesModelIndex) private sitePackagesIndex: SitePackagesModelIndex,
+        @inject(TYPES.ProjectShardManager) private shardManager: ProjectShardManager,
+        @inject(TYPES.AdvancedModelAnalyzer) private modelAnalyzer: AdvancedModelAnalyzer,
+        @inject(TYPES.DjangoFormAnalyzer) private formAnalyzer: DjangoFormAnalyzer,
+        @inject(TYPES.AnalysisServerClient) private analysisServer: AnalysisServerClient,
+        @inject(TYPES.ReferenceDiagnosticsService) private referenceDiagnostics: ReferenceDiagnosticsService,
+        @inject(TYPES.PrebuiltProjectIndex) private prebuiltIndex: PrebuiltProjectIndex,
+        @inject(TYPES.GitCheckoutMonitor) private checkoutMonitor: GitCheckoutMonitor,
+        @inject(TYPES.LiveModelRegistry) private liveRegistry: LiveModelRegistry,
+        @inject(TYPES.BufferAnalysisService) private bufferAnalysis: BufferAnalysisService,
+        @inject(TYPES.ReferenceIndex) private referenceIndex: ReferenceIndex,
+        @inject(TYPES.UrlConfEngine) private urlConfEngine: UrlConfEngine,
+        @inject(TYPES.PrefetchService) private prefetchService: PrefetchService,
+        @inject(TYPES.CacheService) private cacheService: CacheService,
+        @inject(TYPES.ViewContextAnalyzer) private viewContextAnalyzer: ViewContextAnalyzer,
+        @inject(TYPES.MemoryBudgetManager) private memoryBudget: MemoryBudgetManager,
+        @inject(TYPES.AnalysisQuarantine) private quarantine: AnalysisQuarantine
     ) {}
 
     async initialize(): Promise<void> {
@@ -44,12 +77,42 @@ export class ExtensionService {
         // Set up file watcher for new Django projects
         this.pathConfigurator.setupFileWatcher(this.context);
 
+        this.configureQuarantine();
+        await this.startAnalysisServer();
+        await this.loadPrebuiltIndex();
+        this.startCheckoutMonitor();
+        this.projectAnalyzer.setUrlConfEngine(this.urlConfEngine);
+        this.projectAnalyzer.setStorageDirectory((this.context.storageUri || this.context.globalStorageUri)?.fsPath);
+        this.startMemoryBudget();
+
+        // Keep the primary analyzer to its own project when the workspace
+        // holds several; the others are analyzed by lazily started shards
+        await this.shardManager.discoverProjects();
+        if (this.shardManager.getProjectRoots().length > 1) {
+            this.projectAnalyzer.restrictToProjectRoot();
+        }
+
         // Initialize Django project analyzer
         const projectFound = await this.projectAnalyzer.initialize();
+        await this.shardManager.initialize();
         
         // Scan workspace for URL patterns
         if (projectFound) {
             await this.urlPatternAnalyzer.scanWorkspace();
+            
+            // Load or build the index of installed-package models in the background
+            this.sitePackagesIndex.initialize().catch(error => {
+                console.error('Failed to initialize site-packages model index:', error);
+            });
+
+            // Opt-in: read the model registry from django.setup()
+            this.liveRegistry.initialize();
+
+            if (vscode.workspace.getConfiguration('djangoPowerTools').get<boolean>('enableReferenceIndex', true)) {
+                this.referenceIndex.initialize().catch(error => {
+                    console.error('Failed to build reference index:', error);
+                });
+            }
         }
         
         if (!projectFound) {
@@ -65,14 +128,112 @@ export class ExtensionService {
         // Register all services
         await this.completionService.register();
         await this.commandService.register();
-        await this.fileWatcherService.register();
         await this.definitionService.register();
+        await this.referenceDiagnostics.register();
+        this.bufferAnalysis.register();
+        this.prefetchService.register();
         
         // Setup enhanced file watching for admin files
         this.setupAdminFileWatching();
         this.enhancedFileWatcherService.register();
     }
 
+    /**
+     * Move parsing into the analysis server process when configured; analyzers
+     * fall back to in-process parsing whenever the server is unavailable
+     */
+    private async startAnalysisServer(): Promise<void> {
+        const config = vscode.workspace.getConfiguration('djangoPowerTools.performance');
+        if (config.get<string>('analysisMode', 'inProcess') !== 'server') {
+            return;
+        }
+
+        try {
+            await this.analysisServer.start();
+            this.modelAnalyzer.setExtractionBackend(this.analysisServer);
+            this.formAnalyzer.setParseBackend(this.analysisServer);
+        } catch (error) {
+            console.error('Failed to start Django analysis server, analyzing in-process:', error);
+        }
+    }
+
+    /**
+     * Skip files whose analysis exceeds the per-file time budget; optionally
+     * parse them in the analysis server, which is restarted when a parse
+     * does not finish within the hard timeout
+     */
+    private configureQuarantine(): void {
+        const config = vscode.workspace.getConfiguration('djangoPowerTools.performance');
+        this.quarantine.configure({
+            budgetMs: config.get<number>('fileAnalysisBudgetMs', 2000),
+            hardTimeoutMs: config.get<number>('quarantineHardTimeoutMs', 10000)
+        });
+        if (config.get<boolean>('retryQuarantinedFiles', false)) {
+            this.quarantine.setWorker(this.analysisServer);
+        }
+    }
+
+    /**
+     * Batch the file events of branch switches instead of re-analyzing each
+     * file as its watcher event arrives
+     */
+    private startCheckoutMonitor(): void {
+        this.checkoutMonitor.initialize();
+        this.projectAnalyzer.setCheckoutMonitor(this.checkoutMonitor);
+        this.modelAnalyzer.setCheckoutMonitor(this.checkoutMonitor);
+        this.formAnalyzer.setCheckoutMonitor(this.checkoutMonitor);
+    }
+
+    /**
+     * Keep the caches of all analyzers, including those of project shards
+     * started later, within one memory budget
+     */
+    private startMemoryBudget(): void {
+        const budgetMB = vscode.workspace
+            .getConfiguration('djangoPowerTools.performance')
+            .get<number>('memoryBudgetMB', 200);
+        this.memoryBudget.configure({ budgetMB });
+
+        const register = (consumers: MemoryConsumer[]) => consumers.forEach(consumer => this.memoryBudget.register(consumer));
+        register(this.projectAnalyzer.getMemoryConsumers());
+        register(this.modelAnalyzer.getMemoryConsumers());
+        register(this.viewContextAnalyzer.getMemoryConsumers());
+        register(this.cacheService.getMemoryConsumers());
+
+        this.context.subscriptions.push(
+            this.shardManager.onDidStartShard(shard => {
+                if (shard.isPrimary) {
+                    return;
+                }
+                const project = path.basename(shard.root);
+                register([...shard.projectAnalyzer.getMemoryConsumers(), ...shard.modelAnalyzer.getMemoryConsumers()]
+                    .map(consumer => ({ ...consumer, name: `${consumer.name} (${project})` })));
+            })
+        );
+
+        this.memoryBudget.start();
+    }
+
+    /**
+     * Import the index written by the build-index CLI, if the workspace has
+     * one, before the initial scan so unchanged files are not parsed again
+     */
+    private async loadPrebuiltIndex(): Promise<void> {
+        const configuredPath = vscode.workspace
+            .getConfiguration('djangoPowerTools.performance')
+            .get<string>('prebuiltIndexPath', '');
+        if (!configuredPath) {
+            return;
+        }
+
+        for (const folder of vscode.workspace.workspaceFolders || []) {
+            const indexPath = PrebuiltProjectIndex.resolveIndexPath(folder.uri.fsPath, configuredPath);
+            if (await this.prebuiltIndex.load(folder.uri.fsPath, indexPath)) {
+                return;
+            }
+        }
+    }
+
     private setupAdminFileWatching(): void {
         // Watch admin.py files
         this.enhancedFileWatcherService.watchPattern('**/admin.py', async (uri, changeType) => {
@@ -95,5 +256,16 @@ export class ExtensionService {
         this.pythonIntegration.dispose();
         this.commandService.dispose();
         this.enhancedFileWatcherService.dispose();
+        this.shardManager.dispose();
+        this.analysisServer.dispose();
+        this.referenceDiagnostics.dispose();
+        this.checkoutMonitor.dispose();
+        this.liveRegistry.dispose();
+        this.sitePackagesIndex.dispose();
+        this.bufferAnalysis.dispose();
+        this.referenceIndex.dispose();
+        this.urlConfEngine.dispose();
+        this.prefetchService.dispose();
+        this.memoryBudget.dispose();
     }
 }
\ No newline at end of file
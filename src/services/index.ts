@@ -1,6 +1,5 @@
 export * from './extensionService';
 export * from './completionService';
 export * from './commandService';
-export * from './fileWatcherService';
 export * from './enhancedFileWatcherService';
 export * from './definitionService';
\ No newline at end of file
@@ -0,0 +1,323 @@
+import { injectable, inject, optional } from 'inversify';
+import * as vscode from 'vscode';
+import * as fs from 'fs';
+import * as path from 'path';
+import { TYPES } from '../container/types';
+import { DjangoProjectAnalyzer } from '../analyzers/djangoProjectAnalyzer';
+import { DjangoFormAnalyzer } from '../analyzers/djangoFormAnalyzer';
+import { ProjectShardManager } from '../analyzers/projectShardManager';
+import { PrefetchPolicy } from '../analyzers/prefetchPolicy';
+import { MemoryBudgetManager } from '../cache/memoryBudgetManager';
+import { parseImports, getImportCandidates } from '../parsers/pythonImports';
+import { DebouncedTaskExecutor } from '../workers/analysisWorkerPool';
+
+/**
+ * Prepares what a feature needs for a file before the file is opened.
+ * Called during idle time with the file's content on disk.
+ */
+export type PrefetchWarmer = (filePath: string, content: string, token: vscode.CancellationToken) => void | Promise<void>;
+
+export interface PrefetchStats {
+    opened: number;
+    hits: number;
+    hitRate: number;
+    prefetched: number;
+    cancelled: number;
+    budgetStops: number;
+    memoryStops: number;
+    warmFiles: number;
+    warmMB: number;
+}
+
+interface WarmFile {
+    mtimeMs: number;
+    size: number;
+}
+
+// Files tracked as warm for the hit rate, least recently used dropped first.
+// The prefetched analysis itself lives in the analyzers' caches, which the
+// memory budget manager sheds; runs do not start while it is over budget.
+const MAX_WARM_FILES = 500;
+// Larger files would not be analyzed within an idle run's time budget
+const MAX_PREFETCH_FILE_BYTES = 1024 * 1024;
+
+/**
+ * Analyzes the files likely to be opened next while the editor is idle, so
+ * they are warm when the user gets to them. A run starts once nothing was
+ * typed for the debounce delay, is cancelled by the next edit or editor
+ * switch, and stops at its time budget or when the caches are over the
+ * memory budget.
+ */
+@injectable()
+export class PrefetchService {
+    private policy = new PrefetchPolicy();
+    private warmers: PrefetchWarmer[] = [];
+    // Prefetched files with the version they were warmed at, least recently used first
+    private warmFiles: Map<string, WarmFile> = new Map();
+    private warmBytes = 0;
+    private idle: DebouncedTaskExecutor;
+    private run: vscode.CancellationTokenSource | undefined;
+    private disposables: vscode.Disposable[] = [];
+    private maxFiles: number;
+    private timeBudgetMs: number;
+    private stats = { opened: 0, hits: 0, prefetched: 0, cancelled: 0, budgetStops: 0, memoryStops: 0 };
+
+    constructor(
+        @inject(TYPES.ExtensionContext) private context: vscode.ExtensionContext,
+        @inject(TYPES.DjangoProjectAnalyzer) private projectAnalyzer: DjangoProjectAnalyzer,
+        @inject(TYPES.ProjectShardManager) private shardManager: ProjectShardManager,
+        @inject(TYPES.DjangoFormAnalyzer) private formAnalyzer: DjangoFormAnalyzer,
+        @inject(TYPES.MemoryBudgetManager) @optional() private memoryBudget?: MemoryBudgetManager
+    ) {
+        const config = vscode.workspace.getConfiguration('djangoPowerTools.performance');
+        this.idle = new DebouncedTaskExecutor(config.get<number>('debounceDelay', 500));
+        this.maxFiles = config.get<number>('prefetchMaxFiles', 8);
+        this.timeBudgetMs = config.get<number>('prefetchTimeBudgetMs', 200);
+    }
+
+    register(): void {
+        const config = vscode.workspace.getConfiguration('djangoPowerTools.performance');
+        if (!config.get<boolean>('enablePrefetch', true)) {
+            return;
+        }
+
+        this.registerWarmer(filePath => this.warmAnalysis(filePath));
+        this.disposables.push(
+            vscode.window.onDidChangeActiveTextEditor(editor => {
+                if (editor) {
+                    this.onDidOpen(editor.document);
+                }
+            }),
+            vscode.workspace.onDidChangeTextDocument(event => {
+                if (event.contentChanges.length > 0) {
+                    this.onDidType();
+                }
+            })
+        );
+
+        const activeEditor = vscode.window.activeTextEditor;
+        if (activeEditor) {
+            this.onDidOpen(activeEditor.document);
+        }
+        this.context.subscriptions.push(...this.disposables);
+    }
+
+    /**
+     * Add work to do for each prefetched file, e.g. building completion items
+     */
+    registerWarmer(warmer: PrefetchWarmer): vscode.Disposable {
+        this.warmers.push(warmer);
+        return new vscode.Disposable(() => {
+            this.warmers = this.warmers.filter(candidate => candidate !== warmer);
+        });
+    }
+
+    getStats(): PrefetchStats {
+        return {
+            ...this.stats,
+            hitRate: this.stats.opened > 0 ? this.stats.hits / this.stats.opened : 0,
+            warmFiles: this.warmFiles.size,
+            warmMB: this.warmBytes / (1024 * 1024)
+        };
+    }
+
+    private onDidOpen(document: vscode.TextDocument): void {
+        if (document.uri.scheme !== 'file' || document.languageId !== 'python') {
+            return;
+        }
+
+        const filePath = document.uri.fsPath;
+        this.stats.opened++;
+        if (this.isWarm(filePath)) {
+            this.stats.hits++;
+        }
+        this.policy.recordOpen(filePath);
+        this.schedule(document);
+    }
+
+    private onDidType(): void {
+        const activeEditor = vscode.window.activeTextEditor;
+        if (activeEditor) {
+            this.schedule(activeEditor.document);
+        } else {
+            this.cancel();
+        }
+    }
+
+    /**
+     * Restart the idle timer for the active document
+     */
+    private schedule(document: vscode.TextDocument): void {
+        this.cancel();
+        if (document.uri.scheme === 'file' && document.languageId === 'python') {
+            this.idle.execute('prefetch', () => this.prefetch(document));
+        }
+    }
+
+    private cancel(): void {
+        this.idle.cancel('prefetch');
+        this.run?.cancel();
+    }
+
+    private async prefetch(document: vscode.TextDocument): Promise<void> {
+        if (document.isClosed) {
+            return;
+        }
+
+        if (this.memoryBudget?.isOverBudget()) {
+            this.stats.memoryStops++;
+            return;
+        }
+
+        const run = new vscode.CancellationTokenSource();
+        this.run = run;
+        const deadline = Date.now() + this.timeBudgetMs;
+
+        try {
+            const filePath = document.uri.fsPath;
+            const importedFiles = await this.resolveImports(filePath, document.getText());
+            for (const candidate of this.policy.rank(filePath, importedFiles, this.maxFiles)) {
+                if (run.token.isCancellationRequested) {
+                    this.stats.cancelled++;
+                    return;
+                }
+                if (Date.now() >= deadline) {
+                    this.stats.budgetStops++;
+                    return;
+                }
+                if (this.memoryBudget?.isOverBudget()) {
+                    this.stats.memoryStops++;
+                    return;
+                }
+                await this.warmFile(candidate.filePath, run.token);
+                // Let editor events in between files
+                await new Promise(resolve => setImmediate(resolve));
+            }
+        } finally {
+            if (this.run === run) {
+                this.run = undefined;
+            }
+            run.dispose();
+        }
+    }
+
+    private async warmFile(filePath: string, token: vscode.CancellationToken): Promise<void> {
+        let stat: fs.Stats;
+        try {
+            stat = await fs.promises.stat(filePath);
+        } catch {
+            // Predicted siblings do not always exist
+            return;
+        }
+
+        const warm = this.warmFiles.get(filePath);
+        if (warm && warm.mtimeMs === stat.mtimeMs) {
+            this.remember(filePath, warm);
+            return;
+        }
+        if (!stat.isFile() || stat.size > MAX_PREFETCH_FILE_BYTES) {
+            return;
+        }
+
+        const content = await fs.promises.readFile(filePath, 'utf8');
+        for (const warmer of this.warmers) {
+            if (token.isCancellationRequested) {
+                return;
+            }
+            try {
+                await warmer(filePath, content, token);
+            } catch (error) {
+                console.error(`Error prefetching ${filePath}:`, error);
+            }
+        }
+
+        this.remember(filePath, { mtimeMs: stat.mtimeMs, size: stat.size });
+        this.stats.prefetched++;
+    }
+
+    /**
+     * Track a warm file; the least recently used ones stop counting as warm
+     * beyond MAX_WARM_FILES
+     */
+    private remember(filePath: string, warm: WarmFile): void {
+        const previous = this.warmFiles.get(filePath);
+        if (previous) {
+            this.warmFiles.delete(filePath);
+            this.warmBytes -= previous.size;
+        }
+        this.warmFiles.set(filePath, warm);
+        this.warmBytes += warm.size;
+
+        for (const [oldest, entry] of this.warmFiles) {
+            if (this.warmFiles.size <= MAX_WARM_FILES) {
+                break;
+            }
+            this.warmFiles.delete(oldest);
+            this.warmBytes -= entry.size;
+        }
+    }
+
+    private isWarm(filePath: string): boolean {
+        const warm = this.warmFiles.get(filePath);
+        if (!warm) {
+            return false;
+        }
+        try {
+            return fs.statSync(filePath).mtimeMs === warm.mtimeMs;
+        } catch {
+            return false;
+        }
+    }
+
+    private async warmAnalysis(filePath: string): Promise<void> {
+        const analyzer = this.shardManager.getShard(filePath)?.projectAnalyzer || this.projectAnalyzer;
+        await analyzer.prefetchFile(filePath);
+        if (path.basename(filePath) === 'forms.py') {
+            await this.formAnalyzer.analyzeFormFile(filePath);
+        }
+    }
+
+    /**
+     * Project files imported by a module; submodules are preferred over the
+     * package __init__.py they are imported from
+     */
+    private async resolveImports(filePath: string, content: string): Promise<string[]> {
+        const roots = new Set<string>();
+        const projectRoot = this.shardManager.findRootForPath(filePath);
+        if (projectRoot) {
+            roots.add(projectRoot);
+        }
+        for (const folder of vscode.workspace.workspaceFolders || []) {
+            roots.add(folder.uri.fsPath);
+        }
+
+        const files = new Set<string>();
+        for (const imp of parseImports(content)) {
+            const existing: string[] = [];
+            for (const candidate of getImportCandidates(imp, filePath, Array.from(roots))) {
+                if (!files.has(candidate) && await this.exists(candidate)) {
+                    existing.push(candidate);
+                }
+            }
+            const modules = existing.filter(candidate => path.basename(candidate) !== '__init__.py');
+            (modules.length > 0 ? modules : existing).forEach(candidate => files.add(candidate));
+        }
+        return Array.from(files);
+    }
+
+    private async exists(filePath: string): Promise<boolean> {
+        try {
+            await fs.promises.access(filePath);
+            return true;
+        } catch {
+            return false;
+        }
+    }
+
+    dispose(): void {
+        this.cancel();
+        this.idle.cancelAll();
+        this.disposables.forEach(disposable => disposable.dispose());
+        this.disposables = [];
+    }
+}
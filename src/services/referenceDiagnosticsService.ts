@@ -0,0 +1,399 @@
+import { injectable, inject } from 'inversify';
+import * as vscode from 'vscode';
+import { TYPES } from '../container/types';
+import { UrlPatternAnalyzer } from '../analyzers/urlPatternAnalyzer';
+import { StaticFileAnalyzer } from '../analyzers/staticFileAnalyzer';
+import { TemplateIndex } from '../analyzers/templateIndex';
+import { extractReferences, NameReference, ReferenceKind } from '../parsers/referenceExtractor';
+import { DebouncedTaskExecutor } from '../workers/analysisWorkerPool';
+
+interface DocumentReferences {
+    version: number;
+    references: NameReference[];
+    // Distinct "kind:name" keys of the references
+    referenceKeys: Set<string>;
+}
+
+interface UrlLookup {
+    names: Set<string>;
+    namespaces: Set<string>;
+}
+
+const SUPPORTED_LANGUAGES = ['python', 'html', 'django-html'];
+
+/**
+ * Flags {% url %}, reverse(), {% static %} and template name references that
+ * do not resolve. References are extracted once per document version and the
+ * resolution of each referenced name is cached. An index change drops only
+ * the cached results that depend on it and re-checks the documents using them.
+ */
+@injectable()
+export class ReferenceDiagnosticsService {
+    private diagnostics: vscode.DiagnosticCollection | undefined;
+    private documents: Map<string, DocumentReferences> = new Map();
+    // Reverse dependencies: reference key -> URIs of documents using it
+    private referenceDocuments: Map<string, Set<string>> = new Map();
+    // Index facts a resolution depends on -> reference keys
+    private dependencyReferences: Map<string, Set<string>> = new Map();
+    private resolved: Map<string, boolean> = new Map();
+    private readyKinds: Map<ReferenceKind, boolean> = new Map();
+    private dirtyDocuments: Set<string> = new Set();
+    private urlLookup: UrlLookup | undefined;
+    private staticRoots: Set<string> | undefined;
+    private templateRoots: Set<string> | undefined;
+    private debouncer: DebouncedTaskExecutor;
+    private disposables: vscode.Disposable[] = [];
+
+    constructor(
+        @inject(TYPES.ExtensionContext) private context: vscode.ExtensionContext,
+        @inject(TYPES.UrlPatternAnalyzer) private urlPatternAnalyzer: UrlPatternAnalyzer,
+        @inject(TYPES.StaticFileAnalyzer) private staticFileAnalyzer: StaticFileAnalyzer,
+        @inject(TYPES.TemplateIndex) private templateIndex: TemplateIndex
+    ) {
+        const delay = vscode.workspace.getConfiguration('djangoPowerTools.performance').get<number>('debounceDelay', 500);
+        this.debouncer = new DebouncedTaskExecutor(delay);
+    }
+
+    async register(): Promise<void> {
+        const config = vscode.workspace.getConfiguration('djangoPowerTools');
+        if (!config.get<boolean>('enableReferenceDiagnostics', true)) {
+            return;
+        }
+
+        this.diagnostics = vscode.languages.createDiagnosticCollection('django-references');
+        this.disposables.push(
+            this.diagnostics,
+            vscode.workspace.onDidOpenTextDocument(document => this.schedule(document)),
+            vscode.workspace.onDidChangeTextDocument(event => this.schedule(event.document)),
+            vscode.workspace.onDidCloseTextDocument(document => this.forget(document.uri.toString())),
+            vscode.workspace.onDidChangeConfiguration(event => {
+                if (event.affectsConfiguration('djangoPowerTools.diagnostics.ignoredReferences')) {
+                    this.resolved.clear();
+                    this.documents.forEach((_, uri) => this.dirtyDocuments.add(uri));
+                    this.scheduleFlush();
+                }
+            }),
+            this.urlPatternAnalyzer.onDidChangePatterns(keys => this.onIndexChanged('url', keys)),
+            this.staticFileAnalyzer.onDidChangeStaticFiles(paths => this.onIndexChanged('static', paths)),
+            this.templateIndex.onDidChangeTemplates(names => this.onIndexChanged('template', names))
+        );
+
+        vscode.workspace.textDocuments.forEach(document => this.schedule(document));
+        this.context.subscriptions.push(...this.disposables);
+    }
+
+    private schedule(document: vscode.TextDocument): void {
+        if (document.uri.scheme !== 'file' || !SUPPORTED_LANGUAGES.includes(document.languageId)) {
+            return;
+        }
+        this.dirtyDocuments.add(document.uri.toString());
+        this.scheduleFlush();
+    }
+
+    private scheduleFlush(): void {
+        this.debouncer.execute('referenceDiagnostics', () => this.flush());
+    }
+
+    /**
+     * Translate changed index entries into the facts they affect, drop the
+     * cached resolutions depending on those facts and queue their documents
+     */
+    onIndexChanged(kind: ReferenceKind, names: string[]): void {
+        const dependencies = new Set<string>();
+
+        if (kind === 'url') {
+            this.urlLookup = undefined;
+            for (const key of names) {
+                const separator = key.lastIndexOf(':');
+                dependencies.add(`url:${key}`);
+                dependencies.add(`url:${key.substring(separator + 1)}`);
+                if (separator !== -1) {
+                    dependencies.add(`url-namespace:${key.substring(0, separator)}`);
+                }
+            }
+        } else {
+            if (kind === 'static') {
+                this.staticRoots = undefined;
+            } else {
+                this.templateRoots = undefined;
+            }
+            for (const name of names) {
+                dependencies.add(`${kind}:${name}`);
+                dependencies.add(`${kind}-root:${this.getRootSegment(name)}`);
+            }
+        }
+
+        // References skipped while an index was empty must be checked once it fills
+        const ready = this.isReady(kind);
+        if (this.readyKinds.get(kind) !== ready) {
+            this.readyKinds.set(kind, ready);
+            dependencies.add(`ready:${kind}`);
+        }
+
+        for (const dependency of dependencies) {
+            this.dependencyReferences.get(dependency)?.forEach(referenceKey => {
+                this.resolved.delete(referenceKey);
+                this.referenceDocuments.get(referenceKey)?.forEach(uri => this.dirtyDocuments.add(uri));
+            });
+        }
+
+        if (this.dirtyDocuments.size > 0) {
+            this.scheduleFlush();
+        }
+    }
+
+    /**
+     * Re-validate the queued documents that are still open
+     */
+    flush(): void {
+        const openDocuments = new Map<string, vscode.TextDocument>();
+        vscode.workspace.textDocuments.forEach(document => openDocuments.set(document.uri.toString(), document));
+
+        for (const uri of this.dirtyDocuments) {
+            const document = openDocuments.get(uri);
+            if (document) {
+                this.validate(document);
+            }
+        }
+        this.dirtyDocuments.clear();
+    }
+
+    private validate(document: vscode.TextDocument): void {
+        const entry = this.getReferences(document);
+        const result: vscode.Diagnostic[] = [];
+
+        for (const reference of entry.references) {
+            if (this.isResolved(reference)) {
+                continue;
+            }
+            const range = new vscode.Range(document.positionAt(reference.start), document.positionAt(reference.end));
+            const diagnostic = new vscode.Diagnostic(range, this.getMessage(reference), vscode.DiagnosticSeverity.Warning);
+            diagnostic.source = 'Django Power Tools';
+            result.push(diagnostic);
+        }
+
+        this.diagnostics?.set(document.uri, result);
+    }
+
+    /**
+     * References of a document, extracted again only when its version changed
+     */
+    private getReferences(document: vscode.TextDocument): DocumentReferences {
+        const uri = document.uri.toString();
+        const cached = this.documents.get(uri);
+        if (cached && cached.version === document.version) {
+            return cached;
+        }
+
+        const references = extractReferences(document.getText(), document.languageId);
+        const referenceKeys = new Set(references.map(reference => this.getReferenceKey(reference)));
+
+        cached?.referenceKeys.forEach(key => {
+            if (!referenceKeys.has(key)) {
+                this.removeReferenceDocument(key, uri);
+            }
+        });
+        for (const reference of references) {
+            const key = this.getReferenceKey(reference);
+            let uris = this.referenceDocuments.get(key);
+            if (!uris) {
+                uris = new Set();
+                this.referenceDocuments.set(key, uris);
+                this.getDependencies(reference).forEach(dependency => this.addDependency(dependency, key));
+            }
+            uris.add(uri);
+        }
+
+        const entry = { version: document.version, references, referenceKeys };
+        this.documents.set(uri, entry);
+        return entry;
+    }
+
+    private getReferenceKey(reference: NameReference): string {
+        return `${reference.kind}:${reference.name}`;
+    }
+
+    /**
+     * Index facts the resolution of a reference depends on
+     */
+    private getDependencies(reference: NameReference): string[] {
+        const dependencies = [this.getReferenceKey(reference), `ready:${reference.kind}`];
+        if (reference.kind === 'url') {
+            const separator = reference.name.lastIndexOf(':');
+            if (separator !== -1) {
+                dependencies.push(`url-namespace:${reference.name.substring(0, separator)}`);
+            }
+        } else {
+            dependencies.push(`${reference.kind}-root:${this.getRootSegment(reference.name)}`);
+        }
+        return dependencies;
+    }
+
+    private addDependency(dependency: string, referenceKey: string): void {
+        let keys = this.dependencyReferences.get(dependency);
+        if (!keys) {
+            keys = new Set();
+            this.dependencyReferences.set(dependency, keys);
+        }
+        keys.add(referenceKey);
+    }
+
+    private removeReferenceDocument(referenceKey: string, uri: string): void {
+        const uris = this.referenceDocuments.get(referenceKey);
+        if (!uris) {
+            return;
+        }
+        uris.delete(uri);
+        if (uris.size > 0) {
+            return;
+        }
+
+        // No document uses the name anymore
+        this.referenceDocuments.delete(referenceKey);
+        this.resolved.delete(referenceKey);
+        const separator = referenceKey.indexOf(':');
+        const reference = {
+            kind: referenceKey.substring(0, separator) as ReferenceKind,
+            name: referenceKey.substring(separator + 1),
+            start: 0,
+            end: 0
+        };
+        for (const dependency of this.getDependencies(reference)) {
+            const keys = this.dependencyReferences.get(dependency);
+            keys?.delete(referenceKey);
+            if (keys && keys.size === 0) {
+                this.dependencyReferences.delete(dependency);
+            }
+        }
+    }
+
+    private isResolved(reference: NameReference): boolean {
+        const key = this.getReferenceKey(reference);
+        let resolved = this.resolved.get(key);
+        if (resolved === undefined) {
+            resolved = this.resolve(reference);
+            this.resolved.set(key, resolved);
+        }
+        return resolved;
+    }
+
+    private resolve(reference: NameReference): boolean {
+        // An empty index means analysis has not run yet, not that nothing exists
+        const ready = this.isReady(reference.kind);
+        this.readyKinds.set(reference.kind, ready);
+        if (!ready || this.isIgnored(reference.name)) {
+            return true;
+        }
+
+        switch (reference.kind) {
+            case 'url':
+                return this.resolveUrl(reference.name);
+            case 'static':
+                return this.staticFileAnalyzer.hasStaticFile(reference.name) ||
+                    !this.getStaticRoots().has(this.getRootSegment(reference.name));
+            case 'template':
+                return this.templateIndex.resolve(reference.name) !== undefined ||
+                    !this.getTemplateRoots().has(this.getRootSegment(reference.name));
+        }
+    }
+
+    private resolveUrl(name: string): boolean {
+        const lookup = this.getUrlLookup();
+        if (lookup.names.has(name)) {
+            return true;
+        }
+
+        const separator = name.lastIndexOf(':');
+        if (separator === -1) {
+            return false;
+        }
+        // Namespaces set with include(namespace=...) or by installed packages
+        // are not indexed, so only names in a known app_name can be wrong
+        return !lookup.namespaces.has(name.substring(0, separator));
+    }
+
+    private getUrlLookup(): UrlLookup {
+        if (!this.urlLookup) {
+            const names = new Set<string>();
+            const namespaces = new Set<string>();
+            for (const pattern of this.urlPatternAnalyzer.getAllUrlPatterns()) {
+                if (pattern.appName) {
+                    names.add(`${pattern.appName}:${pattern.name}`);
+                    namespaces.add(pattern.appName);
+                }
+                names.add(pattern.name);
+            }
+            this.urlLookup = { names, namespaces };
+        }
+        return this.urlLookup;
+    }
+
+    /**
+     * Top-level folders of project static files. Paths under other folders
+     * usually come from installed packages such as django.contrib.admin and
+     * are not reported.
+     */
+    private getStaticRoots(): Set<string> {
+        if (!this.staticRoots) {
+            this.staticRoots = new Set(this.staticFileAnalyzer.getStaticFiles().map(file => this.getRootSegment(file.relativePath)));
+        }
+        return this.staticRoots;
+    }
+
+    private getTemplateRoots(): Set<string> {
+        if (!this.templateRoots) {
+            this.templateRoots = new Set(this.templateIndex.getTemplateNames().map(name => this.getRootSegment(name)));
+        }
+        return this.templateRoots;
+    }
+
+    private getRootSegment(relativePath: string): string {
+        const slash = relativePath.indexOf('/');
+        return slash === -1 ? '' : relativePath.substring(0, slash);
+    }
+
+    private isReady(kind: ReferenceKind): boolean {
+        switch (kind) {
+            case 'url':
+                return this.getUrlLookup().names.size > 0;
+            case 'static':
+                return this.getStaticRoots().size > 0;
+            case 'template':
+                return this.getTemplateRoots().size > 0;
+        }
+    }
+
+    private isIgnored(name: string): boolean {
+        const ignored = vscode.workspace.getConfiguration('djangoPowerTools.diagnostics').get<string[]>('ignoredReferences', []);
+        return ignored.includes(name);
+    }
+
+    private getMessage(reference: NameReference): string {
+        switch (reference.kind) {
+            case 'url':
+                return `URL name '${reference.name}' is not defined in any urls.py`;
+            case 'static':
+                return `Static file '${reference.name}' was not found in the static directories`;
+            case 'template':
+                return `Template '${reference.name}' was not found in the template directories`;
+        }
+    }
+
+    private forget(uri: string): void {
+        const entry = this.documents.get(uri);
+        entry?.referenceKeys.forEach(key => this.removeReferenceDocument(key, uri));
+        this.documents.delete(uri);
+        this.dirtyDocuments.delete(uri);
+        this.diagnostics?.delete(vscode.Uri.parse(uri));
+    }
+
+    dispose(): void {
+        this.debouncer.cancel('referenceDiagnostics');
+        this.disposables.forEach(d => d.dispose());
+        this.disposables = [];
+        this.documents.clear();
+        this.referenceDocuments.clear();
+        this.dependencyReferences.clear();
+        this.resolved.clear();
+    }
+}
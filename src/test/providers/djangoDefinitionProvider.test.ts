@@ -27,6 +27,7 @@ suite('Django Definition Provider Test Suite', () => {
         const mockUrlPattern: UrlPattern = {
             name: 'post-detail',
             pattern: 'posts/<int:pk>/',
+            route: 'posts/<int:pk>/',
             params: ['pk'],
             filePath: '/test/project/blog/urls.py',
             view: 'views.PostDetailView.as_view()'
@@ -189,10 +189,12 @@ suite('StaticPathCompletionProvider Test Suite', () => {
         const position = new vscode.Position(1, 40);
         
         // Mock static files
-        mockAnalyzer.getStaticFiles.returns([
-            { relativePath: 'style.css', absolutePath: '/static/style.css', type: 'css', size: 512 },
-            { relativePath: 'large.css', absolutePath: '/static/large.css', type: 'css', size: 1048576 }
-        ]);
+        const staticFiles = [
+            { relativePath: 'style.css', absolutePath: '/static/style.css', type: 'css' as const, size: 512 },
+            { relativePath: 'large.css', absolutePath: '/static/large.css', type: 'css' as const, size: 1048576 }
+        ];
+        mockAnalyzer.getStaticFiles.returns(staticFiles);
+        mockAnalyzer.getStaticFile.callsFake(absolutePath => staticFiles.find(file => file.absolutePath === absolutePath));
         
         const completions = await provider.provideCompletionItems(
             document,
@@ -205,10 +207,15 @@ suite('StaticPathCompletionProvider Test Suite', () => {
         
         const smallFile = completions.find(item => item.label.toString().includes('style.css'));
         assert.ok(smallFile);
+        // Size is only formatted once the item is resolved
+        assert.strictEqual(smallFile.documentation, undefined);
+        provider.resolveCompletionItem(smallFile);
         assert.strictEqual(smallFile.documentation, 'Size: 512 B');
+        assert.strictEqual(smallFile.detail, 'CSS Stylesheet');
         
         const largeFile = completions.find(item => item.label.toString().includes('large.css'));
         assert.ok(largeFile);
+        provider.resolveCompletionItem(largeFile);
         assert.strictEqual(largeFile.documentation, 'Size: 1.0 MB');
     });
 
@@ -0,0 +1,75 @@
+import * as assert from 'assert';
+import { AdaptiveConcurrencyController } from '../../workers/adaptiveConcurrency';
+import { ProgressiveAnalyzer } from '../../analyzers/progressiveAnalyzer';
+
+suite('AdaptiveConcurrency Test Suite', () => {
+    let controller: AdaptiveConcurrencyController;
+
+    teardown(() => {
+        controller.dispose();
+    });
+
+    test('should ramp up additively and halve when tasks slow down', () => {
+        controller = new AdaptiveConcurrencyController({
+            maxConcurrency: 4,
+            cpuCount: 8,
+            targetLatencyMs: 100,
+            maxEventLoopDelayMs: 10000
+        });
+        assert.strictEqual(controller.concurrency, 1);
+
+        for (let i = 0; i < 20; i++) {
+            controller.recordTask(20);
+        }
+        assert.strictEqual(controller.concurrency, 4);
+
+        // Three times the baseline and above the target
+        for (let i = 0; i < 5 && controller.concurrency === 4; i++) {
+            controller.recordTask(400);
+        }
+        assert.strictEqual(controller.concurrency, 2);
+        assert.strictEqual(controller.getStatus().decreases, 1);
+    });
+
+    test('should stay within the CPU count and back off while the user types', async () => {
+        controller = new AdaptiveConcurrencyController({ maxConcurrency: 8, cpuCount: 2, idleDelayMs: 30 });
+        for (let i = 0; i < 10; i++) {
+            controller.recordTask(5);
+        }
+        assert.strictEqual(controller.concurrency, 2);
+
+        controller.notifyUserActivity();
+        assert.strictEqual(controller.concurrency, 1);
+        assert.ok(controller.getStatus().userActive);
+
+        await new Promise(resolve => setTimeout(resolve, 50));
+        controller.recordTask(5);
+        assert.strictEqual(controller.concurrency, 2);
+    });
+
+    test('should start the next task as soon as one finishes', async () => {
+        controller = new AdaptiveConcurrencyController({ maxConcurrency: 2, cpuCount: 2, maxEventLoopDelayMs: 10000 });
+        controller.recordTask(10);
+        assert.strictEqual(controller.concurrency, 2);
+        const analyzer = new ProgressiveAnalyzer();
+        analyzer.addToQueue(['/project/slow/models.py', '/project/a/models.py', '/project/b/models.py'], 'model');
+
+        const order: string[] = [];
+        let running = 0;
+        let maxRunning = 0;
+        await analyzer.startProcessing(async task => {
+            running++;
+            maxRunning = Math.max(maxRunning, running);
+            const slow = task.filePath.includes('slow');
+            await new Promise(resolve => setTimeout(resolve, slow ? 80 : 10));
+            order.push(task.filePath);
+            running--;
+        }, { controller });
+
+        assert.strictEqual(order.length, 3);
+        // The fast files did not wait for the slow one to finish
+        assert.strictEqual(order[order.length - 1], '/project/slow/models.py');
+        assert.ok(maxRunning <= 2);
+        analyzer.dispose();
+    });
+});
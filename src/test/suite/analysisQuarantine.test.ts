@@ -0,0 +1,91 @@
+import * as assert from 'assert';
+import { AnalysisQuarantine, QuarantineWorker } from '../../analyzers/analysisQuarantine';
+import { FormInfo } from '../../analyzers/djangoFormAnalyzer';
+
+suite('AnalysisQuarantine Test Suite', () => {
+    function slowParse<T>(milliseconds: number, result: T): T {
+        const end = Date.now() + milliseconds;
+        while (Date.now() < end) {
+            // Stand-in for a regex backtracking on a huge generated module
+        }
+        return result;
+    }
+
+    function createWorker(parse: () => Promise<any>): QuarantineWorker & { restarts: number } {
+        return {
+            restarts: 0,
+            start: () => Promise.resolve(),
+            async restart() {
+                this.restarts++;
+            },
+            extractModels: parse,
+            parseForms: parse,
+            forgetFile: () => undefined
+        };
+    }
+
+    test('should skip a file that exceeded the budget until its content changes', async () => {
+        const quarantine = new AnalysisQuarantine();
+        quarantine.configure({ budgetMs: 10 });
+        let parses = 0;
+        const parse = () => {
+            parses++;
+            return slowParse(30, ['Parsed']);
+        };
+
+        assert.deepStrictEqual(await quarantine.run('model', '/project/generated/models.py', 'v1', parse), ['Parsed']);
+        assert.ok(quarantine.isQuarantined('/project/generated/models.py', 'v1'));
+        assert.strictEqual(quarantine.getQuarantinedFiles()[0].kind, 'model');
+
+        assert.strictEqual(await quarantine.run('model', '/project/generated/models.py', 'v1', parse), undefined);
+        assert.strictEqual(parses, 1);
+
+        assert.deepStrictEqual(await quarantine.run('model', '/project/generated/models.py', 'v2', () => ['Fast']), ['Fast']);
+        assert.strictEqual(quarantine.getQuarantinedFiles().length, 0);
+    });
+
+    test('should parse quarantined files in the worker and restart it on timeout', async () => {
+        const quarantine = new AnalysisQuarantine();
+        quarantine.configure({ budgetMs: 10, hardTimeoutMs: 20 });
+        const inProcess = { forms: [] as FormInfo[], hasUnparsedFormPatterns: true };
+        const fromWorker = { forms: [] as FormInfo[], hasUnparsedFormPatterns: false };
+        await quarantine.run('form', '/project/app/forms.py', 'v1', () => slowParse(30, inProcess));
+
+        const worker = createWorker(() => Promise.resolve(fromWorker));
+        quarantine.setWorker(worker);
+        const retry = (target: QuarantineWorker) => target.parseForms('v1', '/project/app/forms.py');
+        assert.deepStrictEqual(await quarantine.run('form', '/project/app/forms.py', 'v1', () => inProcess, retry), fromWorker);
+        assert.strictEqual(quarantine.getQuarantinedFiles()[0].retry, 'succeeded');
+
+        const hangingWorker = createWorker(() => new Promise(() => undefined));
+        quarantine.setWorker(hangingWorker);
+        assert.strictEqual(await quarantine.run('form', '/project/app/forms.py', 'v1', () => inProcess, retry), undefined);
+        assert.strictEqual(quarantine.getQuarantinedFiles()[0].retry, 'timedOut');
+        assert.strictEqual(hangingWorker.restarts, 1);
+
+        // A timed out file is not sent to the worker again
+        assert.strictEqual(await quarantine.run('form', '/project/app/forms.py', 'v1', () => inProcess, retry), undefined);
+        assert.strictEqual(hangingWorker.restarts, 1);
+    });
+
+    test('should not count time spent waiting toward the budget', async () => {
+        const quarantine = new AnalysisQuarantine();
+        quarantine.configure({ budgetMs: 10 });
+        const wait = () => new Promise(resolve => setTimeout(resolve, 30));
+
+        // Queued behind other files in the analysis server
+        assert.deepStrictEqual(await quarantine.run('model', '/project/blog/models.py', 'v1', async () => {
+            await wait();
+            return ['Fast'];
+        }), ['Fast']);
+        assert.strictEqual(quarantine.isQuarantined('/project/blog/models.py', 'v1'), false);
+
+        // The server failed and the file is parsed in-process after the wait
+        await quarantine.run('model', '/project/blog/models.py', 'v1', async measure => {
+            await wait();
+            return measure(() => slowParse(30, ['Slow']));
+        });
+        assert.ok(quarantine.isQuarantined('/project/blog/models.py', 'v1'));
+        assert.ok(quarantine.getQuarantinedFiles()[0].durationMs < 60);
+    });
+});
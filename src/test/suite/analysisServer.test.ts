@@ -0,0 +1,112 @@
+import * as assert from 'assert';
+import { createInProcessConnectionPair } from '../../server/connection';
+import { AnalysisServer, AnalysisMethods } from '../../server/analysisServer';
+import { AnalysisServerClient } from '../../services/analysisServerClient';
+import { AdvancedModelAnalyzer } from '../../analyzers/advancedModelAnalyzer';
+import { AnalysisQuarantine } from '../../analyzers/analysisQuarantine';
+
+suite('AnalysisServer Test Suite', () => {
+    let client: AnalysisServerClient;
+    let server: AnalysisServer;
+
+    const modelsCode = `
+from django.db import models
+
+class Author(models.Model):
+    name = models.CharField(max_length=100)
+
+class Book(models.Model):
+    title = models.CharField(max_length=200)
+    author = models.ForeignKey(Author, on_delete=models.CASCADE, related_name='books')
+`;
+
+    setup(async () => {
+        const pair = createInProcessConnectionPair();
+        server = new AnalysisServer(pair.server);
+        server.listen();
+
+        client = new AnalysisServerClient({ extensionPath: __dirname } as any);
+        await client.startWithConnection(pair.client);
+    });
+
+    teardown(async () => {
+        await client.stop();
+    });
+
+    test('completes the initialize handshake', () => {
+        assert.strictEqual(client.getState(), 'running');
+    });
+
+    test('extracts models out of the extension host', async () => {
+        const models = await client.extractModels(modelsCode, '/project/library/models.py');
+
+        assert.deepStrictEqual(models.map(model => model.name), ['Author', 'Book']);
+        const book = models.find(model => model.name === 'Book')!;
+        assert.strictEqual(book.relations[0].toModel, 'Author');
+        assert.strictEqual(book.relations[0].relatedName, 'books');
+    });
+
+    test('parses forms', async () => {
+        const result = await client.parseForms(`
+from django import forms
+
+class ContactForm(forms.Form):
+    email = forms.EmailField()
+`, '/project/contact/forms.py');
+
+        assert.deepStrictEqual(result.forms.map(form => form.name), ['ContactForm']);
+        assert.strictEqual(result.hasUnparsedFormPatterns, false);
+    });
+
+    test('reports server heap and request count', async () => {
+        await client.extractModels(modelsCode, '/project/library/models.py');
+        const status = await client.getStatus();
+
+        assert.strictEqual(status.requestCount, 1);
+        assert.ok(status.heapUsedMB > 0);
+    });
+
+    test('model analyzer uses the server and falls back after it stops', async () => {
+        const analyzer = new AdvancedModelAnalyzer();
+        analyzer.setExtractionBackend(client);
+
+        await analyzer.analyzeModelCode(modelsCode, '/project/library/models.py');
+        assert.ok(analyzer.getModel('Book'));
+        assert.strictEqual((await client.getStatus()).requestCount, 1);
+
+        await client.stop();
+        assert.strictEqual(client.getState(), 'stopped');
+
+        const models = await analyzer.extractModels(modelsCode, '/project/library/models.py');
+        assert.ok(models);
+        assert.deepStrictEqual(models.map(model => model.name), ['Author', 'Book']);
+    });
+
+    test('quarantines a file that hangs the server instead of parsing it in-process', async () => {
+        // A server that completes the handshake but never answers a parse
+        const pair = createInProcessConnectionPair();
+        pair.server.onRequest('initialize', () => ({}));
+        pair.server.onRequest(AnalysisMethods.ExtractModels, () => new Promise(() => undefined));
+        pair.server.listen();
+
+        const hungClient = new AnalysisServerClient({ extensionPath: __dirname } as any);
+        hungClient.setRequestTimeout(50);
+        await hungClient.startWithConnection(pair.client);
+
+        const quarantine = new AnalysisQuarantine();
+        const analyzer = new AdvancedModelAnalyzer(undefined, undefined, quarantine);
+        analyzer.setExtractionBackend(hungClient);
+        assert.strictEqual(await analyzer.extractModels(modelsCode, '/project/library/models.py'), undefined);
+        assert.deepStrictEqual(
+            quarantine.getQuarantinedFiles().map(file => [file.filePath, file.retry]),
+            [['/project/library/models.py', 'timedOut']]
+        );
+
+        // Without a server to ask, other files are parsed in-process
+        await new Promise(resolve => setTimeout(resolve, 10));
+        assert.strictEqual(hungClient.getState(), 'stopped');
+        const models = await analyzer.extractModels(modelsCode, '/project/shop/models.py');
+        assert.deepStrictEqual(models?.map(model => model.name), ['Author', 'Book']);
+        await hungClient.stop();
+    });
+});
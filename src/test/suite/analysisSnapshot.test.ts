@@ -0,0 +1,67 @@
+import * as assert from 'assert';
+import { SnapshotMap } from '../../analyzers/analysisSnapshot';
+import { AdvancedModelAnalyzer } from '../../analyzers/advancedModelAnalyzer';
+
+suite('AnalysisSnapshot Test Suite', () => {
+    test('should publish writes together and share unchanged values', () => {
+        const map = new SnapshotMap<{ name: string }>();
+        const author = { name: 'Author' };
+        map.set('Author', author);
+        map.set('Book', { name: 'Book' });
+
+        const empty = map.getSnapshot();
+        assert.strictEqual(empty.size, 0);
+        assert.strictEqual(map.size, 2);
+
+        const first = map.publish();
+        assert.strictEqual(first.generation, empty.generation + 1);
+        assert.strictEqual(map.publish(), first, 'publishing without writes keeps the snapshot');
+
+        map.delete('Book');
+        map.set('Review', { name: 'Review' });
+        assert.deepStrictEqual(Array.from(first.keys()), ['Author', 'Book']);
+
+        const second = map.publish();
+        assert.deepStrictEqual(Array.from(second.keys()), ['Author', 'Review']);
+        assert.strictEqual(second.get('Author'), first.get('Author'));
+        assert.strictEqual(second.get('Author'), author);
+    });
+
+    test('should keep the published models while a batch runs', async () => {
+        const analyzer = new AdvancedModelAnalyzer();
+        await analyzer.analyzeModelCode(`
+from django.db import models
+
+class Author(models.Model):
+    name = models.CharField(max_length=100)
+`, '/project/authors/models.py');
+
+        const before = analyzer.getSnapshot();
+        const author = before.get('Author')!;
+        const changed: string[][] = [];
+        analyzer.onDidChangeModels(names => changed.push(names));
+
+        await analyzer.batch(async () => {
+            await analyzer.analyzeModelCode(`
+from django.db import models
+
+class Book(models.Model):
+    title = models.CharField(max_length=200)
+    author = models.ForeignKey('Author', on_delete=models.CASCADE)
+`, '/project/books/models.py');
+
+            assert.strictEqual(analyzer.getSnapshot(), before);
+            assert.strictEqual(analyzer.getModel('Book'), undefined);
+            assert.strictEqual(changed.length, 0);
+        });
+
+        const after = analyzer.getSnapshot();
+        assert.ok(after.generation > before.generation);
+        assert.ok(after.get('Book'));
+        assert.ok(after.get('Author')!.fields.some(field => field.name === 'book_set'));
+        // The reverse relation went on a copy; the published model is unchanged
+        assert.ok(!author.fields.some(field => field.name === 'book_set'));
+        assert.strictEqual(changed.length, 1);
+        assert.ok(changed[0].includes('Book'));
+    });
+});
@@ -368,4 +368,44 @@ class TestForm(forms.Form):
         analyzer = new DjangoFormAnalyzer(mockProjectAnalyzer);
         assert.strictEqual(analyzer.getAllForms().length, 0);
     });
+
+    test('should fold problems into the summary until overlapping scans end', async () => {
+        const slowPath = path.join(tempDir, 'slow', 'forms.py');
+        const quickPath = path.join(tempDir, 'quick', 'forms.py');
+        const brokenPath = path.join(tempDir, 'broken', 'forms.py');
+        for (const filePath of [slowPath, quickPath, brokenPath]) {
+            fs.mkdirSync(path.dirname(filePath));
+            fs.writeFileSync(filePath, 'from django import forms\n');
+        }
+
+        let releaseSlow: () => void = () => undefined;
+        const slow = new Promise<void>(resolve => { releaseSlow = resolve; });
+        analyzer.setParseBackend({
+            parseForms: async (_content: string, filePath: string) => {
+                if (filePath === slowPath) {
+                    await slow;
+                }
+                return { forms: [], hasUnparsedFormPatterns: filePath === brokenPath };
+            },
+            forgetFile: () => undefined
+        });
+
+        const originalFindFiles = vscode.workspace.findFiles;
+        vscode.workspace.findFiles = async () => [vscode.Uri.file(slowPath)];
+        try {
+            const workspaceScan = analyzer.scanWorkspace();
+            await new Promise(resolve => setImmediate(resolve));
+            await (analyzer as any).analyzeChangedFiles([quickPath]);
+
+            // The workspace scan still runs, so the problem waits for its summary
+            await analyzer.analyzeFormFile(brokenPath);
+            assert.strictEqual((analyzer as any).reportTimer, undefined);
+
+            releaseSlow();
+            await workspaceScan;
+            assert.ok((analyzer as any).reportedProblems.has(brokenPath));
+        } finally {
+            vscode.workspace.findFiles = originalFindFiles;
+        }
+    });
 });
\ No newline at end of file
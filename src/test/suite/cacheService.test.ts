@@ -0,0 +1,87 @@
+import * as assert from 'assert';
+import * as sinon from 'sinon';
+import { CacheService } from '../../services/cacheService';
+
+suite('CacheService Test Suite', () => {
+    let clock: sinon.SinonFakeTimers;
+    let cache: CacheService;
+
+    setup(() => {
+        clock = sinon.useFakeTimers();
+        cache = new CacheService();
+    });
+
+    teardown(() => {
+        cache.dispose();
+        clock.restore();
+    });
+
+    test('flat API keeps working on the default namespace', () => {
+        cache.set('a', 1);
+        assert.strictEqual(cache.get('a'), 1);
+        assert.strictEqual(cache.has('a'), true);
+
+        cache.clearPrefix('a');
+        assert.strictEqual(cache.has('a'), false);
+    });
+
+    test('namespaces evict independently', () => {
+        const noisy = cache.namespace<number>('noisy', { maxEntries: 2 });
+        const quiet = cache.namespace<number>('quiet', { maxEntries: 2 });
+
+        quiet.set('keep', 1);
+        for (let i = 0; i < 100; i++) {
+            noisy.set(`key${i}`, i);
+        }
+
+        assert.strictEqual(quiet.get('keep'), 1);
+        assert.strictEqual(noisy.size, 2);
+        assert.strictEqual(noisy.getStats().evictions, 98);
+    });
+
+    test('evicts the least recently used entry', () => {
+        const lru = cache.namespace<string>('lru', { maxEntries: 2 });
+        lru.set('a', 'A');
+        lru.set('b', 'B');
+        lru.get('a');
+        lru.set('c', 'C');
+
+        assert.strictEqual(lru.get('b'), undefined);
+        assert.strictEqual(lru.get('a'), 'A');
+        assert.strictEqual(lru.get('c'), 'C');
+    });
+
+    test('expires entries lazily per namespace TTL', () => {
+        const short = cache.namespace<string>('short', { ttl: 1000 });
+        short.set('a', 'A');
+        short.set('b', 'B', 5000);
+
+        clock.tick(1001);
+
+        assert.strictEqual(short.get('a'), undefined);
+        assert.strictEqual(short.get('b'), 'B');
+        assert.strictEqual(short.size, 1);
+        assert.strictEqual(short.getStats().expirations, 1);
+    });
+
+    test('refreshing an entry supersedes its old expiry', () => {
+        const ns = cache.namespace<number>('refresh', { ttl: 1000 });
+        ns.set('a', 1);
+        clock.tick(800);
+        ns.set('a', 2);
+        clock.tick(800);
+
+        assert.strictEqual(ns.get('a'), 2);
+    });
+
+    test('counts hits and misses', () => {
+        const ns = cache.namespace<number>('stats');
+        ns.set('a', 1);
+        ns.get('a');
+        ns.get('missing');
+
+        const stats = cache.getStats().find(s => s.name === 'stats')!;
+        assert.strictEqual(stats.hits, 1);
+        assert.strictEqual(stats.misses, 1);
+    });
+});
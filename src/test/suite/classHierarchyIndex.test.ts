@@ -0,0 +1,185 @@
+import * as assert from 'assert';
+import * as os from 'os';
+import * as path from 'path';
+import * as fs from 'fs';
+import { ClassHierarchyIndex, c3Merge } from '../../analyzers/classHierarchyIndex';
+import { AdvancedModelAnalyzer } from '../../analyzers/advancedModelAnalyzer';
+import { ModelExtractor } from '../../parsers/modelExtractor';
+import { PersistentAnalysisCache } from '../../cache/persistentAnalysisCache';
+import { buildClassSnippet, findTopLevelClasses } from '../../parsers/classRanges';
+
+suite('ClassHierarchyIndex Test Suite', () => {
+    let root: string;
+    let index: ClassHierarchyIndex;
+
+    const write = (relativePath: string, content: string): string => {
+        const filePath = path.join(root, relativePath);
+        fs.mkdirSync(path.dirname(filePath), { recursive: true });
+        fs.writeFileSync(filePath, content);
+        return filePath;
+    };
+
+    const timeStamped = (fields: string) => `
+from django.db import models
+
+class TimeStamped(models.Model):
+${fields}
+    class Meta:
+        abstract = True
+`;
+
+    setup(() => {
+        root = fs.mkdtempSync(path.join(os.tmpdir(), 'class-hierarchy-'));
+        index = new ClassHierarchyIndex();
+        index.addSourceRoot(root);
+    });
+
+    teardown(() => {
+        index.dispose();
+        fs.rmSync(root, { recursive: true, force: true });
+    });
+
+    test('should linearize diamonds like Python', () => {
+        index.updateFile(path.join(root, 'shapes.py'), `
+class Base:
+    def area(self):
+        pass
+
+class Left(Base):
+    def area(self):
+        pass
+
+class Right(Base):
+    sides = 4
+
+class Square(Left, Right):
+    pass
+`);
+
+        assert.deepStrictEqual(index.getMro('shapes.Square'), ['shapes.Square', 'shapes.Left', 'shapes.Right', 'shapes.Base']);
+        assert.deepStrictEqual(
+            index.getInheritedMembers('shapes.Square').map(member => `${member.owner}.${member.name}`),
+            ['shapes.Left.area', 'shapes.Right.sides']
+        );
+        assert.strictEqual(c3Merge([['A', 'B'], ['B', 'A'], ['A', 'B']]), undefined);
+    });
+
+    test('should resolve bases imported from other modules and invalidate descendants only', () => {
+        write('core/__init__.py', 'from .models import TimeStamped\n');
+        const core = write('core/models.py', timeStamped('    created = models.DateTimeField(auto_now_add=True)\n'));
+        write('core/mixins.py', `
+class SlugMixin:
+    @property
+    def slug(self):
+        return ''
+`);
+        const blog = write('blog/models.py', `
+from django.db import models
+from core import TimeStamped
+from core.mixins import SlugMixin as Sluggable
+
+class Post(Sluggable, TimeStamped):
+    title = models.CharField(max_length=100)
+
+class Tag(models.Model):
+    name = models.CharField(max_length=50)
+`);
+        index.updateFile(blog, fs.readFileSync(blog, 'utf8'));
+
+        assert.deepStrictEqual(index.getMro('blog.models.Post'), [
+            'blog.models.Post', 'core.mixins.SlugMixin', 'core.models.TimeStamped', 'django.db.models.Model'
+        ]);
+        assert.deepStrictEqual(index.getDescendants('core.models.TimeStamped'), ['blog.models.Post']);
+
+        write('core/models.py', timeStamped('    created = models.DateTimeField(auto_now_add=True)\n    updated = models.DateTimeField(auto_now=True)\n'));
+        const change = index.refreshFile(core);
+        assert.deepStrictEqual(change?.classes.sort(), ['blog.models.Post', 'core.models.TimeStamped']);
+        assert.ok(index.getInheritedMembers('blog.models.Post').some(member => member.name === 'updated'));
+    });
+
+    test('should give models the members of bases in other apps', async () => {
+        const core = write('core/models.py', timeStamped('    created = models.DateTimeField(auto_now_add=True)\n'));
+        const blog = write('blog/models.py', `
+from django.db import models
+from core.models import TimeStamped
+
+class Post(TimeStamped):
+    title = models.CharField(max_length=100)
+`);
+        const analyzer = new AdvancedModelAnalyzer(undefined, undefined, undefined, index);
+
+        // The base is analyzed after the model deriving from it
+        await analyzer.analyzeModelCode(fs.readFileSync(blog, 'utf8'), blog);
+        assert.ok(analyzer.getModel('Post'));
+        await analyzer.analyzeModelCode(fs.readFileSync(core, 'utf8'), core);
+        assert.deepStrictEqual(analyzer.getModel('Post')!.fields.map(field => field.name), ['title', 'created']);
+
+        const changed: string[] = [];
+        analyzer.onDidChangeModels(names => changed.push(...names));
+        await analyzer.analyzeModelCode(timeStamped('    modified = models.DateTimeField(auto_now=True)\n'), core);
+        assert.deepStrictEqual(analyzer.getModel('Post')!.fields.map(field => field.name), ['title', 'modified']);
+        assert.ok(changed.includes('Post'));
+    });
+
+    test('should parse a model with a base in another module once and cache it with its bases', async () => {
+        write('core/models.py', timeStamped('    created = models.DateTimeField(auto_now_add=True)\n'));
+        const blog = write('blog/models.py', `
+from django.db import models
+from core.models import TimeStamped
+
+class Post(TimeStamped):
+    title = models.CharField(max_length=100)
+`);
+        const requests: (string[] | undefined)[] = [];
+        const extractor = new ModelExtractor();
+        const backend = {
+            extractModels: async (code: string, filePath: string, modelBases?: string[]) => {
+                requests.push(modelBases);
+                return extractor.extractModels(code, filePath, modelBases);
+            }
+        };
+        const cache = new PersistentAnalysisCache<any>(path.join(root, '.cache'), root);
+
+        const analyzer = new AdvancedModelAnalyzer(undefined, undefined, undefined, index);
+        analyzer.setExtractionBackend(backend);
+        analyzer.setPersistentCache(cache);
+        await analyzer.analyzeModelCode(fs.readFileSync(blog, 'utf8'), blog);
+        assert.deepStrictEqual(requests, [['TimeStamped']]);
+        assert.ok(analyzer.getModel('Post'));
+
+        // A later session restores the file from the cache without parsing
+        const restoredIndex = new ClassHierarchyIndex();
+        restoredIndex.addSourceRoot(root);
+        const restored = new AdvancedModelAnalyzer(undefined, undefined, undefined, restoredIndex);
+        restored.setExtractionBackend(backend);
+        restored.setPersistentCache(cache);
+        await restored.analyzeModelCode(fs.readFileSync(blog, 'utf8'), blog);
+        assert.strictEqual(requests.length, 1);
+        assert.ok(restored.getModel('Post'));
+    });
+
+    test('should keep a model with a base in another module while its buffer is edited', async () => {
+        const core = write('core/models.py', timeStamped('    created = models.DateTimeField(auto_now_add=True)\n'));
+        const blogContent = `
+from django.db import models
+from core.models import TimeStamped
+
+class Post(TimeStamped):
+    title = models.CharField(max_length=100)
+
+class Tag(models.Model):
+    name = models.CharField(max_length=50)
+`;
+        const blog = write('blog/models.py', blogContent);
+        const analyzer = new AdvancedModelAnalyzer(undefined, undefined, undefined, index);
+        await analyzer.analyzeModelCode(fs.readFileSync(core, 'utf8'), core);
+        await analyzer.analyzeModelCode(blogContent, blog);
+
+        const edited = blogContent.replace('title = models.CharField(max_length=100)', 'headline = models.CharField(max_length=100)');
+        const snippet = buildClassSnippet(edited, findTopLevelClasses(edited), ['Post']);
+        await analyzer.patchModelClasses(blog, snippet, ['Post'], edited);
+
+        assert.deepStrictEqual(analyzer.getModel('Post')?.fields.map(field => field.name), ['headline', 'created']);
+        assert.ok(analyzer.getModel('Tag'));
+    });
+});
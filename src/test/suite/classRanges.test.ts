@@ -0,0 +1,84 @@
+import * as assert from 'assert';
+import { AdvancedModelAnalyzer } from '../../analyzers/advancedModelAnalyzer';
+import { buildClassSnippet, classesTouchedBy, findTopLevelClasses, recordLineChange } from '../../parsers/classRanges';
+
+suite('Class Ranges Test Suite', () => {
+    const content = [
+        'from django.db import models',        // 0
+        '',                                    // 1
+        'class Base(models.Model):',           // 2
+        '    created = models.DateTimeField()',// 3
+        '',                                    // 4
+        '    class Meta:',                     // 5
+        '        abstract = True',             // 6
+        '',                                    // 7
+        '@register',                           // 8
+        'class Post(Base):',                   // 9
+        '    title = models.CharField(max_length=200)', // 10
+        '',                                    // 11
+        'class Tag(models.Model):',            // 12
+        '    name = models.CharField(max_length=50)'  // 13
+    ].join('\n');
+
+    test('should find top-level classes with their decorators', () => {
+        const classes = findTopLevelClasses(content);
+        assert.deepStrictEqual(
+            classes.map(cls => [cls.name, cls.startLine, cls.endLine]),
+            [['Base', 2, 7], ['Post', 8, 11], ['Tag', 12, 13]]
+        );
+        assert.deepStrictEqual(classes[1].bases, ['Base']);
+    });
+
+    test('should shift dirty spans by inserted and removed lines', () => {
+        let spans = recordLineChange([], 10, 10, 'x');
+        assert.deepStrictEqual(spans, [[10, 10]]);
+
+        // Two lines inserted above move the earlier span down
+        spans = recordLineChange(spans, 3, 3, '\n\n');
+        assert.deepStrictEqual(spans, [[12, 12], [3, 5]]);
+
+        // Removing lines 4-5 pulls it back up
+        spans = recordLineChange(spans, 4, 6, '');
+        assert.deepStrictEqual(spans[0], [10, 10]);
+    });
+
+    test('should map spans to the classes they touch', () => {
+        const classes = findTopLevelClasses(content);
+        const inside = classesTouchedBy(classes, [[10, 10]]);
+        assert.deepStrictEqual(inside.classes.map(cls => cls.name), ['Post']);
+        assert.strictEqual(inside.outside, false);
+
+        assert.strictEqual(classesTouchedBy(classes, [[0, 0]]).outside, true);
+    });
+
+    test('should keep imports, base classes and line numbers in snippets', () => {
+        const classes = findTopLevelClasses(content);
+        const lines = buildClassSnippet(content, classes, ['Post']).split('\n');
+        assert.strictEqual(lines.length, 14);
+        assert.strictEqual(lines[0], 'from django.db import models');
+        assert.strictEqual(lines[2], 'class Base(models.Model):');
+        assert.strictEqual(lines[9], 'class Post(Base):');
+        assert.strictEqual(lines[12], '');
+    });
+
+    test('should patch only the changed models of a file', async () => {
+        const analyzer = new AdvancedModelAnalyzer();
+        await analyzer.analyzeModelCode(content, '/project/blog/models.py');
+        const tag = analyzer.getModel('Tag');
+        assert.ok(tag);
+
+        const edited = content.replace('title = models.CharField(max_length=200)', 'headline = models.CharField(max_length=200)');
+        const classes = findTopLevelClasses(edited);
+        await analyzer.patchModelClasses('/project/blog/models.py', buildClassSnippet(edited, classes, ['Post']), ['Post']);
+
+        const fieldNames = analyzer.getModel('Post')!.fields.map(field => field.name);
+        assert.ok(fieldNames.includes('headline'));
+        assert.ok(!fieldNames.includes('title'));
+        // Untouched models are kept as they are
+        assert.strictEqual(analyzer.getModel('Tag'), tag);
+
+        // Closing without saving goes back to the file on disk
+        await analyzer.analyzeModelCode(content, '/project/blog/models.py');
+        assert.ok(analyzer.getModel('Post')!.fields.some(field => field.name === 'title'));
+    });
+});
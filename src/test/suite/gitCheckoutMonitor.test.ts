@@ -0,0 +1,98 @@
+import * as assert from 'assert';
+import * as path from 'path';
+import * as fs from 'fs';
+import * as os from 'os';
+import { GitCheckoutMonitor, CheckoutEvent } from '../../analyzers/gitCheckoutMonitor';
+import { DebouncedTaskExecutor } from '../../workers/analysisWorkerPool';
+
+suite('GitCheckoutMonitor Test Suite', () => {
+    const MAIN = 'a'.repeat(40);
+    const FEATURE = 'b'.repeat(40);
+
+    let tempDir: string;
+    let monitor: GitCheckoutMonitor;
+
+    const writeGitFile = (relativePath: string, content: string) => {
+        const filePath = path.join(tempDir, '.git', relativePath);
+        fs.mkdirSync(path.dirname(filePath), { recursive: true });
+        fs.writeFileSync(filePath, content);
+    };
+
+    setup(() => {
+        tempDir = fs.mkdtempSync(path.join(os.tmpdir(), 'git-checkout-test-'));
+        writeGitFile('HEAD', 'ref: refs/heads/main\n');
+        writeGitFile('refs/heads/main', `${MAIN}\n`);
+        writeGitFile('packed-refs', `# pack-refs with: peeled\n${FEATURE} refs/heads/feature\n`);
+
+        monitor = new GitCheckoutMonitor();
+        monitor.initialize([tempDir]);
+    });
+
+    teardown(() => {
+        monitor.dispose();
+        fs.rmSync(tempDir, { recursive: true, force: true });
+    });
+
+    test('should resolve HEAD through loose and packed refs', () => {
+        const modelsPath = path.join(tempDir, 'blog', 'models.py');
+        assert.strictEqual(monitor.getHead(modelsPath), MAIN);
+
+        writeGitFile('HEAD', 'ref: refs/heads/feature\n');
+        monitor.refresh();
+        monitor.finishSwitch();
+        assert.strictEqual(monitor.getHead(modelsPath), FEATURE);
+
+        assert.strictEqual(monitor.getHead(path.join(os.tmpdir(), 'elsewhere.py')), undefined);
+    });
+
+    test('should defer files during a switch and deliver them in one batch', () => {
+        const modelsPath = path.join(tempDir, 'blog', 'models.py');
+        assert.strictEqual(monitor.defer(modelsPath), false);
+
+        const events: CheckoutEvent[] = [];
+        monitor.onDidFinishSwitch(event => events.push(event));
+
+        writeGitFile('HEAD', 'ref: refs/heads/feature\n');
+        monitor.refresh();
+        assert.ok(monitor.isSwitching());
+        assert.strictEqual(monitor.defer(modelsPath), true);
+        assert.strictEqual(monitor.defer(modelsPath), true);
+
+        monitor.finishSwitch();
+        assert.strictEqual(monitor.isSwitching(), false);
+        assert.strictEqual(events.length, 1);
+        assert.deepStrictEqual(events[0].changedFiles, [modelsPath]);
+        assert.strictEqual(events[0].previousHead, MAIN);
+        assert.strictEqual(events[0].head, FEATURE);
+    });
+
+    test('should restore results of a recently checked out commit', () => {
+        const modelsPath = path.join(tempDir, 'blog', 'models.py');
+        const cache = monitor.createSnapshotCache<string[]>();
+        cache.set(modelsPath, 'class Post', ['Post']);
+
+        writeGitFile('HEAD', 'ref: refs/heads/feature\n');
+        monitor.refresh();
+        monitor.finishSwitch();
+        assert.strictEqual(cache.get(modelsPath, 'class Post'), undefined);
+
+        writeGitFile('HEAD', 'ref: refs/heads/main\n');
+        monitor.refresh();
+        monitor.finishSwitch();
+        assert.deepStrictEqual(cache.get(modelsPath, 'class Post'), ['Post']);
+        // Uncommitted changes are never served from the snapshot
+        assert.strictEqual(cache.get(modelsPath, 'class Post2'), undefined);
+        assert.strictEqual(monitor.getStatus().snapshotHits, 1);
+    });
+
+    test('should run one task for all batched items', async () => {
+        const executor = new DebouncedTaskExecutor(10);
+        const batches: string[][] = [];
+        ['a.py', 'b.py', 'a.py'].forEach(item => executor.executeBatched('files', item, items => {
+            batches.push(items);
+        }));
+
+        await new Promise(resolve => setTimeout(resolve, 50));
+        assert.deepStrictEqual(batches, [['a.py', 'b.py']]);
+    });
+});
@@ -0,0 +1,71 @@
+import * as assert from 'assert';
+import * as vscode from 'vscode';
+import { LazyCompletionItem, StaticCompletionItems, resolveLazyCompletionItem } from '../../providers/lazyCompletion';
+import { EnhancedCompletionProvider } from '../../providers/enhancedCompletionProvider';
+
+suite('Lazy Completion Test Suite', () => {
+    test('should resolve details once from the item id', () => {
+        let lookups = 0;
+        const item = new LazyCompletionItem('title', vscode.CompletionItemKind.Field, 'Post.title');
+        assert.strictEqual(item.detail, undefined);
+
+        const resolve = (id: string) => {
+            lookups++;
+            return { detail: `${id} detail`, documentation: 'docs' };
+        };
+        resolveLazyCompletionItem(item, resolve);
+        resolveLazyCompletionItem(item, resolve);
+
+        assert.strictEqual(item.detail, 'Post.title detail');
+        assert.strictEqual(item.documentation, 'docs');
+        assert.strictEqual(lookups, 1);
+    });
+
+    test('should build static items once', () => {
+        let builds = 0;
+        const items = new StaticCompletionItems(() => {
+            builds++;
+            return [new vscode.CompletionItem('all', vscode.CompletionItemKind.Method)];
+        });
+
+        assert.strictEqual(items.get(), items.get());
+        assert.strictEqual(builds, 1);
+    });
+
+    test('should fill in field lookup details only on resolve', async () => {
+        const post = {
+            name: 'Post',
+            fields: [{ name: 'title', type: 'CharField', helpText: 'Headline' }],
+            methods: [],
+            properties: [],
+            managers: []
+        };
+        const analyzer = {
+            getAllModels: () => ({ Post: post }),
+            getModel: (name: string) => name === 'Post' ? post : undefined,
+            getFieldLookups: () => ['icontains']
+        };
+        const provider = new EnhancedCompletionProvider(analyzer as any);
+        const document = {
+            uri: vscode.Uri.file('/project/blog/views.py'),
+            lineAt: () => ({ text: 'Post.objects.filter(' })
+        } as any;
+
+        const items = await provider.provideCompletionItems(
+            document,
+            new vscode.Position(0, 20),
+            new vscode.CancellationTokenSource().token,
+            { triggerKind: vscode.CompletionTriggerKind.Invoke, triggerCharacter: undefined }
+        );
+        const lookup = items.find(item => item.label === 'title__icontains')!;
+        assert.strictEqual(lookup.detail, undefined);
+
+        provider.resolveCompletionItem(lookup);
+        assert.strictEqual(lookup.detail, 'CharField lookup');
+        assert.strictEqual((lookup.documentation as vscode.MarkdownString).value, 'Filter by title using icontains lookup');
+
+        const field = provider.resolveCompletionItem(items.find(item => item.label === 'title')!);
+        assert.strictEqual(field.detail, 'CharField field');
+        assert.strictEqual((field.documentation as vscode.MarkdownString).value, 'Headline');
+    });
+});
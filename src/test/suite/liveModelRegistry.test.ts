@@ -0,0 +1,120 @@
+import * as assert from 'assert';
+import { AdvancedModelAnalyzer } from '../../analyzers/advancedModelAnalyzer';
+import { LiveModelRegistry, RegistryDump, RegistryModel, fromRegistryDump } from '../../analyzers/liveModelRegistry';
+import { PythonExecutor } from '../../pythonIntegration';
+
+suite('Live Model Registry Test Suite', () => {
+    const registryModel = (overrides: Partial<RegistryModel>): RegistryModel => ({
+        name: 'Post',
+        app: 'blog',
+        module: 'blog.models',
+        filePath: '/project/blog/models.py',
+        abstract: false,
+        proxy: false,
+        dbTable: 'blog_post',
+        ordering: [],
+        bases: ['TimestampedMixin', 'Model'],
+        fields: [
+            { name: 'id', type: 'BigAutoField', required: false },
+            { name: 'title', type: 'CharField', required: true, maxLength: 200 },
+            // Contributed by a mixin defined in another module
+            { name: 'created', type: 'DateTimeField', required: false }
+        ],
+        reverse: [{ name: 'comments', relatedModel: 'Comment', multiple: true, fieldName: 'post' }],
+        relations: [],
+        managers: [{ name: 'objects', type: 'PublishedManager', methods: ['published'] }],
+        methods: [{ name: 'summary', isProperty: true, isClassMethod: false, isStaticMethod: false, parameters: [] }],
+        ...overrides
+    });
+
+    const dump: RegistryDump = {
+        djangoVersion: '4.2.1',
+        models: [
+            registryModel({}),
+            registryModel({ name: 'Post', app: 'legacy', filePath: '/venv/lib/site-packages/legacy/models.py', fields: [] }),
+            registryModel({
+                name: 'User',
+                app: 'auth',
+                filePath: '/venv/lib/site-packages/django/contrib/auth/models.py',
+                swappable: 'AUTH_USER_MODEL',
+                fields: [{ name: 'username', type: 'CharField', required: true }],
+                reverse: [],
+                managers: [{ name: 'objects', type: 'UserManager', methods: ['create_user'] }],
+                methods: []
+            })
+        ]
+    };
+
+    test('should read the dump after output printed by settings', () => {
+        const stdout = `Loading local settings\nDJANGO_POWER_TOOLS_REGISTRY:${JSON.stringify(dump)}\n`;
+        assert.strictEqual(LiveModelRegistry.parseOutput(stdout).djangoVersion, '4.2.1');
+        assert.throws(() => LiveModelRegistry.parseOutput('Traceback (most recent call last):'));
+    });
+
+    test('should convert registry models and prefer project models', () => {
+        const models = fromRegistryDump(dump, '/project');
+        assert.deepStrictEqual(models.map(model => model.name), ['Post', 'User']);
+
+        const post = models[0];
+        assert.strictEqual(post.app, 'blog');
+        assert.ok(post.fields.some(field => field.name === 'created'));
+        const comments = post.fields.find(field => field.name === 'comments');
+        assert.strictEqual(comments?.type, 'RelatedManager');
+        assert.ok(post.managers.some(manager => manager.name === 'comments'));
+        assert.ok(post.properties.includes('summary'));
+        assert.ok(post.methods.some(method => method.name === 'save'));
+        assert.strictEqual(models[1].meta?.swappable, 'AUTH_USER_MODEL');
+    });
+
+    test('should merge the registry over parsed models', async () => {
+        const analyzer = new AdvancedModelAnalyzer();
+        await analyzer.analyzeModelCode([
+            'from django.db import models',
+            '',
+            'class Post(TimestampedMixin, models.Model):',
+            '    title = models.CharField(max_length=200)',
+            '    draft = models.BooleanField(default=False)'
+        ].join('\n'), '/project/blog/models.py');
+
+        await analyzer.setLiveModels(fromRegistryDump(dump, '/project'));
+
+        const post = analyzer.getModel('Post')!;
+        const fieldNames = post.fields.map(field => field.name);
+        // Mixin field from the registry, unsaved field from the parser
+        assert.ok(fieldNames.includes('created'));
+        assert.ok(fieldNames.includes('draft'));
+        assert.strictEqual(post.managers.find(manager => manager.name === 'objects')?.type, 'PublishedManager');
+        assert.strictEqual(analyzer.isExternalModel('Post'), false);
+
+        // Models no workspace file defines come from the registry alone
+        assert.ok(analyzer.getModel('User'));
+        assert.strictEqual(analyzer.isExternalModel('User'), true);
+
+        await analyzer.setLiveModels([]);
+        assert.strictEqual(analyzer.getModel('User'), undefined);
+        assert.ok(!analyzer.getModel('Post')!.fields.some(field => field.name === 'created'));
+    });
+
+    test('should kill a dump that hangs and refresh again later', async () => {
+        // Node stands in for an interpreter stuck in django.setup()
+        const executor = new PythonExecutor({ getCurrentPythonPath: () => process.execPath } as any);
+        const hang = () => executor.execute(['-e', 'setInterval(() => {}, 1000)'], undefined, 100);
+        await assert.rejects(hang(), /did not finish within 100ms/);
+
+        let dumps = 0;
+        const pythonExecutor = {
+            getCurrentPythonPath: () => 'python',
+            execute: () => {
+                dumps++;
+                return hang();
+            }
+        };
+        const registry = new LiveModelRegistry(pythonExecutor as any, new AdvancedModelAnalyzer(), { getProjectRoot: () => '/project' } as any);
+
+        await registry.refresh();
+        assert.match(registry.getStatus().lastError || '', /did not finish/);
+        await registry.refresh();
+        assert.strictEqual(dumps, 2);
+        registry.dispose();
+    });
+});
@@ -0,0 +1,80 @@
+import * as assert from 'assert';
+import { MemoryBudgetManager, MemoryConsumer, MemoryTier } from '../../cache/memoryBudgetManager';
+
+suite('MemoryBudgetManager Test Suite', () => {
+    const MB = 1024 * 1024;
+    const heapLimit = 1000 * MB;
+
+    function createConsumer(name: string, tier: MemoryTier, megabytes: number): MemoryConsumer & { shedCount: number } {
+        let bytes = megabytes * MB;
+        return {
+            name,
+            tier,
+            shedCount: 0,
+            cost: () => bytes,
+            shed() {
+                bytes = 0;
+                this.shedCount++;
+            }
+        };
+    }
+
+    test('should shed the least valuable tiers first until within budget', () => {
+        const manager = new MemoryBudgetManager();
+        manager.configure({ budgetMB: 120 });
+        const analysis = createConsumer('analysis', 'analysis', 70);
+        const content = createConsumer('content', 'content', 40);
+        const smallTransient = createConsumer('small', 'transient', 5);
+        const largeTransient = createConsumer('large', 'transient', 20);
+        const consumers = [analysis, content, smallTransient, largeTransient];
+        consumers.forEach(consumer => manager.register(consumer));
+
+        // 135 MB: the largest transient cache is enough
+        assert.strictEqual(manager.check(0, heapLimit), 20 * MB);
+        assert.deepStrictEqual(consumers.map(consumer => consumer.shedCount), [0, 0, 0, 1]);
+        assert.strictEqual(manager.check(0, heapLimit), 0);
+
+        // 115 MB: all transient caches are not enough, so file contents go too
+        manager.configure({ budgetMB: 80 });
+        assert.strictEqual(manager.check(0, heapLimit), 45 * MB);
+        assert.deepStrictEqual(consumers.map(consumer => consumer.shedCount), [0, 1, 1, 1]);
+
+        const usage = manager.getStatus().consumers.find(consumer => consumer.name === 'content')!;
+        assert.deepStrictEqual([usage.bytes, usage.sheds], [0, 1]);
+    });
+
+    test('should shed one whole tier per check under heap pressure', () => {
+        const manager = new MemoryBudgetManager();
+        manager.configure({ budgetMB: 100, pressureRatio: 0.8 });
+        const content = createConsumer('content', 'content', 10);
+        const transient = createConsumer('transient', 'transient', 1);
+        manager.register(content);
+        manager.register(transient);
+
+        manager.check(900 * MB, heapLimit);
+        assert.deepStrictEqual([transient.shedCount, content.shedCount], [1, 0]);
+
+        manager.check(900 * MB, heapLimit);
+        assert.deepStrictEqual([transient.shedCount, content.shedCount], [1, 1]);
+    });
+
+    test('should report being over budget until a shed is done', () => {
+        const manager = new MemoryBudgetManager();
+        manager.configure({ budgetMB: 10 });
+        const cache = createConsumer('cache', 'transient', 20);
+        let overBudgetWhileShedding = false;
+        manager.register({
+            ...cache,
+            shed() {
+                cache.shed();
+                overBudgetWhileShedding = manager.isOverBudget(0, heapLimit);
+            }
+        });
+
+        assert.strictEqual(manager.isOverBudget(0, heapLimit), true);
+        manager.check(0, heapLimit);
+        assert.strictEqual(overBudgetWhileShedding, true);
+        assert.strictEqual(manager.isOverBudget(0, heapLimit), false);
+        assert.strictEqual(manager.isOverBudget(900 * MB, heapLimit), true);
+    });
+});
@@ -0,0 +1,100 @@
+import * as assert from 'assert';
+import * as path from 'path';
+import * as fs from 'fs';
+import * as os from 'os';
+import { AdvancedModelAnalyzer } from '../../analyzers/advancedModelAnalyzer';
+import { ModelDependencyGraph, ModelDependent } from '../../analyzers/modelDependencyGraph';
+import { DjangoFormAnalyzer } from '../../analyzers/djangoFormAnalyzer';
+
+suite('ModelDependencyGraph Test Suite', () => {
+    let modelAnalyzer: AdvancedModelAnalyzer;
+    let graph: ModelDependencyGraph;
+    let invalidated: ModelDependent[][];
+
+    const modelsCode = `
+from django.db import models
+
+class Article(models.Model):
+    title = models.CharField(max_length=200)
+
+class Tag(models.Model):
+    name = models.CharField(max_length=50)
+`;
+
+    setup(() => {
+        modelAnalyzer = new AdvancedModelAnalyzer();
+        graph = new ModelDependencyGraph(modelAnalyzer);
+        invalidated = [];
+        graph.onDidInvalidate(dependents => invalidated.push(dependents));
+    });
+
+    teardown(() => {
+        graph.dispose();
+    });
+
+    test('notifies only the dependents of changed models', async () => {
+        await modelAnalyzer.analyzeModelCode(modelsCode, '/project/blog/models.py');
+        graph.setDependencies('admin', 'ArticleAdmin', ['Article']);
+        graph.setDependencies('form', 'TagForm', ['Tag']);
+
+        await modelAnalyzer.analyzeModelCode(
+            modelsCode.replace('max_length=200)', 'max_length=200)\n    body = models.TextField()'),
+            '/project/blog/models.py'
+        );
+
+        assert.deepStrictEqual(invalidated, [[{ kind: 'admin', name: 'ArticleAdmin' }]]);
+    });
+
+    test('notifies dependents when a model is removed', async () => {
+        await modelAnalyzer.analyzeModelCode(modelsCode, '/project/blog/models.py');
+        graph.setDependencies('view', 'views.py#TagListView', ['Tag']);
+
+        await modelAnalyzer.analyzeModelCode(modelsCode.split('class Tag')[0], '/project/blog/models.py');
+
+        assert.strictEqual(modelAnalyzer.getModel('Tag'), undefined);
+        assert.deepStrictEqual(invalidated, [[{ kind: 'view', name: 'views.py#TagListView' }]]);
+    });
+
+    test('replacing dependencies drops the old edges', () => {
+        graph.setDependencies('form', 'ArticleForm', ['Article']);
+        graph.setDependencies('form', 'ArticleForm', ['Tag']);
+
+        assert.deepStrictEqual(graph.getDependents('Article'), []);
+        assert.deepStrictEqual(graph.getDependents('Tag'), [{ kind: 'form', name: 'ArticleForm' }]);
+    });
+
+    test('ModelForm fields are cached until the model changes', async () => {
+        const modelInfo: any = {
+            Article: { name: 'Article', fields: [{ name: 'title', type: 'CharField', required: true }] }
+        };
+        const projectAnalyzer = { getModelInfo: async () => modelInfo } as any;
+        const formAnalyzer = new DjangoFormAnalyzer(projectAnalyzer, graph);
+
+        const tempDir = fs.mkdtempSync(path.join(os.tmpdir(), 'model-dependency-graph-test-'));
+        try {
+            const formPath = path.join(tempDir, 'forms.py');
+            fs.writeFileSync(formPath, `
+from django import forms
+
+class ArticleForm(forms.ModelForm):
+    class Meta:
+        model = Article
+        fields = '__all__'
+`);
+            await formAnalyzer.analyzeFormFile(formPath);
+
+            const first = await formAnalyzer.getModelFormFields('ArticleForm');
+            assert.deepStrictEqual(first.map(f => f.name), ['title']);
+
+            modelInfo.Article.fields.push({ name: 'body', type: 'TextField', required: true });
+            assert.strictEqual(await formAnalyzer.getModelFormFields('ArticleForm'), first);
+
+            graph.invalidateModels(['Article']);
+            const refreshed = await formAnalyzer.getModelFormFields('ArticleForm');
+            assert.deepStrictEqual(refreshed.map(f => f.name), ['title', 'body']);
+        } finally {
+            formAnalyzer.dispose();
+            fs.rmSync(tempDir, { recursive: true, force: true });
+        }
+    });
+});
@@ -0,0 +1,107 @@
+import * as assert from 'assert';
+import * as os from 'os';
+import * as path from 'path';
+import * as fs from 'fs';
+import { ModelLocator, findClassNames } from '../../analyzers/modelLocator';
+import { PersistentAnalysisCache } from '../../cache/persistentAnalysisCache';
+
+suite('ModelLocator Test Suite', () => {
+    const files: { [filePath: string]: string } = {
+        '/project/blog/models.py': `
+from django.db import models
+
+class Post(models.Model):
+    class Meta:
+        ordering = ['-id']
+
+class Comment(models.Model):
+    pass
+`,
+        '/project/shop/models.py': `
+class Product(models.Model):
+    pass
+
+class Post(Product):
+    pass
+`
+    };
+
+    test('should find top-level class names only', () => {
+        assert.deepStrictEqual(findClassNames(files['/project/blog/models.py']), ['Post', 'Comment']);
+    });
+
+    test('should scan files on the first lookup and after changes', async () => {
+        const reads: string[] = [];
+        const locator = new ModelLocator(async filePath => {
+            reads.push(filePath);
+            return files[filePath];
+        });
+        locator.addFiles(Object.keys(files));
+        assert.strictEqual(reads.length, 0);
+
+        assert.deepStrictEqual(await locator.locate('Post'), ['/project/blog/models.py', '/project/shop/models.py']);
+        assert.deepStrictEqual(await locator.locate('Product'), ['/project/shop/models.py']);
+        assert.deepStrictEqual(await locator.locate('Missing'), []);
+        assert.strictEqual(reads.length, 2);
+
+        locator.updateFile('/project/shop/models.py', 'class Order(models.Model):\n    pass\n');
+        assert.deepStrictEqual(await locator.locate('Post'), ['/project/blog/models.py']);
+        assert.deepStrictEqual(await locator.locate('Order'), ['/project/shop/models.py']);
+
+        locator.removeFile('/project/blog/models.py');
+        assert.deepStrictEqual(await locator.locate('Post'), []);
+        assert.strictEqual(reads.length, 2);
+    });
+
+    test('should keep analysis results between sessions by content', async () => {
+        const directory = fs.mkdtempSync(path.join(os.tmpdir(), 'analysis-cache-'));
+        try {
+            const cache = new PersistentAnalysisCache<string[]>(directory, '/project');
+            await cache.load();
+            cache.setWithHash('/project/blog/models.py', 'v1', ['Post', 'Comment']);
+            await cache.flush();
+
+            const restored = new PersistentAnalysisCache<string[]>(directory, '/project');
+            assert.strictEqual(await restored.load(), 1);
+            assert.deepStrictEqual(restored.getIfValid('/project/blog/models.py', 'v1'), ['Post', 'Comment']);
+            assert.strictEqual(restored.getIfValid('/project/blog/models.py', 'v2'), undefined);
+
+            const otherProject = new PersistentAnalysisCache<string[]>(directory, '/other');
+            assert.strictEqual(await otherProject.load(), 0);
+        } finally {
+            fs.rmSync(directory, { recursive: true, force: true });
+        }
+    });
+
+    test('should keep changes made while a lookup reads files', async () => {
+        let release: () => void = () => undefined;
+        const reading = new Promise<void>(resolve => { release = resolve; });
+        const locator = new ModelLocator(async filePath => {
+            await reading;
+            return files[filePath];
+        });
+        locator.addFiles(Object.keys(files));
+
+        const lookup = locator.locate('Order');
+        locator.updateFile('/project/shop/models.py', 'class Order(models.Model):\n    pass\n');
+        release();
+
+        assert.deepStrictEqual(await lookup, ['/project/shop/models.py']);
+        assert.deepStrictEqual(await locator.locate('Product'), []);
+    });
+
+    test('should write pending entries synchronously on shutdown', async () => {
+        const directory = fs.mkdtempSync(path.join(os.tmpdir(), 'analysis-cache-'));
+        try {
+            const cache = new PersistentAnalysisCache<string[]>(directory, '/project');
+            await cache.load();
+            cache.setWithHash('/project/blog/models.py', 'v1', ['Post']);
+            cache.flushSync();
+
+            const restored = new PersistentAnalysisCache<string[]>(directory, '/project');
+            assert.strictEqual(await restored.load(), 1);
+        } finally {
+            fs.rmSync(directory, { recursive: true, force: true });
+        }
+    });
+});
\ No newline at end of file
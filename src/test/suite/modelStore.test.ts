@@ -0,0 +1,130 @@
+import * as assert from 'assert';
+import { ModelStore } from '../../analyzers/modelStore';
+import { AdvancedModelAnalyzer } from '../../analyzers/advancedModelAnalyzer';
+import { createTestDjangoProjectAnalyzer } from '../container/testContainer';
+import { InMemoryFileSystem } from '../utils/mockHelpers';
+
+suite('ModelStore Test Suite', () => {
+    const modelsCode = `
+from django.db import models
+
+class Author(models.Model):
+    name = models.CharField(max_length=100)
+
+    def get_absolute_url(self):
+        return '/authors/'
+
+class Book(models.Model):
+    title = models.CharField(max_length=200)
+    author = models.ForeignKey(Author, on_delete=models.CASCADE)
+
+    def get_absolute_url(self):
+        return '/books/'
+`;
+
+    test('models share frozen default and identical methods', async () => {
+        const analyzer = new AdvancedModelAnalyzer(new ModelStore());
+        await analyzer.analyzeModelCode(modelsCode, '/project/library/models.py');
+
+        const author = analyzer.getModel('Author')!;
+        const book = analyzer.getModel('Book')!;
+        const save = author.methods.find(m => m.name === 'save')!;
+
+        assert.ok(Object.isFrozen(save));
+        assert.strictEqual(book.methods.find(m => m.name === 'save'), save);
+        assert.strictEqual(
+            book.methods.find(m => m.name === 'get_absolute_url'),
+            author.methods.find(m => m.name === 'get_absolute_url')
+        );
+    });
+
+    test('methods that differ are not merged', () => {
+        const store = new ModelStore();
+        const base = {
+            app: 'shop', fields: [], properties: [], managers: [],
+            baseClasses: [], isAbstract: false, relations: []
+        };
+
+        const a = store.add({
+            ...base,
+            name: 'A',
+            methods: [{ name: 'total', isProperty: false, isClassMethod: false, isStaticMethod: false, parameters: ['tax'] }]
+        });
+        const b = store.add({
+            ...base,
+            name: 'B',
+            methods: [{ name: 'total', isProperty: true, isClassMethod: false, isStaticMethod: false, parameters: [] }]
+        });
+
+        assert.notStrictEqual(a.methods[0], b.methods[0]);
+        assert.strictEqual(store.getStats().sharedMethods, 2);
+    });
+
+    test('interns repeated strings once', () => {
+        const store = new ModelStore();
+        for (let i = 0; i < 10; i++) {
+            store.add({
+                name: `Model${i}`,
+                app: 'inventory',
+                fields: [{ name: 'created_at', type: 'DateTimeField', required: true }],
+                methods: [],
+                properties: ['pk'],
+                managers: [{ name: 'objects', type: 'Manager', methods: [] }],
+                baseClasses: [],
+                isAbstract: false,
+                relations: []
+            });
+        }
+
+        const stats = store.getStats();
+        assert.strictEqual(stats.models, 10);
+        // 10 model names plus app, field name, field type, property, manager name and type
+        assert.strictEqual(stats.internedStrings, 16);
+    });
+
+    test('project analyzer references the stored field objects', async () => {
+        const fs = new InMemoryFileSystem({ '/project/library/models.py': modelsCode });
+        const projectAnalyzer = createTestDjangoProjectAnalyzer(fs);
+        (projectAnalyzer as any).projectRoot = '/project';
+
+        await (projectAnalyzer as any).analyzeModels('/project/library/models.py');
+
+        const models = await projectAnalyzer.getModelInfo();
+        const stored = projectAnalyzer.getAdvancedAnalyzer().getModel('Author')!;
+        assert.strictEqual(models['Author'].fields[0], stored.fields[0]);
+        // The reverse book_set relation stays on the stored model only
+        assert.deepStrictEqual(models['Author'].fields.map(f => f.name), ['name']);
+    });
+
+    test('prunes strings and methods of deleted models on publish', () => {
+        const store = new ModelStore();
+        const addModel = (name: string) => store.add({
+            name,
+            app: 'inventory',
+            fields: [{ name: `${name.toLowerCase()}_code`, type: 'CharField', required: true }],
+            methods: [{ name: `restock_${name.toLowerCase()}`, isProperty: false, isClassMethod: false, isStaticMethod: false, parameters: [] }],
+            properties: [],
+            managers: [],
+            baseClasses: [],
+            isAbstract: false,
+            relations: []
+        });
+
+        for (let i = 0; i < 100; i++) {
+            addModel(`Item${i}`);
+        }
+        store.publish();
+        for (let i = 0; i < 99; i++) {
+            store.delete(`Item${i}`);
+        }
+        store.publish();
+
+        const stats = store.getStats();
+        assert.strictEqual(stats.models, 1);
+        // Item99, app, field name, field type and method name
+        assert.strictEqual(stats.internedStrings, 5);
+        assert.strictEqual(stats.sharedMethods, 1);
+        const method = store.get('Item99')!.methods[0];
+        assert.strictEqual(addModel('Item99').methods[0], method);
+    });
+});
\ No newline at end of file
@@ -0,0 +1,102 @@
+import * as assert from 'assert';
+import { FormParser } from '../../../parsers/formParser';
+
+suite('FormParser Test Suite', () => {
+    let parser: FormParser;
+
+    const formsModule = `
+from django import forms
+
+class ContactForm(forms.Form):
+    name = forms.CharField(max_length=100)
+    email = forms.EmailField()
+
+class ArticleForm(forms.ModelForm):
+    title = forms.CharField()
+
+    class Meta:
+        model = Article
+        fields = ['title']
+`;
+
+    setup(() => {
+        parser = new FormParser();
+    });
+
+    test('should extract forms from a module', () => {
+        const result = parser.parse(formsModule, '/project/blog/forms.py');
+
+        assert.deepStrictEqual(result.forms.map(f => f.name), ['ContactForm', 'ArticleForm']);
+        assert.strictEqual(result.forms[1].type, 'ModelForm');
+        assert.strictEqual(result.forms[1].modelName, 'Article');
+        assert.strictEqual(result.hasUnparsedFormPatterns, false);
+    });
+
+    test('should only re-extract changed classes', () => {
+        parser.parse(formsModule, '/project/blog/forms.py');
+
+        const edited = formsModule.replace(
+            '    email = forms.EmailField()',
+            '    email = forms.EmailField()\n    phone = forms.CharField(required=False)'
+        );
+        const result = parser.parse(edited, '/project/blog/forms.py');
+
+        assert.strictEqual(result.parsedClasses, 1);
+        assert.strictEqual(result.reusedClasses, 1);
+        const contactForm = result.forms.find(f => f.name === 'ContactForm');
+        assert.deepStrictEqual(contactForm!.fields.map(f => f.name), ['name', 'email', 'phone']);
+    });
+
+    test('should reuse the whole result for unchanged content', () => {
+        parser.parse(formsModule, '/project/blog/forms.py');
+        const result = parser.parse(formsModule, '/project/blog/forms.py');
+
+        assert.strictEqual(result.parsedClasses, 0);
+        assert.strictEqual(result.forms.length, 2);
+    });
+
+    test('should re-extract only the classes whose imported bases change', () => {
+        parser.parse(formsModule, '/project/blog/forms.py');
+        let result = parser.parse('from myapp.forms import BaseContactForm\n' + formsModule, '/project/blog/forms.py');
+
+        assert.strictEqual(result.parsedClasses, 0);
+        assert.strictEqual(result.reusedClasses, 2);
+
+        result = parser.parse(formsModule.replace('from django import forms', 'from django import forms  # noqa'), '/project/blog/forms.py');
+        assert.strictEqual(result.parsedClasses, 2);
+    });
+
+    test('should keep other classes when a class is added or renamed', () => {
+        parser.parse(formsModule, '/project/blog/forms.py');
+        let result = parser.parse(formsModule + `
+class SearchForm(forms.Form):
+    q = forms.CharField()
+`, '/project/blog/forms.py');
+
+        assert.strictEqual(result.parsedClasses, 1);
+        assert.strictEqual(result.reusedClasses, 2);
+
+        result = parser.parse(formsModule.replace('class ContactForm', 'class InquiryForm'), '/project/blog/forms.py');
+        assert.strictEqual(result.parsedClasses, 1);
+        assert.deepStrictEqual(result.forms.map(f => f.name), ['InquiryForm', 'ArticleForm']);
+    });
+
+    test('should extract classes derived from forms of the same file', () => {
+        const result = parser.parse(formsModule + `
+class Registration(forms.Form):
+    email = forms.EmailField()
+
+class Signup(Registration):
+    password = forms.CharField()
+`, '/project/blog/forms.py');
+
+        assert.deepStrictEqual(result.forms.map(f => f.name), ['ContactForm', 'ArticleForm', 'Registration', 'Signup']);
+    });
+
+    test('should flag form-like files that cannot be parsed', () => {
+        const result = parser.parse('from django import forms\n\nContactForm = make_form()\n', '/project/app/forms.py');
+
+        assert.strictEqual(result.forms.length, 0);
+        assert.strictEqual(result.hasUnparsedFormPatterns, true);
+    });
+});
@@ -0,0 +1,57 @@
+import * as assert from 'assert';
+import * as path from 'path';
+import { parseImports, getImportCandidates } from '../../../parsers/pythonImports';
+
+suite('Python Imports Parser Test Suite', () => {
+    const content = `import os
+import django.db.models as m, json
+from django.db import models
+from .models import (
+    Order,  # the order
+    OrderItem as Item,
+)
+from . import forms, views
+from ..core.utils import \\
+    slugify
+
+def handler():
+    from shop.signals import order_paid
+`;
+
+    test('should parse import statements with aliases and relative levels', () => {
+        const imports = parseImports(content);
+
+        assert.deepStrictEqual(imports.map(imp => [imp.line, imp.level, imp.module]), [
+            [0, 0, 'os'],
+            [1, 0, 'django.db.models'],
+            [1, 0, 'json'],
+            [2, 0, 'django.db'],
+            [3, 1, 'models'],
+            [7, 1, ''],
+            [8, 2, 'core.utils'],
+            [12, 0, 'shop.signals']
+        ]);
+        assert.strictEqual(imports[1].alias, 'm');
+        assert.deepStrictEqual(imports[4].names, [
+            { name: 'Order', alias: 'Order' },
+            { name: 'OrderItem', alias: 'Item' }
+        ]);
+        assert.deepStrictEqual(imports[6].names.map(name => name.name), ['slugify']);
+    });
+
+    test('should resolve relative imports against the importing file', () => {
+        const root = path.join(path.sep, 'project');
+        const file = path.join(root, 'shop', 'admin.py');
+        const [, , , , fromModels, fromPackage] = parseImports(content);
+
+        assert.deepStrictEqual(getImportCandidates(fromModels, file, [root]).slice(0, 2), [
+            path.join(root, 'shop', 'models.py'),
+            path.join(root, 'shop', 'models', '__init__.py')
+        ]);
+        assert.deepStrictEqual(getImportCandidates(fromPackage, file, [root]), [
+            path.join(root, 'shop', '__init__.py'),
+            path.join(root, 'shop', 'forms.py'),
+            path.join(root, 'shop', 'views.py')
+        ]);
+    });
+});
@@ -0,0 +1,47 @@
+import * as assert from 'assert';
+import { extractReferences } from '../../../parsers/referenceExtractor';
+
+suite('ReferenceExtractor Test Suite', () => {
+    test('should extract template references with offsets', () => {
+        const content = `{% extends "base.html" %}
+<a href="{% url 'blog:post-list' %}">{% static 'css/site.css' %}</a>
+{% include 'partials/nav.html' with active=1 %}
+{% static prefix|add:'.css' %}`;
+
+        const references = extractReferences(content, 'django-html');
+
+        assert.deepStrictEqual(references.map(r => [r.kind, r.name]), [
+            ['template', 'base.html'],
+            ['url', 'blog:post-list'],
+            ['static', 'css/site.css'],
+            ['template', 'partials/nav.html']
+        ]);
+        const url = references[1];
+        assert.strictEqual(content.substring(url.start, url.end), 'blog:post-list');
+    });
+
+    test('should extract Python references outside comments', () => {
+        const content = `from django.shortcuts import render
+from django.urls import reverse, reverse_lazy
+
+success_url = reverse_lazy('blog:post-list')
+
+def detail(request):
+    # return render(request, 'old.html')
+    url = reverse("blog:post-detail", args=[1])
+    return render(request, 'blog/detail.html', {'url': url})
+
+class PostList(ListView):
+    template_name = 'blog/list.html'
+`;
+
+        const references = extractReferences(content, 'python');
+
+        assert.deepStrictEqual(references.map(r => [r.kind, r.name]), [
+            ['url', 'blog:post-list'],
+            ['url', 'blog:post-detail'],
+            ['template', 'blog/detail.html'],
+            ['template', 'blog/list.html']
+        ]);
+    });
+});
@@ -0,0 +1,37 @@
+import * as assert from 'assert';
+import { parseTemplate } from '../../../parsers/templateParser';
+
+suite('TemplateParser Test Suite', () => {
+    test('should extract extends, includes and blocks with lines', () => {
+        const result = parseTemplate([
+            "{% extends 'base.html' %}",
+            '{% load static %}',
+            '{% block title %}Posts{% endblock %}',
+            '{% block content %}',
+            '  {% include "partials/post.html" with post=post %}',
+            '  {% include template_var %}',
+            '{% endblock content %}'
+        ].join('\n'));
+
+        assert.deepStrictEqual(result.extends, { name: 'base.html', line: 0 });
+        assert.deepStrictEqual(result.includes, [{ name: 'partials/post.html', line: 4 }]);
+        assert.deepStrictEqual(result.blocks, [
+            { name: 'title', line: 2 },
+            { name: 'content', line: 3 }
+        ]);
+    });
+
+    test('should ignore tags inside comment and verbatim sections', () => {
+        const result = parseTemplate([
+            '{% comment %}',
+            "{% extends 'old.html' %}",
+            '{% endcomment %}',
+            '{% verbatim %}{% block js %}{% endverbatim %}',
+            '{% block real %}{% endblock %}',
+            '{% blocktrans %}text{% endblocktrans %}'
+        ].join('\n'));
+
+        assert.strictEqual(result.extends, undefined);
+        assert.deepStrictEqual(result.blocks, [{ name: 'real', line: 4 }]);
+    });
+});
@@ -0,0 +1,60 @@
+import * as assert from 'assert';
+import { parseUrlConf, UrlConfIncludeEntry, UrlConfPatternEntry } from '../../../parsers/urlConfParser';
+
+suite('UrlConfParser Test Suite', () => {
+    test('should extract path, re_path and include entries', () => {
+        const result = parseUrlConf(`
+from django.urls import path, re_path, include
+from . import views
+
+app_name = 'shop'
+
+urlpatterns = [
+    path('', views.index, name='index'),
+    # path('old/', views.old, name='old'),
+    re_path(r'^orders/(?P<pk>[0-9]+)/$', views.order_detail, name="order-detail"),
+    path('api/', include('shop.api.urls', namespace='api')),
+    path('legacy/', include(('legacy.urls', 'legacy'))),
+]
+`);
+
+        assert.strictEqual(result.appName, 'shop');
+        assert.strictEqual(result.entries.length, 4);
+
+        const index = result.entries[0] as UrlConfPatternEntry;
+        assert.strictEqual(index.kind, 'pattern');
+        assert.strictEqual(index.route, '');
+        assert.strictEqual(index.view, 'views.index');
+        assert.strictEqual(index.name, 'index');
+        assert.strictEqual(index.line, 7);
+
+        const detail = result.entries[1] as UrlConfPatternEntry;
+        assert.strictEqual(detail.isRegex, true);
+        assert.strictEqual(detail.route, '^orders/(?P<pk>[0-9]+)/$');
+        assert.strictEqual(detail.name, 'order-detail');
+
+        const api = result.entries[2] as UrlConfIncludeEntry;
+        assert.strictEqual(api.kind, 'include');
+        assert.strictEqual(api.module, 'shop.api.urls');
+        assert.strictEqual(api.namespace, 'api');
+
+        const legacy = result.entries[3] as UrlConfIncludeEntry;
+        assert.strictEqual(legacy.module, 'legacy.urls');
+        assert.strictEqual(legacy.appName, 'legacy');
+    });
+
+    test('should parse include() of an inline pattern list', () => {
+        const result = parseUrlConf(`
+urlpatterns = [
+    path('reports/', include([
+        path('daily/', views.daily, name='daily'),
+        path('<int:year>/', views.yearly),
+    ])),
+]
+`);
+
+        const reports = result.entries[0] as UrlConfIncludeEntry;
+        assert.strictEqual(reports.module, undefined);
+        assert.deepStrictEqual(reports.entries!.map(e => e.route), ['daily/', '<int:year>/']);
+    });
+});
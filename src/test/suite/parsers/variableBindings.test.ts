@@ -0,0 +1,62 @@
+import * as assert from 'assert';
+import { BindingTable } from '../../../parsers/variableBindings';
+
+suite('Variable Bindings Test Suite', () => {
+    const source = [
+        'post = Post.objects.get(pk=1)',                                      // 0
+        '',                                                                   // 1
+        'class Post(models.Model):',                                          // 2
+        '    def summary(self):',                                             // 3
+        '        return self.title',                                          // 4
+        '',                                                                   // 5
+        'def detail(request, pk, author: \'Author\' = None, tag: Optional[Tag] = None):', // 6
+        '    post = get_object_or_404(Post, pk=pk)',                          // 7
+        '    posts = Post.objects.filter(author=author)',                     // 8
+        '    for item in posts:',                                             // 9
+        '        item.title',                                                 // 10
+        '    comment, created = Comment.objects.get_or_create(',              // 11
+        '        post=post,',                                                 // 12
+        '    )',                                                              // 13
+        '    post = compute()',                                               // 14
+        '    post.title',                                                     // 15
+        '',                                                                   // 16
+        'def other():',                                                       // 17
+        '    post.title'                                                      // 18
+    ];
+
+    test('should resolve names in the scope of a line', () => {
+        const table = BindingTable.fromText(source.join('\n'));
+
+        assert.strictEqual(table.lookup('self', 4), 'Post');
+        assert.strictEqual(table.lookup('author', 7), 'Author');
+        assert.strictEqual(table.lookup('tag', 7), 'Tag');
+        assert.strictEqual(table.lookup('post', 8), 'Post');
+        assert.strictEqual(table.lookup('item', 10), 'Post');
+        assert.strictEqual(table.lookup('comment', 14), 'Comment');
+        // Keyword arguments of a call spanning lines do not bind names
+        assert.strictEqual(table.lookup('post', 13), 'Post');
+        // Rebinding to an unknown value shadows the earlier binding
+        assert.strictEqual(table.lookup('post', 15), undefined);
+        // Locals of detail() are not visible in other()
+        assert.strictEqual(table.lookup('post', 18), 'Post');
+        assert.strictEqual(table.lookup('posts', 18), undefined);
+    });
+
+    test('should re-parse only the lines a change replaces', () => {
+        const lines = [...source];
+        const table = BindingTable.fromText(lines.join('\n'));
+
+        // Replace line 8 with two lines
+        lines.splice(8, 1, '    posts = Author.objects.all()', '    count = posts.count()');
+        table.replaceLines(8, 8, 2);
+        const parsed: number[] = [];
+        table.fill(line => {
+            parsed.push(line);
+            return lines[line];
+        });
+
+        assert.deepStrictEqual(parsed, [8, 9]);
+        assert.strictEqual(table.lookup('item', 11), 'Author');
+        assert.strictEqual(table.lookup('comment', 15), 'Comment');
+    });
+});
@@ -2,16 +2,18 @@ import * as assert from 'assert';
 import * as vscode from 'vscode';
 import * as path from 'path';
 import * as fs from 'fs';
+import * as os from 'os';
 import { EnhancedUrlPatternAnalyzer } from '../../../analyzers/enhancedUrlPatternAnalyzer';
+import { UrlConfEngine } from '../../../analyzers/urlConfEngine';
 import { EnhancedDjangoDefinitionProvider } from '../../../providers/enhancedDjangoDefinitionProvider';
-import { EnhancedFileWatcherService } from '../../../services/enhancedFileWatcherService';
 import { DjangoProjectAnalyzer } from '../../../analyzers/djangoProjectAnalyzer';
 import sinon from 'sinon';
 
 suite('Cross-file Navigation Performance Benchmarks', () => {
     let sandbox: sinon.SinonSandbox;
-    let fileWatcherService: EnhancedFileWatcherService;
+    let engine: UrlConfEngine;
     let urlAnalyzer: EnhancedUrlPatternAnalyzer;
+    let tempDir: string | undefined;
     let definitionProvider: EnhancedDjangoDefinitionProvider;
     let projectAnalyzer: DjangoProjectAnalyzer;
     
@@ -31,17 +33,33 @@ suite('Cross-file Navigation Performance Benchmarks', () => {
         } as any;
         
         // Create services
-        fileWatcherService = new EnhancedFileWatcherService(mockContext);
-        urlAnalyzer = new EnhancedUrlPatternAnalyzer(fileWatcherService);
+        engine = new UrlConfEngine();
+        urlAnalyzer = new EnhancedUrlPatternAnalyzer(engine);
         projectAnalyzer = new DjangoProjectAnalyzer(mockContext);
         definitionProvider = new EnhancedDjangoDefinitionProvider(projectAnalyzer, urlAnalyzer);
     });
 
     teardown(() => {
         sandbox.restore();
-        fileWatcherService.dispose();
+        engine.dispose();
+        if (tempDir) {
+            fs.rmSync(tempDir, { recursive: true, force: true });
+            tempDir = undefined;
+        }
     });
 
+    const writeUrlFiles = (appCount: number, patternsPerApp: number): vscode.Uri[] => {
+        tempDir = fs.mkdtempSync(path.join(os.tmpdir(), 'navigation-benchmark-'));
+        const files: vscode.Uri[] = [];
+        for (let i = 0; i < appCount; i++) {
+            const filePath = path.join(tempDir, `app${i}`, 'urls.py');
+            fs.mkdirSync(path.dirname(filePath), { recursive: true });
+            fs.writeFileSync(filePath, generateUrlFileForApp(i, patternsPerApp));
+            files.push(vscode.Uri.file(filePath));
+        }
+        return files;
+    };
+
     test('Go to Definition performance with 1000+ URL patterns', async () => {
         // Generate large URL file
         const urlPatterns = generateLargeUrlFile(1000);
@@ -74,31 +92,18 @@ suite('Cross-file Navigation Performance Benchmarks', () => {
     });
 
     test('Initial workspace scan performance', async () => {
-        // Mock findFiles to return many URL files
-        const mockFiles: vscode.Uri[] = [];
-        for (let i = 0; i < 50; i++) {
-            mockFiles.push(vscode.Uri.file(`/test/app${i}/urls.py`));
-        }
-        
-        sandbox.stub(vscode.workspace, 'findFiles').resolves(mockFiles);
-        
-        // Mock openTextDocument
-        sandbox.stub(vscode.workspace, 'openTextDocument').callsFake((options: any) => {
-            const uri = options as vscode.Uri;
-            const appIndex = parseInt(uri.path.match(/app(\d+)/)?.[1] || '0');
-            return Promise.resolve({
-                getText: () => generateUrlFileForApp(appIndex, 20)
-            } as any);
-        });
-        
+        // The engine reads the files findFiles reports from disk
+        const urlFiles = writeUrlFiles(50, 20);
+        sandbox.stub(vscode.workspace, 'findFiles').resolves(urlFiles);
+
         // Measure scan time
         const startTime = Date.now();
-        await (urlAnalyzer as any).scanWorkspaceIncremental();
+        await engine.ensureScanned();
         const endTime = Date.now();
-        
+
         const scanTime = endTime - startTime;
         const patterns = await urlAnalyzer.getAllUrlPatterns();
-        
+
         assert.equal(patterns.length, 1000, 'Should find all patterns');
         assert.ok(
             scanTime < PERFORMANCE_THRESHOLDS.initialScan,
@@ -106,6 +111,31 @@ suite('Cross-file Navigation Performance Benchmarks', () => {
         );
     });
 
+    test('Single file update performance after a workspace scan', async () => {
+        const urlFiles = writeUrlFiles(50, 20);
+        sandbox.stub(vscode.workspace, 'findFiles').resolves(urlFiles);
+        await engine.ensureScanned();
+        engine.getSnapshot();
+
+        const filePath = urlFiles[25].fsPath;
+        const updatedContent = generateUrlFileForApp(25, 20).replace("name='view_0'", "name='renamed_view'");
+
+        const startTime = Date.now();
+        engine.updateFile(filePath, updatedContent);
+        const snapshot = engine.getSnapshot();
+        const endTime = Date.now();
+
+        const updateTime = endTime - startTime;
+
+        assert.ok(snapshot.get('renamed_view', 'app25'), 'Should see the updated pattern');
+        assert.strictEqual(snapshot.get('view_0', 'app25'), undefined);
+        assert.equal(snapshot.patterns.length, 1000);
+        assert.ok(
+            updateTime < PERFORMANCE_THRESHOLDS.incrementalUpdate,
+            `Single file update should be faster than ${PERFORMANCE_THRESHOLDS.incrementalUpdate}ms, but took ${updateTime}ms`
+        );
+    });
+
     test('Incremental update performance', async () => {
         // Pre-populate analyzer
         const initialContent = generateLargeUrlFile(100);
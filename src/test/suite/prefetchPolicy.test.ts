@@ -0,0 +1,39 @@
+import * as assert from 'assert';
+import * as path from 'path';
+import { PrefetchPolicy } from '../../analyzers/prefetchPolicy';
+
+suite('PrefetchPolicy Test Suite', () => {
+    const app = path.join(path.sep, 'project', 'orders');
+    const file = (name: string) => path.join(app, name);
+
+    test('should rank same-app modules and imports for a new file', () => {
+        const policy = new PrefetchPolicy();
+        const imported = path.join(path.sep, 'project', 'core', 'models.py');
+
+        const ranked = policy.rank(file('models.py'), [imported], 3);
+
+        assert.deepStrictEqual(ranked.map(candidate => candidate.filePath), [
+            file('admin.py'),
+            file('forms.py'),
+            file('views.py')
+        ]);
+        assert.ok(policy.rank(file('models.py'), [imported], 10).some(candidate => candidate.filePath === imported));
+    });
+
+    test('should rank files opened next before by how often they were', () => {
+        const policy = new PrefetchPolicy();
+        const template = path.join(path.sep, 'project', 'templates', 'orders', 'detail.html');
+        policy.recordOpen(file('views.py'));
+        policy.recordOpen(template);
+        policy.recordOpen(file('views.py'));
+        policy.recordOpen(file('models.py'));
+        policy.recordOpen(file('views.py'));
+        policy.recordOpen(template);
+
+        const ranked = policy.rank(file('views.py'), [], 3);
+
+        assert.strictEqual(ranked[0].filePath, file('models.py'));
+        assert.deepStrictEqual(ranked[0].reasons, ['history', 'sibling']);
+        assert.strictEqual(ranked[1].filePath, template);
+    });
+});
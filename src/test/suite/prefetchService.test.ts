@@ -0,0 +1,69 @@
+import * as assert from 'assert';
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import { PrefetchService } from '../../services/prefetchService';
+import { MemoryBudgetManager } from '../../cache/memoryBudgetManager';
+
+suite('PrefetchService Test Suite', () => {
+    const MB = 1024 * 1024;
+    let app: string;
+    let budget: MemoryBudgetManager;
+    let cacheBytes: number;
+    let service: PrefetchService;
+    let warmed: string[];
+
+    setup(() => {
+        app = fs.mkdtempSync(path.join(os.tmpdir(), 'prefetch-'));
+        for (const name of ['models.py', 'admin.py', 'forms.py', 'views.py']) {
+            fs.writeFileSync(path.join(app, name), '');
+        }
+
+        budget = new MemoryBudgetManager();
+        budget.configure({ budgetMB: 10 });
+        cacheBytes = 0;
+        budget.register({ name: 'analysis', tier: 'analysis', cost: () => cacheBytes, shed: () => { cacheBytes = 0; } });
+
+        const shardManager = { findRootForPath: () => undefined, getShard: () => undefined };
+        service = new PrefetchService({ subscriptions: [] } as any, {} as any, shardManager as any, {} as any, budget);
+        warmed = [];
+        service.registerWarmer(filePath => {
+            warmed.push(path.basename(filePath));
+            cacheBytes += 6 * MB;
+        });
+    });
+
+    teardown(() => {
+        service.dispose();
+        fs.rmSync(app, { recursive: true, force: true });
+    });
+
+    function prefetch(name: string): Promise<void> {
+        const filePath = path.join(app, name);
+        const document = { isClosed: false, uri: { fsPath: filePath }, getText: () => '' };
+        return (service as any).prefetch(document);
+    }
+
+    test('should not prefetch while the caches are over the memory budget', async () => {
+        cacheBytes = 20 * MB;
+
+        await prefetch('models.py');
+
+        assert.deepStrictEqual(warmed, []);
+        assert.strictEqual(service.getStats().memoryStops, 1);
+
+        budget.check(0, Number.MAX_SAFE_INTEGER);
+        await prefetch('models.py');
+
+        assert.ok(warmed.length > 0);
+    });
+
+    test('should stop a run once it fills the caches over the memory budget', async () => {
+        await prefetch('models.py');
+
+        // The second file takes the caches to 12 MB of 10
+        assert.deepStrictEqual(warmed, ['admin.py', 'forms.py']);
+        assert.strictEqual(service.getStats().memoryStops, 1);
+        assert.strictEqual(service.getStats().prefetched, 2);
+    });
+});
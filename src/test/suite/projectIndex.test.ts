@@ -0,0 +1,106 @@
+import * as assert from 'assert';
+import * as path from 'path';
+import * as fs from 'fs';
+import * as os from 'os';
+import { ProjectIndexBuilder } from '../../cli/projectIndex';
+import { PROJECT_INDEX_VERSION } from '../../analyzers/projectIndexFormat';
+import { PrebuiltProjectIndex } from '../../analyzers/prebuiltProjectIndex';
+
+suite('Project Index Test Suite', () => {
+    let tempDir: string;
+
+    const files: { [relativePath: string]: string } = {
+        'blog/models.py': [
+            'from django.db import models',
+            '',
+            'class Post(models.Model):',
+            '    title = models.CharField(max_length=200)'
+        ].join('\n'),
+        'blog/forms.py': [
+            'from django import forms',
+            '',
+            'class ContactForm(forms.Form):',
+            '    email = forms.EmailField()'
+        ].join('\n'),
+        'blog/admin.py': [
+            'from django.contrib import admin',
+            '',
+            '@admin.register(Post)',
+            'class PostAdmin(admin.ModelAdmin):',
+            "    list_display = ['title']"
+        ].join('\n'),
+        'blog/views.py': [
+            'def post_list(request):',
+            '    posts = Post.objects.all()',
+            "    return render(request, 'blog/post_list.html', {'posts': posts})"
+        ].join('\n'),
+        // Never indexed
+        'venv/lib/models.py': 'class Ignored(models.Model):\n    pass'
+    };
+
+    setup(() => {
+        tempDir = fs.mkdtempSync(path.join(os.tmpdir(), 'project-index-test-'));
+        for (const [relativePath, content] of Object.entries(files)) {
+            const filePath = path.join(tempDir, relativePath);
+            fs.mkdirSync(path.dirname(filePath), { recursive: true });
+            fs.writeFileSync(filePath, content);
+        }
+    });
+
+    teardown(() => {
+        fs.rmSync(tempDir, { recursive: true, force: true });
+    });
+
+    test('should index project modules by relative path', async () => {
+        const { index, timings } = await new ProjectIndexBuilder().build(tempDir);
+
+        assert.strictEqual(index.version, PROJECT_INDEX_VERSION);
+        assert.deepStrictEqual(Object.keys(index.files).sort(), [
+            'blog/admin.py', 'blog/forms.py', 'blog/models.py', 'blog/views.py'
+        ]);
+        assert.deepStrictEqual(index.files['blog/models.py'].models?.map(model => model.name), ['Post']);
+        assert.strictEqual(timings.models.files, 1);
+        // No absolute paths, so the index can be moved between machines
+        assert.ok(!JSON.stringify(index).includes(tempDir));
+    });
+
+    test('should hand out results only for unchanged files', async () => {
+        const { index } = await new ProjectIndexBuilder().build(tempDir);
+        const indexPath = path.join(tempDir, 'index.json');
+        fs.writeFileSync(indexPath, JSON.stringify(index));
+
+        // Load the index against a copy of the project elsewhere
+        const prebuilt = new PrebuiltProjectIndex();
+        const otherRoot = path.join(os.tmpdir(), 'relocated-project');
+        assert.ok(await prebuilt.load(otherRoot, indexPath));
+
+        const models = prebuilt.takeModels(path.join(otherRoot, 'blog', 'models.py'), files['blog/models.py']);
+        assert.deepStrictEqual(models?.map(model => model.name), ['Post']);
+
+        const admin = prebuilt.takeAdmin(path.join(otherRoot, 'blog', 'admin.py'), files['blog/admin.py']);
+        assert.strictEqual(admin?.adminClasses[0].modelName, 'Post');
+        assert.deepStrictEqual(admin?.adminClasses[0].attributes.get('list_display'), ['title']);
+        assert.strictEqual(admin?.adminClasses[0].filePath, path.join(otherRoot, 'blog', 'admin.py'));
+
+        const views = prebuilt.takeViews(path.join(otherRoot, 'blog', 'views.py'), files['blog/views.py']);
+        assert.strictEqual(views?.[0].contextVariables.get('posts')?.value, 'posts');
+        assert.strictEqual(views?.[0].viewFunction, 'post_list');
+
+        const changed = prebuilt.takeForms(path.join(otherRoot, 'blog', 'forms.py'), files['blog/forms.py'] + '\n');
+        assert.strictEqual(changed, undefined);
+
+        const status = prebuilt.getStatus();
+        assert.strictEqual(status.hits, 3);
+        assert.strictEqual(status.misses, 1);
+        assert.strictEqual(status.remainingFiles, 0);
+    });
+
+    test('should ignore indexes from another version', async () => {
+        const indexPath = path.join(tempDir, 'index.json');
+        fs.writeFileSync(indexPath, JSON.stringify({ version: PROJECT_INDEX_VERSION + 1, createdAt: 0, files: {} }));
+
+        const prebuilt = new PrebuiltProjectIndex();
+        assert.strictEqual(await prebuilt.load(tempDir, indexPath), false);
+        assert.strictEqual(prebuilt.isLoaded(), false);
+    });
+});
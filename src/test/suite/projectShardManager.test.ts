@@ -0,0 +1,111 @@
+import * as assert from 'assert';
+import * as sinon from 'sinon';
+import * as vscode from 'vscode';
+import * as path from 'path';
+import * as fs from 'fs';
+import * as os from 'os';
+import { ProjectShardManager } from '../../analyzers/projectShardManager';
+import { AdvancedModelAnalyzer } from '../../analyzers/advancedModelAnalyzer';
+import { UrlConfEngine } from '../../analyzers/urlConfEngine';
+import { UrlPatternAnalyzer } from '../../analyzers/urlPatternAnalyzer';
+import { UrlTagCompletionProvider } from '../../providers/urlTagCompletionProvider';
+
+suite('ProjectShardManager Test Suite', () => {
+    let sandbox: sinon.SinonSandbox;
+    let tempDir: string;
+    let billingRoot: string;
+    let shopRoot: string;
+    let primaryModelAnalyzer: AdvancedModelAnalyzer;
+    let manager: ProjectShardManager;
+
+    setup(async () => {
+        sandbox = sinon.createSandbox();
+        tempDir = fs.mkdtempSync(path.join(os.tmpdir(), 'project-shard-test-'));
+        billingRoot = path.join(tempDir, 'services', 'billing');
+        shopRoot = path.join(tempDir, 'services', 'shop');
+
+        for (const root of [billingRoot, shopRoot]) {
+            fs.mkdirSync(path.join(root, 'config'), { recursive: true });
+            fs.writeFileSync(path.join(root, 'manage.py'), '');
+            fs.writeFileSync(path.join(root, 'config', 'settings.py'), 'INSTALLED_APPS = []\n');
+        }
+
+        sandbox.stub(vscode.workspace, 'findFiles').callsFake(async (pattern: vscode.GlobPattern) => {
+            if (pattern === '**/manage.py') {
+                return [
+                    vscode.Uri.file(path.join(billingRoot, 'manage.py')),
+                    vscode.Uri.file(path.join(shopRoot, 'manage.py'))
+                ];
+            }
+            return [];
+        });
+
+        primaryModelAnalyzer = new AdvancedModelAnalyzer();
+        const primaryAnalyzer = { getProjectRoot: () => billingRoot, getUrlConfEngine: () => new UrlConfEngine() } as any;
+        const context = { subscriptions: [] } as any;
+
+        manager = new ProjectShardManager(context, primaryAnalyzer, primaryModelAnalyzer);
+        await manager.initialize();
+    });
+
+    teardown(() => {
+        manager.dispose();
+        sandbox.restore();
+        fs.rmSync(tempDir, { recursive: true, force: true });
+    });
+
+    test('discovers one project per manage.py with its settings', () => {
+        assert.deepStrictEqual(manager.getProjectRoots().sort(), [billingRoot, shopRoot].sort());
+    });
+
+    test('routes files of the primary project to the global analyzers', () => {
+        const shard = manager.getShard(path.join(billingRoot, 'invoices', 'models.py'));
+
+        assert.ok(shard);
+        assert.strictEqual(shard!.isPrimary, true);
+        assert.strictEqual(shard!.modelAnalyzer, primaryModelAnalyzer);
+    });
+
+    test('starts other projects lazily with their own analyzers', async () => {
+        const shopFile = path.join(shopRoot, 'catalog', 'models.py');
+        assert.strictEqual(manager.getShard(shopFile), undefined);
+
+        const shard = await manager.ensureShard(shopFile);
+
+        assert.ok(shard);
+        assert.strictEqual(shard!.root, shopRoot);
+        assert.strictEqual(shard!.settingsPath, path.join(shopRoot, 'config', 'settings.py'));
+        assert.notStrictEqual(shard!.modelAnalyzer, primaryModelAnalyzer);
+        assert.strictEqual(manager.getShard(shopFile), shard);
+        assert.strictEqual(await manager.ensureShard(path.join(shopRoot, 'manage.py')), shard);
+    });
+
+    test('reports which shards are started', () => {
+        const status = manager.getStatus();
+
+        assert.strictEqual(status.find(s => s.root === billingRoot)!.started, true);
+        assert.strictEqual(status.find(s => s.root === shopRoot)!.started, false);
+    });
+
+    test('completes the URL names of the document\'s project only', async () => {
+        const engine = new UrlConfEngine();
+        const homeUrls = (view: string) => `urlpatterns = [\n    path('', views.${view}, name='home'),\n]\n`;
+        engine.updateFile(path.join(billingRoot, 'config', 'urls.py'), homeUrls('dashboard'));
+        engine.updateFile(path.join(shopRoot, 'config', 'urls.py'), homeUrls('storefront'));
+        engine.setRootUrlconf(billingRoot, 'config.urls');
+        engine.setRootUrlconf(shopRoot, 'config.urls');
+        const provider = new UrlTagCompletionProvider(new UrlPatternAnalyzer(engine), manager);
+
+        const shopFile = path.join(shopRoot, 'catalog', 'views.py');
+        assert.strictEqual(manager.getScopeRoot(shopFile), shopRoot);
+        const document = {
+            uri: vscode.Uri.file(shopFile),
+            languageId: 'python',
+            lineAt: () => ({ text: "reverse('" })
+        } as any;
+        const items = await provider.provideCompletionItems(document, new vscode.Position(0, 9), {} as any, {} as any);
+
+        assert.strictEqual(items.length, 1);
+        assert.ok(items[0].detail!.endsWith('views.storefront'));
+    });
+});
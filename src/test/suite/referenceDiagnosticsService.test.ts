@@ -0,0 +1,119 @@
+import * as assert from 'assert';
+import * as sinon from 'sinon';
+import * as vscode from 'vscode';
+import * as path from 'path';
+import * as fs from 'fs';
+import * as os from 'os';
+import { ReferenceDiagnosticsService } from '../../services/referenceDiagnosticsService';
+
+suite('ReferenceDiagnosticsService Test Suite', () => {
+    let sandbox: sinon.SinonSandbox;
+    let collection: vscode.DiagnosticCollection;
+    let tempDir: string;
+    let urlEmitter: vscode.EventEmitter<string[]>;
+    let staticEmitter: vscode.EventEmitter<string[]>;
+    let templateEmitter: vscode.EventEmitter<string[]>;
+    let urlPatterns: { name: string; appName?: string }[];
+    let templateNames: string[];
+    let templateIndex: any;
+    let service: ReferenceDiagnosticsService;
+
+    const template = `{% extends 'base.html' %}
+{% load static %}
+<link href="{% static 'css/site.css' %}">
+<link href="{% static 'css/missing.css' %}">
+<script src="{% static 'admin/js/core.js' %}"></script>
+<a href="{% url 'blog:post-list' %}">{% url 'blog:gone' %}</a>
+<a href="{% url 'admin:index' %}"></a>
+{% include 'partials/missing.html' %}
+`;
+
+    const openTemplate = async () => {
+        const filePath = path.join(tempDir, 'page.html');
+        fs.writeFileSync(filePath, template);
+        return vscode.workspace.openTextDocument(vscode.Uri.file(filePath));
+    };
+
+    const messages = (document: vscode.TextDocument) =>
+        (collection.get(document.uri) || []).map(d => document.getText(d.range)).sort();
+
+    setup(async () => {
+        // Keep the diagnostics apart from those of the running extension
+        sandbox = sinon.createSandbox();
+        const createCollection = vscode.languages.createDiagnosticCollection;
+        sandbox.stub(vscode.languages, 'createDiagnosticCollection').callsFake(() => {
+            collection = createCollection('django-references-test');
+            return collection;
+        });
+
+        tempDir = fs.mkdtempSync(path.join(os.tmpdir(), 'reference-diagnostics-test-'));
+        urlEmitter = new vscode.EventEmitter<string[]>();
+        staticEmitter = new vscode.EventEmitter<string[]>();
+        templateEmitter = new vscode.EventEmitter<string[]>();
+        urlPatterns = [{ name: 'post-list', appName: 'blog' }];
+        templateNames = ['base.html', 'partials/nav.html'];
+
+        const urlAnalyzer = {
+            onDidChangePatterns: urlEmitter.event,
+            getAllUrlPatterns: () => urlPatterns
+        };
+        const staticFiles = ['css/site.css', 'js/app.js'];
+        const staticFileAnalyzer = {
+            onDidChangeStaticFiles: staticEmitter.event,
+            getStaticFiles: () => staticFiles.map(relativePath => ({ relativePath })),
+            hasStaticFile: (relativePath: string) => staticFiles.includes(relativePath)
+        };
+        templateIndex = {
+            onDidChangeTemplates: templateEmitter.event,
+            getTemplateNames: () => templateNames,
+            resolve: sinon.spy((name: string) => templateNames.includes(name) ? { name } : undefined)
+        };
+
+        service = new ReferenceDiagnosticsService(
+            { subscriptions: [] } as any,
+            urlAnalyzer as any,
+            staticFileAnalyzer as any,
+            templateIndex
+        );
+        await service.register();
+    });
+
+    teardown(() => {
+        service.dispose();
+        sandbox.restore();
+        fs.rmSync(tempDir, { recursive: true, force: true });
+    });
+
+    test('reports references missing from the project indexes', async () => {
+        const document = await openTemplate();
+        service.flush();
+
+        // admin:index and admin/js/core.js belong to django.contrib.admin
+        assert.deepStrictEqual(messages(document), ['blog:gone', 'css/missing.css', 'partials/missing.html']);
+    });
+
+    test('re-checks only references affected by an index change', async () => {
+        const document = await openTemplate();
+        service.flush();
+        const templateLookups = templateIndex.resolve.callCount;
+
+        urlPatterns.push({ name: 'gone', appName: 'blog' });
+        service.onIndexChanged('url', ['blog:gone']);
+        service.flush();
+
+        assert.deepStrictEqual(messages(document), ['css/missing.css', 'partials/missing.html']);
+        assert.strictEqual(templateIndex.resolve.callCount, templateLookups);
+    });
+
+    test('checks references once an empty index is filled', async () => {
+        templateNames = [];
+        const document = await openTemplate();
+        service.flush();
+        assert.ok(!messages(document).includes('partials/missing.html'));
+
+        templateNames = ['base.html', 'partials/nav.html'];
+        service.onIndexChanged('template', templateNames);
+        service.flush();
+        assert.ok(messages(document).includes('partials/missing.html'));
+    });
+});
@@ -0,0 +1,144 @@
+import * as assert from 'assert';
+import * as vscode from 'vscode';
+import { ReferenceIndex } from '../../analyzers/referenceIndex';
+import { ModelSchema, extractIdentifiers } from '../../parsers/identifierExtractor';
+import { DjangoReferenceProvider } from '../../providers/djangoReferenceProvider';
+
+suite('Reference Index Test Suite', () => {
+    const models: { [name: string]: any } = {
+        Author: {
+            name: 'Author',
+            fields: [{ name: 'name', type: 'CharField' }],
+            managers: [{ name: 'objects', type: 'Manager' }]
+        },
+        Post: {
+            name: 'Post',
+            fields: [
+                { name: 'title', type: 'CharField' },
+                { name: 'author', type: 'ForeignKey', relatedModel: 'Author' }
+            ],
+            managers: [{ name: 'objects', type: 'Manager' }, { name: 'published', type: 'PublishedManager' }]
+        }
+    };
+    const modelAnalyzer = {
+        getModel: (name: string) => models[name],
+        onDidChangeModels: () => ({ dispose: () => undefined })
+    };
+    const schema: ModelSchema = {
+        isModel: name => name in models,
+        getField: (model, field) => models[model]?.fields.find((f: any) => f.name === field),
+        getManagerNames: model => models[model].managers.map((m: any) => m.name)
+    };
+
+    const modelsPy = [
+        'from django.db import models',
+        '',
+        'class Post(models.Model):',
+        '    title = models.CharField(max_length=200)  # shown on Post pages',
+        '    author = models.ForeignKey(Author, on_delete=models.CASCADE)',
+        '',
+        '    class Meta:',
+        '        ordering = [\'-title\']'
+    ].join('\n');
+    const viewsPy = [
+        'def index(request):',
+        '    posts = Post.published.filter(author__name__icontains=q).order_by(\'title\')',
+        '    return render(request, \'blog/index.html\', {\'next\': reverse(\'blog:post_list\')})'
+    ].join('\n');
+    const adminPy = [
+        '@admin.register(Post)',
+        'class PostAdmin(admin.ModelAdmin):',
+        '    list_display = (\'title\', \'author\', \'word_count\')',
+        '    search_fields = [\'^title\', \'author__name\']'
+    ].join('\n');
+
+    test('should find model, field, URL and template identifiers', () => {
+        const keys = (content: string, filePath: string) =>
+            extractIdentifiers(content, 'python', filePath, schema).map(o => `${o.key}@${o.line}:${o.start}${o.isDefinition ? '!' : ''}`);
+
+        assert.deepStrictEqual(keys(modelsPy, '/project/blog/models.py'), [
+            'model:Post@2:6!',
+            'field:Post.title@3:4!',
+            'field:Post.author@4:4!',
+            'model:Author@4:31',
+            'field:Post.title@7:22'
+        ]);
+        assert.deepStrictEqual(keys(viewsPy, '/project/blog/views.py'), [
+            'model:Post@1:12',
+            'field:Post.author@1:34',
+            'field:Author.name@1:42',
+            'field:Post.title@1:71',
+            'template:blog/index.html@2:28',
+            'url:blog:post_list@2:69'
+        ]);
+        assert.deepStrictEqual(keys(adminPy, '/project/blog/admin.py'), [
+            'model:Post@0:16',
+            'field:Post.title@2:21',
+            'field:Post.author@2:30',
+            'field:Post.title@3:23',
+            'field:Post.author@3:32',
+            'field:Author.name@3:40'
+        ]);
+    });
+
+    test('should rename a field everywhere it is used', async () => {
+        const index = new ReferenceIndex(modelAnalyzer as any, {} as any);
+        index.indexFile('/project/blog/models.py', modelsPy);
+        index.indexFile('/project/blog/views.py', viewsPy);
+        index.indexFile('/project/blog/admin.py', adminPy);
+
+        const provider = new DjangoReferenceProvider(index);
+        const document = {
+            uri: vscode.Uri.file('/project/blog/admin.py'),
+            version: 1,
+            getText: (range: vscode.Range) => adminPy.split('\n')[range.start.line].substring(range.start.character, range.end.character)
+        } as any;
+
+        const references = (await provider.provideReferences(document, new vscode.Position(2, 23), { includeDeclaration: false }))!;
+        assert.strictEqual(references.length, 4);
+
+        assert.strictEqual((await provider.prepareRename(document, new vscode.Position(2, 23))).placeholder, 'title');
+        const edit = await provider.provideRenameEdits(document, new vscode.Position(2, 23), 'headline');
+        assert.strictEqual(edit.size, 3);
+        assert.strictEqual(edit.get(vscode.Uri.file('/project/blog/admin.py')).length, 2);
+        assert.ok(edit.get(vscode.Uri.file('/project/blog/views.py')).every(change => change.newText === 'headline'));
+
+        // Names that are not indexed, e.g. admin methods, cannot be renamed
+        await assert.rejects(provider.prepareRename(document, new vscode.Position(2, 45)));
+
+        index.removeFile('/project/blog/views.py');
+        assert.strictEqual(index.getOccurrences('field:Author.name').length, 1);
+    });
+
+    test('should index an edited document before answering and decline stale renames', async () => {
+        const index = new ReferenceIndex(modelAnalyzer as any, {} as any);
+        index.indexFile('/project/blog/models.py', modelsPy);
+        index.indexFile('/project/blog/admin.py', adminPy);
+        const provider = new DjangoReferenceProvider(index);
+
+        // A line was typed above the class and the debounced refresh has not run yet
+        const edited = '# Admin options\n' + adminPy;
+        const document = {
+            uri: vscode.Uri.file('/project/blog/admin.py'),
+            version: 2,
+            getText: (range?: vscode.Range) => range
+                ? edited.split('\n')[range.start.line].substring(range.start.character, range.end.character)
+                : edited
+        } as any;
+        (index as any).markStale('/project/blog/admin.py');
+
+        const { range, placeholder } = await provider.prepareRename(document, new vscode.Position(3, 23));
+        assert.strictEqual(placeholder, 'title');
+        assert.strictEqual(range.start.line, 3);
+
+        // The buffer changes again while the index catches up
+        (index as any).markStale('/project/blog/admin.py');
+        const getText = document.getText;
+        document.getText = (range?: vscode.Range) => {
+            document.version++;
+            return getText(range);
+        };
+        await assert.rejects(provider.provideRenameEdits(document, new vscode.Position(3, 23), 'headline'));
+        index.dispose();
+    });
+});
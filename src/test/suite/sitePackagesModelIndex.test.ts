@@ -0,0 +1,157 @@
+import * as assert from 'assert';
+import * as path from 'path';
+import * as fs from 'fs';
+import * as os from 'os';
+import * as vscode from 'vscode';
+import { AdvancedModelAnalyzer } from '../../analyzers/advancedModelAnalyzer';
+import { SitePackagesModelIndex, InterpreterEnvironment } from '../../analyzers/sitePackagesModelIndex';
+
+suite('SitePackagesModelIndex Test Suite', () => {
+    let tempDir: string;
+    let advancedAnalyzer: AdvancedModelAnalyzer;
+    let index: SitePackagesModelIndex;
+
+    const authModels = `
+from django.db import models
+
+class PermissionsMixin(models.Model):
+    is_superuser = models.BooleanField(default=False)
+
+class AbstractUser(PermissionsMixin):
+    username = models.CharField(max_length=150)
+    email = models.EmailField(blank=True)
+
+class User(AbstractUser):
+    pass
+`;
+
+    function createEnvironment(files: string[]): InterpreterEnvironment {
+        return {
+            pythonPath: '/venv/bin/python',
+            pythonVersion: '3.11.4',
+            packages: { django: '4.2.7', djangorestframework: '3.14.0' },
+            apps: [{ app: 'auth', module: 'django.contrib.auth', files }]
+        };
+    }
+
+    setup(() => {
+        tempDir = fs.mkdtempSync(path.join(os.tmpdir(), 'site-packages-index-test-'));
+        advancedAnalyzer = new AdvancedModelAnalyzer();
+
+        const context = { globalStorageUri: { fsPath: path.join(tempDir, 'storage') } } as any;
+        const executor = { getCurrentPythonPath: () => '/venv/bin/python' } as any;
+        const projectAnalyzer = {
+            getInstalledApps: () => ['django.contrib.auth'],
+            getProjectRoot: () => tempDir
+        } as any;
+
+        index = new SitePackagesModelIndex(context, executor, advancedAnalyzer, projectAnalyzer);
+    });
+
+    teardown(() => {
+        fs.rmSync(tempDir, { recursive: true, force: true });
+    });
+
+    test('index key is stable for the same environment', () => {
+        const environment = createEnvironment([]);
+        const apps = ['django.contrib.auth', 'django.contrib.contenttypes'];
+
+        assert.strictEqual(
+            SitePackagesModelIndex.computeIndexKey(environment, apps),
+            SitePackagesModelIndex.computeIndexKey(environment, [...apps].reverse())
+        );
+    });
+
+    test('index key changes when a package version or interpreter changes', () => {
+        const environment = createEnvironment([]);
+        const apps = ['django.contrib.auth'];
+        const key = SitePackagesModelIndex.computeIndexKey(environment, apps);
+
+        const upgraded = { ...environment, packages: { ...environment.packages, django: '5.0.0' } };
+        assert.notStrictEqual(SitePackagesModelIndex.computeIndexKey(upgraded, apps), key);
+
+        const otherInterpreter = { ...environment, pythonPath: '/other/bin/python' };
+        assert.notStrictEqual(SitePackagesModelIndex.computeIndexKey(otherInterpreter, apps), key);
+    });
+
+    test('builds models from installed app files including inherited models', async () => {
+        const modelsPath = path.join(tempDir, 'django', 'contrib', 'auth', 'models.py');
+        fs.mkdirSync(path.dirname(modelsPath), { recursive: true });
+        fs.writeFileSync(modelsPath, authModels);
+
+        const models = await index.buildModels(createEnvironment([modelsPath]));
+        const user = models.find(m => m.name === 'User');
+
+        assert.ok(user, 'User should be indexed even though it derives from AbstractUser');
+        assert.strictEqual(user!.app, 'auth');
+        assert.ok(user!.fields.some(f => f.name === 'username'), 'Inherited fields should be included');
+        assert.ok(user!.managers.some(m => m.name === 'objects'));
+    });
+
+    test('external models do not replace workspace models', async () => {
+        await advancedAnalyzer.analyzeModelCode(`
+from django.db import models
+
+class User(models.Model):
+    nickname = models.CharField(max_length=30)
+`, '/workspace/accounts/models.py');
+
+        const modelsPath = path.join(tempDir, 'auth', 'models.py');
+        fs.mkdirSync(path.dirname(modelsPath), { recursive: true });
+        fs.writeFileSync(modelsPath, authModels);
+
+        const models = await index.buildModels(createEnvironment([modelsPath]));
+        advancedAnalyzer.addExternalModels(models);
+
+        const user = advancedAnalyzer.getModel('User');
+        assert.ok(user!.fields.some(f => f.name === 'nickname'));
+        assert.strictEqual(advancedAnalyzer.isExternalModel('User'), false);
+        assert.strictEqual(advancedAnalyzer.isExternalModel('AbstractUser'), true);
+    });
+
+    test('rebuilds when the interpreter changes without duplicating relations', async () => {
+        const modelsPath = path.join(tempDir, 'auth', 'models.py');
+        fs.mkdirSync(path.dirname(modelsPath), { recursive: true });
+        fs.writeFileSync(modelsPath, authModels + `
+class Group(models.Model):
+    name = models.CharField(max_length=150)
+
+class Membership(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    group = models.ForeignKey(Group, on_delete=models.CASCADE)
+`);
+
+        const environmentChanged = new vscode.EventEmitter<string | undefined>();
+        let pythonPath = '/venv/bin/python';
+        const executor = {
+            getCurrentPythonPath: () => pythonPath,
+            onDidChangeEnvironment: environmentChanged.event,
+            execute: async () => ({
+                stdout: JSON.stringify({ ...createEnvironment([modelsPath]), pythonPath }),
+                stderr: ''
+            })
+        } as any;
+        const context = { globalStorageUri: { fsPath: path.join(tempDir, 'storage') } } as any;
+        const projectAnalyzer = {
+            getInstalledApps: () => ['django.contrib.auth'],
+            getProjectRoot: () => tempDir
+        } as any;
+        index = new SitePackagesModelIndex(context, executor, advancedAnalyzer, projectAnalyzer);
+
+        await index.initialize();
+        const firstKey = index.getStatus().key;
+        const relationCount = advancedAnalyzer.getRelationsForModel('Membership').length;
+        assert.ok(relationCount > 0);
+
+        pythonPath = '/other/bin/python';
+        environmentChanged.fire(pythonPath);
+        await index.refresh();
+
+        assert.notStrictEqual(index.getStatus().key, firstKey);
+        assert.strictEqual(index.getStatus().pythonPath, '/other/bin/python');
+        assert.strictEqual(advancedAnalyzer.getRelationsForModel('Membership').length, relationCount);
+
+        index.dispose();
+        environmentChanged.dispose();
+    });
+});
\ No newline at end of file
@@ -0,0 +1,115 @@
+import * as assert from 'assert';
+import * as path from 'path';
+import * as fs from 'fs';
+import * as os from 'os';
+import { TemplateIndex } from '../../analyzers/templateIndex';
+
+suite('TemplateIndex Test Suite', () => {
+    let tempDir: string;
+    let index: TemplateIndex;
+
+    const writeFile = (relativePath: string, content: string) => {
+        const filePath = path.join(tempDir, relativePath);
+        fs.mkdirSync(path.dirname(filePath), { recursive: true });
+        fs.writeFileSync(filePath, content);
+        return filePath;
+    };
+
+    setup(async () => {
+        tempDir = fs.mkdtempSync(path.join(os.tmpdir(), 'template-index-test-'));
+
+        writeFile('templates/base.html', [
+            '<html>',
+            '{% block title %}{% endblock %}',
+            '{% block content %}{% endblock %}',
+            '{% block footer %}{% endblock %}',
+            '</html>'
+        ].join('\n'));
+        // Overrides the app template of the same name, since DIRS come first
+        writeFile('templates/blog/post_list.html', "{% extends 'blog/layout.html' %}");
+
+        writeFile('blog/__init__.py', '');
+        writeFile('blog/templates/blog/layout.html', [
+            "{% extends 'base.html' %}",
+            '{% block content %}{% block sidebar %}{% endblock %}{% endblock %}'
+        ].join('\n'));
+        writeFile('blog/templates/blog/post_list.html', "{% extends 'base.html' %}");
+        writeFile('blog/templates/blog/post_detail.html', [
+            "{% extends 'blog/layout.html' %}",
+            "{% block sidebar %}{% include 'blog/_related.html' %}{% endblock %}"
+        ].join('\n'));
+
+        const projectAnalyzer = {
+            getProjectRoot: () => tempDir,
+            getTemplateDirs: () => [path.join(tempDir, 'templates')],
+            getInstalledApps: () => ['django.contrib.admin', 'blog.apps.BlogConfig']
+        };
+        index = new TemplateIndex(projectAnalyzer as any);
+        await index.initialize();
+    });
+
+    teardown(() => {
+        index.dispose();
+        fs.rmSync(tempDir, { recursive: true, force: true });
+    });
+
+    test('resolves names in loader order', () => {
+        assert.strictEqual(
+            index.resolve('blog/post_list.html')?.filePath,
+            path.join(tempDir, 'templates', 'blog', 'post_list.html')
+        );
+        assert.strictEqual(
+            index.resolve('blog/post_detail.html')?.filePath,
+            path.join(tempDir, 'blog', 'templates', 'blog', 'post_detail.html')
+        );
+        assert.strictEqual(index.resolve('missing.html'), undefined);
+    });
+
+    test('records extends and include edges', () => {
+        const detail = path.join(tempDir, 'blog', 'templates', 'blog', 'post_detail.html');
+
+        assert.deepStrictEqual(index.getChildren('blog/layout.html').sort(), [
+            path.join(tempDir, 'templates', 'blog', 'post_list.html'),
+            detail
+        ].sort());
+        assert.deepStrictEqual(index.getIncluders('blog/_related.html'), [detail]);
+    });
+
+    test('lists inherited blocks with their nearest definition', () => {
+        const detail = index.resolve('blog/post_detail.html')!;
+        const blocks = index.getAvailableBlocks(detail.filePath);
+
+        assert.deepStrictEqual(blocks.map(block => block.name), ['sidebar', 'content', 'title', 'footer']);
+        assert.strictEqual(
+            index.findBlock('blog/layout.html', 'content')?.filePath,
+            path.join(tempDir, 'blog', 'templates', 'blog', 'layout.html')
+        );
+        assert.strictEqual(index.findBlock('blog/layout.html', 'footer')?.line, 3);
+    });
+
+    test('updates a single template and its edges', async () => {
+        const changed: string[][] = [];
+        index.onDidChangeTemplates(names => changed.push(names));
+
+        const layout = writeFile('blog/templates/blog/layout.html', "{% extends 'other_base.html' %}\n{% block main %}{% endblock %}");
+        await index.updateFile(layout);
+
+        assert.deepStrictEqual(changed, [['blog/layout.html']]);
+        assert.deepStrictEqual(index.getChildren('base.html'), [
+            path.join(tempDir, 'blog', 'templates', 'blog', 'post_list.html')
+        ]);
+        assert.deepStrictEqual(index.getChildren('other_base.html'), [layout]);
+
+        const detail = index.resolve('blog/post_detail.html')!;
+        assert.deepStrictEqual(index.getAvailableBlocks(detail.filePath).map(block => block.name), ['sidebar', 'main']);
+    });
+
+    test('falls back to the next directory when a template is removed', () => {
+        index.removeFile(path.join(tempDir, 'templates', 'blog', 'post_list.html'));
+
+        assert.strictEqual(
+            index.resolve('blog/post_list.html')?.filePath,
+            path.join(tempDir, 'blog', 'templates', 'blog', 'post_list.html')
+        );
+    });
+});
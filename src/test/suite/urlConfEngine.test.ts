@@ -0,0 +1,132 @@
+import * as assert from 'assert';
+import * as path from 'path';
+import { UrlConfEngine } from '../../analyzers/urlConfEngine';
+
+suite('UrlConfEngine Test Suite', () => {
+    const root = path.join(path.sep, 'project');
+    const file = (relativePath: string) => path.join(root, ...relativePath.split('/'));
+
+    const configUrls = `
+from django.urls import path, re_path, include
+
+urlpatterns = [
+    path('', views.home, name='home'),
+    path('shop/', include('shop.urls', namespace='store')),
+    re_path(r'^blog/(?P<year>[0-9]{4})/', include('blog.urls')),
+]
+`;
+    const shopUrls = `
+app_name = 'shop'
+
+urlpatterns = [
+    path('orders/<int:pk>/', views.order_detail, name='order-detail'),
+    path('api/', include(('shop.api', 'api'))),
+]
+`;
+    const shopApi = `
+urlpatterns = [
+    path('items/', views.items, name='items'),
+]
+`;
+    const blogUrls = `
+app_name = 'blog'
+
+urlpatterns = [
+    path('<slug:slug>/', views.post_detail, name='post'),
+]
+`;
+
+    test('should qualify names through nested include() namespaces', () => {
+        const engine = new UrlConfEngine();
+        engine.batch(() => {
+            engine.updateFile(file('config/urls.py'), configUrls);
+            engine.updateFile(file('shop/urls.py'), shopUrls);
+            engine.updateFile(file('shop/api.py'), shopApi);
+            engine.updateFile(file('blog/urls.py'), blogUrls);
+        });
+        engine.setRootUrlconf(root, 'config.urls');
+
+        const snapshot = engine.getSnapshot();
+        const detail = snapshot.get('order-detail', 'store')!;
+        assert.strictEqual(detail.route, 'shop/orders/<int:pk>/');
+        assert.deepStrictEqual(detail.params, ['pk']);
+        assert.strictEqual(detail.line, 4);
+        // The instance namespace replaces the included module's app_name
+        assert.strictEqual(snapshot.get('order-detail', 'shop'), undefined);
+        assert.strictEqual(snapshot.get('items', 'store:api')?.route, 'shop/api/items/');
+
+        const post = snapshot.get('post', 'blog')!;
+        assert.deepStrictEqual(post.params, ['year', 'slug']);
+
+        assert.ok(Object.isFrozen(snapshot.patterns));
+        assert.ok(Object.isFrozen(detail));
+    });
+
+    test('should parse a file once per content and report the changed names', () => {
+        const engine = new UrlConfEngine();
+        const changes: string[][] = [];
+        engine.onDidChangePatterns(keys => changes.push(keys));
+
+        assert.strictEqual(engine.updateFile(file('blog/urls.py'), blogUrls), true);
+        const snapshot = engine.getSnapshot();
+        assert.strictEqual(engine.updateFile(file('blog/urls.py'), blogUrls), false);
+        assert.strictEqual(engine.getSnapshot(), snapshot);
+
+        engine.updateFile(file('blog/urls.py'), blogUrls.replace("name='post'", "name='entry'"));
+        assert.deepStrictEqual(changes, [['blog:post'], ['blog:post', 'blog:entry']]);
+
+        // Readers holding the earlier snapshot keep seeing it
+        assert.ok(snapshot.get('post', 'blog'));
+        assert.strictEqual(engine.getSnapshot().get('post', 'blog'), undefined);
+    });
+
+    test('should collect only the patterns of the changed module', () => {
+        const engine = new UrlConfEngine();
+        engine.batch(() => {
+            engine.updateFile(file('config/urls.py'), configUrls);
+            engine.updateFile(file('shop/urls.py'), shopUrls);
+            engine.updateFile(file('blog/urls.py'), blogUrls);
+        });
+        engine.setRootUrlconf(root, 'config.urls');
+        const detail = engine.getSnapshot().get('order-detail', 'store');
+
+        // A module outside the include() tree does not walk the tree again
+        engine.updateFile(file('legacy/urls.py'), "app_name = 'legacy'\nurlpatterns = [path('old/', views.old, name='old')]\n");
+        assert.strictEqual(engine.getSnapshot().get('order-detail', 'store'), detail);
+        assert.strictEqual(engine.getSnapshot().get('old', 'legacy')?.route, 'old/');
+
+        // An included module that appears later joins the tree
+        engine.updateFile(file('shop/api.py'), shopApi);
+        assert.strictEqual(engine.getSnapshot().get('items', 'store:api')?.route, 'shop/api/items/');
+        assert.strictEqual(engine.getSnapshot().get('items'), undefined);
+    });
+
+    test('should keep the URL names of each project apart', () => {
+        const engine = new UrlConfEngine();
+        const shopRoot = path.join(root, 'shop');
+        const billingRoot = path.join(root, 'billing');
+        const homeUrls = (view: string) => `
+urlpatterns = [
+    path('', views.${view}, name='home'),
+]
+`;
+        engine.batch(() => {
+            engine.updateFile(path.join(shopRoot, 'config', 'urls.py'), homeUrls('storefront'));
+            engine.updateFile(path.join(billingRoot, 'config', 'urls.py'), homeUrls('dashboard'));
+            engine.updateFile(path.join(billingRoot, 'invoices', 'urls.py'), shopApi);
+        });
+        engine.setRootUrlconf(shopRoot, 'config.urls');
+        engine.setRootUrlconf(billingRoot, 'config.urls');
+
+        assert.strictEqual(engine.getSnapshot(shopRoot).get('home')?.view, 'views.storefront');
+        assert.strictEqual(engine.getSnapshot(billingRoot).get('home')?.view, 'views.dashboard');
+        // Modules no ROOT_URLCONF includes belong to the project they are in
+        assert.strictEqual(engine.getSnapshot(shopRoot).get('items'), undefined);
+        assert.ok(engine.getSnapshot(billingRoot).get('items'));
+        assert.strictEqual(engine.getSnapshot(shopRoot), engine.getSnapshot(shopRoot));
+
+        engine.updateFile(path.join(shopRoot, 'config', 'urls.py'), homeUrls('landing'));
+        assert.strictEqual(engine.getSnapshot(shopRoot).get('home')?.view, 'views.landing');
+        assert.strictEqual(engine.getSnapshot().patterns.length, 3);
+    });
+});
@@ -0,0 +1,131 @@
+import * as assert from 'assert';
+import * as path from 'path';
+import * as fs from 'fs';
+import * as os from 'os';
+import { UrlResolver } from '../../analyzers/urlResolver';
+
+suite('UrlResolver Test Suite', () => {
+    let tempDir: string;
+    let resolver: UrlResolver;
+
+    const writeFile = (relativePath: string, content: string) => {
+        const filePath = path.join(tempDir, relativePath);
+        fs.mkdirSync(path.dirname(filePath), { recursive: true });
+        fs.writeFileSync(filePath, content);
+        return filePath;
+    };
+
+    setup(() => {
+        tempDir = fs.mkdtempSync(path.join(os.tmpdir(), 'url-resolver-test-'));
+
+        writeFile('config/urls.py', `
+from django.urls import path, re_path, include
+from pages import views as page_views
+
+urlpatterns = [
+    path('', page_views.home, name='home'),
+    path('shop/', include('shop.urls', namespace='shop')),
+    re_path(r'^blog/(?P<year>[0-9]{4})/', include('blog.urls')),
+    path('<slug:page>/', page_views.page, name='page'),
+]
+`);
+        writeFile('shop/__init__.py', '');
+        writeFile('shop/urls.py', `
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('orders/', views.OrderListView.as_view(), name='order-list'),
+    path('orders/<int:pk>/', views.OrderDetailView.as_view(), name='order-detail'),
+    path('products/<uuid:id>/', views.product_detail, name='product'),
+]
+`);
+        writeFile('blog/urls.py', `
+from django.urls import path
+from . import views
+
+app_name = 'blog'
+
+urlpatterns = [
+    path('<slug:slug>/', views.post_detail, name='post'),
+]
+`);
+
+        const projectAnalyzer = {
+            getProjectRoot: () => tempDir,
+            getRootUrlconf: () => 'config.urls'
+        };
+        resolver = new UrlResolver(projectAnalyzer as any);
+    });
+
+    teardown(() => {
+        resolver.dispose();
+        fs.rmSync(tempDir, { recursive: true, force: true });
+    });
+
+    test('resolves a path through include() with namespace and converters', async () => {
+        const result = (await resolver.resolve('/shop/orders/42/'))!;
+
+        assert.ok(result);
+        assert.strictEqual(result.view, 'views.OrderDetailView.as_view()');
+        assert.strictEqual(result.name, 'shop:order-detail');
+        assert.deepStrictEqual(result.kwargs, { pk: '42' });
+        assert.strictEqual(result.route, 'shop/orders/<int:pk>/');
+        assert.strictEqual(result.filePath, path.join(tempDir, 'shop', 'urls.py'));
+        assert.strictEqual(result.line, 6);
+    });
+
+    test('collects kwargs from re_path includes and uses the app_name namespace', async () => {
+        const result = (await resolver.resolve('/blog/2024/hello-world/'))!;
+
+        assert.ok(result);
+        assert.strictEqual(result.view, 'views.post_detail');
+        assert.strictEqual(result.name, 'blog:post');
+        assert.deepStrictEqual(result.kwargs, { year: '2024', slug: 'hello-world' });
+    });
+
+    test('falls back to dynamic patterns in declaration order', async () => {
+        const home = await resolver.resolve('/');
+        assert.strictEqual(home?.name, 'home');
+
+        const page = await resolver.resolve('/about/');
+        assert.strictEqual(page?.name, 'page');
+        assert.deepStrictEqual(page?.kwargs, { page: 'about' });
+
+        // Nothing under shop/ matches and the catch-all takes one segment only
+        assert.strictEqual(await resolver.resolve('/shop/unknown/'), undefined);
+    });
+
+    test('accepts full URLs and query strings', async () => {
+        const result = await resolver.resolve('https://example.com/shop/orders/?page=2#top');
+        assert.strictEqual(result?.name, 'shop:order-list');
+    });
+
+    test('rejects values that do not fit the converter', async () => {
+        assert.strictEqual(await resolver.resolve('/shop/orders/abc/'), undefined);
+        assert.strictEqual(await resolver.resolve('/shop/products/not-a-uuid/'), undefined);
+    });
+
+    test('recompiles only the changed URLconf', async () => {
+        await resolver.resolve('/shop/orders/');
+
+        const shopUrls = writeFile('shop/urls.py', `
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('orders/', views.orders_v2, name='order-list'),
+]
+`);
+        resolver.invalidateFile(shopUrls);
+
+        const result = await resolver.resolve('/shop/orders/');
+        assert.strictEqual(result?.view, 'views.orders_v2');
+    });
+
+    test('returns undefined without ROOT_URLCONF', async () => {
+        const empty = new UrlResolver({ getProjectRoot: () => tempDir, getRootUrlconf: () => undefined } as any);
+        assert.strictEqual(await empty.resolve('/shop/orders/'), undefined);
+        empty.dispose();
+    });
+});
@@ -0,0 +1,24 @@
+/**
+ * Run an async worker over items with at most `limit` calls in flight.
+ * Worker errors are not caught here; callers handle failures per item.
+ */
+export async function runWithConcurrency<T>(
+    items: readonly T[],
+    limit: number,
+    worker: (item: T, index: number) => Promise<void>
+): Promise<void> {
+    let nextIndex = 0;
+    const runners: Promise<void>[] = [];
+    const runnerCount = Math.max(1, Math.min(limit, items.length));
+
+    for (let i = 0; i < runnerCount; i++) {
+        runners.push((async () => {
+            while (nextIndex < items.length) {
+                const index = nextIndex++;
+                await worker(items[index], index);
+            }
+        })());
+    }
+
+    await Promise.all(runners);
+}
@@ -0,0 +1,32 @@
+import * as fs from 'fs';
+
+/**
+ * Synchronous file system access used by the analyzers, so that tests and
+ * the command line tools can supply their own implementation
+ */
+export interface FileSystem {
+    existsSync(path: string): boolean;
+    readFileSync(path: string, encoding?: string): string | Buffer;
+    readdirSync(path: string): string[];
+    statSync(path: string): fs.Stats;
+    // Optional non-blocking read for background work
+    readFile?(path: string): Promise<string>;
+}
+
+export const nodeFileSystem: FileSystem = {
+    existsSync: fs.existsSync,
+    readFileSync: (path: string, encoding?: string) => fs.readFileSync(path, (encoding || 'utf8') as BufferEncoding),
+    readdirSync: fs.readdirSync,
+    statSync: fs.statSync,
+    readFile: (path: string) => fs.promises.readFile(path, 'utf8')
+};
+
+/**
+ * Read a text file without blocking when the file system supports it
+ */
+export async function readTextFile(fileSystem: FileSystem, path: string): Promise<string> {
+    if (fileSystem.readFile) {
+        return fileSystem.readFile(path);
+    }
+    return fileSystem.readFileSync(path, 'utf8') as string;
+}
@@ -0,0 +1,173 @@
+import * as os from 'os';
+import { monitorEventLoopDelay, IntervalHistogram } from 'perf_hooks';
+
+export interface AdaptiveConcurrencyOptions {
+    // Upper bound, the analysisWorkers setting
+    maxConcurrency: number;
+    minConcurrency?: number;
+    // Task latency below which tasks never count as slowed down
+    targetLatencyMs?: number;
+    // Event loop delay above which background analysis is slowing the editor down
+    maxEventLoopDelayMs?: number;
+    // Time without edits after which the user counts as idle
+    idleDelayMs?: number;
+    cpuCount?: number;
+}
+
+export interface AdaptiveConcurrencyStatus {
+    concurrency: number;
+    maxConcurrency: number;
+    latencyMs: number;
+    eventLoopDelayMs: number;
+    userActive: boolean;
+    increases: number;
+    decreases: number;
+}
+
+const DEFAULT_TARGET_LATENCY_MS = 250;
+const DEFAULT_MAX_EVENT_LOOP_DELAY_MS = 50;
+const DEFAULT_IDLE_DELAY_MS = 1000;
+// Weight of the newest sample in the latency average
+const LATENCY_SMOOTHING = 0.3;
+// How fast the baseline follows latencies above it, e.g. when files get larger
+const BASELINE_DRIFT = 0.05;
+// Latency relative to the baseline that counts as contention
+const LATENCY_TOLERANCE = 2;
+const EVENT_LOOP_RESOLUTION_MS = 20;
+
+/**
+ * Number of background analysis tasks to run at once, tuned AIMD-style:
+ * each completed task adds 1/limit (one step per round of tasks), and the
+ * limit is halved, at most once per round, when the event loop delay
+ * exceeds its maximum or the smoothed task latency rises to twice the
+ * lowest latency seen (and above the target). Edits drop it to the
+ * minimum until the user has been idle for a while; it never exceeds the
+ * configured maximum or the CPU count.
+ */
+export class AdaptiveConcurrencyController {
+    private limit: number;
+    private readonly minConcurrency: number;
+    private readonly maxConcurrency: number;
+    private readonly targetLatencyMs: number;
+    private readonly maxEventLoopDelayMs: number;
+    private readonly idleDelayMs: number;
+    private latencyMs = 0;
+    private baselineLatencyMs = 0;
+    private eventLoopDelayMs = 0;
+    private lastActivity = 0;
+    // Completions to wait for after a decrease before reacting again
+    private holdOff = 0;
+    private increases = 0;
+    private decreases = 0;
+    private histogram: IntervalHistogram | undefined;
+
+    constructor(options: AdaptiveConcurrencyOptions) {
+        const cpuCount = options.cpuCount ?? os.cpus().length;
+        this.minConcurrency = Math.max(1, options.minConcurrency ?? 1);
+        this.maxConcurrency = Math.max(this.minConcurrency, Math.min(options.maxConcurrency, cpuCount));
+        this.targetLatencyMs = options.targetLatencyMs ?? DEFAULT_TARGET_LATENCY_MS;
+        this.maxEventLoopDelayMs = options.maxEventLoopDelayMs ?? DEFAULT_MAX_EVENT_LOOP_DELAY_MS;
+        this.idleDelayMs = options.idleDelayMs ?? DEFAULT_IDLE_DELAY_MS;
+        this.limit = this.minConcurrency;
+
+        try {
+            this.histogram = monitorEventLoopDelay({ resolution: EVENT_LOOP_RESOLUTION_MS });
+            this.histogram.enable();
+        } catch {
+            // Event loop delay is not a signal then; latency still is
+        }
+    }
+
+    /**
+     * Tasks that may run at once now
+     */
+    get concurrency(): number {
+        if (this.isUserActive()) {
+            return this.minConcurrency;
+        }
+        return Math.floor(this.limit);
+    }
+
+    /**
+     * Back off sharply, e.g. on every edit
+     */
+    notifyUserActivity(): void {
+        this.lastActivity = Date.now();
+        this.limit = this.minConcurrency;
+    }
+
+    isUserActive(): boolean {
+        return Date.now() - this.lastActivity < this.idleDelayMs;
+    }
+
+    /**
+     * Adjust the limit after a task finished in `durationMs`
+     */
+    recordTask(durationMs: number): void {
+        this.latencyMs = this.latencyMs === 0
+            ? durationMs
+            : this.latencyMs + LATENCY_SMOOTHING * (durationMs - this.latencyMs);
+        this.baselineLatencyMs = this.baselineLatencyMs === 0 || this.latencyMs < this.baselineLatencyMs
+            ? this.latencyMs
+            : this.baselineLatencyMs + BASELINE_DRIFT * (this.latencyMs - this.baselineLatencyMs);
+        this.sampleEventLoopDelay();
+
+        if (this.isUserActive()) {
+            this.limit = this.minConcurrency;
+            return;
+        }
+        if (this.holdOff > 0) {
+            this.holdOff--;
+            return;
+        }
+
+        const slowTasks = this.latencyMs > this.targetLatencyMs
+            && this.latencyMs > this.baselineLatencyMs * LATENCY_TOLERANCE;
+        if (slowTasks || this.eventLoopDelayMs > this.maxEventLoopDelayMs) {
+            if (this.limit > this.minConcurrency) {
+                this.limit = Math.max(this.minConcurrency, Math.floor(this.limit / 2));
+                this.decreases++;
+            }
+            // Tasks started at the old limit are still finishing
+            this.holdOff = Math.ceil(this.limit);
+        } else if (this.limit < this.maxConcurrency) {
+            const before = Math.floor(this.limit);
+            this.limit = Math.min(this.maxConcurrency, this.limit + 1 / Math.floor(this.limit));
+            if (Math.floor(this.limit) > before) {
+                this.increases++;
+            }
+        }
+    }
+
+    getStatus(): AdaptiveConcurrencyStatus {
+        return {
+            concurrency: this.concurrency,
+            maxConcurrency: this.maxConcurrency,
+            latencyMs: this.latencyMs,
+            eventLoopDelayMs: this.eventLoopDelayMs,
+            userActive: this.isUserActive(),
+            increases: this.increases,
+            decreases: this.decreases
+        };
+    }
+
+    /**
+     * Delay of the event loop since the last sample, ignoring single outliers
+     */
+    private sampleEventLoopDelay(): void {
+        if (!this.histogram) {
+            return;
+        }
+        // Nanoseconds, 0 without samples; each sample includes the timer's resolution
+        const delay = this.histogram.percentile(90);
+        this.histogram.reset();
+        if (delay > 0) {
+            this.eventLoopDelayMs = Math.max(0, delay / 1e6 - EVENT_LOOP_RESOLUTION_MS);
+        }
+    }
+
+    dispose(): void {
+        this.histogram?.disable();
+        this.histogram = undefined;
+    }
+}
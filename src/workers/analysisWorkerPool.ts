@@ -169,6 +169,7 @@ export class AnalysisWorkerPool extends EventEmitter {
  */
 export class DebouncedTaskExecutor {
     private timeouts: Map<string, NodeJS.Timeout> = new Map();
+    private batches: Map<string, Set<unknown>> = new Map();
     private delay: number;
 
     constructor(delay: number = 300) {
@@ -198,6 +199,25 @@ export class DebouncedTaskExecutor {
         this.timeouts.set(key, timeout);
     }
 
+    /**
+     * Collect items under one key and run the task once for all of them
+     * after the delay, instead of keeping one timer per item
+     */
+    executeBatched<T>(key: string, item: T, task: (items: T[]) => void | Promise<void>): void {
+        let items = this.batches.get(key) as Set<T> | undefined;
+        if (!items) {
+            items = new Set();
+            this.batches.set(key, items);
+        }
+        items.add(item);
+
+        this.execute(key, () => {
+            const batch = Array.from((this.batches.get(key) || []) as Iterable<T>);
+            this.batches.delete(key);
+            return task(batch);
+        });
+    }
+
     /**
      * Cancel pending task
      */
@@ -207,6 +227,7 @@ export class DebouncedTaskExecutor {
             clearTimeout(timeout);
             this.timeouts.delete(key);
         }
+        this.batches.delete(key);
     }
 
     /**
@@ -217,6 +238,7 @@ export class DebouncedTaskExecutor {
             clearTimeout(timeout);
         }
         this.timeouts.clear();
+        this.batches.clear();
     }
 
     /**